@@ -2,32 +2,39 @@
 Dependency Injection Container
 
 Central container for managing service instances and their dependencies.
+
+Services are created lazily: each one (and the modules it imports) is built
+the first time it is accessed, so importing the container is cheap.
 """
 
 import logging
 import os
-from typing import Optional
+import threading
+from typing import Any, Callable, List, Optional
 
 from core.logging_config import setup_logging, get_service_logger
-from services.enhanced_logging_service import EnhancedLoggingService
-from services.psd_service import PSDService
-from services.aepx_service import AEPXService
-from services.matching_service import MatchingService
-from services.preview_service import PreviewService
-from services.settings_service import SettingsService
-from services.project_service import ProjectService
-from services.export_service import ExportService
-from services.expression_applier_service import ExpressionApplierService
-from services.recovery_service import RecoveryService
-from services.validation_service import ValidationService
-from services.plainly_validator_service import PlainlyValidatorService
-from modules.aep_converter import AEPConverter
-from modules.expression_system import (
-    ExpressionGenerator,
-    ExpressionConfig,
-    HardCardGenerator,
-    AEPXExpressionWriter
-)
+
+
+class _LazyService:
+    """
+    Descriptor that builds a service on first access and caches it on the
+    container instance (later lookups never reach the descriptor again).
+    """
+
+    def __init__(self, factory: Callable[['ServiceContainer'], Any]):
+        self.factory = factory
+        self.__doc__ = factory.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        with instance._services_lock:
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = self.factory(instance)
+        return instance.__dict__[self.name]
 
 
 class ServiceContainer:
@@ -75,7 +82,7 @@ class ServiceContainer:
         return cls._instance
 
     def __init__(self):
-        """Initialize the container and all services."""
+        """Initialize the container (services are built on first access)."""
         if self._initialized:
             return
 
@@ -95,91 +102,135 @@ class ServiceContainer:
         self.main_logger.info("Service container initialized successfully")
 
     def _initialize_services(self):
-        """Initialize all service instances."""
+        """Set up shared state; individual services are built on first access."""
+        self._services_lock = threading.RLock()
+
         # Create enhanced logging service if enabled
         use_enhanced = os.getenv('USE_ENHANCED_LOGGING', 'false').lower() == 'true'
         if use_enhanced:
+            from services.enhanced_logging_service import EnhancedLoggingService
             self.enhanced_logging = EnhancedLoggingService(self.main_logger)
             self.main_logger.info("Enhanced logging enabled")
         else:
             self.enhanced_logging = None
 
-        # Settings Service
-        self.settings_service = SettingsService(
+    @_LazyService
+    def settings_service(self):
+        """Settings Service"""
+        from services.settings_service import SettingsService
+        return SettingsService(
             logger=get_service_logger('settings'),
             enhanced_logging=self.enhanced_logging
         )
 
-        # PSD Service
-        self.psd_service = PSDService(
+    @_LazyService
+    def psd_service(self):
+        """PSD Service"""
+        from services.psd_service import PSDService
+        return PSDService(
             logger=get_service_logger('psd'),
             enhanced_logging=self.enhanced_logging
         )
 
-        # AEPX Service
-        self.aepx_service = AEPXService(
+    @_LazyService
+    def aepx_service(self):
+        """AEPX Service"""
+        from services.aepx_service import AEPXService
+        return AEPXService(
             logger=get_service_logger('aepx'),
             enhanced_logging=self.enhanced_logging
         )
 
-        # Matching Service
-        self.matching_service = MatchingService(
+    @_LazyService
+    def matching_service(self):
+        """Matching Service"""
+        from services.matching_service import MatchingService
+        return MatchingService(
             logger=get_service_logger('matching'),
             enhanced_logging=self.enhanced_logging
         )
 
-        # Preview Service
-        self.preview_service = PreviewService(
+    @_LazyService
+    def preview_service(self):
+        """Preview Service"""
+        from services.preview_service import PreviewService
+        return PreviewService(
             logger=get_service_logger('preview'),
             enhanced_logging=self.enhanced_logging
         )
 
-        # AEP Converter
-        self.aep_converter = AEPConverter(
+    @_LazyService
+    def aep_converter(self):
+        """AEP Converter"""
+        from modules.aep_converter import AEPConverter
+        return AEPConverter(
             logger=get_service_logger('aep_converter')
         )
 
-        # Export Service
-        self.export_service = ExportService(
+    @_LazyService
+    def export_service(self):
+        """Export Service"""
+        from services.export_service import ExportService
+        return ExportService(
             logger=get_service_logger('export'),
             enhanced_logging=self.enhanced_logging
         )
 
-        # Expression System Components
-        # Configuration for expression generator
-        self.expression_config = ExpressionConfig(
+    # Expression System Components
+
+    @_LazyService
+    def expression_config(self):
+        """Configuration for expression generator"""
+        from modules.expression_system import ExpressionConfig
+        return ExpressionConfig(
             hard_card_comp_name="Hard_Card",
             use_lowercase_comparison=True,
             add_error_handling=True
         )
 
-        # Expression Generator (creates JavaScript expressions)
-        self.expression_generator = ExpressionGenerator(self.expression_config)
-
-        # Hard Card Generator (creates variable composition)
-        self.hard_card_generator = HardCardGenerator(
+    @_LazyService
+    def expression_generator(self):
+        """Expression Generator (creates JavaScript expressions)"""
+        from modules.expression_system import ExpressionGenerator
+        return ExpressionGenerator(self.expression_config)
+
+    @_LazyService
+    def hard_card_generator(self):
+        """Hard Card Generator (creates variable composition)"""
+        from modules.expression_system import HardCardGenerator
+        return HardCardGenerator(
             logger=get_service_logger('hard_card_generator'),
             comp_width=1920,
             comp_height=1080
         )
 
-        # AEPX Expression Writer (modifies AEPX XML to add expressions)
-        self.aepx_expression_writer = AEPXExpressionWriter(
+    @_LazyService
+    def aepx_expression_writer(self):
+        """AEPX Expression Writer (modifies AEPX XML to add expressions)"""
+        from modules.expression_system import AEPXExpressionWriter
+        return AEPXExpressionWriter(
             logger=get_service_logger('aepx_expression_writer')
         )
 
-        # Expression Applier Service (intelligently matches layers to variables)
-        self.expression_applier_service = ExpressionApplierService(
+    @_LazyService
+    def expression_applier_service(self):
+        """Expression Applier Service (intelligently matches layers to variables)"""
+        from services.expression_applier_service import ExpressionApplierService
+        return ExpressionApplierService(
             logger=get_service_logger('expression_applier'),
             enhanced_logging=self.enhanced_logging
         )
 
-        # Project Service (with audit trail and batch processing)
+    @_LazyService
+    def project_service(self):
+        """Project Service (with audit trail and batch processing)"""
+        from services.project_service import ProjectService
+
         # Get settings data from Result object
         settings_result = self.settings_service.get_settings()
         settings_data = settings_result.get_data() if settings_result.is_success() else {}
 
-        self.project_service = ProjectService(
+        return ProjectService(
             logger=get_service_logger('project'),
             settings=settings_data,
             psd_service=self.psd_service,
@@ -190,25 +241,53 @@ class ServiceContainer:
             enhanced_logging=self.enhanced_logging
         )
 
-        # Recovery Service (error recovery and retry mechanisms)
-        self.recovery_service = RecoveryService(
+    @_LazyService
+    def recovery_service(self):
+        """Recovery Service (error recovery and retry mechanisms)"""
+        from services.recovery_service import RecoveryService
+        return RecoveryService(
             logger=get_service_logger('recovery'),
             project_service=self.project_service,
             enhanced_logging=self.enhanced_logging
         )
 
-        # Validation Service (file validation before processing)
-        self.validation_service = ValidationService(
+    @_LazyService
+    def validation_service(self):
+        """Validation Service (file validation before processing)"""
+        from services.validation_service import ValidationService
+        return ValidationService(
             logger=get_service_logger('validation'),
             enhanced_logging=self.enhanced_logging
         )
 
-        # Plainly Validator Service (Plainly compatibility validation)
-        self.plainly_validator_service = PlainlyValidatorService(
+    @_LazyService
+    def plainly_validator_service(self):
+        """Plainly Validator Service (Plainly compatibility validation)"""
+        from services.plainly_validator_service import PlainlyValidatorService
+        return PlainlyValidatorService(
             logger=get_service_logger('plainly_validator'),
             enhanced_logging=self.enhanced_logging
         )
 
+    def loaded_services(self) -> List[str]:
+        """Names of services that have been built so far."""
+        return [
+            name for name, attr in vars(type(self)).items()
+            if isinstance(attr, _LazyService) and name in self.__dict__
+        ]
+
+    def preload(self, *names: str):
+        """
+        Build services ahead of first use (all services if no names given).
+        """
+        if not names:
+            names = tuple(
+                name for name, attr in vars(type(self)).items()
+                if isinstance(attr, _LazyService)
+            )
+        for name in names:
+            getattr(self, name)
+
     def get_logger(self, name: str = None) -> logging.Logger:
         """
         Get a logger instance.
@@ -229,6 +308,9 @@ class ServiceContainer:
 
         Warning: This will re-initialize all services.
         """
+        for name, attr in vars(type(self)).items():
+            if isinstance(attr, _LazyService):
+                self.__dict__.pop(name, None)
         self._initialized = False
         self.__init__()
 
@@ -0,0 +1,101 @@
+"""
+Lazy Imports
+
+Defers loading of heavy third-party packages (psd_tools, PIL, scipy,
+sentence_transformers/torch) until first use, so importing web_app and the
+service container stays fast.
+
+Usage:
+    from core.lazy_imports import lazy_import, is_available
+
+    psd_tools = lazy_import('psd_tools')      # nothing loaded yet
+    psd = psd_tools.PSDImage.open(path)       # loads psd_tools here
+
+    if is_available('sentence_transformers'):  # no import performed
+        ...
+"""
+
+import importlib
+import importlib.machinery
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """
+    Module placeholder that imports the real module on first attribute access.
+
+    The real import goes through the normal import system (and its per-module
+    locks), so concurrent first use from several threads is safe.
+    """
+
+    def __init__(self, module_name: str):
+        super().__init__(module_name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def is_available(module_name: str) -> bool:
+    """
+    Check whether a module can be imported, without importing it.
+
+    For a submodule ('PIL.Image') the parent packages are located on the
+    path rather than imported, which importlib.util.find_spec would do.
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name] is not None
+
+    top, _, rest = module_name.partition('.')
+    try:
+        spec = importlib.util.find_spec(top)
+        name = top
+        for part in rest.split('.') if rest else []:
+            if spec is None or spec.submodule_search_locations is None:
+                return False
+            name = f"{name}.{part}"
+            if name in sys.modules:
+                spec = sys.modules[name].__spec__
+                continue
+            spec = importlib.machinery.PathFinder.find_spec(name, spec.submodule_search_locations)
+        return spec is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def lazy_import(module_name: str) -> ModuleType:
+    """
+    Return a module whose code runs on first attribute access.
+
+    If the module is already loaded it is returned as-is. Raises
+    ImportError immediately if the module cannot be found.
+    """
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    if not is_available(module_name):
+        raise ImportError(f"No module named '{module_name}'", name=module_name)
+
+    return LazyModule(module_name)
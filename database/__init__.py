@@ -4,24 +4,25 @@ Database initialization and session management.
 Provides database engine, session factory, and initialization utilities.
 """
 
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.engine import make_url
 from pathlib import Path
 import os
 
 from .models import Base
+from .job_stats import register_job_stats
+from .engine import create_db_engine, get_database_url, sqlite_database_path
 
-# Database file location
+# Database file location (default SQLite database)
 DB_DIR = Path(__file__).parent.parent / 'data'
 DB_DIR.mkdir(exist_ok=True)
 DB_PATH = DB_DIR / 'production.db'
 
-# Create engine
-DATABASE_URL = f'sqlite:///{DB_PATH}'
-engine = create_engine(
+# Create engine (DATABASE_URL selects another database, e.g. PostgreSQL)
+DATABASE_URL = get_database_url()
+engine = create_db_engine(
     DATABASE_URL,
-    echo=False,  # Set to True for SQL debugging
-    connect_args={'check_same_thread': False}  # Needed for SQLite
+    echo=False  # Set to True for SQL debugging
 )
 
 # Create session factory
@@ -31,6 +32,9 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Keep dashboard counters (job_stats) in step with job changes
+register_job_stats(SessionLocal)
+
 # Create scoped session for thread safety
 db_session = scoped_session(SessionLocal)
 
@@ -44,7 +48,7 @@ def init_database():
     print(f"\n{'='*70}")
     print(f"🗄️  DATABASE INITIALIZATION")
     print(f"{'='*70}")
-    print(f"Database: {DB_PATH}")
+    print(f"Database: {make_url(DATABASE_URL).render_as_string(hide_password=True)}")
     print(f"Creating tables...")
 
     # Create all tables
@@ -96,6 +100,7 @@ def reset_database():
     print(f"{'='*70}\n")
 
 
-# Auto-initialize database on import
-if not DB_PATH.exists():
+# Auto-initialize a new SQLite database on import
+_sqlite_path = sqlite_database_path(DATABASE_URL)
+if _sqlite_path is not None and not _sqlite_path.exists():
     init_database()
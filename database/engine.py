@@ -0,0 +1,112 @@
+"""
+Database engine factory.
+
+Builds the SQLAlchemy engine from DATABASE_URL (default: the SQLite file in
+data/production.db) with settings suited to the backend:
+
+SQLite
+    - WAL journal, so readers don't block the writer and vice versa
+    - synchronous=NORMAL (safe with WAL; fsync at checkpoints, not commits)
+    - busy_timeout, so a briefly locked database waits instead of failing
+    - mmap_size for memory-mapped reads
+    - a small connection pool shared across threads
+
+PostgreSQL (or any other server database)
+    - pooled connections with pre-ping and recycling
+"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / 'data' / 'production.db'
+
+DEFAULT_BUSY_TIMEOUT_MS = 30000
+DEFAULT_MMAP_SIZE_MB = 256
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_RECYCLE = 1800  # seconds
+
+
+def get_database_url() -> str:
+    """DATABASE_URL from the environment, or the default SQLite file."""
+    return os.getenv('DATABASE_URL') or f'sqlite:///{DEFAULT_DB_PATH}'
+
+
+def sqlite_database_path(url: str) -> Optional[Path]:
+    """Filesystem path of a file-backed SQLite URL (None for memory/other backends)."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != 'sqlite':
+        return None
+    if not parsed.database or parsed.database == ':memory:':
+        return None
+    return Path(parsed.database)
+
+
+def create_db_engine(url: Optional[str] = None, echo: bool = False) -> Engine:
+    """
+    Create an engine for url (default: get_database_url()).
+
+    Tuned from the environment:
+        DB_POOL_SIZE / DB_MAX_OVERFLOW: connection pool size (default: 5 / 10)
+        DB_POOL_RECYCLE: seconds before a server connection is replaced (default: 1800)
+        SQLITE_BUSY_TIMEOUT_MS: wait for locks this long (default: 30000)
+        SQLITE_MMAP_SIZE_MB: memory-mapped I/O size, 0 to disable (default: 256)
+        SQLITE_SYNCHRONOUS: PRAGMA synchronous value (default: NORMAL)
+    """
+    url = url or get_database_url()
+    pool_size = int(os.getenv('DB_POOL_SIZE', DEFAULT_POOL_SIZE))
+    max_overflow = int(os.getenv('DB_MAX_OVERFLOW', DEFAULT_MAX_OVERFLOW))
+
+    if make_url(url).get_backend_name() != 'sqlite':
+        return create_engine(
+            url,
+            echo=echo,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=True,
+            pool_recycle=int(os.getenv('DB_POOL_RECYCLE', DEFAULT_POOL_RECYCLE))
+        )
+
+    busy_timeout_ms = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', DEFAULT_BUSY_TIMEOUT_MS))
+    file_backed = sqlite_database_path(url) is not None
+
+    pool_args = {}
+    if file_backed:
+        pool_args = {'pool_size': pool_size, 'max_overflow': max_overflow}
+
+    engine = create_engine(
+        url,
+        echo=echo,
+        connect_args={
+            'check_same_thread': False,  # Connections are shared across threads via the pool
+            'timeout': busy_timeout_ms / 1000
+        },
+        **pool_args
+    )
+
+    if file_backed:
+        configure_sqlite(engine, busy_timeout_ms)
+    return engine
+
+
+def configure_sqlite(engine: Engine, busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS):
+    """Apply WAL and tuning PRAGMAs to every new connection of a SQLite engine."""
+    synchronous = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+    mmap_bytes = int(os.getenv('SQLITE_MMAP_SIZE_MB', DEFAULT_MMAP_SIZE_MB)) * 1024 * 1024
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA synchronous={synchronous}")
+            cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+            cursor.execute(f"PRAGMA mmap_size={int(mmap_bytes)}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+        finally:
+            cursor.close()
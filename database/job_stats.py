@@ -0,0 +1,172 @@
+"""
+Materialized job counters for the production dashboard.
+
+The job_stats table holds job counts per status and per stage plus the
+running total of completion durations. Counters are adjusted after every
+flush that inserts, deletes or moves a job, so the dashboard reads a
+handful of rows instead of scanning the jobs table. Because the hook
+watches the session rather than particular service methods, status
+changes made directly on Job objects (as many routes do) are counted too.
+
+If the table has never been seeded (new table, or cleared to repair
+drift) read_job_stats() rebuilds it from the jobs table first.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import event, func, inspect, text
+from sqlalchemy.orm import Session
+
+from .models import Job, JobStat
+
+_UPSERT = text(
+    "INSERT INTO job_stats (metric, bucket, count, total_seconds) "
+    "VALUES (:metric, :bucket, :count, :seconds) "
+    "ON CONFLICT (metric, bucket) DO UPDATE SET "
+    "count = job_stats.count + excluded.count, "
+    "total_seconds = job_stats.total_seconds + excluded.total_seconds"
+)
+
+
+def _completion_seconds(status, created_at, completed_at) -> float:
+    """Seconds from creation to stage 4 completion for a completed job (else 0)."""
+    if status == 'completed' and created_at and completed_at:
+        return (completed_at - created_at).total_seconds()
+    return 0.0
+
+
+def _old_new(job: Job, attr: str) -> Tuple[Any, Any]:
+    """(value before this flush, value after) for a Job column."""
+    history = inspect(job).attrs[attr].history
+    if not history.has_changes():
+        value = getattr(job, attr)
+        return value, value
+    old = history.deleted[0] if history.deleted else None
+    new = history.added[0] if history.added else None
+    return old, new
+
+
+def _count(deltas, status, stage, seconds: float, sign: int):
+    deltas[('status', str(status))][0] += sign
+    deltas[('stage', str(stage))][0] += sign
+    if seconds:
+        deltas[('completion', 'all')][0] += sign
+        deltas[('completion', 'all')][1] += sign * seconds
+
+
+def _changed(job: Job, attrs) -> bool:
+    state = inspect(job)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def _collect_deltas(session) -> Dict[Tuple[str, str], list]:
+    deltas = defaultdict(lambda: [0, 0.0])
+
+    for job in session.new:
+        if isinstance(job, Job):
+            status = job.status or 'pending'
+            seconds = _completion_seconds(status, job.created_at, job.stage4_completed_at)
+            deltas[('total', 'all')][0] += 1
+            _count(deltas, status, job.current_stage or 0, seconds, 1)
+
+    for job in session.deleted:
+        if isinstance(job, Job):
+            status, _ = _old_new(job, 'status')
+            stage, _ = _old_new(job, 'current_stage')
+            completed_at, _ = _old_new(job, 'stage4_completed_at')
+            deltas[('total', 'all')][0] -= 1
+            _count(deltas, status, stage, _completion_seconds(status, job.created_at, completed_at), -1)
+
+    for job in session.dirty:
+        if not isinstance(job, Job) or job in session.deleted:
+            continue
+        if not _changed(job, ('status', 'current_stage', 'stage4_completed_at')):
+            continue
+        old_status, new_status = _old_new(job, 'status')
+        old_stage, new_stage = _old_new(job, 'current_stage')
+        old_completed, new_completed = _old_new(job, 'stage4_completed_at')
+        _count(deltas, old_status, old_stage, _completion_seconds(old_status, job.created_at, old_completed), -1)
+        _count(deltas, new_status, new_stage, _completion_seconds(new_status, job.created_at, new_completed), 1)
+
+    return {key: value for key, value in deltas.items() if value[0] or value[1]}
+
+
+def _before_flush(session, flush_context, instances):
+    # History is only complete before the flush, so collect deltas now and
+    # apply them once the job rows are written
+    deltas = _collect_deltas(session)
+    if deltas:
+        session.info.setdefault('job_stat_deltas', []).append(deltas)
+
+
+def _after_flush(session, flush_context):
+    for deltas in session.info.pop('job_stat_deltas', []):
+        session.execute(_UPSERT, [
+            {'metric': metric, 'bucket': bucket, 'count': count, 'seconds': seconds}
+            for (metric, bucket), (count, seconds) in deltas.items()
+        ])
+
+
+def _after_soft_rollback(session, previous_transaction):
+    # A failed flush leaves its deltas behind; the rows they describe were
+    # rolled back, so the next flush must not apply them
+    session.info.pop('job_stat_deltas', None)
+
+
+def register_job_stats(session_factory):
+    """Maintain job_stats for every session made by session_factory."""
+    if not event.contains(session_factory, 'before_flush', _before_flush):
+        event.listen(session_factory, 'before_flush', _before_flush)
+        event.listen(session_factory, 'after_flush', _after_flush)
+        event.listen(session_factory, 'after_soft_rollback', _after_soft_rollback)
+
+
+def rebuild_job_stats(session):
+    """Recompute every counter from the jobs table, mark it seeded and commit."""
+    session.query(JobStat).delete(synchronize_session=False)
+
+    rows = [JobStat(metric='meta', bucket='seeded', count=1, total_seconds=0.0)]
+    total = 0
+    for status, count in session.query(Job.status, func.count(Job.job_id)).group_by(Job.status):
+        rows.append(JobStat(metric='status', bucket=str(status), count=count, total_seconds=0.0))
+        total += count
+    for stage, count in session.query(Job.current_stage, func.count(Job.job_id)).group_by(Job.current_stage):
+        rows.append(JobStat(metric='stage', bucket=str(stage), count=count, total_seconds=0.0))
+    rows.append(JobStat(metric='total', bucket='all', count=total, total_seconds=0.0))
+
+    # Only the two timestamp columns, not whole Job objects
+    completed = session.query(Job.created_at, Job.stage4_completed_at).filter(
+        Job.status == 'completed',
+        Job.created_at.isnot(None),
+        Job.stage4_completed_at.isnot(None)
+    )
+    durations = [(done - created).total_seconds() for created, done in completed]
+    durations = [seconds for seconds in durations if seconds]
+    rows.append(JobStat(metric='completion', bucket='all', count=len(durations),
+                        total_seconds=float(sum(durations))))
+
+    session.add_all(rows)
+    session.commit()
+
+
+def read_job_stats(session) -> Dict[Tuple[str, str], Tuple[int, float]]:
+    """
+    All counters in one query, rebuilding them first if never seeded.
+
+    The rebuild commits in a session of its own, so reading never commits
+    work pending in the caller's session.
+
+    Returns:
+        {(metric, bucket): (count, total_seconds)}
+    """
+    rows = session.query(JobStat.metric, JobStat.bucket, JobStat.count, JobStat.total_seconds).all()
+    stats = {(metric, bucket): (count, seconds) for metric, bucket, count, seconds in rows}
+    if ('meta', 'seeded') not in stats:
+        seed_session = Session(bind=session.get_bind())
+        try:
+            rebuild_job_stats(seed_session)
+        finally:
+            seed_session.close()
+        return read_job_stats(session)
+    return stats
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Move Job Payloads to job_artifacts
+Date: October 16, 2026
+Purpose: Move stage1_results, stage2_approved_matches, stage3_validation_results
+         and stage5_extendscript out of the jobs table into compressed
+         job_artifacts rows, so job list queries stop reading them
+"""
+
+import json
+import sqlite3
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from database.models import JobArtifact, JOB_ARTIFACT_FIELDS
+
+
+def run_migration(db_path):
+    """Create job_artifacts and move inline payloads into it."""
+    print(f"\n{'='*70}")
+    print(f"DATABASE MIGRATION: Job Artifacts")
+    print(f"{'='*70}")
+    print(f"Database: {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found: {db_path}")
+        return False
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS job_artifacts (
+                job_id VARCHAR(50) NOT NULL REFERENCES jobs(job_id) ON DELETE CASCADE,
+                name VARCHAR(50) NOT NULL,
+                encoding VARCHAR(20) NOT NULL,
+                data BLOB NOT NULL,
+                size_bytes INTEGER,
+                updated_at DATETIME,
+                PRIMARY KEY (job_id, name)
+            )
+        """)
+        print(f"  ✅ Table job_artifacts ready")
+
+        cursor.execute("PRAGMA table_info(jobs)")
+        existing_columns = {row[1] for row in cursor.fetchall()}
+
+        moved_count = 0
+        inline_bytes = 0
+        stored_bytes = 0
+
+        for column_name, kind in JOB_ARTIFACT_FIELDS.items():
+            if column_name not in existing_columns:
+                print(f"  ⏭️  Skipping {column_name} (no such column)")
+                continue
+
+            cursor.execute(f"SELECT job_id, {column_name} FROM jobs WHERE {column_name} IS NOT NULL")
+            rows = cursor.fetchall()
+            for job_id, raw in rows:
+                # JSON columns are stored as JSON text; decode so encode() re-serializes compactly
+                value = raw if kind == 'text' else json.loads(raw)
+                if value is None:
+                    continue
+                encoding, data, size = JobArtifact.encode(value, kind)
+                cursor.execute(
+                    "INSERT OR REPLACE INTO job_artifacts (job_id, name, encoding, data, size_bytes, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)",
+                    (job_id, column_name, encoding, data, size)
+                )
+                inline_bytes += len(raw.encode('utf-8')) if isinstance(raw, str) else len(raw)
+                stored_bytes += len(data)
+                moved_count += 1
+
+            cursor.execute(f"UPDATE jobs SET {column_name} = NULL WHERE {column_name} IS NOT NULL")
+            print(f"  ✅ Moved {len(rows)} {column_name} values")
+
+        conn.commit()
+
+        # Reclaim the space the inline payloads used
+        if moved_count:
+            conn.execute("VACUUM")
+
+        print(f"\n{'='*70}")
+        print(f"✅ Migration Complete")
+        print(f"   Moved: {moved_count} payloads ({inline_bytes} bytes inline -> {stored_bytes} bytes stored)")
+        print(f"{'='*70}\n")
+
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"\n❌ Migration failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    # Default to production database
+    db_path = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+        'data',
+        'production.db'
+    )
+
+    # Allow override via command line
+    if len(sys.argv) > 1:
+        db_path = sys.argv[1]
+
+    success = run_migration(db_path)
+    sys.exit(0 if success else 1)
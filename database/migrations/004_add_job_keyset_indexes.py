@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Add Job Keyset Pagination Indexes
+Date: October 16, 2026
+Purpose: Index the sort keys of the job listing APIs so each page is an
+         index range scan instead of a sort of the whole jobs table
+"""
+
+import sqlite3
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.schema import CreateIndex
+
+from database.models import Job
+
+
+KEYSET_INDEXES = ('idx_job_stage_keyset', 'idx_job_created_keyset')
+
+
+def run_migration(db_path):
+    """Create the keyset pagination indexes on the jobs table."""
+    print(f"\n{'='*70}")
+    print(f"DATABASE MIGRATION: Job Keyset Indexes")
+    print(f"{'='*70}")
+    print(f"Database: {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found: {db_path}")
+        return False
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'jobs'")
+        existing_indexes = {row[0] for row in cursor.fetchall()}
+
+        # Render the DDL from the model so the expression matches the queries exactly
+        dialect = create_engine('sqlite://').dialect
+        created_count = 0
+        for index in Job.__table__.indexes:
+            if index.name not in KEYSET_INDEXES:
+                continue
+            if index.name in existing_indexes:
+                print(f"  ⏭️  Skipping {index.name} (already exists)")
+                continue
+            cursor.execute(str(CreateIndex(index).compile(dialect=dialect)))
+            print(f"  ✅ Created index {index.name}")
+            created_count += 1
+
+        cursor.execute("ANALYZE jobs")
+        conn.commit()
+
+        print(f"\n{'='*70}")
+        print(f"✅ Migration Complete")
+        print(f"   Created: {created_count} indexes")
+        print(f"{'='*70}\n")
+
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"\n❌ Migration failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    # Default to production database
+    db_path = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+        'data',
+        'production.db'
+    )
+
+    # Allow override via command line
+    if len(sys.argv) > 1:
+        db_path = sys.argv[1]
+
+    success = run_migration(db_path)
+    sys.exit(0 if success else 1)
@@ -7,16 +7,23 @@ Tables:
 - job_logs: Activity logs for audit trail
 - job_assets: Generated files and assets
 - batches: Batch metadata and status
+- stage_tasks: Durable work queue for background stage pre-processing
+- job_artifacts: Large per-job payloads (stage results, generated scripts)
+- job_stats: Materialized dashboard counters
 """
 
 from sqlalchemy import (
-    Column, String, Integer, BigInteger, Text, Boolean,
+    Column, String, Integer, BigInteger, Float, Text, Boolean, LargeBinary,
     DateTime, JSON, ForeignKey, Index, Enum, case
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.sql import literal_column
+from sqlalchemy.orm import relationship, deferred, column_property
+from sqlalchemy.orm.collections import attribute_mapped_collection
 from datetime import datetime
 import enum
+import json
+import zlib
 
 Base = declarative_base()
 
@@ -41,6 +48,14 @@ class JobStatusEnum(enum.Enum):
     on_hold = 'on_hold'
 
 
+class StageTaskStatusEnum(enum.Enum):
+    """Stage task queue status values."""
+    queued = 'queued'
+    leased = 'leased'
+    completed = 'completed'
+    failed = 'failed'
+
+
 class BatchStatusEnum(enum.Enum):
     """Batch status values."""
     validating = 'validating'
@@ -58,9 +73,76 @@ class SeverityEnum(enum.Enum):
     info = 'info'
 
 
+# Payloads at least this large are zlib-compressed in job_artifacts
+ARTIFACT_COMPRESS_THRESHOLD = 1024
+
+# Job attributes stored in job_artifacts, and whether each holds JSON or text
+JOB_ARTIFACT_FIELDS = {
+    'stage1_results': 'json',
+    'stage2_approved_matches': 'json',
+    'stage3_validation_results': 'json',
+    'stage5_extendscript': 'text',
+}
+
+
+# Sort rank per job priority (lower sorts first)
+PRIORITY_RANKS = {'high': 1, 'medium': 2, 'low': 3}
+
+
+def priority_rank(priority):
+    """
+    Sort rank of a job priority column: high=1, medium=2, low=3 (else 2).
+
+    Rendered with inline literals so queries match the expression indexes
+    on jobs exactly (SQLite only uses an expression index for an identical
+    expression).
+    """
+    return case(
+        (priority == literal_column("'high'"), literal_column('1')),
+        (priority == literal_column("'medium'"), literal_column('2')),
+        (priority == literal_column("'low'"), literal_column('3')),
+        else_=literal_column('2')
+    )
+
+
+def _artifact_property(name: str, doc: str):
+    """
+    Job attribute backed by a job_artifacts row.
+
+    Reading loads the job's artifacts on first access (falling back to the
+    legacy inline column for rows written before the artifact store);
+    writing replaces the artifact and clears the inline column.
+    """
+    inline_attr = f'_inline_{name}'
+
+    def getter(self):
+        artifact = self.artifacts.get(name)
+        if artifact is not None:
+            return artifact.value
+        return getattr(self, inline_attr)
+
+    def setter(self, value):
+        if value is None:
+            self.artifacts.pop(name, None)
+        else:
+            artifact = self.artifacts.get(name)
+            if artifact is None:
+                artifact = JobArtifact(name=name)
+                self.artifacts[name] = artifact
+            artifact.value = value
+        setattr(self, inline_attr, None)
+
+    return property(getter, setter, doc=doc)
+
+
 class Job(Base):
     """
     Main jobs table tracking all processing stages.
+
+    Large payloads (stage1_results, stage2_approved_matches,
+    stage3_validation_results, stage5_extendscript) live in job_artifacts
+    and are only loaded when accessed, so listing jobs reads the scalar
+    columns alone.
     """
     __tablename__ = 'jobs'
 
@@ -79,9 +161,10 @@ class Job(Base):
     notes = Column(Text)
     batch_id = Column(String(50), ForeignKey('batches.batch_id'))
 
-    # Current Status
-    current_stage = Column(Integer, default=0)
-    status = Column(String(50), default='pending')
+    # Current Status (old values are loaded on change so job_stats can be
+    # adjusted by the difference)
+    current_stage = column_property(Column(Integer, default=0), active_history=True)
+    status = column_property(Column(String(50), default='pending'), active_history=True)
 
     # Archive Status (for completed jobs)
     archived = Column(Boolean, default=False)
@@ -106,11 +189,11 @@ class Job(Base):
     stage3_started_at = Column(DateTime)
     stage3_completed_at = Column(DateTime)
     stage3_completed_by = Column(String(100), default='system')
-    stage3_validation_results = Column(JSON)  # Validation report
+    _inline_stage3_validation_results = deferred(Column('stage3_validation_results', JSON(none_as_null=True)), group='inline_artifacts')
 
     # Stage 4: Validation Review (conditional - only if critical issues)
     stage4_started_at = Column(DateTime)
-    stage4_completed_at = Column(DateTime)
+    stage4_completed_at = column_property(Column(DateTime), active_history=True)  # Feeds job_stats durations
     stage4_completed_by = Column(String(100))
     stage4_override = Column(Boolean, default=False)
     stage4_override_reason = Column(Text)  # Override justification
@@ -119,7 +202,7 @@ class Job(Base):
     stage5_started_at = Column(DateTime)
     stage5_completed_at = Column(DateTime)
     stage5_completed_by = Column(String(100), default='system')
-    stage5_extendscript = Column(Text)  # Generated .jsx script
+    _inline_stage5_extendscript = deferred(Column('stage5_extendscript', Text), group='inline_artifacts')
 
     # Stage 6: Preview & Approval
     stage6_started_at = Column(DateTime)
@@ -138,15 +221,27 @@ class Job(Base):
     # Output
     final_aep_path = Column(Text)
 
-    # Processing Data (JSON)
-    stage1_results = Column(JSON)  # PSD/AEPX extraction results
-    stage2_approved_matches = Column(JSON)  # Approved layer matches
+    # Processing Data (legacy inline copies; new writes go to job_artifacts)
+    _inline_stage1_results = deferred(Column('stage1_results', JSON(none_as_null=True)), group='inline_artifacts')
+    _inline_stage2_approved_matches = deferred(Column('stage2_approved_matches', JSON(none_as_null=True)), group='inline_artifacts')
 
     # Relationships
     batch = relationship("Batch", back_populates="jobs")
     warnings = relationship("JobWarning", back_populates="job", cascade="all, delete-orphan")
     logs = relationship("JobLog", back_populates="job", cascade="all, delete-orphan")
     assets = relationship("JobAsset", back_populates="job", cascade="all, delete-orphan")
+    artifacts = relationship(
+        "JobArtifact",
+        back_populates="job",
+        cascade="all, delete-orphan",
+        collection_class=attribute_mapped_collection('name')
+    )
+
+    # Artifact-backed payloads
+    stage1_results = _artifact_property('stage1_results', "PSD/AEPX extraction results")
+    stage2_approved_matches = _artifact_property('stage2_approved_matches', "Approved layer matches")
+    stage3_validation_results = _artifact_property('stage3_validation_results', "Validation report")
+    stage5_extendscript = _artifact_property('stage5_extendscript', "Generated .jsx script")
 
     # Indexes
     __table_args__ = (
@@ -157,6 +252,9 @@ class Job(Base):
         Index('idx_batch', 'batch_id'),
         Index('idx_created', 'created_at'),
         Index('idx_archived', 'archived'),
+        # Keyset pagination: stage listings in priority order, and all jobs newest first
+        Index('idx_job_stage_keyset', 'current_stage', priority_rank(priority), 'created_at', 'job_id'),
+        Index('idx_job_created_keyset', 'created_at', 'job_id'),
     )
 
     def __repr__(self):
@@ -276,6 +374,99 @@ class JobAsset(Base):
         return f"<JobAsset(asset_id={self.asset_id}, job_id='{self.job_id}', type='{self.asset_type}')>"
 
 
+class JobArtifact(Base):
+    """
+    Large job payloads kept out of the jobs table.
+
+    Values are serialized (JSON or UTF-8 text) and zlib-compressed above
+    ARTIFACT_COMPRESS_THRESHOLD bytes. Use .value to read and write.
+    """
+    __tablename__ = 'job_artifacts'
+
+    job_id = Column(String(50), ForeignKey('jobs.job_id', ondelete='CASCADE'), primary_key=True)
+    name = Column(String(50), primary_key=True)  # Job attribute, e.g. 'stage1_results'
+
+    # Payload
+    encoding = Column(String(20), nullable=False)  # 'json' or 'text', plus '+zlib' if compressed
+    data = Column(LargeBinary, nullable=False)
+    size_bytes = Column(Integer)  # Uncompressed size
+
+    # Audit
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    job = relationship("Job", back_populates="artifacts")
+
+    @property
+    def value(self):
+        """Decoded payload (decoded again only when data is reloaded)."""
+        data = self.data
+        cached = self.__dict__.get('_decoded')
+        if cached is None or cached[0] is not data:
+            cached = (data, self.decode(self.encoding, data))
+            self.__dict__['_decoded'] = cached
+        return cached[1]
+
+    @value.setter
+    def value(self, value):
+        self.encoding, self.data, self.size_bytes = self.encode(
+            value, JOB_ARTIFACT_FIELDS.get(self.name, 'json')
+        )
+        self.__dict__['_decoded'] = (self.data, value)
+
+    @staticmethod
+    def encode(value, kind: str = 'json'):
+        """
+        Serialize a payload.
+
+        Returns:
+            (encoding, data, uncompressed size)
+        """
+        if kind == 'text':
+            raw = str(value).encode('utf-8')
+        else:
+            raw = json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+        if len(raw) >= ARTIFACT_COMPRESS_THRESHOLD:
+            return f'{kind}+zlib', zlib.compress(raw, 6), len(raw)
+        return kind, raw, len(raw)
+
+    @staticmethod
+    def decode(encoding: str, data: bytes):
+        """Inverse of encode()."""
+        kind, _, compression = encoding.partition('+')
+        if compression == 'zlib':
+            data = zlib.decompress(data)
+        text = data.decode('utf-8')
+        return text if kind == 'text' else json.loads(text)
+
+    def __repr__(self):
+        return f"<JobArtifact(job_id='{self.job_id}', name='{self.name}', encoding='{self.encoding}')>"
+
+
+class JobStat(Base):
+    """
+    Dashboard counters maintained incrementally as jobs change.
+
+    Rows (metric, bucket):
+        ('total', 'all')           - number of jobs
+        ('status', <status>)       - jobs per status
+        ('stage', <stage>)         - jobs per current stage
+        ('completion', 'all')      - completed jobs with a duration; total_seconds
+                                     sums created_at -> stage4_completed_at
+        ('meta', 'seeded')         - present once the counters were rebuilt
+    """
+    __tablename__ = 'job_stats'
+
+    metric = Column(String(20), primary_key=True)
+    bucket = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    total_seconds = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<JobStat(metric='{self.metric}', bucket='{self.bucket}', count={self.count})>"
+
+
 class Batch(Base):
     """
     Batches table for tracking CSV batch uploads.
@@ -318,3 +509,46 @@ class Batch(Base):
 
     def __repr__(self):
         return f"<Batch(batch_id='{self.batch_id}', status='{self.status}', jobs={self.total_jobs})>"
+
+
+class StageTask(Base):
+    """
+    Durable queue of background pre-processing tasks (one per job and stage).
+
+    Workers lease tasks in the same priority/created_at order used by
+    JobService.get_jobs_for_stage; a lease that expires (worker crashed)
+    makes the task claimable again.
+    """
+    __tablename__ = 'stage_tasks'
+
+    task_id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(50), ForeignKey('jobs.job_id', ondelete='CASCADE'), nullable=False)
+    stage = Column(Integer, nullable=False)
+
+    # Ordering (denormalized from the job at enqueue time)
+    priority_rank = Column(Integer, nullable=False, default=2)  # 1=high, 2=medium, 3=low
+    job_created_at = Column(DateTime)
+
+    # State
+    status = Column(String(20), nullable=False, default='queued')
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    available_at = Column(DateTime, default=datetime.utcnow)  # Retry backoff
+    lease_owner = Column(String(100))
+    lease_expires_at = Column(DateTime)
+    last_error = Column(Text)
+    enqueued_by = Column(String(100))
+
+    # Audit
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime)
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_stage_task_claim', 'status', 'priority_rank', 'job_created_at'),
+        Index('idx_stage_task_job', 'job_id', 'stage'),
+    )
+
+    def __repr__(self):
+        return f"<StageTask(task_id={self.task_id}, job_id='{self.job_id}', stage={self.stage}, status='{self.status}')>"
@@ -6,9 +6,11 @@ Data models for project management with full audit trail support.
 
 import json
 import os
+import sqlite3
+import threading
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import Dict, Iterable, List, Optional
 
 
 @dataclass
@@ -97,6 +99,11 @@ class Project:
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
 
+    def __post_init__(self):
+        # graphic id -> position in self.graphics (not a dataclass field, so
+        # it stays out of to_dict())
+        self._graphic_positions: Dict[str, int] = {}
+
     def add_graphic(self, graphic: Graphic):
         """Add a graphic to the project"""
         self.graphics.append(graphic)
@@ -104,10 +111,14 @@ class Project:
 
     def get_graphic(self, graphic_id: str) -> Optional[Graphic]:
         """Get a graphic by ID"""
-        for graphic in self.graphics:
-            if graphic.id == graphic_id:
-                return graphic
-        return None
+        position = self._graphic_positions.get(graphic_id)
+        if position is None or position >= len(self.graphics) or self.graphics[position].id != graphic_id:
+            # graphics is a plain list callers may change; re-index on a miss
+            self._graphic_positions = {g.id: i for i, g in enumerate(self.graphics)}
+            position = self._graphic_positions.get(graphic_id)
+            if position is None:
+                return None
+        return self.graphics[position]
 
     def remove_graphic(self, graphic_id: str) -> bool:
         """Remove a graphic from the project"""
@@ -132,117 +143,295 @@ class Project:
         return data
 
 
+def _dumps(data: dict) -> str:
+    return json.dumps(data, separators=(',', ':'), sort_keys=True)
+
+
 class ProjectStore:
-    """Persistent storage for projects"""
+    """
+    Persistent storage for projects.
+
+    Projects and graphics are kept one row each in an embedded SQLite
+    database, so saving an approval rewrites that graphic and its project
+    row rather than every project in the store. All records are loaded
+    into memory on start-up and looked up by ID through dict indexes.
+
+    A storage_path ending in .json names the legacy whole-file store: the
+    database lives next to it (projects.json -> projects.db) and the JSON
+    file is imported once, the first time the database is created.
+    """
 
     def __init__(self, storage_path: str = 'projects.json'):
         self.storage_path = storage_path
+        root, ext = os.path.splitext(storage_path)
+        self.db_path = root + '.db' if ext == '.json' else storage_path
+        self.legacy_path = storage_path if ext == '.json' else None
+
         self.projects: List[Project] = []
         self.next_project_id = 1
         self.next_graphic_id = 1
+
+        self._projects_by_id: Dict[str, Project] = {}
+        self._graphic_projects: Dict[str, str] = {}  # graphic id -> project id
+        # Serialized form of every record as last written, to skip unchanged rows
+        self._written_projects: Dict[str, str] = {}
+        self._written_graphics: Dict[str, str] = {}
+        self._written_meta: Dict[str, str] = {}
+
+        self._lock = threading.RLock()
+        self._conn = self._connect()
         self.load()
 
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS store_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS projects (
+                id TEXT PRIMARY KEY,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS graphics (
+                id TEXT PRIMARY KEY,
+                project_id TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_graphics_project ON graphics (project_id);
+        """)
+        return conn
+
     def load(self):
         """Load projects from storage"""
-        if not os.path.exists(self.storage_path):
-            self.save()  # Create empty file
-            return
+        with self._lock:
+            meta = dict(self._conn.execute("SELECT key, value FROM store_meta"))
+            self._written_meta = meta
+            if 'next_project_id' not in meta:
+                self._import_legacy()
+                return
+
+            self.next_project_id = int(meta['next_project_id'])
+            self.next_graphic_id = int(meta['next_graphic_id'])
+
+            graphics_by_project: Dict[str, List[Graphic]] = {}
+            self._written_graphics = {}
+            # rowid keeps creation order; upserts don't change it
+            for graphic_id, project_id, data in self._conn.execute(
+                    "SELECT id, project_id, data FROM graphics ORDER BY rowid"):
+                graphics_by_project.setdefault(project_id, []).append(Graphic(**json.loads(data)))
+                self._written_graphics[graphic_id] = data
 
-        try:
-            with open(self.storage_path, 'r') as f:
-                data = json.load(f)
-
-            self.next_project_id = data.get('next_project_id', 1)
-            self.next_graphic_id = data.get('next_graphic_id', 1)
-
-            # Reconstruct projects
             self.projects = []
-            for proj_data in data.get('projects', []):
-                # Reconstruct graphics
-                graphics = []
-                for g_data in proj_data.get('graphics', []):
-                    graphic = Graphic(**g_data)
-                    graphics.append(graphic)
-
-                # Remove graphics from project data before creating Project
-                proj_data_copy = proj_data.copy()
-                proj_data_copy.pop('graphics', None)
-
-                # Create project with graphics
-                project = Project(**proj_data_copy, graphics=graphics)
+            self._written_projects = {}
+            for project_id, data in self._conn.execute("SELECT id, data FROM projects ORDER BY rowid"):
+                project = Project(**json.loads(data), graphics=graphics_by_project.get(project_id, []))
                 self.projects.append(project)
+                self._written_projects[project_id] = data
 
-        except Exception as e:
-            print(f"Error loading projects: {e}")
-            # Keep empty state if load fails
+            self._reindex()
+
+    def _import_legacy(self):
+        """Seed an empty database from the legacy projects.json, if any."""
+        if self.legacy_path and os.path.exists(self.legacy_path):
+            try:
+                with open(self.legacy_path, 'r') as f:
+                    data = json.load(f)
+
+                self.next_project_id = data.get('next_project_id', 1)
+                self.next_graphic_id = data.get('next_graphic_id', 1)
+
+                for proj_data in data.get('projects', []):
+                    graphics = [Graphic(**g_data) for g_data in proj_data.get('graphics', [])]
+                    proj_data_copy = proj_data.copy()
+                    proj_data_copy.pop('graphics', None)
+                    self.projects.append(Project(**proj_data_copy, graphics=graphics))
+
+            except Exception as e:
+                print(f"Error loading projects: {e}")
+                # Keep empty state if load fails
+                self.projects = []
+
+        self._reindex()
+        self.save()
+
+    def _reindex(self):
+        self._projects_by_id = {project.id: project for project in self.projects}
+        self._graphic_projects = {
+            graphic.id: project.id
+            for project in self.projects
+            for graphic in project.graphics
+        }
 
     def save(self):
-        """Save projects to storage"""
-        try:
-            data = {
-                'next_project_id': self.next_project_id,
-                'next_graphic_id': self.next_graphic_id,
-                'projects': [proj.to_dict() for proj in self.projects]
-            }
+        """Save every project and graphic that changed since it was last written"""
+        with self._lock:
+            # Callers may append to or remove from self.projects directly
+            self._projects_by_id = {project.id: project for project in self.projects}
+            deleted = set(self._written_projects) - set(self._projects_by_id)
+            self._write(self.projects, None, deleted_projects=deleted)
+
+    def save_project(self, project: Project, graphics: Optional[Iterable[Graphic]] = None):
+        """
+        Save one project.
+
+        Args:
+            project: Project to write
+            graphics: Only check these of its graphics for changes
+                (default: all of them)
+        """
+        with self._lock:
+            self._write([project], graphics)
+
+    def save_graphic(self, project: Project, graphic: Graphic):
+        """Save one graphic and its project row (stats, updated_at)"""
+        self.save_project(project, [graphic])
+
+    def _write(self, projects: List[Project], graphics: Optional[Iterable[Graphic]],
+               deleted_projects: Iterable[str] = ()):
+        project_rows = []
+        graphic_rows = []
+        removed_graphics = []
+
+        for project in projects:
+            data = _dumps({k: v for k, v in project.to_dict().items() if k != 'graphics'})
+            if self._written_projects.get(project.id) != data:
+                project_rows.append((project.id, data))
+
+            candidates = project.graphics if graphics is None else graphics
+            for graphic in candidates:
+                data = _dumps(graphic.to_dict())
+                if self._written_graphics.get(graphic.id) != data:
+                    graphic_rows.append((graphic.id, project.id, data))
+                self._graphic_projects[graphic.id] = project.id
+
+            if graphics is None:
+                # Graphics removed from the project's list since the last write
+                current = set(graphic.id for graphic in project.graphics)
+                removed_graphics.extend(
+                    graphic_id for graphic_id, owner in self._graphic_projects.items()
+                    if owner == project.id and graphic_id not in current
+                )
+
+        meta_rows = [
+            (key, value) for key, value in (
+                ('next_project_id', str(self.next_project_id)),
+                ('next_graphic_id', str(self.next_graphic_id))
+            )
+            if self._written_meta.get(key) != value
+        ]
+        deleted_projects = list(deleted_projects)
 
-            with open(self.storage_path, 'w') as f:
-                json.dump(data, f, indent=2)
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO store_meta (key, value) VALUES (?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                    meta_rows
+                )
+                self._conn.executemany(
+                    "INSERT INTO projects (id, data) VALUES (?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET data = excluded.data",
+                    project_rows
+                )
+                self._conn.executemany(
+                    "INSERT INTO graphics (id, project_id, data) VALUES (?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET project_id = excluded.project_id, data = excluded.data",
+                    graphic_rows
+                )
+                self._conn.executemany(
+                    "DELETE FROM graphics WHERE id = ?",
+                    [(graphic_id,) for graphic_id in removed_graphics]
+                )
+                for project_id in deleted_projects:
+                    self._conn.execute("DELETE FROM graphics WHERE project_id = ?", (project_id,))
+                    self._conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
 
         except Exception as e:
             print(f"Error saving projects: {e}")
             raise
 
+        self._written_meta.update(meta_rows)
+        self._written_projects.update(project_rows)
+        self._written_graphics.update((graphic_id, data) for graphic_id, _, data in graphic_rows)
+        for graphic_id in removed_graphics:
+            self._written_graphics.pop(graphic_id, None)
+            self._graphic_projects.pop(graphic_id, None)
+        for project_id in deleted_projects:
+            self._written_projects.pop(project_id, None)
+            for graphic_id in [g for g, owner in self._graphic_projects.items() if owner == project_id]:
+                self._written_graphics.pop(graphic_id, None)
+                self._graphic_projects.pop(graphic_id, None)
+
     def create_project(self, name: str, client: str = '', description: str = '') -> Project:
         """Create a new project"""
-        project_id = f"proj_{self.next_project_id}"
-        self.next_project_id += 1
-
-        project = Project(
-            id=project_id,
-            name=name,
-            client=client,
-            description=description
-        )
-
-        self.projects.append(project)
-        self.save()
-        return project
+        with self._lock:
+            project_id = f"proj_{self.next_project_id}"
+            self.next_project_id += 1
+
+            project = Project(
+                id=project_id,
+                name=name,
+                client=client,
+                description=description
+            )
+
+            self.projects.append(project)
+            self._projects_by_id[project_id] = project
+            self.save_project(project)
+            return project
 
     def get_project(self, project_id: str) -> Optional[Project]:
         """Get a project by ID"""
-        for project in self.projects:
-            if project.id == project_id:
-                return project
-        return None
+        return self._projects_by_id.get(project_id)
+
+    def get_graphic(self, graphic_id: str) -> Optional[Graphic]:
+        """Get a graphic by ID, whichever project it belongs to"""
+        project = self._projects_by_id.get(self._graphic_projects.get(graphic_id))
+        return project.get_graphic(graphic_id) if project else None
 
     def delete_project(self, project_id: str) -> bool:
         """Delete a project"""
-        project = self.get_project(project_id)
-        if project:
-            self.projects.remove(project)
-            self.save()
-            return True
-        return False
+        with self._lock:
+            project = self.get_project(project_id)
+            if project:
+                self.projects.remove(project)
+                del self._projects_by_id[project_id]
+                self._write([], None, deleted_projects=[project_id])
+                return True
+            return False
 
     def create_graphic(self, project_id: str, name: str, psd_path: Optional[str] = None) -> Optional[Graphic]:
         """Create a new graphic in a project"""
-        project = self.get_project(project_id)
-        if not project:
-            return None
+        with self._lock:
+            project = self.get_project(project_id)
+            if not project:
+                return None
 
-        graphic_id = f"graphic_{self.next_graphic_id}"
-        self.next_graphic_id += 1
+            graphic_id = f"graphic_{self.next_graphic_id}"
+            self.next_graphic_id += 1
 
-        graphic = Graphic(
-            id=graphic_id,
-            name=name,
-            psd_path=psd_path
-        )
+            graphic = Graphic(
+                id=graphic_id,
+                name=name,
+                psd_path=psd_path
+            )
 
-        project.add_graphic(graphic)
-        self.save()
-        return graphic
+            project.add_graphic(graphic)
+            self.save_graphic(project, graphic)
+            return graphic
 
     def list_projects(self) -> List[Project]:
         """List all projects"""
         return self.projects
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
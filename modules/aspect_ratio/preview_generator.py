@@ -5,10 +5,17 @@ Generates visual previews for different aspect ratio transformation options
 to help humans make informed decisions.
 """
 
+import math
 import os
-from typing import Dict, Any
-from PIL import Image, ImageDraw, ImageFont
+from typing import Dict, Any, Optional, Tuple
+from core.lazy_imports import lazy_import
 from services.base_service import BaseService, Result
+from services.preview_pyramid import get_preview_pyramid
+
+# Pillow is loaded on first preview, not when the web app imports this module
+Image = lazy_import('PIL.Image')
+ImageDraw = lazy_import('PIL.ImageDraw')
+ImageFont = lazy_import('PIL.ImageFont')
 
 
 class AspectRatioPreviewGenerator(BaseService):
@@ -38,6 +45,11 @@ class AspectRatioPreviewGenerator(BaseService):
         2. fill_preview.jpg - Scale to fill (crop edges)
         3. original_preview.jpg - No transformation (for reference)
 
+        Images are read from the shared preview pyramid at the smallest level
+        that still covers the target size, so the PSD is neither re-composited
+        nor decoded at full resolution for a downscaled preview. Dimensions
+        and transform info always refer to the full-size PSD.
+
         Args:
             psd_path: Path to PSD file
             aepx_width: Target AEPX width
@@ -64,11 +76,21 @@ class AspectRatioPreviewGenerator(BaseService):
         try:
             self.log_info(f"Generating aspect ratio previews for {psd_path}")
 
-            # Load PSD as flattened image
-            psd_image = Image.open(psd_path)
-            psd_width, psd_height = psd_image.size
+            # Load PSD as flattened image from the preview cache
+            pyramid = get_preview_pyramid()
+            psd_width, psd_height = self._psd_size(pyramid, psd_path)
 
-            self.log_info(f"PSD dimensions: {psd_width}×{psd_height}")
+            # Fill needs the most pixels; that level also covers fit
+            fill_scale = max(aepx_width / psd_width, aepx_height / psd_height)
+            level = pyramid.get_level_for_size(
+                psd_path,
+                math.ceil(psd_width * fill_scale),
+                math.ceil(psd_height * fill_scale)
+            )
+            psd_image = pyramid.get_or_build(psd_path, level).convert('RGB')
+            psd_size = (psd_width, psd_height)
+
+            self.log_info(f"PSD dimensions: {psd_width}×{psd_height} (preview level: {level})")
             self.log_info(f"Target dimensions: {aepx_width}×{aepx_height}")
 
             # Ensure output directory exists
@@ -91,7 +113,8 @@ class AspectRatioPreviewGenerator(BaseService):
             fit_image, fit_info = self._create_fit_preview(
                 psd_image,
                 aepx_width,
-                aepx_height
+                aepx_height,
+                source_size=psd_size
             )
 
             fit_label = f"Scale to Fit: {aepx_width}×{aepx_height}"
@@ -110,7 +133,8 @@ class AspectRatioPreviewGenerator(BaseService):
             fill_image, fill_info = self._create_fill_preview(
                 psd_image,
                 aepx_width,
-                aepx_height
+                aepx_height,
+                source_size=psd_size
             )
 
             crop_pct = (1.0 - min(aepx_width / fill_info['scaled_width'],
@@ -145,12 +169,21 @@ class AspectRatioPreviewGenerator(BaseService):
             self.log_error(f"Preview generation failed: {e}", e)
             return Result.failure(str(e))
 
+    def _psd_size(self, pyramid, psd_path: str) -> Tuple[int, int]:
+        """Full-resolution PSD size from the preview cache (building it if needed)."""
+        meta = pyramid.get_meta(psd_path)
+        if meta is None:
+            return pyramid.get_or_build(psd_path, 'full').size
+        width, height = meta['levels']['full']['size']
+        return width, height
+
     def _create_fit_preview(
         self,
-        source_image: Image.Image,
+        source_image: 'Image.Image',
         target_width: int,
-        target_height: int
-    ) -> tuple[Image.Image, Dict]:
+        target_height: int,
+        source_size: Optional[Tuple[int, int]] = None
+    ) -> Tuple['Image.Image', Dict]:
         """
         Create "fit" preview (letterbox/pillarbox)
         Scale image to fit inside target, add bars if needed
@@ -159,11 +192,13 @@ class AspectRatioPreviewGenerator(BaseService):
             source_image: Source PIL Image
             target_width: Target width
             target_height: Target height
+            source_size: Size the transform refers to, when source_image is
+                a downscaled copy (default: source_image.size)
 
         Returns:
             Tuple of (preview image, transform info dict)
         """
-        src_w, src_h = source_image.size
+        src_w, src_h = source_size or source_image.size
 
         # Calculate scale to fit
         scale = min(target_width / src_w, target_height / src_h)
@@ -202,10 +237,11 @@ class AspectRatioPreviewGenerator(BaseService):
 
     def _create_fill_preview(
         self,
-        source_image: Image.Image,
+        source_image: 'Image.Image',
         target_width: int,
-        target_height: int
-    ) -> tuple[Image.Image, Dict]:
+        target_height: int,
+        source_size: Optional[Tuple[int, int]] = None
+    ) -> Tuple['Image.Image', Dict]:
         """
         Create "fill" preview (crop edges)
         Scale image to fill entire target, crop overflow
@@ -214,11 +250,13 @@ class AspectRatioPreviewGenerator(BaseService):
             source_image: Source PIL Image
             target_width: Target width
             target_height: Target height
+            source_size: Size the transform refers to, when source_image is
+                a downscaled copy (default: source_image.size)
 
         Returns:
             Tuple of (preview image, transform info dict)
         """
-        src_w, src_h = source_image.size
+        src_w, src_h = source_size or source_image.size
 
         # Calculate scale to fill
         scale = max(target_width / src_w, target_height / src_h)
@@ -252,7 +290,7 @@ class AspectRatioPreviewGenerator(BaseService):
 
     def _save_preview_with_label(
         self,
-        image: Image.Image,
+        image: 'Image.Image',
         output_path: str,
         label: str
     ):
@@ -10,8 +10,11 @@ Fallback chain:
 3. Pillow (limited parsing) - basic info only, last resort
 """
 
-from psd_tools import PSDImage
-from PIL import Image
+from core.lazy_imports import lazy_import
+
+# psd_tools is slow to import; load it on first parse
+psd_tools = lazy_import('psd_tools')
+Image = lazy_import('PIL.Image')
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 import logging
@@ -19,6 +22,9 @@ import os
 
 logger = logging.getLogger(__name__)
 
+# Bump when the output format changes so cached parse results are invalidated
+PARSER_VERSION = '1'
+
 
 def parse_psd(file_path: str) -> Dict[str, Any]:
     """
@@ -55,7 +61,7 @@ def parse_psd(file_path: str) -> Dict[str, Any]:
     # Try psd-tools first (full layer parsing)
     try:
         logger.info(f"Attempting to parse PSD with psd-tools: {file_path}")
-        psd = PSDImage.open(file_path)
+        psd = psd_tools.PSDImage.open(file_path)
 
         # Extract document-level information
         result = {
@@ -3,19 +3,42 @@ Module 2.1: After Effects Template Parser (AEPX format)
 
 Extracts structured data from AEPX (XML) template files.
 Supports After Effects 2025 format.
+
+Two parse modes are available:
+- Tree mode loads the whole document with ElementTree (fine for small templates)
+- Streaming mode walks iterparse events once, tracking composition and <Layr>
+  context on an explicit stack and discarding subtrees as they close, so peak
+  memory stays flat regardless of template size
 """
 
+import os
 import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
 
-def parse_aepx(file_path: str) -> Dict[str, Any]:
+# Bump when the output format changes so cached parse results are invalidated
+PARSER_VERSION = '2'
+
+# Templates at or above this size are parsed in streaming mode by default
+STREAMING_THRESHOLD_BYTES = 8 * 1024 * 1024
+
+# Number of following siblings inspected when deciding whether a <string>
+# names a composition (must match the tree-mode look-ahead window)
+_COMP_LOOKAHEAD = 19
+
+# "ADBE Text Properties" hex-encoded, as it appears in AE 2025 bdata attributes
+_TEXT_PROPERTIES_HEX = '4144424520546578742050726f70657274696573'
+
+
+def parse_aepx(file_path: str, streaming: Optional[bool] = None) -> Dict[str, Any]:
     """
     Parse an AEPX file and extract structured template information.
 
     Args:
         file_path: Path to the AEPX file
+        streaming: Use the single-pass streaming parser. None (default) picks
+            streaming mode for files >= STREAMING_THRESHOLD_BYTES.
 
     Returns:
         Dictionary with filename, composition_name, compositions, and placeholders
@@ -30,17 +53,27 @@ def parse_aepx(file_path: str) -> Dict[str, Any]:
         if not aepx_path.exists():
             raise FileNotFoundError(f"AEPX file not found: {file_path}")
 
-        # Parse XML
-        tree = ET.parse(file_path)
-        root = tree.getroot()
+        if streaming is None:
+            streaming = os.path.getsize(file_path) >= STREAMING_THRESHOLD_BYTES
 
-        # Try new AE 2025 format first
-        compositions = _extract_compositions_ae2025(root)
+        if streaming:
+            compositions = _extract_compositions_streaming(file_path)
+        else:
+            compositions = None
 
-        # Fallback to old format if no compositions found
         if not compositions:
-            namespace = _get_namespace(root)
-            compositions = _extract_compositions_legacy(root, namespace)
+            # Parse XML
+            tree = ET.parse(file_path)
+            root = tree.getroot()
+
+            # Try new AE 2025 format first (already attempted when streaming)
+            if compositions is None:
+                compositions = _extract_compositions_ae2025(root)
+
+            # Fallback to old format if no compositions found
+            if not compositions:
+                namespace = _get_namespace(root)
+                compositions = _extract_compositions_legacy(root, namespace)
 
         # Find main composition (prefer specific names or first one)
         main_comp_name = _find_main_composition(compositions)
@@ -74,6 +107,7 @@ def _extract_compositions_ae2025(root: ET.Element) -> List[Dict[str, Any]]:
     """
     compositions = []
     current_comp = None
+    parent_map = _build_parent_map(root)
 
     # Iterate through all elements in document order
     for elem in root.iter():
@@ -87,7 +121,7 @@ def _extract_compositions_ae2025(root: ET.Element) -> List[Dict[str, Any]]:
 
             # Check if this string is followed by Layr blocks (composition name)
             # by looking at siblings
-            parent = _find_parent_map(root, elem)
+            parent = parent_map.get(elem)
             if parent is not None:
                 # Get position of current element
                 children = list(parent)
@@ -95,14 +129,14 @@ def _extract_compositions_ae2025(root: ET.Element) -> List[Dict[str, Any]]:
                     idx = children.index(elem)
                     # Look ahead for Layr blocks
                     has_layr_after = False
-                    for i in range(idx + 1, min(idx + 20, len(children))):
+                    for i in range(idx + 1, min(idx + 1 + _COMP_LOOKAHEAD, len(children))):
                         child_tag = children[i].tag.split('}')[-1] if '}' in children[i].tag else children[i].tag
                         if child_tag == 'Layr':
                             has_layr_after = True
                             break
 
                     # If followed by Layr blocks and not inside a Layr, it's a comp name
-                    if has_layr_after and not _is_inside_layr_map(root, elem):
+                    if has_layr_after and not _is_inside_layr_map(parent_map, elem):
                         # Save previous composition if exists
                         if current_comp is not None:
                             compositions.append(current_comp)
@@ -154,7 +188,7 @@ def _extract_layer_ae2025(layr_elem: ET.Element) -> Optional[Dict[str, Any]]:
     # "4144424520546578742050726f70657274696573" = "ADBE Text Properties"
     is_text_layer = False
     xml_string = ET.tostring(layr_elem, encoding='unicode')
-    if '4144424520546578742050726f70657274696573' in xml_string:
+    if _TEXT_PROPERTIES_HEX in xml_string:
         is_text_layer = True
 
     # Determine layer type
@@ -170,10 +204,6 @@ def _extract_layer_ae2025(layr_elem: ET.Element) -> Optional[Dict[str, Any]]:
     }
 
 
-# Build parent map once for efficiency
-_PARENT_MAP_CACHE = {}
-
-
 def _build_parent_map(root: ET.Element) -> Dict[ET.Element, ET.Element]:
     """Build a map of element -> parent for efficient parent lookup."""
     parent_map = {}
@@ -183,27 +213,139 @@ def _build_parent_map(root: ET.Element) -> Dict[ET.Element, ET.Element]:
     return parent_map
 
 
-def _find_parent_map(root: ET.Element, elem: ET.Element) -> Optional[ET.Element]:
-    """Find parent using cached parent map."""
-    # Build map if not cached
-    root_id = id(root)
-    if root_id not in _PARENT_MAP_CACHE:
-        _PARENT_MAP_CACHE[root_id] = _build_parent_map(root)
-
-    return _PARENT_MAP_CACHE[root_id].get(elem)
-
-
-def _is_inside_layr_map(root: ET.Element, elem: ET.Element) -> bool:
+def _is_inside_layr_map(parent_map: Dict[ET.Element, ET.Element], elem: ET.Element) -> bool:
     """Check if an element is inside a <Layr> block using parent map."""
-    parent = _find_parent_map(root, elem)
+    parent = parent_map.get(elem)
     while parent is not None:
         parent_tag = parent.tag.split('}')[-1] if '}' in parent.tag else parent.tag
         if parent_tag == 'Layr':
             return True
-        parent = _find_parent_map(root, parent)
+        parent = parent_map.get(parent)
     return False
 
 
+def _extract_compositions_streaming(file_path: str) -> List[Dict[str, Any]]:
+    """
+    Extract compositions from AE 2025 format in a single iterparse pass.
+
+    Produces the same result as _extract_compositions_ae2025 without building
+    the full tree. Composition and layer records are emitted in document
+    order; a <string> outside any <Layr> becomes a pending composition
+    candidate that is confirmed once a <Layr> sibling opens within the
+    look-ahead window, or dropped when the window passes or its parent closes.
+    Each element is detached from its parent as soon as it closes.
+    """
+    # Document-ordered records: ['comp', name, confirmed] / ['layer', layer]
+    records: List[list] = []
+    # Open elements: [tag, child_count, pending_candidates]
+    stack: List[list] = []
+    elem_stack: List[ET.Element] = []
+    # Open <Layr> records: [record, name_or_None, name_seen, is_text]
+    layr_stack: List[list] = []
+    # Per open element, the record it opened (or None)
+    record_stack: List[Optional[list]] = []
+
+    for event, elem in ET.iterparse(file_path, events=('start', 'end')):
+        tag = elem.tag.split('}')[-1] if '}' in elem.tag else elem.tag
+
+        if event == 'start':
+            record = None
+            if stack:
+                parent = stack[-1]
+                idx = parent[1]
+                parent[1] += 1
+
+                if tag == 'Layr' and parent[2]:
+                    # Confirm candidates whose look-ahead window reaches this Layr
+                    for cand_idx, cand in parent[2]:
+                        cand[2] = idx - cand_idx <= _COMP_LOOKAHEAD
+                    parent[2] = []
+                elif parent[2]:
+                    # Drop candidates that can no longer see a Layr
+                    while parent[2] and idx - parent[2][0][0] >= _COMP_LOOKAHEAD:
+                        parent[2].pop(0)[1][2] = False
+
+                if tag == 'string' and not layr_stack:
+                    # Placeholder record; decided when the element closes
+                    record = ['comp', None, None, idx]
+                    records.append(record)
+
+            if tag == 'Layr':
+                record = ['layer', None]
+                records.append(record)
+                layr_stack.append([record, None, False, False])
+
+            stack.append([tag, 0, []])
+            elem_stack.append(elem)
+            record_stack.append(record)
+            continue
+
+        # 'end' event
+        _, _, pending = stack.pop()
+        elem_stack.pop()
+        record = record_stack.pop()
+
+        # Candidates never followed by a Layr sibling are not compositions
+        for _, cand in pending:
+            cand[2] = False
+
+        # Flag every enclosing <Layr> whose subtree carries the text marker
+        if layr_stack and not layr_stack[-1][3]:
+            if _TEXT_PROPERTIES_HEX in (elem.text or '') or any(
+                    _TEXT_PROPERTIES_HEX in value for value in elem.attrib.values()):
+                for open_layr in layr_stack:
+                    open_layr[3] = True
+
+        if tag == 'string':
+            if record is not None:
+                text = elem.text.strip() if elem.text else ''
+                if text:
+                    record[1] = text
+                    stack[-1][2].append((record[3], record))
+                else:
+                    record[2] = False
+            elif (layr_stack and not layr_stack[-1][2]
+                    and stack and stack[-1][0] == 'Layr' and elem.text):
+                # First <string> child with text names the layer
+                layr_stack[-1][1] = elem.text.strip()
+                layr_stack[-1][2] = True
+        elif tag == 'Layr':
+            layr_record, layer_name, _, is_text = layr_stack.pop()
+            if layer_name:
+                layr_record[1] = {
+                    'name': layer_name,
+                    'type': 'text' if is_text else 'image',
+                    'is_placeholder': _is_placeholder_name(layer_name)
+                }
+
+        # Release the subtree: nothing below this point is needed again
+        elem.clear()
+        if elem_stack:
+            elem_stack[-1].remove(elem)
+
+    compositions = []
+    current_comp = None
+    for record in records:
+        if record[0] == 'comp':
+            if record[2]:
+                if current_comp is not None:
+                    compositions.append(current_comp)
+                current_comp = {
+                    'name': record[1],
+                    'width': 1920,  # Default, can't extract from this format
+                    'height': 1080,
+                    'duration': 10.0,
+                    'layers': []
+                }
+        elif record[1] is not None and current_comp is not None:
+            current_comp['layers'].append(record[1])
+
+    if current_comp is not None:
+        compositions.append(current_comp)
+
+    return compositions
+
+
 def _find_main_composition(compositions: List[Dict[str, Any]]) -> str:
     """Find the main composition name from the list."""
     if not compositions:
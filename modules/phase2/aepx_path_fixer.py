@@ -12,6 +12,9 @@ import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from modules.phase2.footage_index import get_footage_index
+from modules.phase2.path_rewriter import rewrite_paths
+
 
 def find_footage_references(aepx_path: str) -> List[Dict[str, str]]:
     """
@@ -121,10 +124,6 @@ def fix_footage_paths(aepx_path: str, output_path: Optional[str] = None,
                 'message': 'No footage references found'
             }
 
-        # Read AEPX as text (easier for path replacement)
-        with open(aepx_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
         # Process each reference
         for ref in references:
             old_path = ref['path']
@@ -166,21 +165,24 @@ def fix_footage_paths(aepx_path: str, output_path: Optional[str] = None,
                             new_path = os.path.abspath(search_path)
                         break
 
+                if not new_path:
+                    # Fall back to the project-wide footage index
+                    indexed_path = get_footage_index().resolve(filename)
+                    if indexed_path:
+                        try:
+                            new_path = os.path.relpath(indexed_path, aepx_dir)
+                        except ValueError:
+                            new_path = indexed_path
+
                 if not new_path:
                     missing_files.append(filename)
 
-            # Replace path in content
             if new_path:
-                # Escape special regex characters in old_path
-                old_path_escaped = re.escape(old_path)
                 # Replace with forward slashes (AE uses forward slashes)
-                new_path_normalized = new_path.replace('\\', '/')
-                content = re.sub(old_path_escaped, new_path_normalized, content)
-                fixed_paths[old_path] = new_path_normalized
+                fixed_paths[old_path] = new_path.replace('\\', '/')
 
-        # Write fixed AEPX
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # Write fixed AEPX, rewriting every path in a single pass
+        rewrite_paths(aepx_path, fixed_paths, output_path)
 
         return {
             'success': True,
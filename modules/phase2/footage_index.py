@@ -0,0 +1,301 @@
+"""
+Module 2.3: Footage Index
+
+Persistent filename -> path index over the project's footage directories
+(uploads, footage, sample_files, assets, media, ...), so resolving a
+missing footage reference is a dictionary lookup instead of an os.walk
+over every root.
+
+The index is refreshed incrementally: each indexed directory remembers its
+mtime, and only directories whose mtime changed (i.e. had entries added,
+removed or renamed) are listed again. A refresh therefore costs one stat()
+per directory, not one per file. The index is saved to disk so a fresh
+process starts warm.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+# Searched in priority order; a file found under an earlier root wins
+DEFAULT_SEARCH_DIRS = [
+    'uploads',
+    'footage',
+    'sample_files',
+    'sample_files/footage',
+    'assets',
+    'media',
+    'static/uploads',
+]
+
+DEFAULT_INDEX_PATH = 'data/cache/footage_index.json'
+DEFAULT_REFRESH_SECONDS = 2.0
+INDEX_VERSION = 1
+
+
+class FootageIndex:
+    """
+    Filename -> candidate paths over a set of root directories.
+
+    Lookups validate the returned path with a single stat and refresh the
+    index when a name is missing or stale, so a file uploaded a moment ago
+    is still found. find_all() refreshes at most every refresh_seconds.
+    """
+
+    def __init__(self, search_dirs: Optional[List[str]] = None,
+                 index_path: Optional[str] = DEFAULT_INDEX_PATH,
+                 refresh_seconds: float = DEFAULT_REFRESH_SECONDS):
+        """
+        Args:
+            search_dirs: Root directories in priority order
+            index_path: JSON file the index persists to (None = memory only)
+            refresh_seconds: Minimum time between find_all() rescans
+        """
+        self.roots = self._normalize_roots(search_dirs or DEFAULT_SEARCH_DIRS)
+        self.index_path = index_path
+        self.refresh_seconds = refresh_seconds
+
+        self._lock = threading.RLock()
+        # dir -> (mtime_ns, root priority, file names, subdirectories)
+        self._dirs: Dict[str, Tuple[int, int, List[str], List[str]]] = {}
+        # file name -> {path: root priority}
+        self._by_name: Dict[str, Dict[str, int]] = {}
+        self._last_refresh = 0.0
+        self._loaded = False
+
+    def resolve(self, filename: str) -> Optional[str]:
+        """
+        Absolute path of a file with this name under the search roots.
+
+        Returns the candidate from the highest-priority root (ties broken by
+        path), or None if no such file exists.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            path = self._best(filename)
+            if path and os.path.isfile(path):
+                return path
+
+            # Missing or stale entry: rescan changed directories and retry.
+            # Not rate-limited; unchanged directories cost one stat each.
+            self.refresh(force=True)
+            path = self._best(filename)
+            if path and os.path.isfile(path):
+                return path
+            return None
+
+    def find_all(self, filename: str) -> List[str]:
+        """Every indexed path with this file name, best first."""
+        with self._lock:
+            self._ensure_loaded()
+            self.refresh()
+            candidates = self._by_name.get(filename, {})
+            return [path for _, path in sorted((prio, path) for path, prio in candidates.items())]
+
+    def list_files(self, directory: str, suffix: str = '') -> List[str]:
+        """
+        Absolute paths of files directly in a directory (optionally by suffix).
+
+        The listing is cached by directory mtime, so repeated calls cost a
+        single stat while the directory is unchanged.
+        """
+        directory = os.path.abspath(directory)
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._scan_dir(directory, self._dirs.get(directory, (0, len(self.roots)))[1])
+            if entry is None:
+                return []
+            return [
+                os.path.join(directory, name)
+                for name in sorted(entry[2])
+                if name.lower().endswith(suffix.lower())
+            ]
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Rescan directories whose mtime changed since the last scan.
+
+        Returns:
+            True if a scan ran (False if skipped by the rate limit)
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_refresh and now - self._last_refresh < self.refresh_seconds:
+                return False
+
+            seen = set()
+            changed = False
+            for priority, root in enumerate(self.roots):
+                stack = [root]
+                while stack:
+                    directory = stack.pop()
+                    if directory in seen:
+                        continue
+                    seen.add(directory)
+
+                    before = self._dirs.get(directory)
+                    entry = self._scan_dir(directory, priority)
+                    if entry is None:
+                        continue
+                    changed = changed or entry is not before
+                    stack.extend(entry[3])
+
+            # Directories that disappeared (or fell outside the roots)
+            for directory in [d for d in self._dirs if d not in seen and self._under_roots(d)]:
+                self._set_dir(directory, None)
+                changed = True
+
+            self._last_refresh = time.monotonic()
+            if changed:
+                self._save()
+            return True
+
+    def get_stats(self) -> Dict[str, int]:
+        """Number of indexed directories and file names."""
+        with self._lock:
+            return {
+                'directories': len(self._dirs),
+                'file_names': len(self._by_name),
+                'files': sum(len(paths) for paths in self._by_name.values())
+            }
+
+    def _best(self, filename: str) -> Optional[str]:
+        candidates = self._by_name.get(filename)
+        if not candidates:
+            return None
+        return min(candidates.items(), key=lambda item: (item[1], item[0]))[0]
+
+    def _scan_dir(self, directory: str, priority: int):
+        """Directory entry, re-listed only if its mtime changed; None if gone."""
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            if directory in self._dirs:
+                self._set_dir(directory, None)
+            return None
+
+        entry = self._dirs.get(directory)
+        if entry and entry[0] == mtime_ns and entry[1] == priority:
+            return entry
+
+        files, subdirs = [], []
+        try:
+            with os.scandir(directory) as it:
+                for item in it:
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            subdirs.append(item.path)
+                        elif item.is_file():
+                            files.append(item.name)
+                    except OSError:
+                        continue
+        except OSError:
+            self._set_dir(directory, None)
+            return None
+
+        entry = (mtime_ns, priority, files, subdirs)
+        self._set_dir(directory, entry)
+        return entry
+
+    def _set_dir(self, directory: str, entry) -> None:
+        """Replace a directory's entry and update the name index to match."""
+        old = self._dirs.pop(directory, None)
+        if old:
+            for name in old[2]:
+                paths = self._by_name.get(name)
+                if paths is not None:
+                    paths.pop(os.path.join(directory, name), None)
+                    if not paths:
+                        del self._by_name[name]
+
+        if entry is None:
+            return
+        self._dirs[directory] = entry
+        # Directories listed outside the roots (list_files) aren't searchable
+        if entry[1] < len(self.roots):
+            for name in entry[2]:
+                self._by_name.setdefault(name, {})[os.path.join(directory, name)] = entry[1]
+
+    def _under_roots(self, directory: str) -> bool:
+        return any(directory == root or directory.startswith(root + os.sep) for root in self.roots)
+
+    def _normalize_roots(self, search_dirs: List[str]) -> List[str]:
+        """Absolute roots, dropping ones nested inside an earlier root."""
+        roots = []
+        for search_dir in search_dirs:
+            root = os.path.abspath(search_dir)
+            if not any(root == r or root.startswith(r + os.sep) for r in roots):
+                roots.append(root)
+        return roots
+
+    def _ensure_loaded(self) -> None:
+        """Load the persisted index once, then bring it up to date."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if self.index_path:
+            try:
+                with open(self.index_path) as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_VERSION and data.get('roots') == self.roots:
+                    for directory, (mtime_ns, priority, files, subdirs) in data['dirs'].items():
+                        self._set_dir(directory, (mtime_ns, priority, files, subdirs))
+            except (OSError, ValueError, KeyError, TypeError):
+                self._dirs.clear()
+                self._by_name.clear()
+
+        self.refresh(force=True)
+
+    def _save(self) -> None:
+        """Persist the index atomically."""
+        if not self.index_path:
+            return
+        data = {
+            'version': INDEX_VERSION,
+            'roots': self.roots,
+            'dirs': {
+                directory: list(entry)
+                for directory, entry in self._dirs.items()
+                if entry[1] < len(self.roots)
+            }
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            pass
+
+
+_shared_index: Optional[FootageIndex] = None
+_shared_index_lock = threading.Lock()
+
+
+def get_footage_index() -> FootageIndex:
+    """
+    Process-wide footage index over the default search directories.
+
+    Configured from the environment:
+        FOOTAGE_SEARCH_DIRS: comma-separated roots (default: uploads, footage,
+            sample_files, assets, media, static/uploads)
+        FOOTAGE_INDEX_PATH: persisted index file (default:
+            data/cache/footage_index.json)
+        FOOTAGE_INDEX_REFRESH_SECONDS: minimum seconds between find_all() rescans
+            (default: 2)
+    """
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None:
+            search_dirs = os.getenv('FOOTAGE_SEARCH_DIRS')
+            _shared_index = FootageIndex(
+                search_dirs=[d.strip() for d in search_dirs.split(',') if d.strip()] if search_dirs else None,
+                index_path=os.getenv('FOOTAGE_INDEX_PATH', DEFAULT_INDEX_PATH),
+                refresh_seconds=float(os.getenv('FOOTAGE_INDEX_REFRESH_SECONDS', DEFAULT_REFRESH_SECONDS))
+            )
+        return _shared_index
@@ -0,0 +1,126 @@
+"""
+Module 2.4: Path Rewriter
+
+Rewrite many footage paths in an AEPX file in a single pass.
+
+All old -> new mappings are compiled into one alternation pattern (longest
+path first, so a path never loses to a shorter prefix of itself) and the
+file is streamed through it in chunks, so a large AEPX is neither scanned
+once per path nor held in memory twice.
+"""
+
+import os
+import re
+from typing import Dict, Optional
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class PathRewriter:
+    """
+    Literal multi-pattern replacer for old -> new path mappings.
+
+    Replacement text is inserted verbatim (backslashes in Windows paths are
+    not treated as regex escapes).
+    """
+
+    def __init__(self, path_mapping: Dict[str, str]):
+        """
+        Args:
+            path_mapping: {old_path: new_path}; empty old paths are ignored
+        """
+        self.path_mapping = {old: new for old, new in path_mapping.items() if old}
+        self.max_length = max((len(old) for old in self.path_mapping), default=0)
+        self.pattern = None
+        if self.path_mapping:
+            alternatives = sorted(self.path_mapping, key=len, reverse=True)
+            self.pattern = re.compile('|'.join(re.escape(old) for old in alternatives))
+
+    def rewrite(self, text: str):
+        """
+        Rewrite all mapped paths in a string.
+
+        Returns:
+            (new_text, {old_path: replacement_count})
+        """
+        counts: Dict[str, int] = {}
+        if not self.pattern:
+            return text, counts
+        return self.pattern.sub(lambda match: self._replace(match, counts), text), counts
+
+    def rewrite_file(self, input_path: str, output_path: Optional[str] = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+        """
+        Stream a file through the rewriter.
+
+        Args:
+            input_path: File to read
+            output_path: File to write (None = rewrite input_path in place)
+            chunk_size: Characters read per chunk
+
+        Returns:
+            {old_path: replacement_count} for paths that were found
+        """
+        output_path = output_path or input_path
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        counts: Dict[str, int] = {}
+
+        # A match starting before this many characters from the end of the
+        # buffer is fully visible, so it can't change once more text arrives
+        keep = max(self.max_length - 1, 0)
+        chunk_size = max(chunk_size, keep + 1)
+
+        try:
+            with open(input_path, 'r', encoding='utf-8', newline='') as src, \
+                    open(tmp_path, 'w', encoding='utf-8', newline='') as dst:
+                buffer = ''
+                while True:
+                    chunk = src.read(chunk_size)
+                    buffer += chunk
+                    at_end = not chunk
+                    limit = len(buffer) if at_end else len(buffer) - keep
+                    buffer = self._rewrite_prefix(buffer, limit, dst, counts)
+                    if at_end:
+                        break
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return counts
+
+    def _rewrite_prefix(self, buffer: str, limit: int, dst, counts: Dict[str, int]) -> str:
+        """Write buffer up to limit (plus any match straddling it); return the rest."""
+        position = 0
+        if self.pattern:
+            for match in self.pattern.finditer(buffer):
+                if match.start() >= limit:
+                    break
+                dst.write(buffer[position:match.start()])
+                dst.write(self._replace(match, counts))
+                position = match.end()
+
+        end = max(position, limit)
+        dst.write(buffer[position:end])
+        return buffer[end:]
+
+    def _replace(self, match, counts: Dict[str, int]) -> str:
+        old = match.group(0)
+        counts[old] = counts.get(old, 0) + 1
+        return self.path_mapping[old]
+
+
+def rewrite_paths(input_path: str, path_mapping: Dict[str, str],
+                  output_path: Optional[str] = None) -> Dict[str, int]:
+    """
+    Replace every mapped path in a file in one streaming pass.
+
+    Args:
+        input_path: AEPX (or other text) file
+        path_mapping: {old_path: new_path}
+        output_path: Where to write (None = overwrite input_path)
+
+    Returns:
+        {old_path: replacement_count} for paths that were found
+    """
+    return PathRewriter(path_mapping).rewrite_file(input_path, output_path)
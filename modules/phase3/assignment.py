@@ -0,0 +1,137 @@
+"""
+Module 3.1c: Optimal Layer Assignment
+
+Solves layer-to-placeholder matching as a global assignment problem:
+given a score matrix (rows = PSD layers, columns = placeholders), pick the
+one-to-one pairing with the highest total score instead of assigning
+greedily placeholder by placeholder.
+
+Uses scipy's linear_sum_assignment when available and a vectorized NumPy
+Hungarian (Kuhn-Munkres) implementation otherwise.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+from core.lazy_imports import is_available
+
+# scipy.optimize is imported on first use (it is slow to import)
+_SCIPY_AVAILABLE = is_available('scipy')
+
+
+def _hungarian_min_cost(cost: np.ndarray) -> np.ndarray:
+    """
+    Minimum-cost assignment for an n x m cost matrix with n <= m.
+
+    Returns:
+        Array of length n: the column assigned to each row
+    """
+    n, m = cost.shape
+    inf = np.inf
+
+    # 1-based potentials/matching as in the classic O(n^2 m) formulation
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int)     # p[j] = row matched to column j (0 = none)
+    way = np.zeros(m + 1, dtype=int)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, inf)
+        used = np.zeros(m + 1, dtype=bool)
+
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            improve = free & (reduced < minv[1:])
+            minv[1:][improve] = reduced[improve]
+            way[1:][improve] = j0
+
+            candidates = np.where(free, minv[1:], inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+
+            used_cols = np.flatnonzero(used)
+            u[p[used_cols]] += delta
+            v[used_cols] -= delta
+            minv[1:][free] -= delta
+
+            j0 = j1
+            if p[j0] == 0:
+                break
+
+        # Augment along the alternating path
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    assignment = np.full(n, -1, dtype=int)
+    for j in range(1, m + 1):
+        if p[j]:
+            assignment[p[j] - 1] = j - 1
+    return assignment
+
+
+def linear_sum_assignment_max(scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Maximum-weight one-to-one assignment for a rectangular score matrix.
+
+    Returns:
+        (row_indices, col_indices) of the chosen pairs, sorted by row
+    """
+    scores = np.asarray(scores, dtype=float)
+    if scores.size == 0:
+        return np.array([], dtype=int), np.array([], dtype=int)
+
+    if _SCIPY_AVAILABLE:
+        from scipy.optimize import linear_sum_assignment
+        return linear_sum_assignment(scores, maximize=True)
+
+    if scores.shape[0] <= scores.shape[1]:
+        cols = _hungarian_min_cost(-scores)
+        return np.arange(scores.shape[0]), cols
+
+    rows = _hungarian_min_cost(-scores.T)
+    order = np.argsort(rows)
+    return rows[order], np.arange(scores.shape[1])[order]
+
+
+def solve_assignment(scores: np.ndarray, min_score: float,
+                     inclusive: bool = True) -> List[Tuple[int, int, float]]:
+    """
+    Optimal one-to-one matching of rows to columns above a score threshold.
+
+    Pairs below the threshold contribute nothing to the objective, so the
+    solver never gives up an acceptable pair to make an unacceptable one.
+
+    Args:
+        scores: Score matrix (rows = PSD layers, columns = placeholders)
+        min_score: Minimum score for a pair to be accepted
+        inclusive: Accept scores equal to min_score (default) or only above it
+
+    Returns:
+        List of (row, column, score) for accepted pairs, ordered by column
+    """
+    scores = np.asarray(scores, dtype=float)
+    if scores.size == 0:
+        return []
+
+    acceptable = scores >= min_score if inclusive else scores > min_score
+    weights = np.where(acceptable, scores, 0.0)
+
+    rows, cols = linear_sum_assignment_max(weights)
+    pairs = [
+        (int(r), int(c), float(scores[r, c]))
+        for r, c in zip(rows, cols)
+        if acceptable[r, c]
+    ]
+    pairs.sort(key=lambda pair: pair[1])
+    return pairs
@@ -7,14 +7,26 @@ Intelligently maps PSD content to AEPX template placeholders.
 import re
 from typing import Dict, List, Any, Tuple
 
+import numpy as np
 
-def match_content_to_slots(psd_data: Dict[str, Any], aepx_data: Dict[str, Any]) -> Dict[str, Any]:
+from .assignment import solve_assignment
+
+
+# Image layer boosts applied for 'featured'/'image' placeholders
+_CONTENT_KEYWORDS = ['cutout', 'photo', 'portrait', 'person', 'player', 'subject']
+_IMAGE_MATCH_THRESHOLD = 0.3
+
+
+def match_content_to_slots(psd_data: Dict[str, Any], aepx_data: Dict[str, Any],
+                           image_assignment: str = 'optimal') -> Dict[str, Any]:
     """
     Match PSD content layers to AEPX template placeholders.
 
     Args:
         psd_data: Parsed PSD data from Module 1.1
         aepx_data: Parsed AEPX data from Module 2.1
+        image_assignment: 'optimal' (global assignment, default) or
+            'greedy' (placeholder-by-placeholder, previous behaviour)
 
     Returns:
         Dictionary with mappings, unmapped layers, and unfilled placeholders
@@ -43,7 +55,8 @@ def match_content_to_slots(psd_data: Dict[str, Any], aepx_data: Dict[str, Any])
     used_ph.update(text_used_ph)
 
     # Match image layers by name similarity
-    image_mappings, img_used_psd, img_used_ph = _match_image_layers(psd_images, image_ph)
+    match_images = _match_image_layers_greedy if image_assignment == 'greedy' else _match_image_layers
+    image_mappings, img_used_psd, img_used_ph = match_images(psd_images, image_ph)
     mappings.extend(image_mappings)
     used_psd.update(img_used_psd)
     used_ph.update(img_used_ph)
@@ -103,7 +116,91 @@ def _match_text_layers(psd_layers: List[Dict], placeholders: List[Dict]) -> Tupl
 
 
 def _match_image_layers(psd_layers: List[Dict], placeholders: List[Dict]) -> Tuple[List[Dict], set, set]:
-    """Match image/smartobject layers to image placeholders using name similarity."""
+    """
+    Match image/smartobject layers to image placeholders using name similarity.
+
+    Scores every layer/placeholder pair at once and picks the pairing with
+    the highest total score (see assignment.solve_assignment).
+    """
+    # Layers are identified by name; keep the first (largest) of duplicates,
+    # in the caller's order so ties break as in the greedy path
+    seen = {}
+    for layer in psd_layers:
+        seen.setdefault(layer['name'], layer)
+    unique_layers = list(seen.values())
+    if not unique_layers or not placeholders:
+        return [], set(), set()
+
+    scores = _image_score_matrix(unique_layers, placeholders)
+
+    mappings = []
+    used_psd = set()
+    used_ph = set()
+
+    for l_idx, p_idx, score in solve_assignment(scores, _IMAGE_MATCH_THRESHOLD, inclusive=False):
+        layer = unique_layers[l_idx]
+        psd_name, ph_name = layer['name'], placeholders[p_idx]['name']
+
+        reason = f"Name similarity match (score: {score:.2f})"
+        if layer.get('type') == 'smartobject':
+            reason += ", smartobject type"
+
+        mappings.append({
+            "psd_layer": psd_name,
+            "aepx_placeholder": ph_name,
+            "type": "image",
+            "confidence": min(1.0, score),
+            "reason": reason
+        })
+
+        used_psd.add(psd_name)
+        used_ph.add(ph_name)
+
+    return mappings, used_psd, used_ph
+
+
+def _image_score_matrix(psd_layers: List[Dict], placeholders: List[Dict]) -> np.ndarray:
+    """
+    Score matrix (layers x placeholders) used for image matching.
+
+    Token Jaccard similarity for every pair, plus layer boosts (content
+    keyword, smartobject type, large area) on 'featured'/'image' placeholders.
+    """
+    layer_tokens = [set(_tokenize(l['name'].lower())) for l in psd_layers]
+    ph_tokens = [set(_tokenize(p['name'].lower())) for p in placeholders]
+
+    vocabulary = {token: i for i, token in enumerate(set().union(*layer_tokens, *ph_tokens))}
+    layer_matrix = np.zeros((len(psd_layers), len(vocabulary)))
+    ph_matrix = np.zeros((len(placeholders), len(vocabulary)))
+    for row, tokens in enumerate(layer_tokens):
+        layer_matrix[row, [vocabulary[t] for t in tokens]] = 1.0
+    for row, tokens in enumerate(ph_tokens):
+        ph_matrix[row, [vocabulary[t] for t in tokens]] = 1.0
+
+    intersection = layer_matrix @ ph_matrix.T
+    union = layer_matrix.sum(axis=1)[:, None] + ph_matrix.sum(axis=1)[None, :] - intersection
+    similarity = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+    boosts = np.zeros(len(psd_layers))
+    for row, layer in enumerate(psd_layers):
+        name_lower = layer['name'].lower()
+        if any(kw in name_lower for kw in _CONTENT_KEYWORDS):
+            boosts[row] += 0.4
+        if layer.get('type') == 'smartobject':
+            boosts[row] += 0.15
+        if layer.get('width', 0) * layer.get('height', 0) > 500000:  # Large image
+            boosts[row] += 0.05
+
+    boosted = np.array([
+        'featured' in p['name'].lower() or 'image' in p['name'].lower()
+        for p in placeholders
+    ])
+
+    return similarity + boosts[:, None] * boosted[None, :]
+
+
+def _match_image_layers_greedy(psd_layers: List[Dict], placeholders: List[Dict]) -> Tuple[List[Dict], set, set]:
+    """Match image/smartobject layers to image placeholders greedily, one placeholder at a time."""
     mappings = []
     used_psd = set()
     used_ph = set()
@@ -0,0 +1,289 @@
+"""
+Embedding Cache
+
+Persistent name -> embedding cache for the ML content matcher.
+
+Layer and placeholder names ("cutout", "Background", "player1FullName")
+repeat across thousands of PSDs and templates, so their embeddings are
+stored once per model and reused:
+- Tier 1: in-memory LRU of vectors (per process)
+- Tier 2: on-disk store per model, opened as a read-only memory map:
+    <cache_dir>/<model>/vectors.f32   float32 rows, appended
+    <cache_dir>/<model>/index.json    {"dim": N, "names": [...]} (row order)
+
+Rows are appended before the index is rewritten, so a crash can only leave
+unreferenced rows behind, never an index entry without a vector. Writers
+in different processes serialize on an flock()ed <model>/.lock file, and
+re-read the index under it, so one process never truncates or indexes
+over rows another has just written. Readers take no lock: the index only
+grows, so rows they have mapped are never truncated away.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+
+DEFAULT_CACHE_DIR = 'data/cache/embeddings'
+DEFAULT_MAX_MEMORY_ENTRIES = 20000
+
+
+class EmbeddingCache:
+    """
+    Two-tier (memory + memory-mapped disk) embedding store for one model.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES,
+        enabled: bool = True
+    ):
+        self.model_name = model_name
+        self.model_dir = Path(cache_dir) / re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        self.max_memory_entries = max_memory_entries
+        self.enabled = enabled
+
+        self._lock = threading.RLock()
+        self._memory: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._rows: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._dim: Optional[int] = None
+        self._vectors: Optional[np.memmap] = None
+        self._index_mtime: Optional[int] = None
+
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.model_dir / 'vectors.f32'
+
+    @property
+    def index_path(self) -> Path:
+        return self.model_dir / 'index.json'
+
+    @property
+    def lock_path(self) -> Path:
+        return self.model_dir / '.lock'
+
+    def get_many(self, names: Iterable[str]) -> Tuple[Dict[str, np.ndarray], List[str]]:
+        """
+        Look up embeddings for names.
+
+        Returns:
+            (found, missing): found maps name -> vector copy; missing lists
+            names (unique, in input order) with no cached vector
+        """
+        found: Dict[str, np.ndarray] = {}
+        missing: List[str] = []
+
+        if not self.enabled:
+            return found, list(dict.fromkeys(names))
+
+        with self._lock:
+            self._refresh_disk()
+
+            for name in dict.fromkeys(names):
+                vector = self._memory.get(name)
+                if vector is not None:
+                    self._memory.move_to_end(name)
+                    self._stats['memory_hits'] += 1
+                    found[name] = vector
+                    continue
+
+                row = self._rows.get(name)
+                if row is not None:
+                    vector = np.array(self._vectors[row], dtype=np.float32)
+                    self._remember(name, vector)
+                    self._stats['disk_hits'] += 1
+                    found[name] = vector
+                    continue
+
+                self._stats['misses'] += 1
+                missing.append(name)
+
+        return found, missing
+
+    def put_many(self, embeddings: Dict[str, np.ndarray]):
+        """Store newly computed embeddings in memory and on disk."""
+        if not self.enabled or not embeddings:
+            return
+
+        with self._lock:
+            self._refresh_disk()
+
+            for name, vector in embeddings.items():
+                self._remember(name, np.asarray(vector, dtype=np.float32))
+            if all(name in self._rows for name in embeddings):
+                return
+
+            try:
+                with self._disk_lock():
+                    # Pick up rows other processes wrote since the last refresh
+                    self._index_mtime = None
+                    self._refresh_disk()
+
+                    new_names = [name for name in embeddings if name not in self._rows]
+                    if not new_names:
+                        return
+
+                    matrix = np.stack([np.asarray(embeddings[name], dtype=np.float32) for name in new_names])
+                    dim = matrix.shape[1]
+                    if self._dim is not None and dim != self._dim:
+                        # Model output size changed: start a fresh store
+                        self._reset_disk()
+                    self._dim = dim
+
+                    self._truncate_orphan_rows()
+                    with open(self.vectors_path, 'ab') as f:
+                        f.write(np.ascontiguousarray(matrix).tobytes())
+
+                    names = self._names + new_names
+                    tmp_path = self.index_path.with_suffix(f'.{os.getpid()}.tmp')
+                    tmp_path.write_text(json.dumps({'dim': dim, 'names': names}), encoding='utf-8')
+                    os.replace(tmp_path, self.index_path)
+            except OSError as e:
+                print(f"Warning: Could not persist embeddings: {e}")
+                return
+
+            self._stats['stores'] += len(new_names)
+            self._index_mtime = None
+            self._refresh_disk()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+            stats['disk_entries'] = len(self._rows)
+        return stats
+
+    def clear(self):
+        """Drop every cached embedding for this model."""
+        with self._lock:
+            self._memory.clear()
+            try:
+                with self._disk_lock():
+                    self._reset_disk()
+            except OSError:
+                self._reset_disk()
+            for counter in self._stats:
+                self._stats[counter] = 0
+
+    def _remember(self, name: str, vector: np.ndarray):
+        """Insert into the in-memory LRU (caller holds the lock)."""
+        self._memory[name] = vector
+        self._memory.move_to_end(name)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _refresh_disk(self):
+        """(Re)open the disk store if the index changed since it was loaded."""
+        try:
+            mtime = self.index_path.stat().st_mtime_ns
+        except OSError:
+            self._rows, self._names, self._vectors = {}, [], None
+            self._index_mtime = None
+            return
+
+        if mtime == self._index_mtime:
+            return
+
+        try:
+            index = json.loads(self.index_path.read_text(encoding='utf-8'))
+            dim = int(index['dim'])
+            names = list(index['names'])
+            complete_rows = self.vectors_path.stat().st_size // (dim * 4)
+        except (OSError, ValueError, KeyError, ZeroDivisionError):
+            self._rows, self._names, self._vectors = {}, [], None
+            self._index_mtime = None
+            return
+
+        names = names[:complete_rows]
+        self._dim = dim
+        self._names = names
+        self._rows = {name: row for row, name in enumerate(names)}
+        self._vectors = (
+            np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(len(names), dim))
+            if names else None
+        )
+        self._index_mtime = mtime
+
+    @contextmanager
+    def _disk_lock(self):
+        """Exclusive lock on this model's disk store, shared with other processes."""
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _truncate_orphan_rows(self):
+        """
+        Drop rows appended by an interrupted write that never reached the index.
+
+        Only called under _disk_lock() with a freshly read index, so every row
+        past the index really is orphaned.
+        """
+        if not self.vectors_path.exists() or self._dim is None:
+            return
+        expected = len(self._names) * self._dim * 4
+        if self.vectors_path.stat().st_size != expected:
+            self._vectors = None
+            with open(self.vectors_path, 'r+b') as f:
+                f.truncate(expected)
+
+    def _reset_disk(self):
+        """Delete the on-disk store for this model."""
+        self._vectors = None
+        for path in (self.vectors_path, self.index_path):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        self._rows, self._names = {}, []
+        self._dim = None
+        self._index_mtime = None
+
+
+_shared_caches: Dict[str, EmbeddingCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str) -> EmbeddingCache:
+    """
+    Process-wide embedding cache for a model.
+
+    Configured from the environment:
+        EMBEDDING_CACHE_DIR: cache directory (default: data/cache/embeddings)
+        EMBEDDING_CACHE_MEMORY_ENTRIES: in-memory LRU size (default: 20000)
+        DISABLE_EMBEDDING_CACHE: set to 'true' to bypass caching
+    """
+    with _shared_caches_lock:
+        cache = _shared_caches.get(model_name)
+        if cache is None:
+            cache = EmbeddingCache(
+                model_name,
+                cache_dir=os.getenv('EMBEDDING_CACHE_DIR', DEFAULT_CACHE_DIR),
+                max_memory_entries=int(os.getenv('EMBEDDING_CACHE_MEMORY_ENTRIES', DEFAULT_MAX_MEMORY_ENTRIES)),
+                enabled=os.getenv('DISABLE_EMBEDDING_CACHE', 'false').lower() != 'true'
+            )
+            _shared_caches[model_name] = cache
+        return cache
@@ -5,19 +5,24 @@ Upgrades content matching with semantic embeddings for better name similarity.
 Falls back to rule-based matching if ML is unavailable.
 """
 
+import threading
 from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
+from core.lazy_imports import is_available
 from .content_matcher import match_content_to_slots
+from .assignment import solve_assignment
+from .embedding_cache import EmbeddingCache, get_embedding_cache
 
-# Try to import sentence transformers
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# sentence-transformers (and torch) are imported when the model is first
+# loaded, not when this module is imported
 _MODEL_CACHE = None
-_ML_AVAILABLE = False
+_MODEL_LOCK = threading.Lock()
+_EMBEDDING_CACHE: Optional[EmbeddingCache] = None
+_ML_AVAILABLE = is_available('sentence_transformers')
 
-try:
-    from sentence_transformers import SentenceTransformer
-    _ML_AVAILABLE = True
-except ImportError:
-    _ML_AVAILABLE = False
+if not _ML_AVAILABLE:
     print("Warning: sentence-transformers not available. Using rule-based matching.")
 
 
@@ -27,31 +32,106 @@ def _get_model() -> Optional[Any]:
     if not _ML_AVAILABLE:
         return None
     if _MODEL_CACHE is None:
-        try:
-            _MODEL_CACHE = SentenceTransformer('all-MiniLM-L6-v2')
-        except Exception as e:
-            print(f"Warning: Failed to load model: {e}")
-            _ML_AVAILABLE = False
-            return None
+        with _MODEL_LOCK:
+            if _MODEL_CACHE is None and _ML_AVAILABLE:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    _MODEL_CACHE = SentenceTransformer(MODEL_NAME)
+                except Exception as e:
+                    print(f"Warning: Failed to load model: {e}")
+                    _ML_AVAILABLE = False
+                    return None
     return _MODEL_CACHE
 
 
-def _cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
-    """Calculate cosine similarity between two vectors."""
-    dot_product = np.dot(vec1, vec2)
-    norm1, norm2 = np.linalg.norm(vec1), np.linalg.norm(vec2)
-    return float(dot_product / (norm1 * norm2)) if norm1 > 0 and norm2 > 0 else 0.0
+def is_model_loaded() -> bool:
+    """Whether the embedding model is already in memory."""
+    return _MODEL_CACHE is not None
 
 
-def _semantic_similarity(text1: str, text2: str, model: Any) -> float:
-    """Calculate semantic similarity between two text strings."""
-    try:
-        embeddings = model.encode([text1, text2])
-        similarity = _cosine_similarity(embeddings[0], embeddings[1])
-        return max(0.0, min(1.0, similarity))
-    except Exception as e:
-        print(f"Warning: Semantic similarity failed: {e}")
-        return 0.0
+def warm_up_model(background: bool = True) -> Optional[threading.Thread]:
+    """
+    Load the embedding model ahead of the first match.
+
+    Args:
+        background: Load in a daemon thread and return immediately
+
+    Returns:
+        The loader thread when background=True and ML is available, else None
+    """
+    if not _ML_AVAILABLE or _MODEL_CACHE is not None:
+        return None
+
+    if not background:
+        _get_model()
+        return None
+
+    thread = threading.Thread(target=_get_model, daemon=True, name='EmbeddingModelWarmup')
+    thread.start()
+    return thread
+
+
+def _get_embedding_cache() -> EmbeddingCache:
+    """Get the persistent embedding cache for the matcher's model."""
+    global _EMBEDDING_CACHE
+    if _EMBEDDING_CACHE is None:
+        _EMBEDDING_CACHE = get_embedding_cache(MODEL_NAME)
+    return _EMBEDDING_CACHE
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row; zero vectors stay zero (cosine similarity 0)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def encode_texts(texts: List[str], model: Optional[Any] = None,
+                 batch_size: int = 64) -> Dict[str, np.ndarray]:
+    """
+    Encode a set of names in a single batched model call.
+
+    Names already in the persistent embedding cache are served from it;
+    only unseen names reach the model (which is loaded only if needed).
+    Duplicates are encoded once. Pass the names of every job in a batch to
+    share one inference call across all of them.
+
+    Args:
+        texts: Strings to encode
+        model: Sentence transformer model (loaded on demand if omitted)
+        batch_size: Inference batch size passed to the model
+
+    Returns:
+        Dict mapping each unique text to its embedding. Names that could not
+        be encoded (ML unavailable) are absent.
+    """
+    cache = _get_embedding_cache()
+    embeddings, missing = cache.get_many(texts)
+    if not missing:
+        return embeddings
+
+    model = model if model is not None else _get_model()
+    if model is None:
+        return embeddings
+
+    vectors = model.encode(missing, batch_size=batch_size)
+    encoded = dict(zip(missing, np.asarray(vectors, dtype=np.float32)))
+    cache.put_many(encoded)
+
+    embeddings.update(encoded)
+    return embeddings
+
+
+def _collect_names(psd_data: Dict[str, Any], aepx_data: Dict[str, Any]) -> List[str]:
+    """All layer and placeholder names the matcher may need embeddings for."""
+    names = [layer['name'] for layer in psd_data.get('layers', [])]
+    names.extend(p['name'] for p in aepx_data.get('placeholders', []))
+    return names
+
+
+def _embedding_matrix(names: List[str], embeddings: Dict[str, np.ndarray]) -> np.ndarray:
+    """Stack normalized embeddings for names, in order."""
+    return _normalize_rows(np.stack([embeddings[name] for name in names]))
 
 
 def _calculate_size_score(psd_layer: Dict, target_dimensions: Tuple[int, int]) -> float:
@@ -83,64 +163,77 @@ def _calculate_keyword_score(layer_name: str, layer_type: str) -> float:
 
 
 def _ml_match_images(psd_layers: List[Dict], placeholders: List[Dict],
-                     comp_dimensions: Tuple[int, int], model: Any) -> List[Dict]:
-    """Match image layers using ML semantic similarity."""
+                     comp_dimensions: Tuple[int, int],
+                     embeddings: Dict[str, np.ndarray],
+                     image_assignment: str = 'optimal') -> List[Dict]:
+    """
+    Match image layers using ML semantic similarity.
+
+    'optimal' picks the layer/placeholder pairing with the highest total
+    score; 'greedy' gives each placeholder, in order, its best free layer.
+    """
     image_layers = [l for l in psd_layers if l['type'] in ('smartobject', 'image')]
     image_placeholders = [p for p in placeholders if p['type'] == 'image']
 
     if not image_layers or not image_placeholders:
         return []
 
-    layer_names = [layer['name'] for layer in image_layers]
-    placeholder_names = [p['name'] for p in image_placeholders]
-
     try:
-        layer_embeddings = model.encode(layer_names)
-        placeholder_embeddings = model.encode(placeholder_names)
+        layer_embeddings = _embedding_matrix([l['name'] for l in image_layers], embeddings)
+        placeholder_embeddings = _embedding_matrix([p['name'] for p in image_placeholders], embeddings)
     except Exception as e:
         print(f"Warning: Failed to generate embeddings: {e}")
         return []
 
-    matches = []
-    matched_layers = set()
-    matched_placeholders = set()
-
-    for p_idx, placeholder in enumerate(image_placeholders):
-        if p_idx in matched_placeholders:
-            continue
+    # Full score matrix: rows are layers, columns are placeholders.
+    # Size and keyword scores depend only on the layer.
+    semantic_scores = layer_embeddings @ placeholder_embeddings.T
+    layer_scores = np.array([
+        _calculate_keyword_score(layer['name'], layer['type'])
+        + _calculate_size_score(layer, comp_dimensions) * 0.2
+        for layer in image_layers
+    ])
+    combined_scores = semantic_scores * 0.4 + layer_scores[:, None]
+
+    if image_assignment == 'greedy':
+        pairs = _greedy_assignment(combined_scores, 0.3)
+    else:
+        pairs = solve_assignment(combined_scores, 0.3)
+
+    return [
+        {
+            'psd_layer': image_layers[l_idx]['name'],
+            'aepx_placeholder': image_placeholders[p_idx]['name'],
+            'type': 'image',
+            'confidence': score,
+            'reason': f'ML semantic match (score: {score:.2f})'
+        }
+        for l_idx, p_idx, score in pairs
+    ]
 
-        best_score, best_layer_idx = 0.0, None
 
-        for l_idx, layer in enumerate(image_layers):
-            if l_idx in matched_layers:
-                continue
+def _greedy_assignment(scores: np.ndarray, min_score: float) -> List[Tuple[int, int, float]]:
+    """Give each placeholder (column), in order, its best still-free layer (row)."""
+    pairs = []
+    available = np.ones(scores.shape[0], dtype=bool)
 
-            semantic_score = _cosine_similarity(layer_embeddings[l_idx], placeholder_embeddings[p_idx])
-            size_score = _calculate_size_score(layer, comp_dimensions)
-            keyword_score = _calculate_keyword_score(layer['name'], layer['type'])
-            combined_score = (semantic_score * 0.4) + keyword_score + (size_score * 0.2)
+    for p_idx in range(scores.shape[1]):
+        if not available.any():
+            break
 
-            if combined_score > best_score:
-                best_score = combined_score
-                best_layer_idx = l_idx
+        column = np.where(available, scores[:, p_idx], -np.inf)
+        best_layer_idx = int(np.argmax(column))
+        best_score = float(column[best_layer_idx])
 
-        if best_layer_idx is not None and best_score >= 0.3:
-            layer = image_layers[best_layer_idx]
-            matches.append({
-                'psd_layer': layer['name'],
-                'aepx_placeholder': placeholder['name'],
-                'type': 'image',
-                'confidence': best_score,
-                'reason': f'ML semantic match (score: {best_score:.2f})'
-            })
-            matched_layers.add(best_layer_idx)
-            matched_placeholders.add(p_idx)
+        if best_score >= min_score:
+            pairs.append((best_layer_idx, p_idx, best_score))
+            available[best_layer_idx] = False
 
-    return matches
+    return pairs
 
 
 def _match_text_sequential(psd_layers: List[Dict], placeholders: List[Dict],
-                           model: Optional[Any]) -> List[Dict]:
+                           embeddings: Optional[Dict[str, np.ndarray]]) -> List[Dict]:
     """Match text layers sequentially with optional ML confidence boost."""
     text_layers = [l for l in psd_layers if l['type'] == 'text']
     text_placeholders = [p for p in placeholders if p['type'] == 'text']
@@ -149,51 +242,54 @@ def _match_text_sequential(psd_layers: List[Dict], placeholders: List[Dict],
         return []
 
     text_layers_sorted = sorted(text_layers, key=lambda l: l.get('y', 0))
-    matches = []
-
-    for i, layer in enumerate(text_layers_sorted):
-        if i < len(text_placeholders):
-            placeholder = text_placeholders[i]
-            confidence = 1.0
-
-            if model is not None:
-                try:
-                    semantic_sim = _semantic_similarity(layer['name'], placeholder['name'], model)
-                    if semantic_sim < 0.5:
-                        confidence = 0.95
-                except:
-                    pass
+    pairs = list(zip(text_layers_sorted, text_placeholders))
 
-            matches.append({
-                'psd_layer': layer['name'],
-                'aepx_placeholder': placeholder['name'],
-                'type': 'text',
-                'confidence': confidence,
-                'reason': 'Sequential text match (position-based)'
-            })
-
-    return matches
+    # Semantic similarity of each sequential pair, computed in one pass
+    confidences = [1.0] * len(pairs)
+    if embeddings:
+        try:
+            layer_vectors = _embedding_matrix([l['name'] for l, _ in pairs], embeddings)
+            placeholder_vectors = _embedding_matrix([p['name'] for _, p in pairs], embeddings)
+            similarities = np.clip(np.sum(layer_vectors * placeholder_vectors, axis=1), 0.0, 1.0)
+            confidences = [0.95 if sim < 0.5 else 1.0 for sim in similarities]
+        except Exception as e:
+            print(f"Warning: Semantic similarity failed: {e}")
+
+    return [
+        {
+            'psd_layer': layer['name'],
+            'aepx_placeholder': placeholder['name'],
+            'type': 'text',
+            'confidence': confidence,
+            'reason': 'Sequential text match (position-based)'
+        }
+        for (layer, placeholder), confidence in zip(pairs, confidences)
+    ]
 
 
 def match_content_to_slots_ml(psd_data: Dict[str, Any], aepx_data: Dict[str, Any],
-                               use_ml: bool = True) -> Dict[str, Any]:
+                               use_ml: bool = True,
+                               embeddings: Optional[Dict[str, np.ndarray]] = None,
+                               image_assignment: str = 'optimal') -> Dict[str, Any]:
     """
     Match PSD layers to AEPX placeholders using ML-enhanced semantic matching.
 
+    All layer and placeholder names are encoded in a single batched model
+    call, and similarities are computed as matrices.
+
     Args:
         psd_data: Parsed PSD data from Module 1.1
         aepx_data: Parsed AEPX data from Module 2.1
         use_ml: Whether to use ML enhancement (default: True)
+        embeddings: Optional precomputed name -> embedding dict (see
+            encode_texts); names missing from it are encoded on demand
+        image_assignment: 'optimal' (global assignment, default) or 'greedy'
 
     Returns:
         Dictionary with mappings, unmapped_psd_layers, unfilled_placeholders
     """
     if not use_ml or not _ML_AVAILABLE:
-        return match_content_to_slots(psd_data, aepx_data)
-
-    model = _get_model()
-    if model is None:
-        return match_content_to_slots(psd_data, aepx_data)
+        return match_content_to_slots(psd_data, aepx_data, image_assignment)
 
     try:
         # Get main composition dimensions
@@ -207,9 +303,22 @@ def match_content_to_slots_ml(psd_data: Dict[str, Any], aepx_data: Dict[str, Any
             main_comp.get('height', 1080) if main_comp else 1080
         )
 
+        embeddings = dict(embeddings or {})
+        missing = [name for name in _collect_names(psd_data, aepx_data) if name not in embeddings]
+        if missing:
+            try:
+                embeddings.update(encode_texts(missing))
+            except Exception as e:
+                print(f"Warning: Failed to generate embeddings: {e}")
+
+            if any(name not in embeddings for name in missing) and _get_model() is None:
+                # Model could not be loaded and the cache can't cover this job
+                return match_content_to_slots(psd_data, aepx_data, image_assignment)
+
         placeholders = aepx_data['placeholders']
-        text_matches = _match_text_sequential(psd_data['layers'], placeholders, model)
-        image_matches = _ml_match_images(psd_data['layers'], placeholders, comp_dimensions, model)
+        text_matches = _match_text_sequential(psd_data['layers'], placeholders, embeddings)
+        image_matches = _ml_match_images(psd_data['layers'], placeholders, comp_dimensions,
+                                         embeddings, image_assignment)
         all_matches = text_matches + image_matches
 
         mapped_psd_layers = {m['psd_layer'] for m in all_matches}
@@ -226,4 +335,35 @@ def match_content_to_slots_ml(psd_data: Dict[str, Any], aepx_data: Dict[str, Any
     except Exception as e:
         print(f"Warning: ML matching failed: {e}")
         print("Falling back to rule-based matcher")
-        return match_content_to_slots(psd_data, aepx_data)
+        return match_content_to_slots(psd_data, aepx_data, image_assignment)
+
+
+def match_batch_ml(jobs: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+                   use_ml: bool = True,
+                   image_assignment: str = 'optimal') -> List[Dict[str, Any]]:
+    """
+    Match many (psd_data, aepx_data) pairs with one embedding call for the batch.
+
+    Args:
+        jobs: List of (psd_data, aepx_data) tuples
+        use_ml: Whether to use ML enhancement (default: True)
+        image_assignment: 'optimal' (global assignment, default) or 'greedy'
+
+    Returns:
+        One match result per job, in input order
+    """
+    embeddings: Dict[str, np.ndarray] = {}
+    if use_ml and _ML_AVAILABLE:
+        names: List[str] = []
+        for psd_data, aepx_data in jobs:
+            names.extend(_collect_names(psd_data, aepx_data))
+        try:
+            embeddings = encode_texts(names)
+        except Exception as e:
+            print(f"Warning: Failed to generate embeddings: {e}")
+
+    return [
+        match_content_to_slots_ml(psd_data, aepx_data, use_ml=use_ml, embeddings=embeddings,
+                                  image_assignment=image_assignment)
+        for psd_data, aepx_data in jobs
+    ]
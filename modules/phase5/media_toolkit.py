@@ -0,0 +1,263 @@
+"""
+Module 5.3: Media Toolkit
+
+ffmpeg/ffprobe helpers for preview videos.
+
+- Binaries are resolved once per process instead of running `which` per call
+- Several frames (poster, contact sheet) come out of a single ffmpeg run
+- Probe results are memoized by (path, size, mtime), so validating a preview
+  and then reading its metadata probes it once
+- Batches of probes run concurrently
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+DEFAULT_TIMEOUT = 30  # seconds per ffmpeg/ffprobe run
+PROBE_CACHE_SIZE = 512
+
+
+class MediaToolkit:
+    """
+    Frame extraction and probing through ffmpeg/ffprobe.
+
+    Methods return None (or None entries) rather than raising when a binary
+    is missing or a run fails, matching the rest of the preview pipeline.
+    """
+
+    def __init__(self, ffmpeg_path: Optional[str] = None, ffprobe_path: Optional[str] = None,
+                 max_workers: Optional[int] = None, timeout: float = DEFAULT_TIMEOUT):
+        """
+        Args:
+            ffmpeg_path: ffmpeg executable (default: FFMPEG_PATH or PATH lookup)
+            ffprobe_path: ffprobe executable (default: FFPROBE_PATH or PATH lookup)
+            max_workers: Concurrent probes in probe_many (default: 4)
+            timeout: Seconds before a run is abandoned
+        """
+        self.ffmpeg_path = ffmpeg_path or os.getenv('FFMPEG_PATH') or shutil.which('ffmpeg')
+        self.ffprobe_path = ffprobe_path or os.getenv('FFPROBE_PATH') or shutil.which('ffprobe')
+        self.max_workers = max_workers or int(os.getenv('MEDIA_PROBE_WORKERS', 4))
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._probes: 'OrderedDict[tuple, Optional[Dict[str, Any]]]' = OrderedDict()
+        self.stats = {'probes': 0, 'probe_hits': 0, 'ffmpeg_runs': 0}
+
+    def probe(self, video_path: str) -> Optional[Dict[str, Any]]:
+        """
+        ffprobe format/stream JSON for a file, memoized by (path, size, mtime).
+
+        Returns:
+            Parsed ffprobe output, or None if ffprobe is unavailable or fails
+        """
+        try:
+            stat = os.stat(video_path)
+        except OSError:
+            return None
+        stamp = (os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            if stamp in self._probes:
+                self._probes.move_to_end(stamp)
+                self.stats['probe_hits'] += 1
+                return self._probes[stamp]
+
+        data = self._run_probe(video_path)
+
+        with self._lock:
+            self.stats['probes'] += 1
+            # Failures aren't memoized; the next call tries again
+            if data is not None:
+                self._probes[stamp] = data
+                while len(self._probes) > PROBE_CACHE_SIZE:
+                    self._probes.popitem(last=False)
+        return data
+
+    def probe_many(self, video_paths: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Probe several files concurrently; returns {path: probe}."""
+        paths = list(dict.fromkeys(video_paths))
+        if len(paths) <= 1:
+            return {path: self.probe(path) for path in paths}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(paths))) as executor:
+            return dict(zip(paths, executor.map(self.probe, paths)))
+
+    def video_info(self, video_path: str) -> Dict[str, Any]:
+        """
+        Duration, resolution and fps of a video.
+
+        Returns:
+            {'duration': float or None, 'resolution': 'WxH' or None, 'fps': float or None}
+        """
+        info = {
+            'duration': None,
+            'resolution': None,
+            'fps': None
+        }
+
+        data = self.probe(video_path)
+        if not data:
+            return info
+
+        # Get duration from format
+        if 'format' in data and 'duration' in data['format']:
+            info['duration'] = float(data['format']['duration'])
+
+        # Get resolution from video stream
+        stream = self._video_stream(data)
+        if stream:
+            width = stream.get('width')
+            height = stream.get('height')
+            if width and height:
+                info['resolution'] = f"{width}x{height}"
+
+            fps_str = stream.get('r_frame_rate', '0/1')
+            if '/' in fps_str:
+                num, den = fps_str.split('/')
+                if int(den) > 0:
+                    info['fps'] = int(num) / int(den)
+
+        return info
+
+    def has_video_stream(self, video_path: str) -> Optional[bool]:
+        """True/False if the file has a video stream; None if it can't be probed."""
+        data = self.probe(video_path)
+        if data is None:
+            return None
+        return self._video_stream(data) is not None
+
+    def extract_frames(self, video_path: str, timestamps: Sequence[float],
+                       output_paths: Optional[Sequence[str]] = None,
+                       quality: int = 2) -> List[Optional[str]]:
+        """
+        Extract one frame per timestamp in a single ffmpeg run.
+
+        Each timestamp is its own input-seeked input, so ffmpeg jumps straight
+        to it instead of decoding from the start.
+
+        Args:
+            video_path: Source video
+            timestamps: Seconds into the video
+            output_paths: Image paths (default: <video>_<index>.jpg)
+            quality: JPEG quality scale (2 = best)
+
+        Returns:
+            Output path per timestamp, or None where no frame was written
+        """
+        if not timestamps:
+            return []
+        if output_paths is None:
+            stem = Path(video_path).with_suffix('')
+            output_paths = [f"{stem}_{index}.jpg" for index in range(len(timestamps))]
+        if len(output_paths) != len(timestamps):
+            raise ValueError("output_paths must have one entry per timestamp")
+        if not self.ffmpeg_path or not os.path.exists(video_path):
+            return [None] * len(timestamps)
+
+        # Stale images from an earlier run must not look like fresh frames
+        for output_path in output_paths:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+
+        cmd = [self.ffmpeg_path, '-v', 'error', '-y']
+        for timestamp in timestamps:
+            cmd.extend(['-ss', str(timestamp), '-i', video_path])
+        for index, output_path in enumerate(output_paths):
+            cmd.extend(['-map', f'{index}:v:0', '-frames:v', '1', '-q:v', str(quality), str(output_path)])
+
+        if not self._run_ffmpeg(cmd):
+            return [None] * len(timestamps)
+        return [str(path) if os.path.exists(path) else None for path in output_paths]
+
+    def contact_sheet(self, video_path: str, output_path: str, count: int = 9,
+                      columns: int = 3, width: int = 320) -> Optional[str]:
+        """
+        Grid of count evenly spaced frames, rendered in a single ffmpeg run.
+
+        Returns:
+            output_path, or None if it could not be made
+        """
+        duration = self.video_info(video_path)['duration']
+        if not self.ffmpeg_path or not duration or count < 1:
+            return None
+
+        rows = (count + columns - 1) // columns
+        video_filter = f"fps={count}/{duration},scale={width}:-2,tile={columns}x{rows}"
+        cmd = [
+            self.ffmpeg_path, '-v', 'error', '-y',
+            '-i', video_path,
+            '-vf', video_filter,
+            '-frames:v', '1',
+            '-q:v', '2',
+            str(output_path)
+        ]
+        if self._run_ffmpeg(cmd) and os.path.exists(output_path):
+            return str(output_path)
+        return None
+
+    def clear(self) -> None:
+        """Forget memoized probes."""
+        with self._lock:
+            self._probes.clear()
+
+    def _run_probe(self, video_path: str) -> Optional[Dict[str, Any]]:
+        if not self.ffprobe_path:
+            return None
+
+        cmd = [
+            self.ffprobe_path,
+            '-v', 'quiet',
+            '-print_format', 'json',
+            '-show_format',
+            '-show_streams',
+            video_path
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
+            if result.returncode != 0:
+                return None
+            return json.loads(result.stdout)
+        except (OSError, subprocess.TimeoutExpired, ValueError):
+            return None
+
+    def _run_ffmpeg(self, cmd: List[str]) -> bool:
+        with self._lock:
+            self.stats['ffmpeg_runs'] += 1
+        try:
+            result = subprocess.run(cmd, capture_output=True, timeout=self.timeout)
+            return result.returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+
+    @staticmethod
+    def _video_stream(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        for stream in data.get('streams', []):
+            if stream.get('codec_type') == 'video':
+                return stream
+        return None
+
+
+_shared_toolkit: Optional[MediaToolkit] = None
+_shared_toolkit_lock = threading.Lock()
+
+
+def get_media_toolkit() -> MediaToolkit:
+    """
+    Process-wide media toolkit.
+
+    Configured from the environment:
+        FFMPEG_PATH / FFPROBE_PATH: executables (default: looked up on PATH once)
+        MEDIA_PROBE_WORKERS: concurrent probes in probe_many (default: 4)
+    """
+    global _shared_toolkit
+    with _shared_toolkit_lock:
+        if _shared_toolkit is None:
+            _shared_toolkit = MediaToolkit()
+        return _shared_toolkit
@@ -12,11 +12,18 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
 
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
+from modules.phase2.footage_index import get_footage_index
+from modules.phase2.path_rewriter import rewrite_paths
+from modules.phase5.media_toolkit import get_media_toolkit
+from modules.phase5.project_staging import get_png_cache, stage_file
+from modules.phase2.aepx_path_fixer import find_footage_references
+from services.render_scheduler import get_render_scheduler
+from core.lazy_imports import is_available, lazy_import
+
+# Pillow is loaded on first use, not when the web app imports this module
+PIL_AVAILABLE = is_available('PIL.Image')
+if PIL_AVAILABLE:
+    Image = lazy_import('PIL.Image')
 
 # Default aerender paths for different platforms
 AERENDER_PATHS = {
@@ -34,12 +41,26 @@ DEFAULT_OPTIONS = {
 }
 
 
+def _write_ae_png(png_path: str, output_path: str) -> None:
+    """Re-save a PNG as RGBA with basic settings AE's PNGIO can import."""
+    with Image.open(png_path) as img:
+        # Convert to RGBA if not already (ensures consistent format)
+        if img.mode != 'RGBA':
+            img = img.convert('RGBA')
+
+        # Save with basic PNG settings (no optimization, no interlacing)
+        # compress_level=6 is a good balance (default is 9)
+        # optimize=False avoids extra processing that can cause issues
+        img.save(output_path, 'PNG', compress_level=6, optimize=False)
+
+
 def make_ae_compatible_png(png_path: str, temp_dir: str) -> str:
     """
     Convert PNG to After Effects compatible format.
 
     After Effects PNGIO plugin can be picky about PNG formats.
     This re-saves PNGs with basic settings that AE can reliably import.
+    Conversions are cached by content hash and staged into temp_dir.
 
     Args:
         png_path: Path to PNG file
@@ -53,22 +74,17 @@ def make_ae_compatible_png(png_path: str, temp_dir: str) -> str:
         return png_path
 
     try:
-        # Open the PNG
-        img = Image.open(png_path)
-
-        # Convert to RGBA if not already (ensures consistent format)
-        if img.mode != 'RGBA':
-            img = img.convert('RGBA')
-
         # Create output path in temp directory
         png_filename = Path(png_path).name
         output_filename = png_filename.replace('.png', '_ae.png')
         output_path = Path(temp_dir) / output_filename
 
-        # Save with basic PNG settings (no optimization, no interlacing)
-        # compress_level=6 is a good balance (default is 9)
-        # optimize=False avoids extra processing that can cause issues
-        img.save(output_path, 'PNG', compress_level=6, optimize=False)
+        # Reuse an earlier conversion of identical content when cached
+        cached_path = get_png_cache().get_or_convert(png_path, _write_ae_png, '.png')
+        if cached_path:
+            stage_file(cached_path, str(output_path))
+        else:
+            _write_ae_png(png_path, str(output_path))
 
         return str(output_path)
 
@@ -226,33 +242,59 @@ def generate_preview(aepx_path: str, mappings: Dict[str, Any],
         print(f"✅ Composition verification complete: '{comp_name}'")
         print(f"{'='*70}\n")
 
-        # Render preview
-        print("Step 5: Rendering with aerender...")
-        success = render_with_aerender(
+        # Reuse an earlier render of an identical populated project (same
+        # contents, footage, composition and render options)
+        from services.render_cache import get_render_cache
+
+        render_cache = get_render_cache()
+        project_dir = os.path.dirname(os.path.abspath(temp_project))
+        render_key = render_cache.fingerprint(
             temp_project,
             comp_name,
-            output_path,
             opts,
-            aerender_path
+            footage_paths=[
+                os.path.join(project_dir, ref['path']) for ref in find_footage_references(temp_project)
+            ],
+            relative_to=temp_dir
         )
+        cached = render_cache.restore(render_key, output_path, str(Path(output_path).with_suffix('.jpg')))
 
-        if not success:
-            print("❌ Rendering failed - see aerender output above\n")
-            return {
-                'success': False,
-                'error': 'Rendering failed - check aerender output above for details',
-                'video_path': None,
-                'thumbnail_path': None
-            }
+        if cached:
+            print("Step 5: Inputs unchanged - reusing cached render\n")
+        else:
+            # Render preview
+            print("Step 5: Rendering with aerender...")
+            success = render_with_aerender(
+                temp_project,
+                comp_name,
+                output_path,
+                opts,
+                aerender_path
+            )
+
+            if not success:
+                print("❌ Rendering failed - see aerender output above\n")
+                return {
+                    'success': False,
+                    'error': 'Rendering failed - check aerender output above for details',
+                    'video_path': None,
+                    'thumbnail_path': None
+                }
 
         # Generate thumbnail
         print("Step 6: Generating thumbnail...")
-        thumbnail_path = generate_thumbnail(output_path, timestamp=0.5)
+        if cached and cached['thumbnail_path']:
+            thumbnail_path = cached['thumbnail_path']
+        else:
+            thumbnail_path = generate_thumbnail(output_path, timestamp=0.5)
         if thumbnail_path:
             print(f"✅ Thumbnail generated: {thumbnail_path}\n")
         else:
             print("⚠️  Thumbnail generation skipped (ffmpeg not available)\n")
 
+        if not cached:
+            render_cache.put(render_key, output_path, thumbnail_path)
+
         # Get video info
         print("Step 7: Extracting video metadata...")
         video_info = get_video_info(output_path)
@@ -388,34 +430,17 @@ def search_for_footage_by_filename(filename: str) -> str | None:
     """
     Search for footage file by filename across multiple directories.
 
+    Looks the name up in the shared footage index (uploads, footage,
+    sample_files, assets, media, static/uploads) rather than walking
+    every directory per call.
+
     Args:
         filename: Name of the file to find (e.g., "green_yellow_bg.png")
 
     Returns:
         Absolute path to found file, or None if not found
     """
-    # Search locations
-    search_dirs = [
-        'uploads',
-        'footage',
-        'sample_files',
-        'sample_files/footage',
-        'assets',
-        'media',
-        'static/uploads',
-    ]
-
-    for search_dir in search_dirs:
-        if not os.path.exists(search_dir):
-            continue
-
-        # Search in directory and all subdirectories
-        for root, dirs, files in os.walk(search_dir):
-            if filename in files:
-                found_path = os.path.join(root, filename)
-                return os.path.abspath(found_path)
-
-    return None
+    return get_footage_index().resolve(filename)
 
 
 def create_placeholder_image(output_path: str, width: int = 1920, height: int = 1080) -> bool:
@@ -470,13 +495,13 @@ def prepare_temp_project(aepx_path: str, mappings: Dict[str, Any], temp_dir: str
     Returns:
         Path to prepared project file
     """
-    # Copy AEPX to temp location
+    # Stage AEPX in temp location (AE saves it in place, so never hardlinked)
     project_name = Path(aepx_path).name
     temp_project = os.path.join(temp_dir, project_name)
-    shutil.copy2(aepx_path, temp_project)
+    stage_file(aepx_path, temp_project, writable=True)
 
     # Copy footage files to temp directory
-    print("Step 3.5: Copying footage files to temp directory...")
+    print("Step 3.5: Staging footage files in temp directory...")
     try:
         from modules.phase2.aepx_path_fixer import find_footage_references
 
@@ -562,9 +587,9 @@ def prepare_temp_project(aepx_path: str, mappings: Dict[str, Any], temp_dir: str
                 # Create destination directory if needed
                 dest_file.parent.mkdir(parents=True, exist_ok=True)
 
-                # Copy file
-                shutil.copy2(str(source_file), str(dest_file))
-                print(f"    ✅ Copied to temp directory ({search_method})")
+                # Link (or clone/copy) file into temp directory
+                method = stage_file(str(source_file), str(dest_file))
+                print(f"    ✅ Staged in temp directory via {method} ({search_method})")
 
                 # Track mapping for AEPX update
                 path_mapping[ref_path] = str(dest_file)
@@ -586,7 +611,7 @@ def prepare_temp_project(aepx_path: str, mappings: Dict[str, Any], temp_dir: str
 
         # Summary
         if copied_count > 0:
-            print(f"✅ Copied {copied_count} footage file(s)")
+            print(f"✅ Staged {copied_count} footage file(s)")
         if not_found:
             print(f"⚠️  Could not find {len(not_found)} file(s)")
         if copied_count == 0 and not not_found:
@@ -599,29 +624,12 @@ def prepare_temp_project(aepx_path: str, mappings: Dict[str, Any], temp_dir: str
     # Update AEPX to use new footage paths
     print("\nStep 3.6: Updating AEPX footage paths...")
     try:
-        # Read AEPX as text for path replacement
-        with open(temp_project, 'r', encoding='utf-8') as f:
-            aepx_content = f.read()
-
-        updated_count = 0
-
-        # Replace all mapped paths (both absolute and relative)
-        for old_path, new_path in path_mapping.items():
-            # Replace in AEPX content (escape special regex chars)
-            import re
-            old_path_escaped = re.escape(old_path)
-
-            # Count matches before replacing
-            matches = len(re.findall(old_path_escaped, aepx_content))
+        # Rewrite all mapped paths (both absolute and relative) in one pass
+        replaced = rewrite_paths(temp_project, path_mapping)
 
-            if matches > 0:
-                aepx_content = re.sub(old_path_escaped, new_path, aepx_content)
-                print(f"  ✓ Updated: {os.path.basename(old_path)} ({matches} reference(s))")
-                updated_count += matches
-
-        # Write updated AEPX back
-        with open(temp_project, 'w', encoding='utf-8') as f:
-            f.write(aepx_content)
+        for old_path, matches in replaced.items():
+            print(f"  ✓ Updated: {os.path.basename(old_path)} ({matches} reference(s))")
+        updated_count = sum(replaced.values())
 
         if updated_count > 0:
             print(f"\n✅ Updated {updated_count} footage path(s) in AEPX")
@@ -933,7 +941,7 @@ def render_with_aerender(project_path: str, comp_name: str, output_path: str,
             'quarter': 4
         }
         res_value = resolution_map.get(options.get('resolution', 'half'), 2)
-        cmd.extend(['-RStemplate', 'Best Settings'])
+        render_args = ['-RStemplate', 'Best Settings']
 
         # Note: Removed -OMtemplate parameter
         # After Effects 2025 doesn't have "H.264" template by that name
@@ -946,13 +954,13 @@ def render_with_aerender(project_path: str, comp_name: str, output_path: str,
             # Calculate end frame
             fps = options.get('fps', 15)
             end_frame = int(duration * fps)
-            cmd.extend(['-s', '0', '-e', str(end_frame)])
+            render_args.extend(['-s', '0', '-e', str(end_frame)])
             print(f"  Duration: {duration}s ({end_frame} frames at {fps} fps)")
         else:
             print(f"  Duration: Full composition")
 
         # Print the full command for debugging
-        cmd_str = ' '.join([f'"{arg}"' if ' ' in str(arg) else str(arg) for arg in cmd])
+        cmd_str = ' '.join([f'"{arg}"' if ' ' in str(arg) else str(arg) for arg in cmd + render_args])
         print(f"\n{'='*70}")
         print(f"AERENDER COMMAND:")
         print(f"{'='*70}")
@@ -961,32 +969,38 @@ def render_with_aerender(project_path: str, comp_name: str, output_path: str,
 
         print("Starting aerender... (this may take 30-60 seconds)\n")
 
-        # Run aerender
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
+        # Run aerender on a render slot (queued behind other previews)
+        scheduler = get_render_scheduler()
+        task = scheduler.submit(
+            abs_project_path,
+            comp_name,
+            abs_output_path,
+            args=render_args,
+            priority=options.get('priority', 'medium'),
+            timeout=options.get('timeout', 300),  # 5 minute timeout
+            aerender_path=aerender_path
         )
+        scheduler.wait(task)
 
-        # Print stdout and stderr for debugging
+        # Print aerender output for debugging
         print(f"\n{'='*70}")
-        print(f"aerender stdout:")
+        print(f"aerender output:")
         print(f"{'='*70}")
-        if result.stdout:
-            print(result.stdout)
+        if task.output:
+            print(task.output)
         else:
-            print("(no stdout)")
+            print("(no output)")
         print()
 
-        print(f"{'='*70}")
-        print(f"aerender stderr:")
-        print(f"{'='*70}")
-        if result.stderr:
-            print(result.stderr)
-        else:
-            print("(no stderr)")
-        print()
+        if task.status == 'timed_out' and task.started_at is None:
+            print(f"\n❌ aerender never started: {task.error}\n")
+            return False
+
+        if task.status == 'timed_out':
+            print(f"\n{'='*70}")
+            print(f"❌ aerender timeout: Rendering took too long (>{task.timeout:g} seconds)")
+            print(f"{'='*70}\n")
+            return False
 
         # Check if output file was created
         output_exists = os.path.exists(abs_output_path)
@@ -999,7 +1013,7 @@ def render_with_aerender(project_path: str, comp_name: str, output_path: str,
         print(f"{'='*70}\n")
 
         # Determine success based on return code AND file existence
-        if result.returncode == 0 and output_exists:
+        if task.succeeded and output_exists:
             print("✅ aerender completed successfully\n")
             return True
         else:
@@ -1007,14 +1021,16 @@ def render_with_aerender(project_path: str, comp_name: str, output_path: str,
             print(f"❌ AERENDER FAILED")
             print(f"{'='*70}")
 
-            if result.returncode != 0:
-                print(f"Return code: {result.returncode}")
+            if task.returncode != 0:
+                print(f"Return code: {task.returncode}")
+            if task.error:
+                print(f"Error: {task.error}")
 
             if not output_exists:
                 print(f"Output file was not created: {abs_output_path}")
 
             # Parse common error messages
-            error_text = (result.stdout + result.stderr).lower()
+            error_text = task.output.lower()
 
             if 'composition' in error_text and ('not found' in error_text or 'does not exist' in error_text):
                 print(f"\n💡 LIKELY CAUSE: Composition '{comp_name}' not found in project")
@@ -1045,11 +1061,6 @@ def render_with_aerender(project_path: str, comp_name: str, output_path: str,
 
             return False
 
-    except subprocess.TimeoutExpired as e:
-        print(f"\n{'='*70}")
-        print(f"❌ aerender timeout: Rendering took too long (>5 minutes)")
-        print(f"{'='*70}\n")
-        return False
     except Exception as e:
         print(f"\n{'='*70}")
         print(f"❌ aerender exception: {str(e)}")
@@ -1068,36 +1079,12 @@ def generate_thumbnail(video_path: str, timestamp: float = 0.5) -> Optional[str]
         timestamp: Time in seconds to extract frame
 
     Returns:
-        Path to thumbnail JPEG, or None if failed
+        Path to thumbnail JPEG, or None if failed (or ffmpeg not available)
     """
     try:
-        # Check if ffmpeg is available
-        result = subprocess.run(['which', 'ffmpeg'], capture_output=True)
-        if result.returncode != 0:
-            # ffmpeg not available, skip thumbnail
-            return None
-
         # Generate thumbnail path
-        video_path_obj = Path(video_path)
-        thumbnail_path = str(video_path_obj.with_suffix('.jpg'))
-
-        # Use ffmpeg to extract frame
-        cmd = [
-            'ffmpeg',
-            '-i', video_path,
-            '-ss', str(timestamp),
-            '-vframes', '1',
-            '-q:v', '2',
-            '-y',  # Overwrite
-            thumbnail_path
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, timeout=30)
-
-        if result.returncode == 0 and os.path.exists(thumbnail_path):
-            return thumbnail_path
-        else:
-            return None
+        thumbnail_path = str(Path(video_path).with_suffix('.jpg'))
+        return get_media_toolkit().extract_frames(video_path, [timestamp], [thumbnail_path])[0]
 
     except Exception:
         return None
@@ -1107,56 +1094,20 @@ def get_video_info(video_path: str) -> Dict[str, Any]:
     """
     Get video metadata (duration, resolution, etc.).
 
+    Probes are memoized by path and mtime, so repeated calls for the same
+    video run ffprobe once.
+
     Args:
         video_path: Path to video file
 
     Returns:
         Dictionary with video info
     """
-    info = {
-        'duration': None,
-        'resolution': None,
-        'fps': None
-    }
-
     try:
-        # Try using ffprobe
-        cmd = [
-            'ffprobe',
-            '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_format',
-            '-show_streams',
-            video_path
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-
-        if result.returncode == 0:
-            import json
-            data = json.loads(result.stdout)
-
-            # Get duration from format
-            if 'format' in data and 'duration' in data['format']:
-                info['duration'] = float(data['format']['duration'])
-
-            # Get resolution from video stream
-            if 'streams' in data:
-                for stream in data['streams']:
-                    if stream.get('codec_type') == 'video':
-                        width = stream.get('width')
-                        height = stream.get('height')
-                        if width and height:
-                            info['resolution'] = f"{width}x{height}"
-
-                        fps_str = stream.get('r_frame_rate', '0/1')
-                        if '/' in fps_str:
-                            num, den = fps_str.split('/')
-                            if int(den) > 0:
-                                info['fps'] = int(num) / int(den)
-                        break
-
+        return get_media_toolkit().video_info(video_path)
     except Exception:
-        pass
-
-    return info
+        return {
+            'duration': None,
+            'resolution': None,
+            'fps': None
+        }
@@ -0,0 +1,246 @@
+"""
+Module 5.2: Project Staging
+
+Stage template projects and footage into a preview's temp directory without
+copying bytes where the filesystem allows it, and cache AE-compatible PNG
+conversions by content hash.
+
+Files are staged by (in order of preference):
+    hardlink  - no data written; only for files nothing writes to (footage)
+    reflink   - copy-on-write clone (APFS clonefile, Btrfs/XFS FICLONE)
+    copy      - plain shutil.copy2 fallback
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+import threading
+from typing import Callable, Dict, Optional
+
+STAGING_MODES = ('link', 'reflink', 'copy')
+
+DEFAULT_PNG_CACHE_DIR = 'data/cache/ae_png'
+DEFAULT_PNG_CACHE_MAX_MB = 512
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+# Linux FICLONE ioctl (_IOW(0x94, 9, int))
+_FICLONE = 0x40049409
+
+
+def get_staging_mode() -> str:
+    """
+    Staging mode from PREVIEW_STAGING_MODE.
+
+    link (default): hardlink, then reflink, then copy
+    reflink: reflink, then copy (never share an inode with the source)
+    copy: always copy
+    """
+    mode = os.getenv('PREVIEW_STAGING_MODE', 'link').strip().lower()
+    if mode not in STAGING_MODES:
+        raise ValueError(f"PREVIEW_STAGING_MODE must be one of {', '.join(STAGING_MODES)}, got '{mode}'")
+    return mode
+
+
+def stage_file(source: str, dest: str, writable: bool = False,
+               mode: Optional[str] = None) -> str:
+    """
+    Place source at dest as cheaply as possible.
+
+    Args:
+        source: Existing file
+        dest: Destination path (replaced if it exists)
+        writable: dest will be modified in place, so it must not share an
+                  inode with source (hardlinks are skipped)
+        mode: Staging mode (default: PREVIEW_STAGING_MODE)
+
+    Returns:
+        Method used: 'hardlink', 'reflink' or 'copy'
+    """
+    mode = mode or get_staging_mode()
+    source = os.path.abspath(source)
+    dest = os.path.abspath(dest)
+    if source == dest:
+        return 'hardlink'
+
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    if os.path.lexists(dest):
+        os.remove(dest)
+
+    if mode == 'link' and not writable:
+        try:
+            os.link(source, dest)
+            return 'hardlink'
+        except OSError:
+            pass
+
+    if mode in ('link', 'reflink') and _reflink(source, dest):
+        shutil.copystat(source, dest)
+        return 'reflink'
+
+    shutil.copy2(source, dest)
+    return 'copy'
+
+
+def _reflink(source: str, dest: str) -> bool:
+    """Copy-on-write clone of source at dest; False if unsupported."""
+    if sys.platform == 'darwin':
+        try:
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            return libc.clonefile(os.fsencode(source), os.fsencode(dest), 0) == 0
+        except (OSError, AttributeError):
+            return False
+
+    if sys.platform.startswith('linux'):
+        try:
+            import fcntl
+        except ImportError:
+            return False
+        try:
+            with open(source, 'rb') as src, open(dest, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            return True
+        except OSError:
+            if os.path.exists(dest):
+                os.remove(dest)
+            return False
+
+    return False
+
+
+class ConversionCache:
+    """
+    Converted files keyed by the content hash of their source.
+
+    Entries live at <cache_dir>/<digest><suffix>; least-recently-used entries
+    are evicted once the directory exceeds max_disk_bytes.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_PNG_CACHE_DIR,
+                 max_disk_bytes: int = DEFAULT_PNG_CACHE_MAX_MB * 1024 * 1024,
+                 enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._digests: Dict[tuple, str] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def file_digest(self, file_path: str) -> str:
+        """
+        BLAKE2b of a file's contents.
+
+        Memoized on (path, size, mtime_ns) so an unchanged file is hashed once.
+        """
+        stat = os.stat(file_path)
+        stamp = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            digest = self._digests.get(stamp)
+        if digest:
+            return digest
+
+        hasher = hashlib.blake2b(digest_size=20)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+
+        with self._lock:
+            self._digests[stamp] = digest
+        return digest
+
+    def get_or_convert(self, source: str, convert: Callable[[str, str], None],
+                       suffix: str = '') -> Optional[str]:
+        """
+        Path to the cached conversion of source, converting on a miss.
+
+        Args:
+            source: File to convert
+            convert: convert(source, output_path) writes the converted file
+            suffix: Extension of cached entries (e.g. '.png')
+
+        Returns:
+            Cached file path, or None if the cache is disabled
+        """
+        if not self.enabled:
+            return None
+
+        digest = self.file_digest(source)
+        cached = os.path.join(self.cache_dir, digest + suffix)
+        if os.path.exists(cached):
+            with self._lock:
+                self.stats['hits'] += 1
+            try:
+                os.utime(cached)
+            except OSError:
+                pass
+            return cached
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Hidden temp name keeps the suffix so converters can infer the format
+        tmp_path = os.path.join(self.cache_dir, f".{digest}.{os.getpid()}.{threading.get_ident()}{suffix}")
+        try:
+            convert(source, tmp_path)
+            os.replace(tmp_path, cached)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        with self._lock:
+            self.stats['misses'] += 1
+        self._evict(keep=cached)
+        return cached
+
+    def _evict(self, keep: str) -> None:
+        """Drop least-recently-used entries beyond the disk budget."""
+        try:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and not entry.name.startswith('.'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+                with self._lock:
+                    self.stats['evictions'] += 1
+            except OSError:
+                pass
+
+
+_png_cache: Optional[ConversionCache] = None
+_png_cache_lock = threading.Lock()
+
+
+def get_png_cache() -> ConversionCache:
+    """
+    Process-wide cache of AE-compatible PNG conversions.
+
+    Configured from the environment:
+        AE_PNG_CACHE_DIR: cache directory (default: data/cache/ae_png)
+        AE_PNG_CACHE_MAX_MB: disk budget in MB (default: 512)
+        DISABLE_AE_PNG_CACHE: set to true to convert every time
+    """
+    global _png_cache
+    with _png_cache_lock:
+        if _png_cache is None:
+            _png_cache = ConversionCache(
+                cache_dir=os.getenv('AE_PNG_CACHE_DIR', DEFAULT_PNG_CACHE_DIR),
+                max_disk_bytes=int(os.getenv('AE_PNG_CACHE_MAX_MB', DEFAULT_PNG_CACHE_MAX_MB)) * 1024 * 1024,
+                enabled=os.getenv('DISABLE_AE_PNG_CACHE', 'false').lower() != 'true'
+            )
+        return _png_cache
+
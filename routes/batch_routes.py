@@ -109,12 +109,18 @@ def start_batch_processing(batch_id: str):
     try:
         _, job_service, stage1_processor = get_services()
 
-        max_jobs = request.json.get('max_jobs', 100) if request.json else 100
+        options = request.json or {}
+        max_jobs = options.get('max_jobs', 100)
 
         container.main_logger.info(f"Starting Stage 1 processing for batch {batch_id}")
 
-        # Process batch
-        result = stage1_processor.process_batch(batch_id, max_jobs=max_jobs)
+        # Process batch (workers/job_timeout default to STAGE1_WORKERS/STAGE1_JOB_TIMEOUT)
+        result = stage1_processor.process_batch(
+            batch_id,
+            max_jobs=max_jobs,
+            workers=options.get('workers'),
+            job_timeout=options.get('job_timeout')
+        )
 
         # Update batch status
         if result['succeeded'] > 0:
@@ -22,6 +22,19 @@ def index():
                           REQUIRE_SIGNOFF_FOR_RENDER=REQUIRE_SIGNOFF_FOR_RENDER)
 
 
+@core_bp.route('/api/health')
+def health():
+    """Lightweight liveness check (does not load models or services)."""
+    from config.container import container
+    from modules.phase3.ml_content_matcher import is_model_loaded
+
+    return jsonify({
+        'status': 'ok',
+        'embedding_model_loaded': is_model_loaded(),
+        'services_loaded': container.loaded_services()
+    })
+
+
 @core_bp.route('/projects-page')
 def projects_page():
     """Serve the projects list page."""
@@ -4,7 +4,9 @@ Job Routes Blueprint
 Handles job management and dashboard statistics.
 """
 
-from flask import Blueprint, request, jsonify
+import json
+
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 
 # Import services from web_app (they're initialized there)
 from config.container import container
@@ -103,23 +105,17 @@ def get_dashboard_stats():
     try:
         job_service, _, _ = get_services()
 
-        # Get summary stats
-        summary = job_service.get_summary_stats()
-
-        # Get counts by stage
-        stage_counts = job_service.get_job_counts_by_stage()
-
-        # Get counts by status
-        status_counts = job_service.get_job_counts_by_status()
+        # Summary and counts by stage/status (materialized counters)
+        stats = job_service.get_dashboard_stats()
 
         # Get recent batches
         recent_batches = job_service.get_all_batches(limit=10)
 
         return jsonify({
             'success': True,
-            'summary': summary,
-            'stage_counts': stage_counts,
-            'status_counts': status_counts,
+            'summary': stats['summary'],
+            'stage_counts': stats['stage_counts'],
+            'status_counts': stats['status_counts'],
             'recent_batches': [{
                 'batch_id': b.batch_id,
                 'status': b.status,
@@ -138,33 +134,101 @@ def get_dashboard_stats():
         }), 500
 
 
+def _stage_job_summary(job) -> dict:
+    """Job fields listed per stage."""
+    return {
+        'job_id': job.job_id,
+        'batch_id': job.batch_id,
+        'status': job.status,
+        'priority': job.priority,
+        'client_name': job.client_name,
+        'project_name': job.project_name,
+        'output_name': job.output_name,
+        'created_at': job.created_at.isoformat() if job.created_at else None
+    }
+
+
+def _job_summary(job) -> dict:
+    """Job fields listed on the jobs page."""
+    return {
+        'job_id': job.job_id,
+        'batch_id': job.batch_id,
+        'current_stage': job.current_stage,
+        'status': job.status,
+        'priority': job.priority,
+        'client_name': job.client_name,
+        'project_name': job.project_name,
+        'output_name': job.output_name,
+        'psd_path': job.psd_path,
+        'aepx_path': job.aepx_path,
+        'final_aep_path': job.final_aep_path,
+        'notes': job.notes,
+        'archived': job.archived,
+        'archived_at': job.archived_at.isoformat() if job.archived_at else None,
+        'archived_by': job.archived_by,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'stage6_completed_at': job.stage6_completed_at.isoformat() if job.stage6_completed_at else None
+    }
+
+
+def _wants_ndjson() -> bool:
+    """True if the client asked for a newline-delimited JSON stream."""
+    return (request.args.get('format') == 'ndjson'
+            or request.accept_mimetypes.best == 'application/x-ndjson')
+
+
+def _ndjson_response(pages, serialize) -> Response:
+    """Stream every job from a page iterator, one JSON object per line."""
+    def generate():
+        for jobs in pages:
+            for job in jobs:
+                yield json.dumps(serialize(job)) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 @job_bp.route('/api/jobs/stage/<int:stage>', methods=['GET'])
 def get_jobs_by_stage(stage: int):
-    """Get all jobs in a specific stage."""
+    """
+    Get jobs in a specific stage, highest priority and oldest first.
+
+    Query params:
+        batch_id: Optional batch filter
+        limit: Page size (default 100)
+        cursor: next_cursor from the previous page
+        format=ndjson: Stream every matching job as NDJSON instead
+    """
     try:
         job_service, _, _ = get_services()
 
         batch_id = request.args.get('batch_id')
         limit = int(request.args.get('limit', 100))
+        cursor = request.args.get('cursor')
 
-        jobs = job_service.get_jobs_for_stage(stage, batch_id=batch_id, limit=limit)
+        if _wants_ndjson():
+            pages = job_service.iter_pages(
+                job_service.page_jobs_for_stage, after=cursor, stage=stage, batch_id=batch_id
+            )
+            return _ndjson_response(pages, _stage_job_summary)
+
+        jobs, next_cursor = job_service.page_jobs_for_stage(
+            stage, batch_id=batch_id, limit=limit, after=cursor
+        )
 
         return jsonify({
             'success': True,
             'stage': stage,
             'count': len(jobs),
-            'jobs': [{
-                'job_id': job.job_id,
-                'batch_id': job.batch_id,
-                'status': job.status,
-                'priority': job.priority,
-                'client_name': job.client_name,
-                'project_name': job.project_name,
-                'output_name': job.output_name,
-                'created_at': job.created_at.isoformat() if job.created_at else None
-            } for job in jobs]
+            'jobs': [_stage_job_summary(job) for job in jobs],
+            'next_cursor': next_cursor
         })
 
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
     except Exception as e:
         container.main_logger.error(f"Error getting jobs by stage: {e}", exc_info=True)
         return jsonify({
@@ -175,48 +239,41 @@ def get_jobs_by_stage(stage: int):
 
 @job_bp.route('/api/jobs', methods=['GET'])
 def get_jobs():
-    """Get jobs with optional filtering."""
+    """
+    Get jobs, newest first.
+
+    Query params:
+        archived: 'true' for archived jobs (default: active jobs)
+        limit: Page size (default 1000)
+        cursor: next_cursor from the previous page
+        format=ndjson: Stream every matching job as NDJSON instead
+    """
     try:
-        from database import db_session
-        from database.models import Job
+        job_service, _, _ = get_services()
 
         archived = request.args.get('archived', 'false').lower() == 'true'
         limit = int(request.args.get('limit', 1000))
+        cursor = request.args.get('cursor')
 
-        query = db_session.query(Job)
-
-        if archived:
-            query = query.filter(Job.archived == True)
-        else:
-            query = query.filter((Job.archived == False) | (Job.archived == None))
+        if _wants_ndjson():
+            pages = job_service.iter_pages(job_service.page_jobs, after=cursor, archived=archived)
+            return _ndjson_response(pages, _job_summary)
 
-        query = query.order_by(Job.created_at.desc()).limit(limit)
-        jobs = query.all()
+        jobs, next_cursor = job_service.page_jobs(archived=archived, limit=limit, after=cursor)
 
         return jsonify({
             'success': True,
             'count': len(jobs),
-            'jobs': [{
-                'job_id': job.job_id,
-                'batch_id': job.batch_id,
-                'current_stage': job.current_stage,
-                'status': job.status,
-                'priority': job.priority,
-                'client_name': job.client_name,
-                'project_name': job.project_name,
-                'output_name': job.output_name,
-                'psd_path': job.psd_path,
-                'aepx_path': job.aepx_path,
-                'final_aep_path': job.final_aep_path,
-                'notes': job.notes,
-                'archived': job.archived,
-                'archived_at': job.archived_at.isoformat() if job.archived_at else None,
-                'archived_by': job.archived_by,
-                'created_at': job.created_at.isoformat() if job.created_at else None,
-                'stage6_completed_at': job.stage6_completed_at.isoformat() if job.stage6_completed_at else None
-            } for job in jobs]
+            'jobs': [_job_summary(job) for job in jobs],
+            'next_cursor': next_cursor
         })
 
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
     except Exception as e:
         container.main_logger.error(f"Error getting jobs: {e}", exc_info=True)
         return jsonify({
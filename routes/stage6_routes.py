@@ -13,6 +13,7 @@ from pathlib import Path
 from config.container import container
 from database import db_session
 from database.models import Job
+from services.render_scheduler import get_render_scheduler
 from services.stage6_preview_service import Stage6PreviewService
 
 
@@ -362,6 +363,10 @@ def preview_status(job_id: str) -> Tuple[Response, int]:
             has_video_preview = bool(job.stage6_preview_video_path)
             has_both = has_psd_preview and has_video_preview
 
+            # Latest render on the shared render slots (queued, running or finished)
+            renders = get_render_scheduler().get_tasks_for_job(job_id)
+            render = max(renders, key=lambda task: task.task_id).to_dict() if renders else None
+
             return jsonify({
                 'success': True,
                 'job_id': job_id,
@@ -373,7 +378,8 @@ def preview_status(job_id: str) -> Tuple[Response, int]:
                 'psd_preview_path': job.stage6_psd_preview_path if has_psd_preview else None,
                 'video_preview_path': job.stage6_preview_video_path if has_video_preview else None,
                 'approved': job.stage6_approved or False,
-                'approval_notes': job.stage6_approval_notes
+                'approval_notes': job.stage6_approval_notes,
+                'render': render
             })
 
         finally:
@@ -387,6 +393,40 @@ def preview_status(job_id: str) -> Tuple[Response, int]:
         }), 500
 
 
+@stage6_bp.route('/api/job/<job_id>/cancel-render', methods=['POST'])
+def cancel_render(job_id: str) -> Tuple[Response, int]:
+    """
+    Cancel a job's queued or running preview render.
+
+    Args:
+        job_id: Unique identifier for the job
+
+    Returns:
+        JSON response with the number of renders cancelled, plus HTTP status code
+    """
+    try:
+        cancelled = get_render_scheduler().cancel_job(job_id)
+        if not cancelled:
+            return jsonify({
+                'success': False,
+                'error': f'No active render for job: {job_id}'
+            }), 404
+
+        container.main_logger.info(f"Job {job_id}: Cancelled {cancelled} preview render(s)")
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'cancelled': cancelled
+        })
+
+    except Exception as e:
+        container.main_logger.error(f"Error cancelling render: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @stage6_bp.route('/api/job/<job_id>/preview-file/<file_type>', methods=['GET'])
 def serve_preview_file(job_id: str, file_type: str) -> Tuple[Response, int]:
     """
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark image layer matching: greedy vs optimal assignment
+
+Generates synthetic PSD layers and AEPX image placeholders with a known
+intended pairing, then compares runtime and match quality of the greedy
+(placeholder-by-placeholder) and optimal (global assignment) strategies
+for both the rule-based and the ML matcher.
+
+Quality is reported as:
+- total: sum of scores of accepted pairs (what the optimizer maximizes)
+- matched: number of placeholders filled
+- correct: fraction of placeholders filled with their intended layer
+
+Usage:
+    python scripts/benchmark_image_matching.py
+    python scripts/benchmark_image_matching.py --sizes 50 150 300 --trials 5
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.phase3 import content_matcher, ml_content_matcher  # noqa: E402
+
+
+SUBJECTS = ['player', 'photo', 'portrait', 'logo', 'team', 'crowd', 'stadium',
+            'badge', 'product', 'cutout', 'person', 'subject', 'banner', 'icon']
+QUALIFIERS = ['main', 'left', 'right', 'top', 'bottom', 'alt', 'hero', 'small',
+              'large', 'secondary', 'featured', 'image', 'home', 'away']
+
+
+def make_case(num_layers, rng):
+    """Synthetic layers/placeholders; placeholder i is intended for layer i."""
+    layers, placeholders = [], []
+    for i in range(num_layers):
+        subject, qualifier = rng.choice(SUBJECTS), rng.choice(QUALIFIERS)
+        layers.append({
+            'name': f"{subject}_{qualifier}_{i}",
+            'type': rng.choice(['image', 'smartobject']),
+            'width': rng.randint(100, 2000),
+            'height': rng.randint(100, 2000),
+        })
+        # Placeholders share some (not all) tokens with their intended layer
+        tokens = [subject, qualifier] if rng.random() < 0.7 else [subject, rng.choice(QUALIFIERS)]
+        placeholders.append({'name': '_'.join(tokens + [f"slot{i}"]), 'type': 'image'})
+
+    rng.shuffle(placeholders)
+    return layers, placeholders
+
+
+def intended_layer(placeholder_name):
+    """Index of the layer a synthetic placeholder was generated for."""
+    return int(placeholder_name.rsplit('slot', 1)[1])
+
+
+def synthetic_embeddings(layers, placeholders, rng_seed, dim=32):
+    """Random embeddings where each placeholder is close to its intended layer."""
+    rng = np.random.default_rng(rng_seed)
+    embeddings = {}
+    for layer in layers:
+        embeddings[layer['name']] = rng.normal(size=dim).astype(np.float32)
+    for ph in placeholders:
+        base = embeddings[layers[intended_layer(ph['name'])]['name']]
+        embeddings[ph['name']] = (base + rng.normal(scale=1.2, size=dim)).astype(np.float32)
+    return embeddings
+
+
+def quality(mappings, layers):
+    """(total score, matched count, correct count) for a list of image mappings."""
+    total = sum(m['confidence'] for m in mappings)
+    correct = sum(
+        1 for m in mappings
+        if m['psd_layer'] == layers[intended_layer(m['aepx_placeholder'])]['name']
+    )
+    return total, len(mappings), correct
+
+
+def run_rule_based(layers, placeholders, strategy):
+    match = (content_matcher._match_image_layers_greedy if strategy == 'greedy'
+             else content_matcher._match_image_layers)
+    start = time.perf_counter()
+    mappings, _, _ = match(layers, placeholders)
+    return time.perf_counter() - start, mappings
+
+
+def run_ml(layers, placeholders, embeddings, strategy):
+    start = time.perf_counter()
+    mappings = ml_content_matcher._ml_match_images(
+        layers, placeholders, (1920, 1080), embeddings, image_assignment=strategy
+    )
+    return time.perf_counter() - start, mappings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark greedy vs optimal image matching')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 150, 300],
+                        help='Number of image layers (and placeholders) per case')
+    parser.add_argument('--trials', type=int, default=3, help='Cases per size')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'engine':<7} {'size':>5} {'strategy':<8} {'ms':>9} {'total':>9} {'matched':>8} {'correct':>8}")
+    print('-' * 60)
+
+    for size in args.sizes:
+        results = {}
+        for trial in range(args.trials):
+            rng = random.Random(args.seed + trial * 1000 + size)
+            layers, placeholders = make_case(size, rng)
+            embeddings = synthetic_embeddings(layers, placeholders, args.seed + trial)
+
+            for strategy in ('greedy', 'optimal'):
+                for engine in ('rule', 'ml'):
+                    if engine == 'rule':
+                        elapsed, mappings = run_rule_based(layers, placeholders, strategy)
+                    else:
+                        elapsed, mappings = run_ml(layers, placeholders, embeddings, strategy)
+                    total, matched, correct = quality(mappings, layers)
+                    acc = results.setdefault((engine, strategy), [0.0, 0.0, 0, 0])
+                    acc[0] += elapsed
+                    acc[1] += total
+                    acc[2] += matched
+                    acc[3] += correct
+
+        for engine in ('rule', 'ml'):
+            for strategy in ('greedy', 'optimal'):
+                elapsed, total, matched, correct = results[(engine, strategy)]
+                n = args.trials
+                print(
+                    f"{engine:<7} {size:>5} {strategy:<8} {elapsed / n * 1000:>9.2f} "
+                    f"{total / n:>9.2f} {matched / n:>8.1f} {correct / (n * size):>8.1%}"
+                )
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Import-time profile for application startup
+
+Imports a module (web_app by default) in a fresh interpreter with
+`python -X importtime`, then reports total import time and the slowest
+modules. Save a report as a baseline and compare later runs against it to
+catch startup regressions (e.g. a heavy library imported at module level).
+
+Usage:
+    python scripts/profile_startup.py
+    python scripts/profile_startup.py --top 30
+    python scripts/profile_startup.py --output startup_profile.json
+    python scripts/profile_startup.py --baseline startup_profile.json --max-regression-ms 200
+    python scripts/profile_startup.py --budget-ms 1500
+
+Exit code is 1 when --budget-ms or --max-regression-ms is exceeded.
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+# Heavy packages that should never load while importing the web app
+WATCHED_PACKAGES = ['torch', 'sentence_transformers', 'scipy', 'psd_tools', 'PIL', 'reportlab']
+
+
+def profile_import(target):
+    """
+    Import target in a fresh interpreter and collect per-module timings.
+
+    Returns:
+        Dict with wall time, total import time and per-module entries
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    if proc.returncode != 0:
+        tail = '\n'.join(proc.stderr.strip().splitlines()[-10:])
+        raise RuntimeError(f"Importing {target} failed:\n{tail}")
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules.append({
+            'module': name,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+            'depth': (len(indent) - 1) // 2
+        })
+
+    target_entry = next((m for m in modules if m['module'] == target), None)
+    loaded = {m['module'] for m in modules}
+
+    return {
+        'target': target,
+        'python': sys.version.split()[0],
+        'wall_ms': round(wall_ms, 1),
+        'import_ms': round(target_entry['cumulative_ms'], 1) if target_entry else None,
+        'module_count': len(modules),
+        'heavy_packages_loaded': [p for p in WATCHED_PACKAGES if p in loaded],
+        'modules': sorted(modules, key=lambda m: m['cumulative_ms'], reverse=True)
+    }
+
+
+def print_report(report, top):
+    print('=' * 70)
+    print(f"IMPORT PROFILE: {report['target']} (Python {report['python']})")
+    print('=' * 70)
+    print(f"Import time:   {report['import_ms']:.0f} ms")
+    print(f"Process wall:  {report['wall_ms']:.0f} ms (interpreter start + import)")
+    print(f"Modules:       {report['module_count']}")
+    heavy = report['heavy_packages_loaded']
+    print(f"Heavy loaded:  {', '.join(heavy) if heavy else 'none'}")
+
+    print(f"\nSlowest modules (cumulative):")
+    print(f"  {'cumulative ms':>13}  {'self ms':>8}  module")
+    for entry in report['modules'][:top]:
+        indent = '  ' * min(entry['depth'], 6)
+        print(f"  {entry['cumulative_ms']:>13.1f}  {entry['self_ms']:>8.1f}  {indent}{entry['module']}")
+
+
+def compare(report, baseline, max_regression_ms):
+    """Print the delta against a baseline report; return True if within limits."""
+    delta = report['import_ms'] - baseline['import_ms']
+    print(f"\nBaseline import time: {baseline['import_ms']:.0f} ms  (delta {delta:+.0f} ms)")
+
+    newly_heavy = sorted(set(report['heavy_packages_loaded']) - set(baseline.get('heavy_packages_loaded', [])))
+    if newly_heavy:
+        print(f"Newly loaded heavy packages: {', '.join(newly_heavy)}")
+
+    before = {m['module']: m['cumulative_ms'] for m in baseline['modules']}
+    regressions = sorted(
+        ((m['cumulative_ms'] - before.get(m['module'], 0.0), m['module']) for m in report['modules']
+         if m['depth'] == 1),
+        reverse=True
+    )[:5]
+    print("Largest top-level increases:")
+    for increase, module in regressions:
+        if increase > 0:
+            print(f"  {increase:+8.1f} ms  {module}")
+
+    return max_regression_ms is None or delta <= max_regression_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile import time of the application')
+    parser.add_argument('--target', default='web_app', help='Module to import (default: web_app)')
+    parser.add_argument('--top', type=int, default=20, help='Number of slowest modules to show')
+    parser.add_argument('--output', help='Write the full report as JSON')
+    parser.add_argument('--baseline', help='Compare against a previously saved JSON report')
+    parser.add_argument('--max-regression-ms', type=float,
+                        help='Fail if import time exceeds the baseline by more than this')
+    parser.add_argument('--budget-ms', type=float, help='Fail if import time exceeds this')
+    args = parser.parse_args()
+
+    report = profile_import(args.target)
+    print_report(report, args.top)
+
+    ok = True
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        ok = compare(report, baseline, args.max_regression_ms) and ok
+
+    if args.budget_ms is not None and report['import_ms'] > args.budget_ms:
+        print(f"\nImport time {report['import_ms']:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+        ok = False
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nReport written to {args.output}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,8 @@ from typing import Dict, List, Optional, Any
 import subprocess
 import re
 
+from services.parse_cache import ParseCache, get_parse_cache
+
 
 class AEPXProcessor:
     """
@@ -26,9 +28,13 @@ class AEPXProcessor:
     - Generate layer thumbnails (OPTIONAL - requires launching AE)
     """
 
-    def __init__(self, logger=None):
+    # Bump when _parse_aepx_structure output changes to invalidate cached results
+    STRUCTURE_VERSION = '1'
+
+    def __init__(self, logger=None, parse_cache: Optional[ParseCache] = None):
         self.logger = logger
         self.aerender_path = self._find_aerender()
+        self.parse_cache = parse_cache or get_parse_cache()
 
     def log_info(self, message: str):
         """Log info message."""
@@ -86,9 +92,17 @@ class AEPXProcessor:
                 print(f"✅ Thumbnails: Skipped (headless mode)")
             print(f"{'='*70}\n")
 
-            # Parse AEPX structure
+            # Parse AEPX structure (templates shared across jobs hit the cache)
             print("Parsing AEPX structure...")
-            structure = self._parse_aepx_structure(aepx_path)
+            structure = self.parse_cache.get_or_parse(
+                'aepx-structure', aepx_path, self.STRUCTURE_VERSION,
+                lambda: self._parse_aepx_structure(aepx_path),
+                cacheable=lambda data: bool(data.get('compositions'))
+            )
+
+            # Footage presence depends on the filesystem, not the file contents
+            for footage in structure['footage']:
+                footage['exists'] = os.path.exists(footage['path']) if footage.get('path') else False
 
             compositions = structure['compositions']
             all_layers = structure['layers']
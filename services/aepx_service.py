@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import Dict, List, Optional
 
 from services.base_service import BaseService, Result
+from services.parse_cache import ParseCache, get_parse_cache
 from core.exceptions import (
     AEPXParsingError,
     raise_file_not_found,
@@ -28,6 +29,11 @@ class AEPXService(BaseService):
     a clean API with proper error handling and logging.
     """
 
+    def __init__(self, logger=None, enhanced_logging=None,
+                 parse_cache: Optional[ParseCache] = None):
+        super().__init__(logger, enhanced_logging)
+        self.parse_cache = parse_cache or get_parse_cache()
+
     def parse_aepx(self, aepx_path: str) -> Result[Dict]:
         """
         Parse an AEPX file and extract its structure.
@@ -51,8 +57,13 @@ class AEPXService(BaseService):
             return Result.failure(f"File must have .aepx extension")
 
         try:
-            # Call existing parser module
-            aepx_data = aepx_parser.parse_aepx(aepx_path)
+            # Call existing parser module (content-addressed cache in front)
+            aepx_data = self.parse_cache.get_or_parse(
+                'aepx', aepx_path, aepx_parser.PARSER_VERSION,
+                lambda: aepx_parser.parse_aepx(aepx_path)
+            )
+            if isinstance(aepx_data, dict):
+                aepx_data['filename'] = Path(aepx_path).name
 
             # Validate parsed data has expected structure
             if not isinstance(aepx_data, dict):
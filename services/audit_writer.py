@@ -0,0 +1,305 @@
+"""
+Audit Writer
+
+Write-behind buffer for job_logs and job_warnings rows.
+
+LogService and WarningService used to commit every row on its own, which on
+SQLite means one fsync per log line. The audit writer queues the rows and
+inserts them in batches, one transaction per batch, when:
+
+- the queue reaches AUDIT_FLUSH_SIZE rows
+- AUDIT_FLUSH_INTERVAL seconds have passed (background flusher thread)
+- a job finishes a stage (callers invoke flush())
+- the process exits
+
+Readers call flush() before querying, so a service always sees its own
+writes. Set AUDIT_WRITE_BEHIND=false to commit every row immediately.
+
+A batch the database rejects is retried row by row, so a single bad row
+doesn't cost the rest of the batch; a busy database defers the batch to
+the next flush a bounded number of times.
+"""
+
+import atexit
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import OperationalError
+
+from database import SessionLocal, db_session
+
+
+DEFAULT_FLUSH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 1.0  # seconds
+DEFAULT_MAX_RETRIES = 5  # flushes a row may be deferred by a busy database
+
+# OperationalError messages worth retrying; anything else (e.g. "no such
+# table") fails the same way every time
+_TRANSIENT_ERRORS = ('database is locked', 'database table is locked', 'database is busy',
+                     'could not serialize', 'deadlock detected', 'server closed the connection',
+                     'connection refused', 'timeout')
+
+
+def _is_transient(error: OperationalError) -> bool:
+    message = str(getattr(error, 'orig', error)).lower()
+    return any(fragment in message for fragment in _TRANSIENT_ERRORS)
+
+
+class AuditWriter:
+    """
+    Batches audit rows (JobLog, JobWarning) into few transactions.
+    """
+
+    def __init__(
+        self,
+        flush_size: int = DEFAULT_FLUSH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        enabled: bool = True,
+        logger=None,
+        max_retries: int = DEFAULT_MAX_RETRIES
+    ):
+        self.flush_size = max(1, flush_size)
+        self.max_retries = max_retries
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self.logger = logger
+
+        self._pending: List[Any] = []
+        # id(record) -> transient failures so far, for rows being retried
+        self._attempts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            'queued': 0,
+            'written': 0,
+            'batches': 0,
+            'dropped': 0
+        }
+
+    def log_info(self, message: str):
+        """Log info message."""
+        if self.logger:
+            self.logger.info(message)
+
+    def log_error(self, message: str):
+        """Log error message."""
+        if self.logger:
+            self.logger.error(message)
+
+    def add(self, record):
+        """
+        Queue a row for insertion.
+
+        With write-behind disabled the row is committed immediately and its
+        primary key is set on return; otherwise the key is assigned when the
+        batch containing it is flushed.
+
+        Returns:
+            The record
+        """
+        if not self.enabled:
+            db_session.add(record)
+            db_session.commit()
+            return record
+
+        with self._lock:
+            self._pending.append(record)
+            self._stats['queued'] += 1
+            full = len(self._pending) >= self.flush_size
+
+        self._ensure_thread()
+        if full:
+            self.flush()
+        return record
+
+    def add_all(self, records: List[Any]) -> List[Any]:
+        """
+        Queue several rows at once; with write-behind disabled they are
+        committed together in one transaction.
+
+        Returns:
+            The records
+        """
+        if not records:
+            return records
+        if not self.enabled:
+            db_session.add_all(records)
+            db_session.commit()
+            return records
+
+        with self._lock:
+            self._pending.extend(records)
+            self._stats['queued'] += len(records)
+            full = len(self._pending) >= self.flush_size
+
+        self._ensure_thread()
+        if full:
+            self.flush()
+        return records
+
+    def flush(self) -> int:
+        """
+        Write every queued row in one transaction.
+
+        A batch that fails because the database is busy is put back for the
+        next flush, each row at most max_retries times. Any other failure
+        (e.g. a foreign key violation) retries the batch row by row, so only
+        the rows that fail are dropped.
+
+        Returns:
+            Number of rows written
+        """
+        # One flush at a time keeps rows in the order they were queued
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            try:
+                self._write(batch)
+                written = len(batch)
+                for record in batch:
+                    self._attempts.pop(id(record), None)
+            except OperationalError as e:
+                if not _is_transient(e):
+                    self.log_error(f"Audit flush of {len(batch)} rows failed ({e}); retrying row by row")
+                    written = self._write_each(batch)
+                else:
+                    exhausted = self._requeue(batch)
+                    self.log_error(f"Audit flush of {len(batch) - len(exhausted)} rows deferred: {e}")
+                    written = self._write_each(exhausted) if exhausted else 0
+            except Exception as e:
+                self.log_error(f"Audit flush of {len(batch)} rows failed ({e}); retrying row by row")
+                written = self._write_each(batch)
+
+            with self._lock:
+                self._stats['written'] += written
+                self._stats['batches'] += 1
+            return written
+
+    def _write(self, rows: List[Any]):
+        """Insert rows in one transaction; raises (after rollback) on failure."""
+        session = SessionLocal(expire_on_commit=False)
+        try:
+            session.add_all(rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _requeue(self, rows: List[Any]) -> List[Any]:
+        """
+        Put rows back at the head of the queue for the next flush.
+
+        Returns:
+            Rows that have already been deferred max_retries times (not requeued)
+        """
+        retry, exhausted = [], []
+        for record in rows:
+            attempts = self._attempts.get(id(record), 0) + 1
+            if attempts > self.max_retries:
+                self._attempts.pop(id(record), None)
+                exhausted.append(record)
+            else:
+                self._attempts[id(record)] = attempts
+                retry.append(record)
+        if retry:
+            with self._lock:
+                self._pending[:0] = retry
+        return exhausted
+
+    def _write_each(self, rows: List[Any]) -> int:
+        """Insert rows one transaction each, dropping the ones that fail."""
+        written = 0
+        for record in rows:
+            try:
+                self._write([record])
+                written += 1
+            except Exception as e:
+                self._drop(record, e)
+            self._attempts.pop(id(record), None)
+        return written
+
+    def _drop(self, record, error: Exception):
+        self._attempts.pop(id(record), None)
+        with self._lock:
+            self._stats['dropped'] += 1
+        self.log_error(f"Audit row dropped ({type(record).__name__}): {error}")
+
+    def pending_count(self) -> int:
+        """Rows queued but not yet written."""
+        with self._lock:
+            return len(self._pending)
+
+    def get_stats(self) -> dict:
+        """Queue and batch counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+        return stats
+
+    def close(self):
+        """Stop the flusher thread and write anything still queued."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _ensure_thread(self):
+        if self._thread is not None or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='audit-writer',
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self.log_error(f"Audit flusher error: {e}")
+
+
+_shared_writer: Optional[AuditWriter] = None
+_shared_writer_lock = threading.Lock()
+
+
+def get_audit_writer(logger=None) -> AuditWriter:
+    """
+    Process-wide audit writer, flushed on interpreter exit.
+
+    Configured from the environment:
+        AUDIT_WRITE_BEHIND: set to 'false' to commit every row immediately
+        AUDIT_FLUSH_SIZE: rows per batch (default: 100)
+        AUDIT_FLUSH_INTERVAL: seconds between background flushes (default: 1.0)
+        AUDIT_MAX_RETRIES: flushes a busy-database batch is deferred (default: 5)
+    """
+    global _shared_writer
+    with _shared_writer_lock:
+        if _shared_writer is None:
+            _shared_writer = AuditWriter(
+                flush_size=int(os.getenv('AUDIT_FLUSH_SIZE', DEFAULT_FLUSH_SIZE)),
+                flush_interval=float(os.getenv('AUDIT_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)),
+                enabled=os.getenv('AUDIT_WRITE_BEHIND', 'true').lower() != 'false',
+                max_retries=int(os.getenv('AUDIT_MAX_RETRIES', DEFAULT_MAX_RETRIES)),
+                logger=logger
+            )
+            atexit.register(_shared_writer.close)
+        elif logger is not None and _shared_writer.logger is None:
+            _shared_writer.logger = logger
+        return _shared_writer
@@ -11,10 +11,10 @@ from typing import Dict, Any, List, Tuple
 from datetime import datetime
 import re
 
-try:
-    from psd_tools import PSDImage
-except ImportError:
-    PSDImage = None
+from core.lazy_imports import is_available, lazy_import
+
+# Optional; loaded on first PSD check
+psd_tools = lazy_import('psd_tools') if is_available('psd_tools') else None
 
 import xml.etree.ElementTree as ET
 
@@ -267,9 +267,9 @@ class BatchValidator:
         # Try to open PSD (if psd-tools is available)
         # Note: We're lenient about version errors because newer PSDs may not be supported
         # by psd-tools but can still be processed by our PSD Layer Exporter
-        if PSDImage:
+        if psd_tools:
             try:
-                psd = PSDImage.open(psd_path)
+                psd = psd_tools.PSDImage.open(psd_path)
                 psd.close()
             except Exception as e:
                 error_msg = str(e).lower()
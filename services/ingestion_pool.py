@@ -0,0 +1,244 @@
+"""
+Ingestion Pool
+
+Bounded process pool for CPU-bound ingestion work (psd-tools decoding,
+PNG encoding, AEPX parsing).
+
+At most max_workers worker processes are started, and each one runs task
+after task, so per-process setup (imports, service construction) is paid
+once per worker rather than once per task. Results are streamed back as
+each task finishes. A task that overruns its timeout has its worker
+terminated (a fresh worker takes its place) without affecting the others.
+Workers never touch the database: callers apply all writes from the parent
+process.
+"""
+
+import multiprocessing
+import os
+import time
+import traceback
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+DEFAULT_TASK_TIMEOUT = 600  # seconds
+DEFAULT_MAX_WORKERS = 4
+
+
+def default_worker_count() -> int:
+    """
+    Number of ingestion workers to use when none is configured.
+
+    Reads STAGE1_WORKERS from the environment, falling back to half the CPU
+    count (at most 4) so a batch started from a web request leaves the
+    machine responsive.
+    """
+    configured = os.getenv('STAGE1_WORKERS')
+    if configured:
+        return max(1, int(configured))
+    return max(1, min(DEFAULT_MAX_WORKERS, (os.cpu_count() or 1) // 2))
+
+
+def max_worker_count() -> int:
+    """Upper bound for a requested worker count: STAGE1_WORKERS or the CPU count."""
+    return max(default_worker_count(), os.cpu_count() or 1)
+
+
+def default_task_timeout() -> float:
+    """Per-task timeout in seconds (STAGE1_JOB_TIMEOUT, default 600)."""
+    return float(os.getenv('STAGE1_JOB_TIMEOUT', DEFAULT_TASK_TIMEOUT))
+
+
+def _worker_loop(conn):
+    """Child process entry point: run (func, args) tasks until sent None."""
+    try:
+        while True:
+            try:
+                task = conn.recv()
+            except EOFError:
+                break
+            if task is None:
+                break
+
+            func, args = task
+            try:
+                conn.send(('ok', func(*args)))
+            except Exception as e:
+                conn.send(('error', f"{type(e).__name__}: {e}", traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+class _Worker:
+    """A worker process and the parent's end of its pipe."""
+
+    def __init__(self, mp_context):
+        self.conn, child_conn = mp_context.Pipe()
+        self.process = mp_context.Process(target=_worker_loop, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self):
+        """Ask an idle worker to exit, terminating it if it doesn't."""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+
+class IngestionPool:
+    """
+    Run picklable module-level functions across a bounded set of reused processes.
+
+    Workers live for one imap_unordered() call; module-level state a task
+    sets up (e.g. a cached service object) is reused by later tasks that
+    land on the same worker.
+
+    Usage:
+        pool = IngestionPool(max_workers=4, task_timeout=300)
+        for task_id, outcome in pool.imap_unordered(func, [('job1', (a, b))]):
+            if outcome['success']:
+                use(outcome['result'])
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        task_timeout: Optional[float] = None,
+        logger=None,
+        mp_context=None
+    ):
+        self.max_workers = max_workers or default_worker_count()
+        self.task_timeout = task_timeout if task_timeout is not None else default_task_timeout()
+        self.logger = logger
+        self.mp_context = mp_context or multiprocessing.get_context()
+
+    def log_info(self, message: str):
+        """Log info message."""
+        if self.logger:
+            self.logger.info(message)
+
+    def log_error(self, message: str):
+        """Log error message."""
+        if self.logger:
+            self.logger.error(message)
+
+    def imap_unordered(
+        self,
+        func: Callable,
+        tasks: Iterable[Tuple[str, tuple]]
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run func(*args) for every (task_id, args) and yield results as they finish.
+
+        Yields:
+            (task_id, {
+                'success': bool,
+                'result': Any (on success),
+                'error': str (on failure),
+                'traceback': str (when the task raised),
+                'timed_out': bool,
+                'duration': seconds
+            })
+        """
+        pending = deque(tasks)
+        idle: List[_Worker] = []
+        # conn -> (task_id, worker, started_at)
+        running: Dict[Any, Tuple[str, _Worker, float]] = {}
+
+        try:
+            while pending or running:
+                while pending and (idle or len(running) < self.max_workers):
+                    worker = idle.pop() if idle else _Worker(self.mp_context)
+                    task_id, args = pending.popleft()
+                    try:
+                        worker.conn.send((func, args))
+                    except OSError:
+                        # Worker died while idle: replace it and retry the task
+                        worker.kill()
+                        pending.appendleft((task_id, args))
+                        continue
+                    running[worker.conn] = (task_id, worker, time.time())
+
+                ready = wait(list(running.keys()), timeout=self._next_wait(running))
+
+                for conn in ready:
+                    task_id, worker, started_at = running.pop(conn)
+                    outcome = self._collect(worker, started_at)
+                    if worker.process.is_alive():
+                        idle.append(worker)
+                    if not outcome['success']:
+                        self.log_error(f"Ingestion task {task_id} failed: {outcome['error']}")
+                    yield task_id, outcome
+
+                now = time.time()
+                for conn, (task_id, worker, started_at) in list(running.items()):
+                    if self.task_timeout and now - started_at > self.task_timeout:
+                        running.pop(conn)
+                        worker.kill()
+                        self.log_error(f"Ingestion task {task_id} timed out after {self.task_timeout}s")
+                        yield task_id, {
+                            'success': False,
+                            'error': f"Timed out after {self.task_timeout}s",
+                            'timed_out': True,
+                            'duration': now - started_at
+                        }
+        finally:
+            # Finished, or the consumer stopped early or raised: don't leave workers behind
+            for worker in idle:
+                worker.stop()
+            for _, worker, _ in running.values():
+                worker.kill()
+
+    def _next_wait(self, running: Dict[Any, Tuple[str, _Worker, float]]) -> Optional[float]:
+        """Seconds until the earliest running task hits its deadline."""
+        if not self.task_timeout or not running:
+            return None
+        earliest = min(started_at for _, _, started_at in running.values())
+        return max(0.0, earliest + self.task_timeout - time.time())
+
+    def _collect(self, worker: _Worker, started_at: float) -> Dict[str, Any]:
+        """Read a finished task's outcome; reap the worker if it died."""
+        try:
+            message = worker.conn.recv()
+        except (EOFError, OSError):
+            message = None
+
+        duration = time.time() - started_at
+
+        if message is None:
+            worker.process.join()
+            worker.conn.close()
+            return {
+                'success': False,
+                'error': f"Worker exited unexpectedly (exit code {worker.process.exitcode})",
+                'timed_out': False,
+                'duration': duration
+            }
+
+        if message[0] == 'ok':
+            return {
+                'success': True,
+                'result': message[1],
+                'timed_out': False,
+                'duration': duration
+            }
+
+        return {
+            'success': False,
+            'error': message[1],
+            'traceback': message[2],
+            'timed_out': False,
+            'duration': duration
+        }
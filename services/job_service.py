@@ -4,10 +4,53 @@ Job Service
 Manages job CRUD operations, status transitions, and queries.
 """
 
-from typing import List, Dict, Any, Optional
+import base64
+import copy
+import json
+import os
+import threading
+import time
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
-from database.models import Job, JobWarning, JobLog, JobAsset, Batch
+from sqlalchemy import tuple_
+from database.models import Job, JobWarning, JobLog, JobAsset, Batch, PRIORITY_RANKS, priority_rank
 from database import db_session
+from database.job_stats import read_job_stats
+from services.audit_writer import get_audit_writer
+
+
+# Dashboard stats shared by every JobService in the process (see get_dashboard_stats)
+_dashboard_cache: Dict[str, Any] = {}
+_dashboard_cache_lock = threading.Lock()
+
+
+def _encode_cursor(kind: str, *key) -> str:
+    """Opaque page cursor holding the sort key of a page's last job."""
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in key]
+    payload = json.dumps([kind] + values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor: str, kind: str) -> Tuple[Any, ...]:
+    """Sort key from a cursor made by _encode_cursor (ValueError if malformed)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if values[0] != kind:
+            raise ValueError(kind)
+        if kind == 'stage':
+            rank, created_at, job_id = values[1:]
+            return int(rank), datetime.fromisoformat(created_at), str(job_id)
+        created_at, job_id = values[1:]
+        return datetime.fromisoformat(created_at), str(job_id)
+    except (ValueError, TypeError, IndexError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def invalidate_dashboard_stats():
+    """Drop cached dashboard stats so the next read sees the latest counters."""
+    with _dashboard_cache_lock:
+        _dashboard_cache.clear()
 
 
 class JobService:
@@ -103,7 +146,8 @@ class JobService:
         self,
         stage: int,
         batch_id: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[str] = None
     ) -> List[Job]:
         """
         Get jobs currently in specified stage.
@@ -112,26 +156,120 @@ class JobService:
             stage: Stage number (0-4)
             batch_id: Optional batch filter
             limit: Max results
+            after: Cursor from a previous page (see page_jobs_for_stage)
+        """
+        return self.page_jobs_for_stage(stage, batch_id=batch_id, limit=limit, after=after)[0]
+
+    def page_jobs_for_stage(
+        self,
+        stage: int,
+        batch_id: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[str] = None
+    ) -> Tuple[List[Job], Optional[str]]:
         """
-        from sqlalchemy import case as sql_case
+        One page of a stage's jobs, ordered by priority then created time.
+
+        Uses keyset pagination on (priority rank, created_at, job_id), backed
+        by idx_job_stage_keyset, so every page costs the same however deep.
+
+        Args:
+            stage: Stage number
+            batch_id: Optional batch filter
+            limit: Page size
+            after: Cursor returned with the previous page (None = first page)
+
+        Returns:
+            (jobs, next_cursor); next_cursor is None on the last page
 
-        query = db_session.query(Job).filter_by(current_stage=stage)
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = max(1, limit)
+        rank = priority_rank(Job.priority)
+        query = db_session.query(Job).filter(Job.current_stage == stage)
 
         if batch_id:
-            query = query.filter_by(batch_id=batch_id)
+            query = query.filter(Job.batch_id == batch_id)
+
+        if after:
+            last_rank, last_created, last_id = _decode_cursor(after, 'stage')
+            query = query.filter(
+                tuple_(rank, Job.created_at, Job.job_id) > tuple_(last_rank, last_created, last_id)
+            )
 
         # Order by priority then created time
-        query = query.order_by(
-            sql_case(
-                (Job.priority == 'high', 1),
-                (Job.priority == 'medium', 2),
-                (Job.priority == 'low', 3),
-                else_=2
-            ),
-            Job.created_at
-        )
+        jobs = query.order_by(rank, Job.created_at, Job.job_id).limit(limit + 1).all()
 
-        return query.limit(limit).all()
+        next_cursor = None
+        if len(jobs) > limit:
+            jobs = jobs[:limit]
+            last = jobs[-1]
+            next_cursor = _encode_cursor('stage', PRIORITY_RANKS.get(last.priority, 2), last.created_at, last.job_id)
+        return jobs, next_cursor
+
+    def page_jobs(
+        self,
+        archived: bool = False,
+        limit: int = 100,
+        after: Optional[str] = None
+    ) -> Tuple[List[Job], Optional[str]]:
+        """
+        One page of jobs, newest first.
+
+        Keyset pagination on (created_at, job_id), backed by
+        idx_job_created_keyset.
+
+        Args:
+            archived: True for archived jobs, False for active ones
+            limit: Page size
+            after: Cursor returned with the previous page (None = first page)
+
+        Returns:
+            (jobs, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = max(1, limit)
+        query = db_session.query(Job)
+
+        if archived:
+            query = query.filter(Job.archived == True)
+        else:
+            query = query.filter((Job.archived == False) | (Job.archived == None))
+
+        if after:
+            last_created, last_id = _decode_cursor(after, 'created')
+            query = query.filter(tuple_(Job.created_at, Job.job_id) < tuple_(last_created, last_id))
+
+        jobs = query.order_by(Job.created_at.desc(), Job.job_id.desc()).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(jobs) > limit:
+            jobs = jobs[:limit]
+            last = jobs[-1]
+            next_cursor = _encode_cursor('created', last.created_at, last.job_id)
+        return jobs, next_cursor
+
+    def iter_pages(self, page, page_size: int = 500, after: Optional[str] = None, **filters) -> Iterator[List[Job]]:
+        """
+        Walk every page of page_jobs / page_jobs_for_stage.
+
+        Each page's objects are released from the session before the next
+        one is loaded, so exporting a large archive holds one page in memory.
+
+        Usage:
+            for jobs in job_service.iter_pages(job_service.page_jobs, archived=True):
+                ...
+        """
+        while True:
+            jobs, after = page(limit=page_size, after=after, **filters)
+            yield jobs
+            for job in jobs:
+                db_session.expunge(job)
+            if not after:
+                return
 
     def get_job_counts_by_stage(self) -> Dict[int, int]:
         """
@@ -140,14 +278,7 @@ class JobService:
         Returns:
             {0: 5, 1: 10, 2: 3, 3: 7, 4: 2}
         """
-        from sqlalchemy import func
-
-        counts = db_session.query(
-            Job.current_stage,
-            func.count(Job.job_id)
-        ).group_by(Job.current_stage).all()
-
-        return {stage: count for stage, count in counts}
+        return self.get_dashboard_stats()['stage_counts']
 
     def get_job_counts_by_status(self) -> Dict[str, int]:
         """
@@ -156,14 +287,58 @@ class JobService:
         Returns:
             {'pending': 5, 'processing': 10, 'completed': 20, ...}
         """
-        from sqlalchemy import func
+        return self.get_dashboard_stats()['status_counts']
+
+    def get_dashboard_stats(self) -> Dict[str, Any]:
+        """
+        Summary, per-stage and per-status counts for the dashboard.
 
-        counts = db_session.query(
-            Job.status,
-            func.count(Job.job_id)
-        ).group_by(Job.status).all()
+        Read from the job_stats counters in a single query and cached for
+        DASHBOARD_STATS_TTL seconds (default 2; 0 disables the cache).
 
-        return {status: count for status, count in counts}
+        Returns:
+            {'summary': {...}, 'stage_counts': {...}, 'status_counts': {...}}
+        """
+        ttl = float(os.getenv('DASHBOARD_STATS_TTL', 2))
+        now = time.monotonic()
+        with _dashboard_cache_lock:
+            cached = _dashboard_cache.get('stats')
+            if ttl > 0 and cached and now - _dashboard_cache['at'] < ttl:
+                return copy.deepcopy(cached)
+
+        counters = read_job_stats(db_session)
+
+        stage_counts = {}
+        status_counts = {}
+        for (metric, bucket), (count, _) in counters.items():
+            if count <= 0:
+                continue
+            if metric == 'stage':
+                stage_counts[int(bucket) if bucket.lstrip('-').isdigit() else None] = count
+            elif metric == 'status':
+                status_counts[None if bucket == 'None' else bucket] = count
+
+        total = counters.get(('total', 'all'), (0, 0.0))[0]
+        completed = status_counts.get('completed', 0)
+        failed = status_counts.get('failed', 0)
+        completion_seconds = counters.get(('completion', 'all'), (0, 0.0))[1]
+
+        stats = {
+            'summary': {
+                'total': total,
+                'completed': completed,
+                'failed': failed,
+                'in_progress': total - completed - failed,
+                'avg_completion_time': self._format_avg_completion_time(completion_seconds, completed)
+            },
+            'stage_counts': stage_counts,
+            'status_counts': status_counts
+        }
+
+        with _dashboard_cache_lock:
+            _dashboard_cache['stats'] = stats
+            _dashboard_cache['at'] = now
+        return copy.deepcopy(stats)
 
     def update_job_status(
         self,
@@ -182,6 +357,7 @@ class JobService:
         job.updated_at = datetime.utcnow()
 
         db_session.commit()
+        invalidate_dashboard_stats()
 
         self.log_info(f"Job {job_id}: Status updated to {status}, stage={current_stage}")
 
@@ -209,6 +385,33 @@ class JobService:
 
         self.log_info(f"Job {job_id}: Stage {stage} started by {user_id}")
 
+    def start_stage_for_jobs(
+        self,
+        job_ids: List[str],
+        stage: int,
+        status: str = 'processing'
+    ):
+        """
+        Mark a stage as started for many jobs in a single transaction.
+
+        Used when dispatching a batch to parallel workers so the parent
+        process issues one commit instead of two per job.
+        """
+        if not job_ids:
+            return
+
+        now = datetime.utcnow()
+        jobs = db_session.query(Job).filter(Job.job_id.in_(job_ids)).all()
+        for job in jobs:
+            setattr(job, f'stage{stage}_started_at', now)
+            job.current_stage = stage
+            job.status = status
+            job.updated_at = now
+
+        db_session.commit()
+
+        self.log_info(f"Stage {stage} started for {len(jobs)} jobs")
+
     def complete_stage(
         self,
         job_id: str,
@@ -231,6 +434,10 @@ class JobService:
         job.updated_at = datetime.utcnow()
 
         db_session.commit()
+        invalidate_dashboard_stats()
+
+        # Stage boundary: write the job's queued logs/warnings
+        get_audit_writer().flush()
 
         print(f"✅ Job {job_id}: Stage {stage} completed by {user_id}")
         self.log_info(f"Job {job_id}: Stage {stage} completed by {user_id}")
@@ -258,6 +465,41 @@ class JobService:
 
         self.log_info(f"Job {job_id}: Stage 1 results stored")
 
+    def record_stage1_success(
+        self,
+        job_id: str,
+        psd_result: Dict[str, Any],
+        aepx_result: Dict[str, Any],
+        match_result: Dict[str, Any],
+        user_id: str = 'system'
+    ):
+        """
+        Store Stage 1 results, complete stage 1 and hand the job to Stage 2.
+
+        Equivalent to store_stage1_results + complete_stage +
+        update_job_status('awaiting_review', 2), committed once.
+        """
+        job = self.get_job(job_id)
+        if not job:
+            raise ValueError(f"Job not found: {job_id}")
+
+        now = datetime.utcnow()
+        job.stage1_results = {
+            'psd': psd_result,
+            'aepx': aepx_result,
+            'matches': match_result,
+            'processed_at': now.isoformat()
+        }
+        job.stage1_completed_at = now
+        job.stage1_completed_by = user_id
+        job.status = 'awaiting_review'
+        job.current_stage = 2
+        job.updated_at = now
+
+        db_session.commit()
+
+        self.log_info(f"Job {job_id}: Stage 1 results stored, stage 1 completed by {user_id}")
+
     def get_stage1_results(self, job_id: str) -> Dict[str, Any]:
         """Get Stage 1 processing results."""
         job = self.get_job(job_id)
@@ -365,40 +607,14 @@ class JobService:
 
     def get_summary_stats(self) -> Dict[str, Any]:
         """Get overall system statistics."""
-        from sqlalchemy import func
-
-        total = db_session.query(func.count(Job.job_id)).scalar() or 0
-        completed = db_session.query(func.count(Job.job_id)).filter_by(status='completed').scalar() or 0
-        failed = db_session.query(func.count(Job.job_id)).filter_by(status='failed').scalar() or 0
-
-        # Calculate average completion time for completed jobs
-        avg_time = self._calculate_avg_completion_time()
-
-        return {
-            'total': total,
-            'completed': completed,
-            'failed': failed,
-            'in_progress': total - completed - failed,
-            'avg_completion_time': avg_time
-        }
+        return self.get_dashboard_stats()['summary']
 
-    def _calculate_avg_completion_time(self) -> str:
-        """Calculate average time from creation to completion."""
-        completed_jobs = db_session.query(Job).filter_by(status='completed').all()
-
-        if not completed_jobs:
+    def _format_avg_completion_time(self, total_seconds: float, completed: int) -> str:
+        """Average time from creation to completion, human-readable."""
+        if not completed or total_seconds == 0:
             return "N/A"
 
-        total_seconds = 0
-        for job in completed_jobs:
-            if job.stage4_completed_at and job.created_at:
-                delta = job.stage4_completed_at - job.created_at
-                total_seconds += delta.total_seconds()
-
-        if total_seconds == 0:
-            return "N/A"
-
-        avg_seconds = total_seconds / len(completed_jobs)
+        avg_seconds = total_seconds / completed
 
         # Format as human-readable
         hours = int(avg_seconds // 3600)
@@ -419,6 +635,9 @@ class JobService:
         if not job:
             raise ValueError(f"Job not found: {job_id}")
 
+        # Queued logs/warnings must land before the cascade removes them
+        get_audit_writer().flush()
+
         db_session.delete(job)
         db_session.commit()
 
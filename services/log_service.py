@@ -2,11 +2,16 @@
 Log Service
 
 Manages job activity logs.
+
+Log rows are written behind through the shared AuditWriter; the query
+methods flush it first, so they always include rows logged earlier.
 """
 
 from typing import List, Dict, Any, Optional
+from datetime import datetime
 from database.models import JobLog
 from database import db_session
+from services.audit_writer import get_audit_writer
 
 
 class LogService:
@@ -16,6 +21,7 @@ class LogService:
 
     def __init__(self, logger=None):
         self.logger = logger
+        self.audit_writer = get_audit_writer(logger)
 
     def log_action(
         self,
@@ -38,7 +44,7 @@ class LogService:
             extra_data: Optional structured data
 
         Returns:
-            log_id
+            log_id, or None while the row is queued for a batched write
         """
         log = JobLog(
             job_id=job_id,
@@ -46,14 +52,18 @@ class LogService:
             action=action,
             message=message,
             user_id=user_id,
-            extra_data=extra_data
+            extra_data=extra_data,
+            created_at=datetime.utcnow()  # Event time, not flush time
         )
 
-        db_session.add(log)
-        db_session.commit()
+        self.audit_writer.add(log)
 
         return log.log_id
 
+    def flush(self) -> int:
+        """Write queued log (and warning) rows now; returns rows written."""
+        return self.audit_writer.flush()
+
     def log_stage_started(
         self,
         job_id: str,
@@ -70,6 +80,26 @@ class LogService:
             message=message or f"Stage {stage} started"
         )
 
+    def log_stages_started(
+        self,
+        job_ids: List[str],
+        stage: int,
+        user_id: str = 'system'
+    ):
+        """Log stage start for many jobs, written in a single transaction."""
+        now = datetime.utcnow()
+        self.audit_writer.add_all([
+            JobLog(
+                job_id=job_id,
+                stage=stage,
+                action='stage_started',
+                message=f"Stage {stage} started",
+                user_id=user_id,
+                created_at=now
+            )
+            for job_id in job_ids
+        ])
+
     def log_stage_completed(
         self,
         job_id: str,
@@ -200,6 +230,7 @@ class LogService:
             action: Optional action filter
             limit: Max results
         """
+        self.audit_writer.flush()
         query = db_session.query(JobLog).filter_by(job_id=job_id)
 
         if stage is not None:
@@ -224,6 +255,7 @@ class LogService:
             stage: Optional stage filter
             action: Optional action filter
         """
+        self.audit_writer.flush()
         query = db_session.query(JobLog)
 
         if stage is not None:
@@ -238,6 +270,7 @@ class LogService:
         """Get total log count for a job."""
         from sqlalchemy import func
 
+        self.audit_writer.flush()
         return db_session.query(func.count(JobLog.log_id))\
             .filter_by(job_id=job_id)\
             .scalar() or 0
@@ -254,6 +287,7 @@ class LogService:
             user_id: User identifier
             limit: Max results
         """
+        self.audit_writer.flush()
         return db_session.query(JobLog)\
             .filter_by(user_id=user_id)\
             .order_by(JobLog.created_at.desc())\
@@ -262,5 +296,6 @@ class LogService:
 
     def delete_logs_for_job(self, job_id: str):
         """Delete all logs for a job."""
+        self.audit_writer.flush()
         db_session.query(JobLog).filter_by(job_id=job_id).delete()
         db_session.commit()
@@ -0,0 +1,327 @@
+"""
+Parse Cache
+
+Content-addressed cache for PSD and AEPX parse results.
+
+Batches reuse one AEPX template across hundreds of rows and many rows point
+at the same PSD, so parse results are cached by file content rather than path:
+- Key: SHA-256 of the file bytes + parser kind + parser version
+- Tier 1: in-memory LRU of serialized results (per process)
+- Tier 2: on-disk JSON files shared across jobs and processes,
+  evicted oldest-first once the directory exceeds its byte budget
+
+Bumping a parser's version constant invalidates its old entries.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+DEFAULT_CACHE_DIR = 'data/cache/parse'
+DEFAULT_MAX_DISK_MB = 512
+DEFAULT_MAX_MEMORY_ENTRIES = 64
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ParseCache:
+    """
+    Two-tier (memory + disk) cache for parser output keyed by file content.
+
+    Cached values must be JSON-serializable. Every lookup returns a fresh
+    copy, so callers may mutate results freely.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_MB * 1024 * 1024,
+        max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES,
+        enabled: bool = True,
+        logger=None
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_entries = max_memory_entries
+        self.enabled = enabled
+        self.logger = logger
+
+        self._lock = threading.RLock()
+        self._memory: 'OrderedDict[str, str]' = OrderedDict()
+        # (path, size, mtime_ns) -> sha256, so unchanged files are hashed once
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._disk_bytes: Optional[int] = None
+
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0
+        }
+
+    def log_info(self, message: str):
+        """Log info message."""
+        if self.logger:
+            self.logger.info(message)
+
+    def log_error(self, message: str):
+        """Log error message."""
+        if self.logger:
+            self.logger.error(message)
+
+    def file_digest(self, file_path: str) -> str:
+        """
+        SHA-256 of a file's contents.
+
+        Memoized on (path, size, mtime_ns) so repeated lookups of an unchanged
+        file cost one stat() instead of a full read.
+        """
+        stat = os.stat(file_path)
+        stamp = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            digest = self._digests.get(stamp)
+        if digest:
+            return digest
+
+        hasher = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+
+        with self._lock:
+            self._digests[stamp] = digest
+        return digest
+
+    def make_key(self, kind: str, file_path: str, version: str) -> str:
+        """Build the cache key for a file parsed by a given parser version."""
+        return f"{kind}-{version}-{self.file_digest(file_path)}"
+
+    def get(self, kind: str, file_path: str, version: str) -> Optional[Any]:
+        """
+        Look up a cached parse result.
+
+        Args:
+            kind: Parser kind ('psd', 'aepx', ...)
+            file_path: Path to the source file
+            version: Parser version string
+
+        Returns:
+            A fresh copy of the cached result, or None on miss
+        """
+        if not self.enabled:
+            return None
+
+        key = self.make_key(kind, file_path, version)
+
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return json.loads(payload)
+
+        entry_path = self._entry_path(key)
+        try:
+            payload = entry_path.read_text(encoding='utf-8')
+            # Refresh mtime so disk eviction is least-recently-used
+            os.utime(entry_path, None)
+        except OSError:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+
+        with self._lock:
+            self._stats['disk_hits'] += 1
+            self._remember(key, payload)
+        return json.loads(payload)
+
+    def put(self, kind: str, file_path: str, version: str, data: Any) -> bool:
+        """
+        Store a parse result.
+
+        Returns:
+            True if stored, False if caching is disabled or data is not
+            JSON-serializable
+        """
+        if not self.enabled:
+            return False
+
+        try:
+            payload = json.dumps(data)
+        except (TypeError, ValueError) as e:
+            self.log_error(f"Parse cache: result for {file_path} not cacheable: {e}")
+            return False
+
+        key = self.make_key(kind, file_path, version)
+        entry_path = self._entry_path(key)
+
+        with self._lock:
+            self._remember(key, payload)
+            self._stats['stores'] += 1
+
+            try:
+                entry_path.parent.mkdir(parents=True, exist_ok=True)
+                previous_size = entry_path.stat().st_size if entry_path.exists() else 0
+
+                # Write atomically so concurrent readers never see partial JSON
+                tmp_path = entry_path.with_suffix(f'.{os.getpid()}.tmp')
+                tmp_path.write_text(payload, encoding='utf-8')
+                os.replace(tmp_path, entry_path)
+
+                self._disk_bytes = (
+                    self._current_disk_bytes() - previous_size + entry_path.stat().st_size
+                )
+                self._evict_disk()
+            except OSError as e:
+                self.log_error(f"Parse cache: could not write {entry_path}: {e}")
+
+        return True
+
+    def get_or_parse(
+        self,
+        kind: str,
+        file_path: str,
+        version: str,
+        parse_func: Callable[[], Any],
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Return the cached result or run parse_func and cache its output.
+
+        Args:
+            kind: Parser kind ('psd', 'aepx', ...)
+            file_path: Path to the source file
+            version: Parser version string
+            parse_func: Zero-argument callable performing the real parse
+            cacheable: Optional predicate; results it rejects are not stored
+
+        Returns:
+            Parse result (cached copy or freshly parsed)
+        """
+        cached = self.get(kind, file_path, version)
+        if cached is not None:
+            return cached
+
+        data = parse_func()
+        if cacheable is None or cacheable(data):
+            self.put(kind, file_path, version, data)
+        return data
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current cache sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+            stats['disk_bytes'] = self._current_disk_bytes()
+
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (
+            (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        )
+        return stats
+
+    def clear(self):
+        """Drop every cached entry (memory and disk) and reset counters."""
+        with self._lock:
+            self._memory.clear()
+            self._digests.clear()
+            for entry_path in self._iter_entries():
+                try:
+                    entry_path.unlink()
+                except OSError:
+                    pass
+            self._disk_bytes = 0
+            for counter in self._stats:
+                self._stats[counter] = 0
+
+    def _entry_path(self, key: str) -> Path:
+        """Location of a cache entry on disk."""
+        return self.cache_dir / f"{key}.json"
+
+    def _iter_entries(self):
+        """All cache entry files on disk."""
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob('*.json'))
+
+    def _remember(self, key: str, payload: str):
+        """Insert into the in-memory LRU (caller holds the lock)."""
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _current_disk_bytes(self) -> int:
+        """Total size of entries on disk, scanned once then tracked."""
+        if self._disk_bytes is None:
+            total = 0
+            for entry_path in self._iter_entries():
+                try:
+                    total += entry_path.stat().st_size
+                except OSError:
+                    pass
+            self._disk_bytes = total
+        return self._disk_bytes
+
+    def _evict_disk(self):
+        """Delete least-recently-used entries until under the byte budget."""
+        if self._current_disk_bytes() <= self.max_disk_bytes:
+            return
+
+        entries = []
+        for entry_path in self._iter_entries():
+            try:
+                stat = entry_path.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry_path))
+            except OSError:
+                pass
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                entry_path.unlink()
+                total -= size
+                self._memory.pop(entry_path.stem, None)
+                self._stats['evictions'] += 1
+            except OSError:
+                pass
+
+        self._disk_bytes = total
+        self.log_info(f"Parse cache evicted entries; disk usage now {total} bytes")
+
+
+_shared_cache: Optional[ParseCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    """
+    Process-wide shared parse cache.
+
+    Configured from the environment:
+        PARSE_CACHE_DIR: cache directory (default: data/cache/parse)
+        PARSE_CACHE_MAX_MB: disk budget in MB (default: 512)
+        PARSE_CACHE_MEMORY_ENTRIES: in-memory LRU size (default: 64)
+        DISABLE_PARSE_CACHE: set to 'true' to bypass caching
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ParseCache(
+                cache_dir=os.getenv('PARSE_CACHE_DIR', DEFAULT_CACHE_DIR),
+                max_disk_bytes=int(os.getenv('PARSE_CACHE_MAX_MB', DEFAULT_MAX_DISK_MB)) * 1024 * 1024,
+                max_memory_entries=int(os.getenv('PARSE_CACHE_MEMORY_ENTRIES', DEFAULT_MAX_MEMORY_ENTRIES)),
+                enabled=os.getenv('DISABLE_PARSE_CACHE', 'false').lower() != 'true'
+            )
+        return _shared_cache
@@ -0,0 +1,391 @@
+"""
+Preview Pyramid Cache
+
+Multi-resolution cache of flattened PSD previews, shared by the layer
+exporter, the Stage 6 preview and the aspect-ratio previews so a PSD is
+composited once no matter how many previews are made from it.
+
+- Key: SHA-256 of the PSD bytes (same digest as the parse cache)
+- Levels: full, half (1/2), quarter (1/4) and thumb (fits THUMBNAIL_SIZE)
+- Each level is stored as PNG tiles of TILE_SIZE pixels under
+  <cache_dir>/<digest>/<level>/<row>_<col>.png with a meta.json describing
+  the level sizes, so readers only decode the level they ask for
+- Entries are evicted least-recently-used once the directory exceeds its
+  byte budget
+
+Entries are built in a temporary directory and renamed into place, so
+concurrent readers never see a partial pyramid.
+"""
+
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.lazy_imports import lazy_import
+from services.parse_cache import get_parse_cache
+
+# psd_tools is slow to import; load it on first composite
+psd_tools = lazy_import('psd_tools')
+Image = lazy_import('PIL.Image')
+
+
+DEFAULT_CACHE_DIR = 'data/cache/previews'
+DEFAULT_MAX_DISK_MB = 1024
+
+TILE_SIZE = 512
+THUMBNAIL_SIZE = 400
+PYRAMID_VERSION = 1
+
+# Level name -> downscale factor (thumb is sized separately)
+LEVEL_FACTORS = {'full': 1, 'half': 2, 'quarter': 4}
+LEVELS = ('full', 'half', 'quarter', 'thumb')
+
+# Modes PNG tiles can store without conversion
+_PNG_MODES = ('L', 'LA', 'RGB', 'RGBA')
+
+
+class PreviewPyramid:
+    """
+    Tiled multi-resolution preview cache keyed by PSD content.
+
+    Images returned by get_image() are fresh PIL images the caller owns.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_MB * 1024 * 1024,
+        tile_size: int = TILE_SIZE,
+        enabled: bool = True,
+        logger=None
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_disk_bytes = max_disk_bytes
+        self.tile_size = tile_size
+        self.enabled = enabled
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        # Per-digest build locks so one composite serves concurrent callers
+        self._build_locks: Dict[str, threading.Lock] = {}
+
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'builds': 0,
+            'evictions': 0
+        }
+
+    def log_info(self, message: str):
+        """Log info message."""
+        if self.logger:
+            self.logger.info(message)
+
+    def log_error(self, message: str):
+        """Log error message."""
+        if self.logger:
+            self.logger.error(message)
+
+    def get_meta(self, psd_path: str) -> Optional[Dict[str, Any]]:
+        """Level sizes for a cached PSD, or None if it is not cached."""
+        if not self.enabled:
+            return None
+        return self._read_meta(self._entry_dir(psd_path))
+
+    def get_image(self, psd_path: str, level: str = 'full'):
+        """
+        Assemble a cached level.
+
+        Returns:
+            PIL Image, or None if the PSD is not cached (nothing is built)
+        """
+        if level not in LEVELS:
+            raise ValueError(f"Unknown preview level '{level}' (expected one of {LEVELS})")
+        if not self.enabled:
+            return None
+
+        entry_dir = self._entry_dir(psd_path)
+        meta = self._read_meta(entry_dir)
+        if meta is None:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+
+        try:
+            image = self._assemble(entry_dir, meta, level)
+            # Refresh mtime so eviction is least-recently-used
+            os.utime(entry_dir / 'meta.json', None)
+        except OSError as e:
+            self.log_error(f"Preview pyramid: unreadable entry {entry_dir.name}: {e}")
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+
+        with self._lock:
+            self._stats['hits'] += 1
+        return image
+
+    def get_or_build(self, psd_path: str, level: str = 'full'):
+        """
+        Return a level, compositing the PSD and caching its pyramid on a miss.
+
+        Falls back to PIL's reader for the merged image when psd-tools
+        cannot open the file.
+        """
+        image = self.get_image(psd_path, level)
+        if image is not None:
+            return image
+
+        with self._build_lock(psd_path):
+            # Another thread may have built it while we waited
+            if self.get_meta(psd_path) is not None:
+                return self.get_image(psd_path, level)
+
+            levels = self._make_levels(self._composite(psd_path))
+            if self.enabled:
+                self._write_entry(self._entry_dir(psd_path), levels)
+            return levels[level]
+
+    def get_level_for_size(self, psd_path: str, min_width: int, min_height: int) -> str:
+        """
+        Smallest cached level at least min_width x min_height (or 'full').
+
+        Builds the pyramid if the PSD is not cached yet.
+        """
+        meta = self.get_meta(psd_path)
+        if meta is None:
+            self.get_or_build(psd_path, 'thumb')
+            meta = self.get_meta(psd_path)
+        if meta is None:
+            return 'full'
+
+        covering = [
+            (width * height, level)
+            for level, (width, height) in ((level, meta['levels'][level]['size']) for level in LEVELS)
+            if width >= min_width and height >= min_height
+        ]
+        return min(covering)[1] if covering else 'full'
+
+    def save_level(self, psd_path: str, level: str, output_path: str, format: str = 'PNG', **params) -> str:
+        """Write a level (built if needed) to output_path; returns the path."""
+        image = self.get_or_build(psd_path, level)
+        image.save(str(output_path), format, **params)
+        return str(output_path)
+
+    def store(self, psd_path: str, composite) -> bool:
+        """
+        Cache the pyramid for a PSD from an already-computed composite.
+
+        Returns:
+            True if the entry exists afterwards, False if caching is disabled
+            or the entry could not be written
+        """
+        if not self.enabled:
+            return False
+
+        entry_dir = self._entry_dir(psd_path)
+        if self._read_meta(entry_dir) is not None:
+            return True
+        return self._write_entry(entry_dir, self._make_levels(composite))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current disk usage."""
+        with self._lock:
+            stats = dict(self._stats)
+        entries = self._iter_entries()
+        stats['entries'] = len(entries)
+        stats['disk_bytes'] = sum(self._entry_bytes(entry) for entry in entries)
+        return stats
+
+    def clear(self):
+        """Delete every cached pyramid and reset counters."""
+        for entry_dir in self._iter_entries():
+            shutil.rmtree(entry_dir, ignore_errors=True)
+        with self._lock:
+            for counter in self._stats:
+                self._stats[counter] = 0
+
+    def _write_entry(self, entry_dir: Path, levels: Dict[str, Any]) -> bool:
+        """Write level tiles to a temp dir and rename it into place."""
+        tmp_dir = entry_dir.with_name(f"{entry_dir.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            tmp_dir.mkdir(parents=True)
+
+            meta = {
+                'version': PYRAMID_VERSION,
+                'mode': levels['full'].mode,
+                'tile_size': self.tile_size,
+                'levels': {
+                    level: self._write_tiles(tmp_dir / level, image)
+                    for level, image in levels.items()
+                }
+            }
+            (tmp_dir / 'meta.json').write_text(json.dumps(meta), encoding='utf-8')
+
+            try:
+                os.replace(tmp_dir, entry_dir)
+            except OSError:
+                # Another process finished the same entry first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                return self._read_meta(entry_dir) is not None
+        except OSError as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            self.log_error(f"Preview pyramid: could not write {entry_dir}: {e}")
+            return False
+
+        with self._lock:
+            self._stats['builds'] += 1
+        self._evict_disk()
+        return True
+
+    def _entry_dir(self, psd_path: str) -> Path:
+        return self.cache_dir / get_parse_cache().file_digest(psd_path)
+
+    def _build_lock(self, psd_path: str) -> threading.Lock:
+        key = self._entry_dir(psd_path).name
+        with self._lock:
+            return self._build_locks.setdefault(key, threading.Lock())
+
+    def _read_meta(self, entry_dir: Path) -> Optional[Dict[str, Any]]:
+        try:
+            meta = json.loads((entry_dir / 'meta.json').read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get('version') == PYRAMID_VERSION else None
+
+    def _composite(self, psd_path: str):
+        """Flattened image of a PSD."""
+        try:
+            return psd_tools.PSDImage.open(psd_path).composite()
+        except Exception as e:
+            self.log_info(f"Preview pyramid: psd-tools could not composite {psd_path} ({e}); "
+                          "using merged image")
+            with Image.open(psd_path) as merged:
+                merged.load()
+                return merged.copy()
+
+    def _make_levels(self, composite) -> Dict[str, Any]:
+        """Full, half, quarter and thumb images from a composite."""
+        full = composite if composite.mode in _PNG_MODES else composite.convert('RGBA')
+        levels = {'full': full}
+
+        # Each level is reduced from the previous one, not from full
+        previous = full
+        for level, factor in LEVEL_FACTORS.items():
+            if factor == 1:
+                continue
+            size = (max(1, full.width // factor), max(1, full.height // factor))
+            previous = previous.resize(size, Image.Resampling.LANCZOS)
+            levels[level] = previous
+
+        # Thumb comes from the smallest level still at least THUMBNAIL_SIZE
+        source = next(
+            (levels[level] for level in ('quarter', 'half')
+             if max(levels[level].size) >= THUMBNAIL_SIZE),
+            full
+        )
+        thumb = source.copy()
+        thumb.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.Resampling.LANCZOS)
+        levels['thumb'] = thumb
+        return levels
+
+    def _write_tiles(self, level_dir: Path, image) -> Dict[str, Any]:
+        """Split an image into PNG tiles; returns the level's metadata."""
+        level_dir.mkdir(parents=True, exist_ok=True)
+        width, height = image.size
+        cols = (width + self.tile_size - 1) // self.tile_size
+        rows = (height + self.tile_size - 1) // self.tile_size
+
+        for row in range(rows):
+            for col in range(cols):
+                box = (
+                    col * self.tile_size,
+                    row * self.tile_size,
+                    min(width, (col + 1) * self.tile_size),
+                    min(height, (row + 1) * self.tile_size)
+                )
+                image.crop(box).save(level_dir / f"{row}_{col}.png", 'PNG', compress_level=1)
+
+        return {'size': [width, height], 'rows': rows, 'cols': cols}
+
+    def _assemble(self, entry_dir: Path, meta: Dict[str, Any], level: str):
+        """Paste a level's tiles back into one image."""
+        info = meta['levels'][level]
+        tile_size = meta['tile_size']
+        image = Image.new(meta['mode'], tuple(info['size']))
+
+        for row in range(info['rows']):
+            for col in range(info['cols']):
+                with Image.open(entry_dir / level / f"{row}_{col}.png") as tile:
+                    tile.load()
+                    image.paste(tile, (col * tile_size, row * tile_size))
+        return image
+
+    def _iter_entries(self) -> List[Path]:
+        if not self.cache_dir.exists():
+            return []
+        return [p for p in self.cache_dir.iterdir() if p.is_dir() and not p.name.endswith('.tmp')]
+
+    def _entry_bytes(self, entry_dir: Path) -> int:
+        total = 0
+        for root, _, names in os.walk(entry_dir):
+            for name in names:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+
+    def _evict_disk(self):
+        """Delete least-recently-used pyramids until under the byte budget."""
+        entries = []
+        for entry_dir in self._iter_entries():
+            try:
+                mtime = (entry_dir / 'meta.json').stat().st_mtime
+            except OSError:
+                mtime = 0
+            entries.append((mtime, self._entry_bytes(entry_dir), entry_dir))
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_disk_bytes:
+            return
+
+        entries.sort()
+        # Never evict the newest entry (the one just built)
+        for _, size, entry_dir in entries[:-1]:
+            if total <= self.max_disk_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            with self._lock:
+                self._stats['evictions'] += 1
+
+        self.log_info(f"Preview pyramid evicted entries; disk usage now {total} bytes")
+
+
+_shared_pyramid: Optional[PreviewPyramid] = None
+_shared_pyramid_lock = threading.Lock()
+
+
+def get_preview_pyramid() -> PreviewPyramid:
+    """
+    Process-wide shared preview pyramid cache.
+
+    Configured from the environment:
+        PREVIEW_CACHE_DIR: cache directory (default: data/cache/previews)
+        PREVIEW_CACHE_MAX_MB: disk budget in MB (default: 1024)
+        DISABLE_PREVIEW_CACHE: set to 'true' to bypass caching
+    """
+    global _shared_pyramid
+    with _shared_pyramid_lock:
+        if _shared_pyramid is None:
+            _shared_pyramid = PreviewPyramid(
+                cache_dir=os.getenv('PREVIEW_CACHE_DIR', DEFAULT_CACHE_DIR),
+                max_disk_bytes=int(os.getenv('PREVIEW_CACHE_MAX_MB', DEFAULT_MAX_DISK_MB)) * 1024 * 1024,
+                enabled=os.getenv('DISABLE_PREVIEW_CACHE', 'false').lower() != 'true'
+            )
+        return _shared_pyramid
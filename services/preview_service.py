@@ -18,6 +18,7 @@ from core.exceptions import (
 
 # Import existing modules (these will remain unchanged)
 from modules.phase5 import preview_generator
+from modules.phase5.media_toolkit import get_media_toolkit
 
 
 class PreviewService(BaseService):
@@ -148,6 +149,10 @@ class PreviewService(BaseService):
         if file_size == 0:
             return Result.failure("Preview video is empty (0 bytes)")
 
+        # Probe results are memoized, so a following get_video_info is free
+        if get_media_toolkit().has_video_stream(video_path) is False:
+            return Result.failure("Preview file contains no video stream")
+
         size_kb = file_size / 1024
         size_mb = size_kb / 1024
 
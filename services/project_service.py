@@ -176,7 +176,7 @@ class ProjectService(BaseService):
                 )
 
             project.update_stats()
-            self.store.save()
+            self.store.save_graphic(project, graphic)
 
             self.log_info(f"Updated graphic {graphic_id} by {user}")
             return Result.success(graphic.to_dict())
@@ -225,7 +225,7 @@ class ProjectService(BaseService):
             )
 
             project.update_stats()
-            self.store.save()
+            self.store.save_graphic(project, graphic)
 
             self.log_info(f"Approved graphic {graphic_id} by {approved_by} at {approval_timestamp}")
             return Result.success(graphic.to_dict())
@@ -268,7 +268,7 @@ class ProjectService(BaseService):
             )
 
             project.update_stats()
-            self.store.save()
+            self.store.save_graphic(project, graphic)
 
             self.log_info(f"Unapproved graphic {graphic_id} by {unapproved_by}")
             return Result.success(graphic.to_dict())
@@ -303,7 +303,7 @@ class ProjectService(BaseService):
             )
 
             project.update_stats()
-            self.store.save()
+            self.store.save_graphic(project, graphic)
 
             self.log_info(f"Changed status of graphic {graphic_id} from {old_status} to {new_status} by {user}")
             return Result.success(graphic.to_dict())
@@ -446,7 +446,7 @@ class ProjectService(BaseService):
             graphic.updated_at = datetime.now().isoformat()
 
             # Save changes
-            self.store.save()
+            self.store.save_graphic(project, graphic)
 
             stats = {
                 'applied_count': applied_count,
@@ -526,7 +526,7 @@ class ProjectService(BaseService):
             }
 
             project.updated_at = datetime.now().isoformat()
-            self.store.save()
+            self.store.save_project(project)
 
             self.log_info(f"Hard Card metadata stored in project {project_id}")
 
@@ -630,7 +630,7 @@ class ProjectService(BaseService):
                 )
 
             project.update_stats()
-            self.store.save()
+            self.store.save_project(project)
 
             self.log_info(f"Batch processing complete: {batch_results}")
 
@@ -872,7 +872,7 @@ class ProjectService(BaseService):
                 )
 
                 project.update_stats()
-                self.store.save()
+                self.store.save_graphic(project, graphic)
 
                 self.log_info(f"Human approved aspect ratio transformation for {graphic_id}")
 
@@ -894,7 +894,7 @@ class ProjectService(BaseService):
                 )
 
                 project.update_stats()
-                self.store.save()
+                self.store.save_graphic(project, graphic)
 
                 self.log_info(f"Graphic {graphic_id} skipped due to aspect ratio")
 
@@ -914,7 +914,7 @@ class ProjectService(BaseService):
                 )
 
                 project.update_stats()
-                self.store.save()
+                self.store.save_graphic(project, graphic)
 
                 self.log_info(f"Graphic {graphic_id} flagged for manual fixing")
 
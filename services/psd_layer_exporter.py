@@ -3,20 +3,262 @@ PSD Layer Exporter Service
 
 Extracts all layers from a PSD file and exports them as individual PNG files.
 HEADLESS - No Photoshop required, pure Python processing using psd-tools.
+
+Layers (including those nested in groups) are walked lazily and decoded
+one at a time on the calling thread; each decoded image is released as soon
+as its PNG and thumbnail are written. For PSDs with many layers, PNG
+encoding and thumbnailing (where Pillow releases the GIL) are fanned out to
+a thread pool; the files written are byte-identical to a serial export. An
+optional process-wide memory ceiling (PSD_EXPORT_MEMORY_LIMIT_MB) bounds the
+decoded pixels held at once, throttling the pool when layers are large.
+
+Each export directory keeps a manifest of per-layer content hashes (raw
+channel data + bbox, or the decoded pixels where psd-tools does not expose
+the raw channels). Re-exporting an edited PSD into the same directory
+reuses the PNGs and thumbnails of unchanged layers and only decodes the
+layers that changed. The flattened preview comes from the shared preview
+pyramid cache when this exact PSD has been composited before, and seeds the
+cache otherwise.
 """
 
+import hashlib
+import json
 import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from psd_tools import PSDImage
-from PIL import Image
+from typing import Callable, Dict, Iterator, List, Optional, Any, Set, Tuple
+from core.lazy_imports import lazy_import
+from services.preview_pyramid import PreviewPyramid, get_preview_pyramid
+
+# psd_tools is slow to import; load it on first export
+psd_tools = lazy_import('psd_tools')
+Image = lazy_import('PIL.Image')
+
+
+# Exportable layers needed before the thread pool beats a serial export
+DEFAULT_PARALLEL_THRESHOLD = 6
+
+EXPORTABLE_KINDS = ('pixel', 'shape', 'smartobject', 'normal')
+
+
+class MemoryBudget:
+    """
+    Cap on the decoded pixel bytes held by layer exports.
+
+    Exports reserve a layer's estimated size before decoding it and release
+    it once its files are written; reservations block while the budget is
+    exhausted. A single layer larger than the whole budget is still allowed
+    through once nothing else is reserved, so exports never deadlock.
+    """
+
+    def __init__(self, limit_bytes: Optional[int] = None):
+        self.limit_bytes = limit_bytes or None
+        self.in_use = 0
+        self.peak = 0
+        self._cond = threading.Condition()
+
+    def reserve(self, nbytes: int) -> int:
+        """Block until nbytes fit in the budget; returns the bytes reserved."""
+        if not self.limit_bytes:
+            return 0
+        with self._cond:
+            while self.in_use and self.in_use + nbytes > self.limit_bytes:
+                self._cond.wait()
+            self.in_use += nbytes
+            self.peak = max(self.peak, self.in_use)
+        return nbytes
+
+    def release(self, nbytes: int) -> None:
+        """Return bytes from an earlier reserve() call."""
+        if not nbytes:
+            return
+        with self._cond:
+            self.in_use -= nbytes
+            self._cond.notify_all()
+
+
+_memory_budget: Optional[MemoryBudget] = None
+_memory_budget_lock = threading.Lock()
+
+
+def get_memory_budget() -> MemoryBudget:
+    """
+    Process-wide export memory budget, shared by all exporters.
+
+    Limit comes from PSD_EXPORT_MEMORY_LIMIT_MB (unset or 0 = unlimited).
+    """
+    global _memory_budget
+    with _memory_budget_lock:
+        if _memory_budget is None:
+            limit_mb = float(os.getenv('PSD_EXPORT_MEMORY_LIMIT_MB', '0') or 0)
+            _memory_budget = MemoryBudget(int(limit_mb * 1024 * 1024))
+        return _memory_budget
+
+
+MANIFEST_FILENAME = 'export_manifest.json'
+MANIFEST_VERSION = 1
+
+
+class ExportManifest:
+    """
+    Per-directory record of exported layers, keyed by PNG file name.
+
+    Entries from the previous export are looked up by file name and content
+    hash; entries for this export are collected and written back on save().
+    Paths are stored relative to the export directory.
+    """
+
+    def __init__(self, output_dir: str, psd_signature: str):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_FILENAME
+        self.psd_signature = psd_signature
+        self.previous: Dict[str, Dict] = {}
+        self.entries: Dict[str, Dict] = {}
+        # Every PNG this export wrote or reused, hashed or not
+        self.exported: Set[str] = set()
+        self.reused = 0
+
+    def load(self) -> 'ExportManifest':
+        """Read the previous manifest, ignoring it if unreadable or incompatible."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+
+        if data.get('version') == MANIFEST_VERSION and data.get('psd_signature') == self.psd_signature:
+            self.previous = data.get('layers', {})
+        return self
+
+    def png_path(self, file_name: str) -> Path:
+        return self.output_dir / file_name
+
+    def thumbnail_path(self, file_name: str) -> Path:
+        return self.output_dir / 'thumbnails' / f"thumb_{file_name}"
+
+    def lookup(self, file_name: str, content_hash: Optional[str],
+               need_thumbnail: bool) -> Optional[Dict]:
+        """Previous entry for file_name if its hash matches and its files still exist."""
+        entry = self.previous.get(file_name)
+        if not entry or not content_hash or entry.get('content_hash') != content_hash:
+            return None
+        if not self.png_path(file_name).exists():
+            return None
+        if need_thumbnail and not (entry.get('thumbnail') and self.thumbnail_path(file_name).exists()):
+            return None
+        return entry
+
+    def record(self, result: Dict) -> None:
+        """Add an exported pixel layer result to this export's manifest."""
+        file_name = Path(result['path']).name
+        self.exported.add(file_name)
+        if not result.get('content_hash'):
+            return
+        self.entries[file_name] = {
+            'content_hash': result['content_hash'],
+            'layer_path': result.get('layer_path'),
+            'size': list(result['size']),
+            'file_size_bytes': result['file_size_bytes'],
+            'thumbnail': bool(result.get('thumbnail_path'))
+        }
+
+    def save(self) -> None:
+        """Write the manifest atomically and delete files of layers that disappeared."""
+        for file_name in self.previous:
+            if file_name in self.exported:
+                continue
+            for stale in (self.png_path(file_name), self.thumbnail_path(file_name)):
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+
+        data = {
+            'version': MANIFEST_VERSION,
+            'psd_signature': self.psd_signature,
+            'layers': self.entries
+        }
+        temp_path = self.path.with_suffix('.json.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, self.path)
+
+
+def _estimated_bytes(width: int, height: int) -> int:
+    """Decoded RGBA size of a width x height image."""
+    return max(width, 0) * max(height, 0) * 4
+
+
+class _EncodePool:
+    """
+    Thread pool for PNG/thumbnail encoding with a bounded in-flight window,
+    so decoded images never pile up faster than they are written.
+    """
+
+    def __init__(self, max_workers: int, memory_budget: Optional[MemoryBudget] = None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='PNGEncode')
+        self.window = threading.BoundedSemaphore(max_workers * 2)
+        self.memory_budget = memory_budget
+        self.pending: List[Tuple[Dict, Future]] = []
+
+    def submit(self, result: Dict, func: Callable, *args, reserved: int = 0) -> None:
+        """
+        Queue func(*args) for result; blocks while the window is full.
+
+        reserved bytes of the memory budget are released when func finishes.
+        """
+        self.window.acquire()
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            # Caller still owns the reservation and releases it
+            self.window.release()
+            raise
+        future.add_done_callback(lambda _: self._done(reserved))
+        self.pending.append((result, future))
+
+    def _done(self, reserved: int) -> None:
+        self.window.release()
+        if self.memory_budget:
+            self.memory_budget.release(reserved)
+
+    def drain(self) -> List[Tuple[Dict, Future]]:
+        """Wait for all queued work and return (result, future) in submit order."""
+        self.executor.shutdown(wait=True)
+        pending, self.pending = self.pending, []
+        return pending
 
 
 class PSDLayerExporter:
     """Service for exporting PSD layers as individual image files."""
 
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, parallel_threshold: Optional[int] = None,
+                 max_workers: Optional[int] = None,
+                 memory_budget: Optional[MemoryBudget] = None,
+                 preview_cache: Optional[PreviewPyramid] = None):
+        """
+        Args:
+            logger: Optional logger
+            parallel_threshold: Minimum number of exportable layers for the
+                thread-pool export (PSD_EXPORT_PARALLEL_THRESHOLD, default 6)
+            max_workers: Encoding threads (PSD_EXPORT_WORKERS, default CPU
+                count capped at 8)
+            memory_budget: Budget for decoded pixels (default: the
+                process-wide budget from get_memory_budget())
+            preview_cache: Flattened preview cache (default: the shared
+                cache from get_preview_pyramid())
+        """
         self.logger = logger
+        self.memory_budget = memory_budget or get_memory_budget()
+        self.preview_cache = preview_cache or get_preview_pyramid()
+        self.parallel_threshold = (
+            parallel_threshold if parallel_threshold is not None
+            else int(os.getenv('PSD_EXPORT_PARALLEL_THRESHOLD', DEFAULT_PARALLEL_THRESHOLD))
+        )
+        self.max_workers = (
+            max_workers or int(os.getenv('PSD_EXPORT_WORKERS', '0')) or min(8, os.cpu_count() or 1)
+        )
 
     def log_info(self, message: str):
         """Log info message."""
@@ -77,7 +319,9 @@ class PSDLayerExporter:
 
     def extract_all_layers(self, psd_path: str, output_dir: str,
                           include_groups: bool = False,
-                          generate_thumbnails: bool = True) -> Dict[str, Any]:
+                          generate_thumbnails: bool = True,
+                          parallel: Optional[bool] = None,
+                          incremental: bool = True) -> Dict[str, Any]:
         """
         Extract all layers from PSD and save as individual PNG files.
         HEADLESS - No Photoshop UI appears, pure Python processing.
@@ -87,9 +331,15 @@ class PSDLayerExporter:
             output_dir: Directory to save exported layer PNGs
             include_groups: Whether to export group layers (default: False)
             generate_thumbnails: Whether to generate thumbnails (default: True)
+            parallel: Encode PNGs/thumbnails on a thread pool. None (default)
+                decides from the number of exportable layers and
+                parallel_threshold.
+            incremental: Reuse files of layers unchanged since the last export
+                into output_dir (default: True)
 
         Returns:
-            Dictionary with comprehensive processing results:
+            Dictionary with comprehensive processing results. 'layers' is
+            keyed by layer path ("Group/Layer"; bare name at top level):
             {
                 'layers': {
                     'Background': {
@@ -107,6 +357,7 @@ class PSDLayerExporter:
                 'dimensions': {'width': 1200, 'height': 1500}
             }
         """
+        encode_pool = None
         try:
             # Create output directories
             Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -117,7 +368,7 @@ class PSDLayerExporter:
             # Open PSD (pure Python, no Photoshop required!)
             # Open PSD with version check and auto-conversion
             try:
-                psd = PSDImage.open(psd_path)
+                psd = psd_tools.PSDImage.open(psd_path)
             except AssertionError as e:
                 if "Invalid version" in str(e):
                     version_match = str(e).split("version ")[-1] if "version" in str(e) else "unknown"
@@ -129,7 +380,7 @@ class PSDLayerExporter:
                     if converted_path != psd_path:
                         # Try opening the converted file
                         try:
-                            psd = PSDImage.open(converted_path)
+                            psd = psd_tools.PSDImage.open(converted_path)
                             print(f"  ✅ Successfully opened converted PSD")
                             # Update psd_path for the rest of the function
                             psd_path = converted_path
@@ -169,16 +420,31 @@ class PSDLayerExporter:
             layer_count = 0
             fonts_detected = []  # Track all fonts
 
-            # Process all layers
-            for layer in psd:
+            if parallel is None:
+                parallel = (
+                    self.max_workers > 1 and
+                    self._count_exportable(psd) >= self.parallel_threshold
+                )
+            encode_pool = _EncodePool(self.max_workers, self.memory_budget) if parallel else None
+            if parallel:
+                print(f"Encoding on {self.max_workers} threads\n")
+
+            used_names: Set[str] = set()
+            manifest = None
+            if incremental:
+                manifest = ExportManifest(output_dir, self._psd_signature(psd)).load()
+
+            # Process all layers, descending into groups
+            for layer, layer_path in self._walk_layers(psd):
                 layer_count += 1
                 result = self._process_layer(
                     layer, output_dir, include_groups,
-                    generate_thumbnails, thumbnails_dir, layer_count
+                    generate_thumbnails, thumbnails_dir, layer_count,
+                    encode_pool, layer_path, used_names, manifest
                 )
 
                 if result:
-                    exported_layers[layer.name] = result
+                    exported_layers[self._unique_key(layer_path, exported_layers)] = result
                     metadata.append(result)
 
                     # Track fonts from text layers
@@ -191,11 +457,32 @@ class PSDLayerExporter:
             # Generate flattened preview
             print("\nCreating flattened preview...")
             flattened_path = str(Path(output_dir) / "psd_flat.png")
-            composite = psd.composite()
-            composite.save(flattened_path, 'PNG')
+            reserved = self.memory_budget.reserve(_estimated_bytes(psd.width, psd.height))
+            try:
+                composite = self.preview_cache.get_image(psd_path, 'full')
+                cached = composite is not None
+                if not cached:
+                    composite = psd.composite()
+                if encode_pool:
+                    encode_pool.submit({}, self._write_flattened, composite, flattened_path,
+                                       psd_path, cached, reserved=reserved)
+                    reserved = 0  # Released by the pool once written
+                else:
+                    self._write_flattened(composite, flattened_path, psd_path, cached)
+                del composite
+            finally:
+                self.memory_budget.release(reserved)
+            if encode_pool:
+                self._finish_parallel_encoding(encode_pool, exported_layers, metadata)
             flat_size = os.path.getsize(flattened_path) / 1024
             print(f"✅ Flattened preview: psd_flat.png ({flat_size:.1f} KB)\n")
 
+            if manifest:
+                for entry in metadata:
+                    if entry.get('type') == 'pixel':
+                        manifest.record(entry)
+                manifest.save()
+
             # Generate font report if fonts were detected
             if fonts_detected:
                 self._print_font_report(fonts_detected)
@@ -208,6 +495,8 @@ class PSDLayerExporter:
             image_layers = len([l for l in exported_layers.values() if l.get('type') == 'pixel'])
             text_layers = len([l for l in exported_layers.values() if l.get('type') == 'text'])
             print(f"  - Image layers exported: {image_layers}")
+            if manifest and manifest.reused:
+                print(f"  - Unchanged layers reused: {manifest.reused}")
             if generate_thumbnails:
                 print(f"  - Thumbnails created: {len([l for l in exported_layers.values() if l.get('thumbnail_path')])}")
             if text_layers > 0:
@@ -236,8 +525,76 @@ class PSDLayerExporter:
             traceback.print_exc()
             return {}
 
+        finally:
+            if encode_pool:
+                # On failure, let queued encodes finish and release their budget
+                encode_pool.drain()
+
+    def _walk_layers(self, psd_or_group, parent_path: str = "") -> Iterator[Tuple[Any, str]]:
+        """
+        Yield (layer, layer_path) depth-first, groups before their children.
+
+        Paths use the same "Group/Layer" form as the PSD parser.
+        """
+        for layer in psd_or_group:
+            layer_path = f"{parent_path}/{layer.name}" if parent_path else layer.name
+            yield layer, layer_path
+            if layer.is_group():
+                yield from self._walk_layers(layer, layer_path)
+
+    @staticmethod
+    def _unique_key(layer_path: str, taken: Dict[str, Any]) -> str:
+        """
+        Key for a layer in the 'layers' result.
+
+        Top-level layers keep their bare name; nested layers use their
+        "Group/Layer" path, and same-named siblings get a " (2)", " (3)"...
+        suffix so no layer overwrites another.
+        """
+        key = layer_path
+        counter = 2
+        while key in taken:
+            key = f"{layer_path} ({counter})"
+            counter += 1
+        return key
+
+    def _count_exportable(self, psd) -> int:
+        """Number of layers (at any depth) that will be written as PNGs."""
+        return sum(
+            1 for layer, _ in self._walk_layers(psd)
+            if not layer.is_group() and layer.kind in EXPORTABLE_KINDS
+        )
+
+    def _finish_parallel_encoding(self, encode_pool: _EncodePool,
+                                  exported_layers: Dict[str, Dict], metadata: List[Dict]):
+        """Wait for queued encodes and fill in file sizes/thumbnail paths in layer order."""
+        print("\nWriting encoded layers...")
+        for result, future in encode_pool.drain():
+            if not result:
+                future.result()  # Flattened preview: propagate failures
+                continue
+
+            try:
+                file_size, thumb_path = future.result()
+            except Exception as e:
+                print(f"│   ❌ Export failed for {result.get('layer_path', result['name'])}: {e}")
+                for key in [key for key, value in exported_layers.items() if value is result]:
+                    del exported_layers[key]
+                metadata[:] = [entry for entry in metadata if entry is not result]
+                continue
+
+            result['file_size_bytes'] = file_size
+            print(f"│   ✅ Exported: {Path(result['path']).name} ({file_size / 1024:.1f} KB)")
+            if thumb_path:
+                result['thumbnail_path'] = str(thumb_path)
+                print(f"│   ✅ Thumbnail: {thumb_path.name}")
+
     def _process_layer(self, layer, output_dir: str, include_groups: bool,
-                      generate_thumbnails: bool, thumbnails_dir: Path, layer_num: int) -> Optional[Dict]:
+                      generate_thumbnails: bool, thumbnails_dir: Path, layer_num: int,
+                      encode_pool: Optional[_EncodePool] = None,
+                      layer_path: Optional[str] = None,
+                      used_names: Optional[Set[str]] = None,
+                      manifest: Optional[ExportManifest] = None) -> Optional[Dict]:
         """
         Process a single layer and export if applicable.
 
@@ -246,7 +603,8 @@ class PSDLayerExporter:
         """
         try:
             layer_name = layer.name
-            print(f"├── [{layer_num}] {layer_name}")
+            layer_path = layer_path or layer_name
+            print(f"├── [{layer_num}] {layer_path}")
 
             # Skip groups unless explicitly requested
             if layer.is_group():
@@ -278,12 +636,18 @@ class PSDLayerExporter:
                     'text_content': layer.text if hasattr(layer, 'text') else '',
                     'font_info': font_info,
                     'visible': layer.visible,
-                    'bounds': layer.bbox if hasattr(layer, 'bbox') else None
+                    'bounds': layer.bbox if hasattr(layer, 'bbox') else None,
+                    'layer_path': layer_path
                 }
 
             # Export pixel/image layers
-            if layer.kind in ['pixel', 'shape', 'smartobject', 'normal']:
-                result = self._export_layer_as_png(layer, output_dir, generate_thumbnails, thumbnails_dir)
+            if layer.kind in EXPORTABLE_KINDS:
+                result = self._export_layer_as_png(
+                    layer, output_dir, generate_thumbnails, thumbnails_dir, encode_pool,
+                    used_names, manifest
+                )
+                if result:
+                    result['layer_path'] = layer_path
                 print("│")
                 return result
 
@@ -298,16 +662,41 @@ class PSDLayerExporter:
             return None
 
     def _export_layer_as_png(self, layer, output_dir: str,
-                            generate_thumbnails: bool, thumbnails_dir: Path) -> Optional[Dict]:
+                            generate_thumbnails: bool, thumbnails_dir: Path,
+                            encode_pool: Optional[_EncodePool] = None,
+                            used_names: Optional[Set[str]] = None,
+                            manifest: Optional[ExportManifest] = None) -> Optional[Dict]:
         """
         Export a layer as a PNG file with optional thumbnail.
 
+        With an encode pool, the layer is decoded here and written in the
+        background; file_size_bytes and thumbnail_path are filled in once
+        the pool is drained. Either way the decoded image is dropped as soon
+        as it has been written. If the manifest shows the layer unchanged
+        since the last export, its existing files are reused without
+        decoding.
+
         Returns:
             Dict with exported file info including thumbnail path
         """
+        reserved = 0
         try:
             layer_name = layer.name
 
+            safe_name = self._make_safe_filename(layer_name)
+            if used_names is not None:
+                safe_name = self._make_unique_name(safe_name, used_names)
+
+            content_hash = self._layer_content_hash(layer) if manifest else None
+            if content_hash:
+                previous = self._reuse_previous(manifest, layer, safe_name, content_hash,
+                                                generate_thumbnails)
+                if previous:
+                    return previous
+
+            # Wait for room in the memory budget before decoding
+            reserved = self.memory_budget.reserve(_estimated_bytes(layer.width, layer.height))
+
             # Convert layer to PIL Image (pure Python, no Photoshop!)
             layer_image = layer.topil()
 
@@ -315,39 +704,51 @@ class PSDLayerExporter:
                 print(f"│   ⚠️  Could not convert to image")
                 return None
 
+            if manifest and not content_hash:
+                # No raw channel data to hash: fall back to the decoded pixels,
+                # which still saves the PNG and thumbnail encode
+                content_hash = self._pixel_content_hash(layer, layer_image)
+                previous = self._reuse_previous(manifest, layer, safe_name, content_hash,
+                                                generate_thumbnails)
+                if previous:
+                    return previous
+
             # Get dimensions
             width, height = layer_image.size
 
-            # Create safe filename
-            safe_name = self._make_safe_filename(layer_name)
             output_path = os.path.join(output_dir, f"{safe_name}.png")
 
-            # Save as PNG
-            layer_image.save(output_path, 'PNG')
-
-            # Get file size
-            file_size = os.path.getsize(output_path)
-            size_kb = file_size / 1024
-
-            print(f"│   ✅ Exported: {safe_name}.png ({size_kb:.1f} KB)")
-
             result = {
                 'name': layer_name,
                 'type': 'pixel',
                 'path': output_path,
                 'size': (width, height),
-                'file_size_bytes': file_size,
+                'file_size_bytes': None,
                 'visible': layer.visible,
                 'kind': layer.kind,
-                'bounds': layer.bbox if hasattr(layer, 'bbox') else None
+                'bounds': layer.bbox if hasattr(layer, 'bbox') else None,
+                'content_hash': content_hash
             }
 
-            # Generate thumbnail if requested
-            if generate_thumbnails:
-                thumb_path = self._generate_thumbnail(layer_image, thumbnails_dir, safe_name)
-                if thumb_path:
-                    result['thumbnail_path'] = str(thumb_path)
-                    print(f"│   ✅ Thumbnail: thumb_{safe_name}.png")
+            thumb_dir = thumbnails_dir if generate_thumbnails else None
+            if encode_pool:
+                encode_pool.submit(result, self._write_layer_files,
+                                   layer_image, output_path, thumb_dir, safe_name,
+                                   reserved=reserved)
+                reserved = 0  # Released by the pool once written
+                print(f"│   ⏳ Queued: {safe_name}.png")
+                return result
+
+            file_size, thumb_path = self._write_layer_files(
+                layer_image, output_path, thumb_dir, safe_name
+            )
+            del layer_image
+            result['file_size_bytes'] = file_size
+            print(f"│   ✅ Exported: {safe_name}.png ({file_size / 1024:.1f} KB)")
+
+            if thumb_path:
+                result['thumbnail_path'] = str(thumb_path)
+                print(f"│   ✅ Thumbnail: thumb_{safe_name}.png")
 
             return result
 
@@ -355,8 +756,105 @@ class PSDLayerExporter:
             print(f"│   ❌ Export failed: {e}")
             return None
 
+        finally:
+            self.memory_budget.release(reserved)
+
+    def _reuse_previous(self, manifest: ExportManifest, layer, safe_name: str,
+                        content_hash: str, generate_thumbnails: bool) -> Optional[Dict]:
+        """Result pointing at the previous export's files if the layer is unchanged."""
+        previous = manifest.lookup(f"{safe_name}.png", content_hash, generate_thumbnails)
+        if not previous:
+            return None
+
+        manifest.reused += 1
+        print(f"│   ♻️  Unchanged: {safe_name}.png")
+        result = {
+            'name': layer.name,
+            'type': 'pixel',
+            'path': str(manifest.png_path(f"{safe_name}.png")),
+            'size': tuple(previous['size']),
+            'file_size_bytes': previous['file_size_bytes'],
+            'visible': layer.visible,
+            'kind': layer.kind,
+            'bounds': layer.bbox if hasattr(layer, 'bbox') else None,
+            'content_hash': content_hash
+        }
+        if generate_thumbnails:
+            result['thumbnail_path'] = str(manifest.thumbnail_path(f"{safe_name}.png"))
+        return result
+
+    def _write_flattened(self, composite, flattened_path: str, psd_path: str, cached: bool):
+        """Save the flattened preview and, if it was just composited, cache its pyramid."""
+        composite.save(flattened_path, 'PNG')
+        if not cached:
+            self.preview_cache.store(psd_path, composite)
+
+    def _psd_signature(self, psd) -> str:
+        """
+        Document-level settings that affect decoded layer pixels.
+
+        A manifest written under a different signature is not reused.
+        """
+        icc = psd.image_resources.get_data(psd_tools.constants.Resource.ICC_PROFILE)
+        icc_hash = hashlib.blake2b(icc, digest_size=8).hexdigest() if icc else 'none'
+        # Raw channel hashes read psd-tools internals, so a manifest written
+        # by another psd-tools version is not trusted
+        return f"{int(psd.color_mode)}:{psd.depth}:{icc_hash}:{psd_tools.__version__}"
+
+    def _layer_content_hash(self, layer) -> Optional[str]:
+        """
+        Hash of a layer's raw (still compressed) channel data and bbox.
+
+        Computed without decoding pixels from psd-tools' private channel
+        records. Returns None if those are unavailable (e.g. a psd-tools
+        release that renamed them); the caller then hashes decoded pixels.
+        """
+        channel_info = getattr(getattr(layer, '_record', None), 'channel_info', None)
+        channels = getattr(layer, '_channels', None)
+        if channel_info is None or channels is None:
+            return None
+        try:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(f"raw:{layer.kind}:{tuple(layer.bbox)}".encode())
+            for info, channel in zip(channel_info, channels):
+                digest.update(f"|{int(info.id)}:{int(channel.compression)}:{len(channel.data)}|".encode())
+                digest.update(channel.data)
+            return digest.hexdigest()
+        except Exception:
+            return None
+
+    def _pixel_content_hash(self, layer, layer_image) -> str:
+        """Hash of a decoded layer image and its bbox."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"pixels:{layer.kind}:{tuple(layer.bbox)}:{layer_image.mode}:{layer_image.size}".encode())
+        digest.update(layer_image.tobytes())
+        return digest.hexdigest()
+
+    def _write_layer_files(self, layer_image, output_path: str,
+                           thumbnails_dir: Optional[Path],
+                           safe_name: str) -> Tuple[int, Optional[Path]]:
+        """
+        Save a decoded layer as PNG and, if thumbnails_dir is given, its thumbnail.
+
+        The image is not used afterwards, so the thumbnail is reduced from it
+        in place rather than from a full-resolution copy. Safe to run on a
+        worker thread.
+
+        Returns:
+            (PNG file size in bytes, thumbnail path or None)
+        """
+        layer_image.save(output_path, 'PNG')
+        file_size = os.path.getsize(output_path)
+
+        thumb_path = None
+        if thumbnails_dir is not None:
+            thumb_path = self._generate_thumbnail(layer_image, thumbnails_dir, safe_name,
+                                                  copy=False)
+
+        return file_size, thumb_path
+
     def _generate_thumbnail(self, pil_image, output_dir: Path, base_name: str,
-                           max_size: int = 200) -> Optional[Path]:
+                           max_size: int = 200, copy: bool = True) -> Optional[Path]:
         """
         Generate thumbnail from PIL Image.
 
@@ -365,13 +863,14 @@ class PSDLayerExporter:
             output_dir: Directory to save thumbnail
             base_name: Base filename (without extension)
             max_size: Maximum thumbnail dimension (default: 200px)
+            copy: Work on a copy (default). False shrinks pil_image in place.
 
         Returns:
             Path to thumbnail file, or None if failed
         """
         try:
             # Create copy for thumbnail
-            thumb_img = pil_image.copy()
+            thumb_img = pil_image.copy() if copy else pil_image
 
             # Resize to fit in max_size x max_size
             thumb_img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
@@ -561,6 +1060,18 @@ class PSDLayerExporter:
 
         return safe
 
+    def _make_unique_name(self, safe_name: str, used_names: Set[str]) -> str:
+        """
+        Suffix safe_name ('logo' → 'logo_2') if an earlier layer already used it.
+        """
+        unique = safe_name
+        suffix = 2
+        while unique in used_names:
+            unique = f"{safe_name}_{suffix}"
+            suffix += 1
+        used_names.add(unique)
+        return unique
+
     def get_export_summary(self, exported_layers: Dict[str, Dict]) -> str:
         """
         Generate a human-readable summary of exported layers.
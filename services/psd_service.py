@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import Dict, List, Optional
 
 from services.base_service import BaseService, Result
+from services.parse_cache import ParseCache, get_parse_cache
 from core.exceptions import (
     PSDParsingError,
     PSDLayerError,
@@ -30,6 +31,11 @@ class PSDService(BaseService):
     a clean API with proper error handling and logging.
     """
 
+    def __init__(self, logger=None, enhanced_logging=None,
+                 parse_cache: Optional[ParseCache] = None):
+        super().__init__(logger, enhanced_logging)
+        self.parse_cache = parse_cache or get_parse_cache()
+
     def parse_psd(self, psd_path: str) -> Result[Dict]:
         """
         Parse a PSD file and extract its structure.
@@ -53,8 +59,15 @@ class PSDService(BaseService):
             return Result.failure(f"File must have .psd extension")
 
         try:
-            # Call existing parser module
-            psd_data = psd_parser.parse_psd(psd_path)
+            # Call existing parser module (content-addressed cache in front).
+            # Limited Pillow parses are not cached so a later full parse can win.
+            psd_data = self.parse_cache.get_or_parse(
+                'psd', psd_path, psd_parser.PARSER_VERSION,
+                lambda: psd_parser.parse_psd(psd_path),
+                cacheable=lambda data: isinstance(data, dict) and not data.get('limited_parse')
+            )
+            if isinstance(psd_data, dict):
+                psd_data['filename'] = Path(psd_path).name
 
             # Validate parsed data has expected structure
             if not isinstance(psd_data, dict):
@@ -0,0 +1,324 @@
+"""
+Render Result Cache
+
+Caches rendered preview videos (and their thumbnails) by a fingerprint of
+everything that determines the render, so regenerating a preview whose
+inputs did not change returns the previous video instead of running
+aerender again.
+
+- Key: SHA-256 over the populated project's contents, the content hashes of
+  the footage it references, the composition name, the render options that
+  affect output (resolution, duration, fps) and any extra inputs the caller
+  supplies (e.g. the populate script and aerender arguments)
+- Entries live under <cache_dir>/<key>/ with a meta.json; files are cloned
+  (reflink) or copied in and out, never hardlinked, since a later render
+  may overwrite the job's output file in place
+- Entries are evicted least-recently-used once their total size exceeds the
+  byte budget
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from modules.phase5.project_staging import stage_file
+from services.parse_cache import get_parse_cache
+
+
+DEFAULT_CACHE_DIR = 'data/cache/renders'
+DEFAULT_MAX_DISK_MB = 2048
+
+RENDER_CACHE_VERSION = 1
+
+# Render options that change the rendered video
+RENDER_OPTION_KEYS = ('resolution', 'duration', 'fps')
+
+
+class RenderCache:
+    """
+    Rendered videos keyed by a fingerprint of their inputs.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_MB * 1024 * 1024,
+        enabled: bool = True,
+        logger=None
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_disk_bytes = max_disk_bytes
+        self.enabled = enabled
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0
+        }
+
+    def log_info(self, message: str):
+        """Log info message."""
+        if self.logger:
+            self.logger.info(message)
+
+    def log_error(self, message: str):
+        """Log error message."""
+        if self.logger:
+            self.logger.error(message)
+
+    def fingerprint(
+        self,
+        project_path: str,
+        comp_name: str,
+        options: Optional[Dict[str, Any]] = None,
+        footage_paths: Iterable[str] = (),
+        extra: Any = None,
+        relative_to: Optional[str] = None
+    ) -> str:
+        """
+        Cache key for rendering a project.
+
+        Args:
+            project_path: Populated AEP/AEPX (or the template it is populated from)
+            comp_name: Composition to render
+            options: Render options; only RENDER_OPTION_KEYS are significant
+            footage_paths: Files the project references
+            extra: JSON-serializable inputs that also affect the render
+            relative_to: Directory the project lives in whose path should not
+                         affect the key (e.g. a per-run temp directory that
+                         appears in the project's footage paths)
+        """
+        if relative_to:
+            # Fresh temp path each run, so hash the contents with it masked
+            root = os.path.abspath(relative_to).encode('utf-8')
+            with open(project_path, 'rb') as f:
+                project_digest = hashlib.sha256(f.read().replace(root, b'<root>')).hexdigest()
+        else:
+            project_digest = get_parse_cache().file_digest(project_path)
+
+        footage = sorted(
+            (os.path.basename(path), get_parse_cache().file_digest(path))
+            for path in set(footage_paths)
+            if os.path.isfile(path)
+        )
+
+        options = options or {}
+        payload = {
+            'version': RENDER_CACHE_VERSION,
+            'project': project_digest,
+            'footage': footage,
+            'comp': comp_name,
+            'options': {key: options.get(key) for key in RENDER_OPTION_KEYS},
+            'extra': extra
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Cached files for a key.
+
+        Returns:
+            {'video_path': ..., 'thumbnail_path': ... or None}, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        entry_dir = self.cache_dir / key
+        meta = self._read_meta(entry_dir)
+        video = entry_dir / meta['video'] if meta else None
+        if video is None or not video.exists():
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+
+        # Refresh mtime so eviction is least-recently-used
+        try:
+            os.utime(entry_dir / 'meta.json', None)
+        except OSError:
+            pass
+
+        with self._lock:
+            self._stats['hits'] += 1
+
+        thumbnail = entry_dir / meta['thumbnail'] if meta.get('thumbnail') else None
+        return {
+            'video_path': str(video),
+            'thumbnail_path': str(thumbnail) if thumbnail and thumbnail.exists() else None
+        }
+
+    def restore(self, key: str, video_path: str,
+                thumbnail_path: Optional[str] = None) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Place a cached render at the caller's output paths.
+
+        Returns:
+            {'video_path': video_path, 'thumbnail_path': thumbnail_path or None}
+            on a hit, None on a miss
+        """
+        cached = self.get(key)
+        if cached is None:
+            return None
+
+        try:
+            stage_file(cached['video_path'], video_path, writable=True)
+            restored_thumbnail = None
+            if thumbnail_path and cached['thumbnail_path']:
+                stage_file(cached['thumbnail_path'], thumbnail_path, writable=True)
+                restored_thumbnail = str(thumbnail_path)
+        except OSError as e:
+            self.log_error(f"Render cache: could not restore {key}: {e}")
+            return None
+
+        self.log_info(f"Render cache hit: {key[:12]} -> {video_path}")
+        return {'video_path': str(video_path), 'thumbnail_path': restored_thumbnail}
+
+    def put(self, key: str, video_path: str, thumbnail_path: Optional[str] = None) -> bool:
+        """
+        Cache a finished render.
+
+        Returns:
+            True if the entry exists afterwards
+        """
+        if not self.enabled or not os.path.isfile(video_path):
+            return False
+
+        entry_dir = self.cache_dir / key
+        tmp_dir = entry_dir.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            tmp_dir.mkdir(parents=True)
+
+            meta = {
+                'version': RENDER_CACHE_VERSION,
+                'video': 'video' + Path(video_path).suffix,
+                'thumbnail': None,
+                'created_at': time.time()
+            }
+            stage_file(video_path, str(tmp_dir / meta['video']), writable=True)
+            if thumbnail_path and os.path.isfile(thumbnail_path):
+                meta['thumbnail'] = 'thumbnail' + Path(thumbnail_path).suffix
+                stage_file(thumbnail_path, str(tmp_dir / meta['thumbnail']), writable=True)
+            meta['bytes'] = self._entry_bytes(tmp_dir)
+            (tmp_dir / 'meta.json').write_text(json.dumps(meta), encoding='utf-8')
+
+            if entry_dir.exists():
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            try:
+                os.replace(tmp_dir, entry_dir)
+            except OSError:
+                # Another process stored the same render first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                return self._read_meta(entry_dir) is not None
+        except OSError as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            self.log_error(f"Render cache: could not store {key}: {e}")
+            return False
+
+        with self._lock:
+            self._stats['stores'] += 1
+        self._evict_disk()
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current disk usage."""
+        with self._lock:
+            stats = dict(self._stats)
+        entries = self._iter_entries()
+        stats['entries'] = len(entries)
+        stats['disk_bytes'] = sum(self._cached_bytes(entry) for entry in entries)
+        return stats
+
+    def clear(self):
+        """Delete every cached render and reset counters."""
+        for entry_dir in self._iter_entries():
+            shutil.rmtree(entry_dir, ignore_errors=True)
+        with self._lock:
+            for counter in self._stats:
+                self._stats[counter] = 0
+
+    def _read_meta(self, entry_dir: Path) -> Optional[Dict[str, Any]]:
+        try:
+            meta = json.loads((entry_dir / 'meta.json').read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get('version') == RENDER_CACHE_VERSION else None
+
+    def _iter_entries(self):
+        if not self.cache_dir.exists():
+            return []
+        return [p for p in self.cache_dir.iterdir() if p.is_dir() and not p.name.endswith('.tmp')]
+
+    def _entry_bytes(self, entry_dir: Path) -> int:
+        total = 0
+        for path in entry_dir.iterdir():
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _cached_bytes(self, entry_dir: Path) -> int:
+        """Entry size from its meta.json (falls back to stat-ing the files)."""
+        meta = self._read_meta(entry_dir)
+        if meta and isinstance(meta.get('bytes'), int):
+            return meta['bytes']
+        return self._entry_bytes(entry_dir)
+
+    def _evict_disk(self):
+        """Delete least-recently-used renders until under the byte budget."""
+        entries = []
+        for entry_dir in self._iter_entries():
+            try:
+                mtime = (entry_dir / 'meta.json').stat().st_mtime
+            except OSError:
+                mtime = 0
+            entries.append((mtime, self._cached_bytes(entry_dir), entry_dir))
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_disk_bytes:
+            return
+
+        entries.sort()
+        # Never evict the newest entry (the one just stored)
+        for _, size, entry_dir in entries[:-1]:
+            if total <= self.max_disk_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            with self._lock:
+                self._stats['evictions'] += 1
+
+        self.log_info(f"Render cache evicted entries; disk usage now {total} bytes")
+
+
+_shared_cache: Optional[RenderCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> RenderCache:
+    """
+    Process-wide render result cache.
+
+    Configured from the environment:
+        RENDER_CACHE_DIR: cache directory (default: data/cache/renders)
+        RENDER_CACHE_MAX_MB: disk budget in MB (default: 2048)
+        DISABLE_RENDER_CACHE: set to 'true' to always render
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = RenderCache(
+                cache_dir=os.getenv('RENDER_CACHE_DIR', DEFAULT_CACHE_DIR),
+                max_disk_bytes=int(os.getenv('RENDER_CACHE_MAX_MB', DEFAULT_MAX_DISK_MB)) * 1024 * 1024,
+                enabled=os.getenv('DISABLE_RENDER_CACHE', 'false').lower() != 'true'
+            )
+        return _shared_cache
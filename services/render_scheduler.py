@@ -0,0 +1,495 @@
+"""
+Render Scheduler
+
+Runs aerender preview renders on a fixed number of render slots instead of
+inline in the calling request thread.
+
+Renders are queued by priority (high, medium, low, then submission order)
+and each slot runs one aerender process at a time. Every render has its own
+timeout, can be cancelled while queued or running, and reports progress
+parsed from aerender's PROGRESS lines. Callers that block on a render use
+wait(), which gives up on renders still queued after the queue timeout.
+The aerender executable is just a path, so any stand-in that prints
+aerender-style output (e.g. a fake script in tests) can be plugged in via
+the constructor or AERENDER_PATH.
+"""
+
+import heapq
+import itertools
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional
+
+
+PRIORITY_RANKS = {'high': 1, 'medium': 2, 'low': 3}
+
+DEFAULT_RENDER_SLOTS = 1
+DEFAULT_RENDER_TIMEOUT = 600  # seconds
+DEFAULT_QUEUE_TIMEOUT = 1800  # seconds a render may wait for a slot
+
+FINAL_STATUSES = ('completed', 'failed', 'timed_out', 'cancelled')
+
+# Output lines kept per render for error reporting
+OUTPUT_TAIL_LINES = 500
+
+# Finished renders kept for status lookups
+FINISHED_HISTORY = 200
+
+# aerender progress output, e.g.
+#   PROGRESS:  Duration: 0:00:10:00
+#   PROGRESS:  Frame Rate: 30.00 (comp)
+#   PROGRESS:  0:00:01:05 (36): 0 Seconds
+_DURATION_RE = re.compile(r'PROGRESS:\s+Duration:\s+(\d+)[:;](\d+)[:;](\d+)[:;](\d+)')
+_FRAME_RATE_RE = re.compile(r'PROGRESS:\s+Frame Rate:\s+([\d.]+)')
+_FRAME_RE = re.compile(r'PROGRESS:\s+[\d:;]+\s+\((\d+)\)')
+
+
+class RenderTask:
+    """
+    A queued or running aerender invocation.
+
+    Attributes are updated by the scheduler; read them (or to_dict()) from
+    any thread.
+    """
+
+    def __init__(self, task_id: int, command: List[str], output_path: str,
+                 priority: str, timeout: Optional[float], job_id: Optional[str]):
+        self.task_id = task_id
+        self.command = command
+        self.output_path = output_path
+        self.priority = priority
+        self.timeout = timeout
+        self.job_id = job_id
+
+        self.status = 'queued'
+        self.progress = 0.0
+        self.frames_rendered = 0
+        self.total_frames: Optional[int] = None
+        self.returncode: Optional[int] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self._output = deque(maxlen=OUTPUT_TAIL_LINES)
+        self._duration = None
+        self._frame_rate = None
+        self._started = threading.Event()
+        self._done = threading.Event()
+        self._cancel = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status == 'completed'
+
+    @property
+    def output(self) -> str:
+        """Last lines of combined aerender stdout/stderr."""
+        return '\n'.join(self._output)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the render finishes; False if timeout elapsed first."""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'task_id': self.task_id,
+            'job_id': self.job_id,
+            'status': self.status,
+            'priority': self.priority,
+            'progress': round(self.progress, 4),
+            'frames_rendered': self.frames_rendered,
+            'total_frames': self.total_frames,
+            'returncode': self.returncode,
+            'error': self.error,
+            'output_path': self.output_path,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+    def _feed(self, line: str) -> None:
+        """Record an output line and update progress from it."""
+        self._output.append(line)
+
+        match = _FRAME_RE.search(line)
+        if match:
+            self.frames_rendered = int(match.group(1))
+            if self.total_frames:
+                self.progress = min(self.frames_rendered / self.total_frames, 1.0)
+            return
+
+        match = _DURATION_RE.search(line)
+        if match:
+            self._duration = tuple(int(part) for part in match.groups())
+        else:
+            match = _FRAME_RATE_RE.search(line)
+            if match:
+                self._frame_rate = float(match.group(1))
+
+        if self._duration and self._frame_rate and self.total_frames is None:
+            hours, minutes, seconds, frames = self._duration
+            total = round((hours * 3600 + minutes * 60 + seconds) * self._frame_rate) + frames
+            self.total_frames = max(total, 1)
+
+
+class RenderScheduler:
+    """
+    Priority queue of aerender renders executed on a fixed set of slots.
+
+    Usage:
+        scheduler = RenderScheduler(slots=2, aerender_path='/path/to/aerender')
+        task = scheduler.submit('project.aep', 'Main Comp', 'out.mp4', priority='high')
+        scheduler.wait(task)
+        if task.succeeded:
+            ...
+    """
+
+    def __init__(self, slots: Optional[int] = None, default_timeout: Optional[float] = None,
+                 aerender_path: Optional[str] = None, logger=None,
+                 queue_timeout: Optional[float] = None):
+        """
+        Args:
+            slots: Concurrent renders (default: RENDER_SLOTS, or 1)
+            default_timeout: Seconds per render (default: RENDER_TIMEOUT, or 600)
+            queue_timeout: Seconds wait() lets a render sit queued
+                           (default: RENDER_QUEUE_TIMEOUT, or 1800; 0 disables)
+            aerender_path: aerender (or stand-in) executable (default: AERENDER_PATH)
+            logger: Optional logger
+        """
+        self.slots = max(1, slots or int(os.getenv('RENDER_SLOTS', DEFAULT_RENDER_SLOTS)))
+        self.default_timeout = (
+            default_timeout if default_timeout is not None
+            else float(os.getenv('RENDER_TIMEOUT', DEFAULT_RENDER_TIMEOUT))
+        )
+        self.queue_timeout = (
+            queue_timeout if queue_timeout is not None
+            else float(os.getenv('RENDER_QUEUE_TIMEOUT', DEFAULT_QUEUE_TIMEOUT))
+        )
+        self.aerender_path = aerender_path or os.getenv('AERENDER_PATH')
+        self.logger = logger
+
+        self._condition = threading.Condition()
+        self._queue: List = []
+        self._sequence = itertools.count()
+        self._task_ids = itertools.count(1)
+        self._tasks: Dict[int, RenderTask] = {}
+        self._finished: 'OrderedDict[int, None]' = OrderedDict()
+        self._workers: List[threading.Thread] = []
+        self._running = 0
+        self._shutdown = False
+        self.stats = {status: 0 for status in FINAL_STATUSES}
+
+    def log_info(self, message: str):
+        """Log info message."""
+        if self.logger:
+            self.logger.info(message)
+
+    def log_error(self, message: str):
+        """Log error message."""
+        if self.logger:
+            self.logger.error(message)
+
+    def submit(self, project_path: str, comp_name: str, output_path: str,
+               args: Optional[List[str]] = None, priority: str = 'medium',
+               timeout: Optional[float] = None, job_id: Optional[str] = None,
+               aerender_path: Optional[str] = None) -> RenderTask:
+        """
+        Queue a render.
+
+        Args:
+            project_path: AE project to render
+            comp_name: Composition name
+            output_path: Output file
+            args: Extra aerender arguments (e.g. ['-RStemplate', 'Best Settings'])
+            priority: 'high', 'medium' or 'low'
+            timeout: Seconds before the render is killed (default: default_timeout;
+                     0 disables the limit)
+            job_id: Job this render belongs to, for status lookups
+            aerender_path: Executable for this render (default: the scheduler's)
+
+        Returns:
+            The queued RenderTask
+
+        Raises:
+            ValueError: If no aerender executable is configured
+            RuntimeError: If the scheduler has been shut down
+        """
+        executable = aerender_path or self.aerender_path
+        if not executable:
+            raise ValueError("No aerender executable configured (set AERENDER_PATH)")
+
+        command = [
+            executable,
+            '-project', project_path,
+            '-comp', comp_name,
+            '-output', output_path
+        ] + list(args or [])
+
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Render scheduler has been shut down")
+
+            task = RenderTask(
+                next(self._task_ids), command, output_path,
+                priority if priority in PRIORITY_RANKS else 'medium',
+                self.default_timeout if timeout is None else timeout,
+                job_id
+            )
+            self._tasks[task.task_id] = task
+            heapq.heappush(self._queue, (PRIORITY_RANKS[task.priority], next(self._sequence), task))
+            self._start_workers()
+            self._condition.notify()
+
+        self.log_info(f"Render {task.task_id} queued (job {job_id}, priority {task.priority})")
+        return task
+
+    def cancel(self, task_id: int) -> bool:
+        """
+        Cancel a queued or running render.
+
+        Returns:
+            False if the render doesn't exist or has already finished
+        """
+        with self._condition:
+            task = self._tasks.get(task_id)
+            if task is None or task.done:
+                return False
+            task._cancel.set()
+            if task.status == 'queued':
+                # Workers skip cancelled entries when they reach them
+                self._finish(task, 'cancelled', 'Cancelled before start')
+            self._condition.notify_all()
+        return True
+
+    def cancel_job(self, job_id: str) -> int:
+        """
+        Cancel every queued or running render of a job.
+
+        Returns:
+            Number of renders cancelled
+        """
+        return sum(self.cancel(task.task_id) for task in self.get_tasks_for_job(job_id))
+
+    def wait(self, task: RenderTask, queue_timeout: Optional[float] = None) -> RenderTask:
+        """
+        Block until a render finishes.
+
+        A render not started within the queue timeout is taken off the
+        queue and marked timed_out; once started, the render's own timeout
+        applies.
+
+        Args:
+            task: Render returned by submit()
+            queue_timeout: Seconds to wait for a slot (default: queue_timeout)
+
+        Returns:
+            The finished task
+        """
+        limit = self.queue_timeout if queue_timeout is None else queue_timeout
+        if limit and not task._started.wait(limit):
+            expired = False
+            with self._condition:
+                if task.status == 'queued':
+                    task._cancel.set()
+                    self._finish(task, 'timed_out', f"No render slot free within {limit:g}s")
+                    self._condition.notify_all()
+                    expired = True
+            if expired:
+                self.log_error(f"Render {task.task_id} timed_out: {task.error}")
+        task.wait()
+        return task
+
+    def get_task(self, task_id: int) -> Optional[RenderTask]:
+        with self._condition:
+            return self._tasks.get(task_id)
+
+    def get_tasks_for_job(self, job_id: str) -> List[RenderTask]:
+        with self._condition:
+            return [task for task in self._tasks.values() if task.job_id == job_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Slot usage, queue depth and outcome counts."""
+        with self._condition:
+            queued = sum(1 for _, _, task in self._queue if task.status == 'queued')
+            return dict(self.stats, slots=self.slots, running=self._running, queued=queued)
+
+    def shutdown(self, wait: bool = True, cancel_running: bool = False) -> None:
+        """
+        Stop accepting renders and cancel everything still queued.
+
+        Args:
+            wait: Block until slot threads exit
+            cancel_running: Also kill renders in progress
+        """
+        with self._condition:
+            self._shutdown = True
+            for _, _, task in self._queue:
+                if task.status == 'queued':
+                    task._cancel.set()
+                    self._finish(task, 'cancelled', 'Scheduler shut down')
+            self._queue.clear()
+            if cancel_running:
+                for task in self._tasks.values():
+                    if task.status == 'running':
+                        task._cancel.set()
+            self._condition.notify_all()
+            workers = list(self._workers)
+
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    def _start_workers(self) -> None:
+        """Start slot threads on first use (caller holds the lock)."""
+        while len(self._workers) < self.slots:
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"render-slot-{len(self._workers) + 1}",
+                daemon=True
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._condition:
+                task = None
+                while task is None:
+                    while not self._queue and not self._shutdown:
+                        self._condition.wait()
+                    if not self._queue:
+                        return
+                    _, _, candidate = heapq.heappop(self._queue)
+                    if candidate.status == 'queued':
+                        task = candidate
+                task.status = 'running'
+                task.started_at = time.time()
+                task._started.set()
+                self._running += 1
+
+            try:
+                self._run(task)
+            except Exception as e:
+                self._conclude(task, None, 'failed', f"{type(e).__name__}: {e}")
+            finally:
+                with self._condition:
+                    self._running -= 1
+
+    def _run(self, task: RenderTask) -> None:
+        """Run one render in the current slot."""
+        os.makedirs(os.path.dirname(os.path.abspath(task.output_path)), exist_ok=True)
+        self.log_info(f"Render {task.task_id} started: {' '.join(task.command)}")
+
+        try:
+            process = subprocess.Popen(
+                task.command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors='replace',
+                bufsize=1
+            )
+        except OSError as e:
+            self._conclude(task, None, 'failed', f"Could not start aerender: {e}")
+            return
+
+        reader = threading.Thread(target=self._read_output, args=(task, process), daemon=True)
+        reader.start()
+
+        deadline = time.monotonic() + task.timeout if task.timeout else None
+        while process.poll() is None:
+            if task._cancel.is_set():
+                self._conclude(task, process, 'cancelled', 'Cancelled while rendering')
+                reader.join(timeout=5)
+                return
+            if deadline and time.monotonic() >= deadline:
+                self._conclude(task, process, 'timed_out', f"Render timed out after {task.timeout:g}s")
+                reader.join(timeout=5)
+                return
+            task._cancel.wait(0.1)
+
+        reader.join(timeout=5)
+        task.returncode = process.returncode
+
+        if process.returncode != 0:
+            self._conclude(task, None, 'failed', f"aerender exited with code {process.returncode}")
+        elif not os.path.exists(task.output_path):
+            self._conclude(task, None, 'failed', f"aerender produced no output: {task.output_path}")
+        else:
+            task.progress = 1.0
+            self._conclude(task, None, 'completed', None)
+
+    def _read_output(self, task: RenderTask, process) -> None:
+        try:
+            for line in process.stdout:
+                task._feed(line.rstrip('\r\n'))
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                process.stdout.close()
+            except OSError:
+                pass
+
+    def _conclude(self, task: RenderTask, process, status: str, error: Optional[str]) -> None:
+        """Stop the process (if any) and record the outcome."""
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            task.returncode = process.returncode
+
+        with self._condition:
+            self._finish(task, status, error)
+
+        if status == 'completed':
+            self.log_info(f"Render {task.task_id} completed in {task.finished_at - task.started_at:.1f}s")
+        else:
+            self.log_error(f"Render {task.task_id} {status}: {error}")
+
+    def _finish(self, task: RenderTask, status: str, error: Optional[str]) -> None:
+        """Mark a task final (caller holds the lock)."""
+        task.status = status
+        task.error = error
+        task.finished_at = time.time()
+        self.stats[status] += 1
+        task._started.set()
+        task._done.set()
+
+        self._finished[task.task_id] = None
+        while len(self._finished) > FINISHED_HISTORY:
+            old_id, _ = self._finished.popitem(last=False)
+            self._tasks.pop(old_id, None)
+
+
+_shared_scheduler: Optional[RenderScheduler] = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def get_render_scheduler(logger=None) -> RenderScheduler:
+    """
+    Process-wide render scheduler shared by every preview request.
+
+    Configured from the environment:
+        RENDER_SLOTS: concurrent aerender processes (default: 1)
+        RENDER_TIMEOUT: seconds per render (default: 600)
+        RENDER_QUEUE_TIMEOUT: seconds a waiting caller lets a render sit queued (default: 1800)
+        AERENDER_PATH: aerender executable (callers may pass their own)
+    """
+    global _shared_scheduler
+    with _shared_scheduler_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = RenderScheduler(logger=logger)
+        return _shared_scheduler
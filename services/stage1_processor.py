@@ -11,9 +11,14 @@ Processes jobs through automated ingestion:
 - Transition to Stage 2 (ready for human review)
 
 This stage runs completely automated with no human intervention.
+
+Batches can be processed serially in-process or fanned out across a bounded
+process pool. In parallel mode workers only do the CPU-bound file work
+(PSD export, AEPX analysis, matching); every database write happens in the
+parent process as each job's result streams back.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 
@@ -22,6 +27,20 @@ from services.aepx_processor import AEPXProcessor
 from services.job_service import JobService
 from services.warning_service import WarningService
 from services.log_service import LogService
+from services.ingestion_pool import IngestionPool, default_worker_count, max_worker_count
+
+
+# Per-worker-process processor, created by the first job a pool worker runs
+# and reused for the rest of the batch
+_worker_processor: Optional['Stage1Processor'] = None
+
+
+def _ingest_job_files(job_id: str, psd_path: str, aepx_path: str) -> Dict[str, Any]:
+    """Ingestion pool entry point: file work only, no database access."""
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = Stage1Processor()
+    return _worker_processor._ingest(job_id, psd_path, aepx_path)
 
 
 class Stage1Processor:
@@ -51,13 +70,25 @@ class Stage1Processor:
             self.logger.error(message)
         print(f"❌ {message}")
 
-    def process_batch(self, batch_id: str, max_jobs: int = 100):
+    def process_batch(
+        self,
+        batch_id: str,
+        max_jobs: int = 100,
+        workers: Optional[int] = None,
+        job_timeout: Optional[float] = None
+    ):
         """
         Process all jobs in a batch through Stage 1.
 
         Args:
             batch_id: Batch identifier
             max_jobs: Maximum jobs to process in one call
+            workers: Worker processes to use (default: STAGE1_WORKERS or half
+                     the CPU count, at most 4; requests are capped at
+                     STAGE1_WORKERS or the CPU count). 1 processes jobs
+                     serially in this process.
+            job_timeout: Per-job timeout in seconds for parallel mode
+                         (default: STAGE1_JOB_TIMEOUT or 600)
         """
         print(f"\n{'='*70}")
         print(f"🏭 STAGE 1: BATCH AUTOMATED PROCESSING")
@@ -91,34 +122,51 @@ class Stage1Processor:
             'job_results': {}
         }
 
-        for idx, job in enumerate(jobs, 1):
-            print(f"{'─'*70}")
-            print(f"Job [{idx}/{len(jobs)}]: {job.job_id}")
-            print(f"{'─'*70}")
-
-            try:
-                # Process this job
-                job_result = self.process_job(job.job_id)
+        workers = min(workers or default_worker_count(), max_worker_count(), len(jobs))
 
+        if workers > 1:
+            print(f"Processing in parallel with {workers} workers\n")
+            for job_id, job_result in self.iter_process_jobs_parallel(
+                jobs, workers=workers, job_timeout=job_timeout
+            ):
                 results['processed'] += 1
-
                 if job_result['success']:
                     results['succeeded'] += 1
                 else:
                     results['failed'] += 1
+                results['job_results'][job_id] = job_result
 
-                results['job_results'][job.job_id] = job_result
+                print(f"Job [{results['processed']}/{len(jobs)}]: {job_id} "
+                      f"{'✅' if job_result['success'] else '❌'}")
+        else:
+            for idx, job in enumerate(jobs, 1):
+                print(f"{'─'*70}")
+                print(f"Job [{idx}/{len(jobs)}]: {job.job_id}")
+                print(f"{'─'*70}")
 
-            except Exception as e:
-                self.log_error(f"Failed to process job {job.job_id}: {e}")
-                results['processed'] += 1
-                results['failed'] += 1
-                results['job_results'][job.job_id] = {
-                    'success': False,
-                    'error': str(e)
-                }
+                try:
+                    # Process this job
+                    job_result = self.process_job(job.job_id)
+
+                    results['processed'] += 1
+
+                    if job_result['success']:
+                        results['succeeded'] += 1
+                    else:
+                        results['failed'] += 1
+
+                    results['job_results'][job.job_id] = job_result
+
+                except Exception as e:
+                    self.log_error(f"Failed to process job {job.job_id}: {e}")
+                    results['processed'] += 1
+                    results['failed'] += 1
+                    results['job_results'][job.job_id] = {
+                        'success': False,
+                        'error': str(e)
+                    }
 
-            print()
+                print()
 
         # Summary
         print(f"\n{'='*70}")
@@ -133,6 +181,62 @@ class Stage1Processor:
 
         return results
 
+    def iter_process_jobs_parallel(
+        self,
+        jobs: List[Any],
+        workers: Optional[int] = None,
+        job_timeout: Optional[float] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run Stage 1 for many jobs across a process pool, yielding as each finishes.
+
+        All jobs are marked started in one transaction before dispatch; each
+        finished job's warnings, results and status are then written from
+        this (parent) process, so SQLite only ever sees a single writer.
+
+        Args:
+            jobs: Job records in stage 0
+            workers: Maximum concurrent worker processes
+            job_timeout: Seconds before a job's worker is terminated
+
+        Yields:
+            (job_id, result) where result has the same shape as process_job()
+        """
+        # Snapshot plain values; ORM objects must not cross process boundaries
+        tasks = [(job.job_id, (job.job_id, job.psd_path, job.aepx_path)) for job in jobs]
+        job_ids = [job_id for job_id, _ in tasks]
+
+        self.job_service.start_stage_for_jobs(job_ids, stage=1, status='processing')
+        self.log_service.log_stages_started(job_ids, stage=1, user_id='system')
+
+        pool = IngestionPool(max_workers=workers, task_timeout=job_timeout, logger=self.logger)
+
+        for job_id, outcome in pool.imap_unordered(_ingest_job_files, tasks):
+            result = {
+                'success': False,
+                'psd_result': None,
+                'aepx_result': None,
+                'matches': None,
+                'warnings': []
+            }
+
+            if outcome['success']:
+                ingested = outcome['result']
+                result.update(ingested)
+                try:
+                    self._finalize_job(job_id, result)
+                    result['success'] = True
+                except Exception as e:
+                    self._fail_job(job_id, result, e)
+            else:
+                error = RuntimeError(outcome['error'])
+                if outcome.get('timed_out'):
+                    error = TimeoutError(outcome['error'])
+                self._fail_job(job_id, result, error)
+
+            result['duration'] = outcome['duration']
+            yield job_id, result
+
     def process_job(self, job_id: str) -> Dict[str, Any]:
         """
         Process a single job through Stage 1.
@@ -174,77 +278,99 @@ class Stage1Processor:
         }
 
         try:
-            # Step 1: Process PSD
-            print(f"\n  📄 Step 1: Processing PSD...")
-            psd_result = self._process_psd(job)
-            result['psd_result'] = psd_result
-
-            # Step 2: Process AEPX
-            print(f"\n  🎬 Step 2: Processing AEPX...")
-            aepx_result = self._process_aepx(job)
-            result['aepx_result'] = aepx_result
-
-            # Step 3: Auto-match layers
-            print(f"\n  🔗 Step 3: Auto-matching layers...")
-            matches = self._auto_match_layers(psd_result, aepx_result)
-            result['matches'] = matches
-
-            # Step 4: Check for warnings
-            print(f"\n  ⚠️  Step 4: Checking for warnings...")
-            warnings = self._check_warnings(job_id, psd_result, aepx_result, matches)
-            result['warnings'] = warnings
-
-            # Step 5: Store results
-            print(f"\n  💾 Step 5: Storing results...")
-            self.job_service.store_stage1_results(
-                job_id=job_id,
-                psd_result=psd_result,
-                aepx_result=aepx_result,
-                match_result=matches
-            )
+            result.update(self._ingest(job_id, job.psd_path, job.aepx_path))
+            self._finalize_job(job_id, result)
+            result['success'] = True
 
-            # Complete stage 1
-            self.job_service.complete_stage(job_id, stage=1, user_id='system')
-            self.job_service.update_job_status(job_id, 'awaiting_review', current_stage=2)
-            self.log_service.log_stage_completed(job_id, stage=1, user_id='system')
+        except Exception as e:
+            self._fail_job(job_id, result, e)
 
-            result['success'] = True
+            import traceback
+            traceback.print_exc()
 
-            print(f"\n✅ Job {job_id} completed Stage 1 successfully")
-            if warnings:
-                print(f"   ⚠️  {len(warnings)} warnings detected")
+        return result
 
-            self.log_info(f"Job {job_id} completed Stage 1 - {len(warnings)} warnings")
+    def _ingest(self, job_id: str, psd_path: str, aepx_path: str) -> Dict[str, Any]:
+        """
+        File-processing part of Stage 1 (steps 1-3).
 
-        except Exception as e:
-            self.log_error(f"Job {job_id} failed in Stage 1: {e}")
-            result['error'] = str(e)
+        Touches only the filesystem, so it is safe to run in a worker process.
+        """
+        # Step 1: Process PSD
+        print(f"\n  📄 Step 1: Processing PSD...")
+        psd_result = self._process_psd(job_id, psd_path)
 
-            # Log error
-            self.log_service.log_error(
-                job_id=job_id,
-                stage=1,
-                error_message=str(e),
-                error_details={'exception_type': type(e).__name__}
-            )
+        # Step 2: Process AEPX
+        print(f"\n  🎬 Step 2: Processing AEPX...")
+        aepx_result = self._process_aepx(job_id, aepx_path)
 
-            # Update job status to failed
-            self.job_service.update_job_status(job_id, 'failed', current_stage=1)
+        # Step 3: Auto-match layers
+        print(f"\n  🔗 Step 3: Auto-matching layers...")
+        matches = self._auto_match_layers(psd_result, aepx_result)
 
-            import traceback
-            traceback.print_exc()
+        return {
+            'psd_result': psd_result,
+            'aepx_result': aepx_result,
+            'matches': matches
+        }
 
-        return result
+    def _finalize_job(self, job_id: str, result: Dict[str, Any]):
+        """Database part of Stage 1 (steps 4-5), run in the parent process."""
+        psd_result = result['psd_result']
+        aepx_result = result['aepx_result']
+        matches = result['matches']
+
+        # Step 4: Check for warnings
+        print(f"\n  ⚠️  Step 4: Checking for warnings...")
+        warnings = self._check_warnings(job_id, psd_result, aepx_result, matches)
+        result['warnings'] = warnings
+
+        # Step 5: Store results and complete stage 1
+        print(f"\n  💾 Step 5: Storing results...")
+        self.job_service.record_stage1_success(
+            job_id=job_id,
+            psd_result=psd_result,
+            aepx_result=aepx_result,
+            match_result=matches,
+            user_id='system'
+        )
+        self.log_service.log_stage_completed(job_id, stage=1, user_id='system')
+
+        # Job finished: write its queued logs/warnings in one transaction
+        self.log_service.flush()
+
+        print(f"\n✅ Job {job_id} completed Stage 1 successfully")
+        if warnings:
+            print(f"   ⚠️  {len(warnings)} warnings detected")
+
+        self.log_info(f"Job {job_id} completed Stage 1 - {len(warnings)} warnings")
+
+    def _fail_job(self, job_id: str, result: Dict[str, Any], error: Exception):
+        """Record a Stage 1 failure for a job."""
+        self.log_error(f"Job {job_id} failed in Stage 1: {error}")
+        result['error'] = str(error)
+
+        # Log error
+        self.log_service.log_error(
+            job_id=job_id,
+            stage=1,
+            error_message=str(error),
+            error_details={'exception_type': type(error).__name__}
+        )
+
+        # Update job status to failed
+        self.job_service.update_job_status(job_id, 'failed', current_stage=1)
+        self.log_service.flush()
 
-    def _process_psd(self, job) -> Dict[str, Any]:
+    def _process_psd(self, job_id: str, psd_path: str) -> Dict[str, Any]:
         """Process PSD file and extract layers."""
         # Create output directory for this job
-        exports_dir = Path('data/exports') / job.job_id
+        exports_dir = Path('data/exports') / job_id
         exports_dir.mkdir(parents=True, exist_ok=True)
 
         # Extract all layers
         export_result = self.psd_exporter.extract_all_layers(
-            psd_path=job.psd_path,
+            psd_path=psd_path,
             output_dir=str(exports_dir),
             generate_thumbnails=True
         )
@@ -257,11 +383,11 @@ class Stage1Processor:
             'metadata': export_result.get('metadata', {})
         }
 
-    def _process_aepx(self, job) -> Dict[str, Any]:
+    def _process_aepx(self, job_id: str, aepx_path: str) -> Dict[str, Any]:
         """Process AEPX file and analyze structure."""
         aepx_result = self.aepx_processor.process_aepx(
-            aepx_path=job.aepx_path,
-            session_id=job.job_id,
+            aepx_path=aepx_path,
+            session_id=job_id,
             generate_thumbnails=False  # Keep headless
         )
 
@@ -17,9 +17,21 @@ import os
 
 from services.base_service import BaseService
 from services.preview_service import PreviewService
+from services.preview_pyramid import get_preview_pyramid
+from services.render_cache import get_render_cache
+from services.render_scheduler import get_render_scheduler
 from database.models import Job
-from psd_tools import PSDImage
 from modules.phase4.extendscript_generator import generate_extendscript
+from modules.phase2.aepx_path_fixer import find_footage_references
+from modules.phase2.footage_index import get_footage_index
+
+
+# -RStemplate: Render settings template (use "Best Settings")
+# -OMtemplate: Output module template (use "H.264")
+STAGE6_RENDER_ARGS = [
+    '-RStemplate', 'Best Settings',
+    '-OMtemplate', 'H.264 - Match Render Settings - 15 Mbps'
+]
 
 
 class Stage6PreviewService(BaseService):
@@ -188,6 +200,34 @@ class Stage6PreviewService(BaseService):
 
             self.log_info(f"Fixed {len(layer_name_fixes)} layer name mappings to match AEPX template")
 
+            # Extract composition name from job's comp_name field
+            comp_name = job.comp_name if hasattr(job, 'comp_name') and job.comp_name else 'test-aep'
+
+            # Convert paths to absolute for aerender (it doesn't handle relative paths correctly)
+            abs_video_path = os.path.abspath(preview_dir / f'{job.job_id}_preview.mp4')
+
+            # The template, the footage it references, the populate script and
+            # the exported layers fully determine the populated project, so an
+            # unchanged regenerate can reuse the previous render without
+            # opening After Effects
+            render_cache = get_render_cache()
+            template_dir = os.path.dirname(os.path.abspath(job.aepx_path))
+            template_footage = [
+                os.path.join(template_dir, ref['path']) for ref in find_footage_references(job.aepx_path)
+            ]
+            render_key = render_cache.fingerprint(
+                job.aepx_path,
+                comp_name,
+                footage_paths=template_footage + get_footage_index().list_files(
+                    Path('data/exports') / job.job_id, '.png'
+                ),
+                extra={'script': script_content, 'args': STAGE6_RENDER_ARGS}
+            )
+            cached = render_cache.restore(render_key, abs_video_path)
+            if cached:
+                self.log_info(f"Job {job.job_id}: Inputs unchanged - reusing cached preview render")
+                return self._finish_preview(job, session, psd_preview_path, cached['video_path'])
+
             # Delete any existing populated.aep file to ensure fresh creation without old PSD references
             output_aep_file = preview_dir / f'{job.job_id}_populated.aep'
             if output_aep_file.exists():
@@ -221,17 +261,14 @@ class Stage6PreviewService(BaseService):
             # Step 4: Render preview video using After Effects
             self.log_info(f"Job {job.job_id}: Rendering preview video")
 
-            # Extract composition name from job's comp_name field
-            comp_name = job.comp_name if hasattr(job, 'comp_name') and job.comp_name else 'test-aep'
-
-            # Convert paths to absolute for aerender (it doesn't handle relative paths correctly)
             abs_aep_path = os.path.abspath(populated_aep_path)
-            abs_video_path = os.path.abspath(preview_dir / f'{job.job_id}_preview.mp4')
 
             video_preview_path = self._render_preview_video(
                 abs_aep_path,
                 Path(abs_video_path),
-                comp_name
+                comp_name,
+                priority=job.priority or 'medium',
+                job_id=job.job_id
             )
 
             if not video_preview_path:
@@ -239,22 +276,9 @@ class Stage6PreviewService(BaseService):
                 self.log_error(error_msg, job_id=job.job_id)
                 return False, error_msg, None
 
-            # Step 4: Update job with preview paths
-            job.stage6_psd_preview_path = str(psd_preview_path)
-            job.stage6_preview_video_path = str(video_preview_path)
-            job.status = 'awaiting_approval'  # Ready for human approval
-            session.commit()
+            render_cache.put(render_key, video_preview_path)
 
-            self.log_info(
-                f"Job {job.job_id}: Preview generation complete - "
-                f"awaiting user approval"
-            )
-
-            return True, None, {
-                'psd_preview_path': str(psd_preview_path),
-                'video_preview_path': str(video_preview_path),
-                'preview_url': f'/preview/{job.job_id}'
-            }
+            return self._finish_preview(job, session, psd_preview_path, video_preview_path)
 
         except Exception as e:
             error_msg = f'Preview generation failed: {str(e)}'
@@ -333,6 +357,31 @@ class Stage6PreviewService(BaseService):
             self.log_error(f"Traceback:\n{traceback.format_exc()}")
             return None
 
+    def _finish_preview(
+        self,
+        job: Job,
+        session,
+        psd_preview_path: Optional[str],
+        video_preview_path: str
+    ) -> Tuple[bool, Optional[str], Optional[Dict[str, Any]]]:
+        """Record preview paths on the job and mark it ready for approval."""
+        # Step 4: Update job with preview paths
+        job.stage6_psd_preview_path = str(psd_preview_path)
+        job.stage6_preview_video_path = str(video_preview_path)
+        job.status = 'awaiting_approval'  # Ready for human approval
+        session.commit()
+
+        self.log_info(
+            f"Job {job.job_id}: Preview generation complete - "
+            f"awaiting user approval"
+        )
+
+        return True, None, {
+            'psd_preview_path': str(psd_preview_path),
+            'video_preview_path': str(video_preview_path),
+            'preview_url': f'/preview/{job.job_id}'
+        }
+
     def _export_psd_preview(
         self,
         psd_path: str,
@@ -341,6 +390,9 @@ class Stage6PreviewService(BaseService):
         """
         Export PSD as flattened preview image.
 
+        Reads the full-resolution level of the shared preview pyramid, so a
+        PSD already composited during Stage 1 is not composited again.
+
         Note: psd-tools library may not support PSD v8 format.
         This method is optional and should not block the preview generation.
 
@@ -355,16 +407,8 @@ class Stage6PreviewService(BaseService):
             self.log_info(f"Attempting to export PSD preview: {psd_path}")
             self.log_info(f"PSD file exists: {os.path.exists(psd_path)}")
 
-            # Open PSD file
-            psd = PSDImage.open(psd_path)
-            self.log_info(f"PSD opened successfully - Version: {psd.version}")
-
-            # Get composite (flattened) image
-            composite = psd.composite()
-            self.log_info(f"PSD composite generated: {composite.size if composite else 'None'}")
-
-            # Save as PNG
-            composite.save(str(output_path), 'PNG')
+            # Flattened image from the preview cache (composited on a miss)
+            get_preview_pyramid().save_level(psd_path, 'full', str(output_path))
 
             self.log_info(f"✅ PSD preview saved: {output_path}")
             return str(output_path)
@@ -527,15 +571,22 @@ class Stage6PreviewService(BaseService):
         self,
         aep_path: str,
         output_video_path: Path,
-        comp_name: str = 'test-aep'
+        comp_name: str = 'test-aep',
+        priority: str = 'medium',
+        job_id: Optional[str] = None
     ) -> Optional[str]:
         """
         Render preview video using After Effects aerender.
 
+        The render is queued on the shared render scheduler, so concurrent
+        previews are limited by render slots rather than request threads.
+
         Args:
             aep_path: Path to populated AEP file
             output_video_path: Path for output video
             comp_name: Composition name to render
+            priority: Job priority ('high', 'medium', 'low') for queue order
+            job_id: Job ID, for render status lookups
 
         Returns:
             Path to rendered video, or None if failed
@@ -550,54 +601,40 @@ class Stage6PreviewService(BaseService):
                 self.log_error("aerender not found")
                 return None
 
-            # Build aerender command
-            # -project: AEP file
-            # -comp: Composition name
-            # -output: Output video path
-            # -RStemplate: Render settings template (use "Best Settings")
-            # -OMtemplate: Output module template (use "H.264")
-            cmd = [
-                aerender_path,
-                '-project', aep_path,
-                '-comp', comp_name,
-                '-output', str(output_video_path),
-                '-RStemplate', 'Best Settings',
-                '-OMtemplate', 'H.264 - Match Render Settings - 15 Mbps'
-            ]
-
-            self.log_info(f"Running aerender: {' '.join(cmd)}")
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=600  # 10 minute timeout
+            scheduler = get_render_scheduler(self.logger)
+            task = scheduler.submit(
+                aep_path,
+                comp_name,
+                str(output_video_path),
+                args=STAGE6_RENDER_ARGS,
+                priority=priority,
+                timeout=600,  # 10 minute timeout
+                job_id=job_id,
+                aerender_path=aerender_path
             )
+            self.log_info(f"Queued render {task.task_id}: {' '.join(task.command)}")
+            scheduler.wait(task)
 
             # Log aerender output for debugging
-            if result.stdout:
-                self.log_info(f"aerender stdout:\n{result.stdout}")
-            if result.stderr:
-                self.log_info(f"aerender stderr:\n{result.stderr}")
+            if task.output:
+                self.log_info(f"aerender output:\n{task.output}")
+
+            if task.succeeded:
+                file_size = output_video_path.stat().st_size
+                self.log_info(
+                    f"Preview video rendered successfully: {output_video_path} "
+                    f"({file_size / 1024 / 1024:.2f} MB)"
+                )
+                return str(output_video_path)
 
-            if result.returncode == 0:
-                # Verify output video was created
-                if output_video_path.exists():
-                    file_size = output_video_path.stat().st_size
-                    self.log_info(
-                        f"Preview video rendered successfully: {output_video_path} "
-                        f"({file_size / 1024 / 1024:.2f} MB)"
-                    )
-                    return str(output_video_path)
-                else:
-                    self.log_error(f"aerender ran but output video not found: {output_video_path}")
-                    return None
+            if task.status == 'timed_out' and task.started_at is None:
+                self.log_error(f"Preview render never started: {task.error}")
+            elif task.status == 'timed_out':
+                self.log_error("Preview rendering timed out after 10 minutes")
             else:
-                self.log_error(f"aerender failed with return code {result.returncode}")
-                return None
-
-        except subprocess.TimeoutExpired:
-            self.log_error("Preview rendering timed out after 10 minutes")
+                self.log_error(f"Preview render {task.status}: {task.error}")
             return None
+
         except Exception as e:
             self.log_error(f"Failed to render preview video: {e}", exc=e)
             return None
@@ -711,7 +748,7 @@ end timeout
                 return False
 
             # Build mapping of filename patterns to new file paths
-            export_files = list(exports_dir.glob('*.png'))
+            export_files = [Path(p) for p in get_footage_index().list_files(exports_dir, '.png')]
             if not export_files:
                 self.log_error(f"No PNG exports found in {exports_dir}")
                 return False
@@ -853,6 +890,11 @@ end timeout
         Returns:
             Path to aerender, or None if not found
         """
+        # Explicit override (e.g. a stand-in aerender for testing)
+        configured = os.getenv('AERENDER_PATH')
+        if configured and os.path.exists(configured):
+            return configured
+
         # Common aerender installation paths
         common_paths = [
             '/Applications/Adobe After Effects 2025/aerender',
@@ -0,0 +1,307 @@
+"""
+Stage Task Queue
+
+Durable, SQLite-backed work queue for background stage pre-processing.
+
+Tasks survive restarts because they live in the stage_tasks table. Workers
+claim a task by taking a time-limited lease; if the worker dies the lease
+expires and another worker picks the task up. Failed tasks are retried with
+exponential backoff until max_attempts is reached. Claim order matches
+JobService.get_jobs_for_stage: priority (high, medium, low), then job
+creation time.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+
+from database.models import Job, StageTask, PRIORITY_RANKS
+from database import db_session
+
+
+# Task statuses that mean "work still outstanding"
+ACTIVE_STATUSES = ('queued', 'leased')
+
+LEASE_EXPIRED_ERROR = 'Lease expired on final attempt'
+
+
+class StageTaskQueue:
+    """
+    Persistent queue of (job, stage) pre-processing tasks.
+    """
+
+    def __init__(
+        self,
+        logger=None,
+        lease_seconds: int = 300,
+        max_attempts: int = 3,
+        backoff_seconds: float = 5.0,
+        on_exhausted: Optional[Callable[[str, int, str], None]] = None
+    ):
+        """
+        Args:
+            on_exhausted: Called as on_exhausted(job_id, stage, error) when a
+                task fails because its lease expired on the final attempt
+                (nobody is left to report that failure otherwise)
+        """
+        self.logger = logger
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.on_exhausted = on_exhausted
+
+    def log_info(self, message: str):
+        """Log info message."""
+        if self.logger:
+            self.logger.info(message)
+
+    def log_error(self, message: str):
+        """Log error message."""
+        if self.logger:
+            self.logger.error(message)
+
+    def enqueue(self, job_id: str, stage: int, user_id: str = 'system') -> StageTask:
+        """
+        Queue pre-processing for a job's stage.
+
+        If the same job/stage already has an outstanding task, that task is
+        returned instead of queueing a duplicate.
+        """
+        existing = db_session.query(StageTask).filter(
+            StageTask.job_id == job_id,
+            StageTask.stage == stage,
+            StageTask.status.in_(ACTIVE_STATUSES)
+        ).first()
+        if existing:
+            self.log_info(f"Job {job_id}: Stage {stage} task already queued (task {existing.task_id})")
+            return existing
+
+        job = db_session.query(Job).filter_by(job_id=job_id).first()
+        if not job:
+            raise ValueError(f"Job not found: {job_id}")
+
+        task = StageTask(
+            job_id=job_id,
+            stage=stage,
+            priority_rank=PRIORITY_RANKS.get(job.priority, 2),
+            job_created_at=job.created_at,
+            status='queued',
+            max_attempts=self.max_attempts,
+            available_at=datetime.utcnow(),
+            enqueued_by=user_id
+        )
+        db_session.add(task)
+        db_session.commit()
+
+        self.log_info(f"Job {job_id}: Stage {stage} task queued (task {task.task_id})")
+        return task
+
+    def lease(self, worker_id: str, stages: Optional[List[int]] = None) -> Optional[StageTask]:
+        """
+        Claim the next available task for a worker.
+
+        A task is available when it is queued and past its backoff delay, or
+        when its previous lease has expired. Claims are made with a
+        conditional UPDATE so two workers can never hold the same task.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+            stages: Optional list of stages this worker handles
+
+        Returns:
+            The leased task, or None if nothing is available
+        """
+        self._fail_exhausted_leases()
+
+        for _ in range(5):
+            now = datetime.utcnow()
+            claimable = or_(
+                and_(StageTask.status == 'queued', StageTask.available_at <= now),
+                and_(StageTask.status == 'leased', StageTask.lease_expires_at < now)
+            )
+
+            query = db_session.query(StageTask.task_id).filter(claimable)
+            if stages:
+                query = query.filter(StageTask.stage.in_(stages))
+            candidate = query.order_by(
+                StageTask.priority_rank,
+                StageTask.job_created_at,
+                StageTask.task_id
+            ).first()
+
+            if candidate is None:
+                db_session.commit()
+                return None
+
+            claimed = db_session.query(StageTask).filter(
+                StageTask.task_id == candidate.task_id,
+                claimable
+            ).update({
+                StageTask.status: 'leased',
+                StageTask.lease_owner: worker_id,
+                StageTask.lease_expires_at: now + timedelta(seconds=self.lease_seconds),
+                StageTask.attempts: StageTask.attempts + 1,
+                StageTask.updated_at: now
+            }, synchronize_session=False)
+            db_session.commit()
+
+            if claimed:
+                task = db_session.get(StageTask, candidate.task_id)
+                db_session.refresh(task)
+                self.log_info(
+                    f"Worker {worker_id} leased task {task.task_id} "
+                    f"(job {task.job_id}, stage {task.stage}, attempt {task.attempts})"
+                )
+                return task
+            # Another worker won the race; try the next candidate
+
+        return None
+
+    def complete(self, task: StageTask, worker_id: str) -> bool:
+        """
+        Mark a leased task as done.
+
+        Returns:
+            False if the worker no longer held the lease
+        """
+        now = datetime.utcnow()
+        updated = db_session.query(StageTask).filter_by(
+            task_id=task.task_id, status='leased', lease_owner=worker_id
+        ).update({
+            StageTask.status: 'completed',
+            StageTask.completed_at: now,
+            StageTask.lease_expires_at: None,
+            StageTask.updated_at: now
+        }, synchronize_session=False)
+        db_session.commit()
+        return bool(updated)
+
+    def fail(self, task: StageTask, worker_id: str, error: str) -> bool:
+        """
+        Record a failed attempt.
+
+        Returns:
+            True if the task was re-queued for retry, False if it has used up
+            its attempts (or the lease was lost) and is now failed
+        """
+        db_session.refresh(task)
+        if task.status != 'leased' or task.lease_owner != worker_id:
+            return False
+
+        now = datetime.utcnow()
+        task.last_error = error
+        task.lease_expires_at = None
+        task.updated_at = now
+
+        if task.attempts < task.max_attempts:
+            delay = self.backoff_seconds * (2 ** (task.attempts - 1))
+            task.status = 'queued'
+            task.available_at = now + timedelta(seconds=delay)
+            db_session.commit()
+            self.log_info(f"Task {task.task_id} failed (attempt {task.attempts}); retrying in {delay:.0f}s")
+            return True
+
+        task.status = 'failed'
+        task.completed_at = now
+        db_session.commit()
+        self.log_error(f"Task {task.task_id} failed permanently after {task.attempts} attempts: {error}")
+        return False
+
+    def get_task(self, job_id: str, stage: int) -> Optional[StageTask]:
+        """Most recent task for a job's stage."""
+        return db_session.query(StageTask).filter_by(
+            job_id=job_id, stage=stage
+        ).order_by(StageTask.task_id.desc()).first()
+
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """
+        Queue depth and state for monitoring.
+
+        Returns:
+            {
+                'by_status': {'queued': 3, 'leased': 2, ...},
+                'by_stage': {2: {'queued': 1, 'leased': 1}, ...},
+                'oldest_queued_at': ISO timestamp or None
+            }
+        """
+        rows = db_session.query(
+            StageTask.stage,
+            StageTask.status,
+            func.count(StageTask.task_id)
+        ).group_by(StageTask.stage, StageTask.status).all()
+
+        by_status: Dict[str, int] = {}
+        by_stage: Dict[int, Dict[str, int]] = {}
+        for stage, status, count in rows:
+            by_status[status] = by_status.get(status, 0) + count
+            by_stage.setdefault(stage, {})[status] = count
+
+        oldest = db_session.query(func.min(StageTask.created_at)).filter(
+            StageTask.status == 'queued'
+        ).scalar()
+
+        return {
+            'by_status': by_status,
+            'by_stage': by_stage,
+            'oldest_queued_at': oldest.isoformat() if oldest else None
+        }
+
+    def purge_finished(self, older_than_hours: int = 24) -> int:
+        """Delete completed/failed tasks older than the given age."""
+        cutoff = datetime.utcnow() - timedelta(hours=older_than_hours)
+        deleted = db_session.query(StageTask).filter(
+            StageTask.status.in_(('completed', 'failed')),
+            StageTask.updated_at < cutoff
+        ).delete(synchronize_session=False)
+        db_session.commit()
+
+        if deleted:
+            self.log_info(f"Purged {deleted} finished stage tasks")
+        return deleted
+
+    def _fail_exhausted_leases(self) -> List[Tuple[str, int]]:
+        """
+        Fail tasks whose lease expired on their final attempt.
+
+        Each task is failed with its own conditional UPDATE, so when several
+        workers race only one of them reports it to on_exhausted.
+
+        Returns:
+            (job_id, stage) of the tasks this call failed
+        """
+        now = datetime.utcnow()
+        exhausted = and_(
+            StageTask.status == 'leased',
+            StageTask.lease_expires_at < now,
+            StageTask.attempts >= StageTask.max_attempts
+        )
+        expired = db_session.query(StageTask.task_id, StageTask.job_id, StageTask.stage).filter(
+            exhausted
+        ).all()
+
+        failed = []
+        for task_id, job_id, stage in expired:
+            updated = db_session.query(StageTask).filter(
+                StageTask.task_id == task_id,
+                exhausted
+            ).update({
+                StageTask.status: 'failed',
+                StageTask.last_error: LEASE_EXPIRED_ERROR,
+                StageTask.completed_at: now,
+                StageTask.updated_at: now
+            }, synchronize_session=False)
+            if updated:
+                failed.append((job_id, stage))
+        if not failed:
+            return failed
+        db_session.commit()
+
+        for job_id, stage in failed:
+            self.log_error(f"Job {job_id}: Stage {stage} task failed: {LEASE_EXPIRED_ERROR}")
+            if self.on_exhausted:
+                try:
+                    self.on_exhausted(job_id, stage, LEASE_EXPIRED_ERROR)
+                except Exception as e:
+                    self.log_error(f"Job {job_id}: Could not record Stage {stage} failure: {e}")
+        return failed
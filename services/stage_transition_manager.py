@@ -5,11 +5,15 @@ This service manages transitions between pipeline stages and automatically
 prepares everything needed for the next stage in the background, ensuring
 humans never wait for processing.
 
+Pre-processing work is queued in the durable stage_tasks table
+(services/stage_task_queue.py) and executed by stage workers
+(services/stage_worker.py), so pending work survives restarts and failed
+attempts are retried.
+
 Author: After Effects Automation System
 Date: 2025-10-30
 """
 
-import threading
 import time
 from pathlib import Path
 from typing import Dict, Any, Optional, List
@@ -18,6 +22,7 @@ from datetime import datetime
 from services.job_service import JobService
 from services.log_service import LogService
 from services.warning_service import WarningService
+from services.stage_task_queue import StageTaskQueue
 
 
 class StageTransitionManager:
@@ -26,20 +31,23 @@ class StageTransitionManager:
 
     When a stage completes, this service:
     1. Transitions the job to the next stage
-    2. Starts background pre-processing for that stage
+    2. Queues background pre-processing for that stage
     3. Updates job status appropriately
     4. Logs all actions
     """
 
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, task_queue: Optional[StageTaskQueue] = None):
         """Initialize the stage transition manager."""
         self.logger = logger
         self.job_service = JobService(logger)
         self.log_service = LogService(logger)
         self.warning_service = WarningService(logger)
 
-        # Background processing threads
-        self.active_threads: Dict[str, threading.Thread] = {}
+        # Durable queue of pending pre-processing work
+        self.task_queue = task_queue or StageTaskQueue(logger)
+        if self.task_queue.on_exhausted is None:
+            # A task whose last lease expired fails the job like any other failure
+            self.task_queue.on_exhausted = self._mark_preprocessing_failed
 
         # Directories for pre-processing outputs
         self.prep_dir = Path(__file__).parent.parent / 'data' / 'stage_prep'
@@ -127,7 +135,7 @@ class StageTransitionManager:
                 'from_stage': from_stage,
                 'to_stage': to_stage,
                 'status': 'processing',
-                'message': f'Transitioning to Stage {to_stage} - pre-processing started'
+                'message': f'Transitioning to Stage {to_stage} - pre-processing queued'
             }
 
         except Exception as e:
@@ -149,36 +157,55 @@ class StageTransitionManager:
 
     def _start_preprocessing(self, job_id: str, stage: int, user_id: str):
         """
-        Start background pre-processing for a stage.
+        Queue background pre-processing for a stage.
 
-        Creates a daemon thread to run pre-processing in the background
-        so the API can return immediately.
+        The task is persisted so the API can return immediately and a stage
+        worker picks it up, even if the web process restarts in between.
         """
-        thread_key = f"{job_id}_stage{stage}"
-
-        # Don't start if already processing
-        if thread_key in self.active_threads and self.active_threads[thread_key].is_alive():
-            self.log_info(f"Job {job_id}: Pre-processing already running for Stage {stage}")
-            return
-
-        # Create and start background thread
-        thread = threading.Thread(
-            target=self._preprocess_for_stage,
-            args=(job_id, stage, user_id),
-            daemon=True,
-            name=f"Preprocess_{job_id}_S{stage}"
-        )
+        self.task_queue.enqueue(job_id, stage, user_id)
+        self.log_info(f"Job {job_id}: Queued background pre-processing for Stage {stage}")
+
+    def process_next_task(self, worker_id: str) -> bool:
+        """
+        Lease and run the next queued pre-processing task.
+
+        Called repeatedly by stage workers.
+
+        Returns:
+            True if a task was processed, False if the queue was empty
+        """
+        task = self.task_queue.lease(worker_id)
+        if task is None:
+            return False
 
-        self.active_threads[thread_key] = thread
-        thread.start()
+        job_id, stage = task.job_id, task.stage
+        try:
+            result = self._preprocess_for_stage(job_id, stage)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+
+        if result.get('success'):
+            # Pre-processing complete - mark job as ready for review/approval
+            if self.task_queue.complete(task, worker_id):
+                self._mark_preprocessing_complete(job_id, stage)
+                self.log_info(f"Job {job_id}: Pre-processing Stage {stage} completed successfully")
+            else:
+                self.log_error(f"Job {job_id}: Lost lease on Stage {stage} task before completion")
+            return True
 
-        self.log_info(f"Job {job_id}: Started background pre-processing for Stage {stage}")
+        error = result.get('error', 'Unknown error')
+        self.log_error(f"Job {job_id}: Pre-processing Stage {stage} failed: {error}")
 
-    def _preprocess_for_stage(self, job_id: str, stage: int, user_id: str):
+        will_retry = self.task_queue.fail(task, worker_id, error)
+        if not will_retry and task.status == 'failed':
+            self._mark_preprocessing_failed(job_id, stage, error)
+        return True
+
+    def _preprocess_for_stage(self, job_id: str, stage: int) -> Dict[str, Any]:
         """
         Route to stage-specific pre-processing.
 
-        This runs in a background thread.
+        This runs in a stage worker.
 
         6-Stage Pipeline:
         - Stage 2: Matching (generate layer previews)
@@ -187,38 +214,18 @@ class StageTransitionManager:
         - Stage 5: ExtendScript Generation (generate script)
         - Stage 6: Download (no preprocessing needed)
         """
-        try:
-            self.log_info(f"Job {job_id}: Pre-processing Stage {stage} started")
-
-            # Route to stage-specific preprocessing
-            if stage == 2:
-                result = self._preprocess_stage2(job_id)
-            elif stage == 3:
-                result = self._preprocess_stage3_validation(job_id)
-            elif stage == 4:
-                # Stage 4 is human review - no preprocessing needed
-                result = {'success': True, 'message': 'No pre-processing required'}
-            elif stage == 5:
-                result = self._preprocess_stage5_extendscript(job_id)
-            elif stage == 6:
-                # Stage 6 is download - no preprocessing needed
-                result = {'success': True, 'message': 'No pre-processing required'}
-            else:
-                # No pre-processing needed for this stage
-                result = {'success': True, 'message': 'No pre-processing required'}
+        self.log_info(f"Job {job_id}: Pre-processing Stage {stage} started")
 
-            if result.get('success'):
-                # Pre-processing complete - mark job as ready for review/approval
-                self._mark_preprocessing_complete(job_id, stage)
-                self.log_info(f"Job {job_id}: Pre-processing Stage {stage} completed successfully")
-            else:
-                # Pre-processing failed
-                self._mark_preprocessing_failed(job_id, stage, result.get('error', 'Unknown error'))
-                self.log_error(f"Job {job_id}: Pre-processing Stage {stage} failed: {result.get('error')}")
+        # Route to stage-specific preprocessing
+        if stage == 2:
+            return self._preprocess_stage2(job_id)
+        elif stage == 3:
+            return self._preprocess_stage3_validation(job_id)
+        elif stage == 5:
+            return self._preprocess_stage5_extendscript(job_id)
 
-        except Exception as e:
-            self.log_error(f"Job {job_id}: Pre-processing exception: {e}")
-            self._mark_preprocessing_failed(job_id, stage, str(e))
+        # Stages 4 (human review) and 6 (download) need no pre-processing
+        return {'success': True, 'message': 'No pre-processing required'}
 
     def _mark_preprocessing_complete(self, job_id: str, stage: int):
         """
@@ -270,7 +277,7 @@ class StageTransitionManager:
         self.log_service.log_error(
             job_id=job_id,
             stage=stage,
-            message=f'Pre-processing failed: {error}',
+            error_message=f'Pre-processing failed: {error}',
             user_id='system'
         )
 
@@ -424,7 +431,7 @@ class StageTransitionManager:
             return {'success': False, 'error': str(e)}
 
     # =========================================================================
-    # HELPER METHODS (To be implemented)
+    # HELPER METHODS
     # =========================================================================
 
     def get_preprocessing_status(self, job_id: str, stage: int) -> Dict[str, Any]:
@@ -434,19 +441,9 @@ class StageTransitionManager:
         Returns:
             Dict with status information
         """
-        thread_key = f"{job_id}_stage{stage}"
+        task = self.task_queue.get_task(job_id, stage)
 
-        if thread_key in self.active_threads:
-            thread = self.active_threads[thread_key]
-            is_running = thread.is_alive()
-
-            return {
-                'job_id': job_id,
-                'stage': stage,
-                'preprocessing_active': is_running,
-                'status': 'processing' if is_running else 'completed'
-            }
-        else:
+        if task is None:
             return {
                 'job_id': job_id,
                 'stage': stage,
@@ -454,15 +451,18 @@ class StageTransitionManager:
                 'status': 'not_started'
             }
 
-    def cleanup_completed_threads(self):
-        """Clean up completed background threads."""
-        completed = [
-            key for key, thread in self.active_threads.items()
-            if not thread.is_alive()
-        ]
-
-        for key in completed:
-            del self.active_threads[key]
-
-        if completed:
-            self.log_info(f"Cleaned up {len(completed)} completed preprocessing threads")
+        status = {
+            'queued': 'queued',
+            'leased': 'processing',
+            'completed': 'completed',
+            'failed': 'failed'
+        }.get(task.status, task.status)
+
+        return {
+            'job_id': job_id,
+            'stage': stage,
+            'preprocessing_active': task.status in ('queued', 'leased'),
+            'status': status,
+            'attempts': task.attempts,
+            'last_error': task.last_error
+        }
@@ -0,0 +1,154 @@
+"""
+Stage Worker
+
+Executes queued stage pre-processing tasks from the durable stage_tasks
+queue. Workers can run embedded in the web process (STAGE_WORKERS threads)
+or as a standalone daemon:
+
+    python -m services.stage_worker --workers 4
+
+Any number of workers, in any number of processes, can share the same
+database; leases guarantee each task is executed by one worker at a time.
+"""
+
+import argparse
+import logging
+import os
+import socket
+import threading
+from typing import List, Optional
+
+from database import db_session
+
+
+DEFAULT_POLL_INTERVAL = 1.0  # seconds between polls of an empty queue
+
+
+class StageWorkerPool:
+    """
+    Pool of threads polling the stage task queue.
+    """
+
+    def __init__(
+        self,
+        transition_manager,
+        num_workers: int = 2,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        logger=None
+    ):
+        self.transition_manager = transition_manager
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.logger = logger
+
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._id_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def log_info(self, message: str):
+        """Log info message."""
+        if self.logger:
+            self.logger.info(message)
+
+    def log_error(self, message: str):
+        """Log error message."""
+        if self.logger:
+            self.logger.error(message)
+
+    def start(self):
+        """Start worker threads."""
+        self._stop_event.clear()
+        for index in range(self.num_workers):
+            worker_id = f"{self._id_prefix}:{index}"
+            thread = threading.Thread(
+                target=self._run,
+                args=(worker_id,),
+                daemon=True,
+                name=f"StageWorker_{index}"
+            )
+            self._threads.append(thread)
+            thread.start()
+
+        self.log_info(f"Started {self.num_workers} stage worker(s)")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Signal workers to stop and wait for in-flight tasks to finish."""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def join(self):
+        """Block until the workers stop (daemon mode)."""
+        for thread in self._threads:
+            while thread.is_alive():
+                thread.join(1.0)
+
+    def _run(self, worker_id: str):
+        """Worker loop: process tasks until the queue is empty, then poll."""
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    processed = self.transition_manager.process_next_task(worker_id)
+                except Exception as e:
+                    db_session.rollback()
+                    self.log_error(f"Stage worker {worker_id} error: {e}")
+                    processed = False
+
+                if not processed:
+                    self._stop_event.wait(self.poll_interval)
+        finally:
+            db_session.remove()
+
+
+def start_embedded_workers(transition_manager, logger=None) -> Optional[StageWorkerPool]:
+    """
+    Start stage workers inside the current process.
+
+    The number of threads comes from STAGE_WORKERS (default 2). Set it to 0
+    when running the standalone daemon instead.
+    """
+    num_workers = int(os.getenv('STAGE_WORKERS', '2'))
+    if num_workers <= 0:
+        return None
+
+    pool = StageWorkerPool(
+        transition_manager,
+        num_workers=num_workers,
+        poll_interval=float(os.getenv('STAGE_WORKER_POLL_INTERVAL', DEFAULT_POLL_INTERVAL)),
+        logger=logger
+    )
+    pool.start()
+    return pool
+
+
+def main():
+    """Run stage workers as a standalone daemon."""
+    parser = argparse.ArgumentParser(description='Run stage pre-processing workers')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('STAGE_WORKERS', '2')) or 2,
+                        help='Number of worker threads')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help='Seconds to wait between polls of an empty queue')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    logger = logging.getLogger('stage_worker')
+
+    from database import init_database
+    from services.stage_transition_manager import StageTransitionManager
+
+    init_database()
+    manager = StageTransitionManager(logger)
+
+    pool = StageWorkerPool(manager, num_workers=args.workers,
+                           poll_interval=args.poll_interval, logger=logger)
+    pool.start()
+    try:
+        pool.join()
+    except KeyboardInterrupt:
+        logger.info("Stopping stage workers...")
+        pool.stop()
+
+
+if __name__ == '__main__':
+    main()
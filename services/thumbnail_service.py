@@ -1,24 +1,59 @@
 """
-Service for generating PSD layer thumbnails using Photoshop.
+Service for generating PSD layer thumbnails.
+
+Thumbnails are rendered headlessly from psd-tools data, one per top-level
+layer, into <output_folder>/thumbnails/<session_id>. Layers are composited
+one at a time, then scaled and encoded on a thread pool.
+Photoshop automation (macOS only) remains available as a fallback for
+PSDs psd-tools cannot read, or as the primary backend via
+THUMBNAIL_BACKEND=photoshop.
 """
 
 import os
+import re
 import subprocess
 import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import json
+from core.lazy_imports import lazy_import
 from services.base_service import BaseService, Result
+from services.psd_layer_exporter import get_memory_budget
+
+# psd_tools is slow to import; load it on first render
+psd_tools = lazy_import('psd_tools')
+Image = lazy_import('PIL.Image')
+
+
+THUMBNAIL_BACKENDS = ('headless', 'photoshop')
 
 
 class ThumbnailService(BaseService):
-    """Generates thumbnails of PSD layers using Photoshop automation."""
+    """Generates thumbnails of PSD layers (headless, with a Photoshop fallback)."""
 
-    def __init__(self, logger, photoshop_path: Optional[str] = None):
+    def __init__(self, logger, photoshop_path: Optional[str] = None,
+                 backend: Optional[str] = None, max_workers: Optional[int] = None):
+        """
+        Args:
+            logger: Logger instance
+            photoshop_path: Photoshop application path (Photoshop backend only)
+            backend: 'headless' (default) or 'photoshop' (THUMBNAIL_BACKEND)
+            max_workers: Render threads for the headless backend
+                (THUMBNAIL_WORKERS, default CPU count capped at 8)
+        """
         super().__init__(logger)
         self.photoshop_path = photoshop_path or "/Applications/Adobe Photoshop 2026/Adobe Photoshop 2026.app"
         self.thumbnail_size = (200, 200)  # Default thumbnail dimensions
 
+        self.backend = (backend or os.getenv('THUMBNAIL_BACKEND', 'headless')).lower()
+        if self.backend not in THUMBNAIL_BACKENDS:
+            raise ValueError(f"Unknown thumbnail backend '{self.backend}' (expected one of {THUMBNAIL_BACKENDS})")
+        self.max_workers = (
+            max_workers or int(os.getenv('THUMBNAIL_WORKERS', '0')) or min(8, os.cpu_count() or 1)
+        )
+
     def generate_layer_thumbnails(self, psd_path: str, output_folder: str,
                                   session_id: str) -> Result[Dict[str, str]]:
         """
@@ -30,25 +65,142 @@ class ThumbnailService(BaseService):
             session_id: Session identifier for cache naming
 
         Returns:
-            Result containing dict mapping layer names to thumbnail file paths
+            Result containing dict mapping layer names to thumbnail file names
+            (relative to <output_folder>/thumbnails/<session_id>)
+        """
+        self.log_info(f"Generating layer thumbnails ({self.backend}): {psd_path} -> session {session_id}")
+
+        thumb_folder = Path(output_folder) / "thumbnails" / session_id
+        try:
+            thumb_folder.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            self.log_error(f"Thumbnail generation failed: {e}", e)
+            return Result.failure(str(e))
+
+        if self.backend == 'photoshop':
+            return self._generate_with_photoshop(psd_path, thumb_folder)
+
+        try:
+            thumbnails = self._generate_headless(psd_path, thumb_folder)
+        except Exception as e:
+            if not self._should_try_photoshop():
+                self.log_error(f"Thumbnail generation failed: {e}", e)
+                return Result.failure(str(e))
+            self.log_warning(f"Headless thumbnails failed ({e}); falling back to Photoshop")
+            return self._generate_with_photoshop(psd_path, thumb_folder)
+
+        self.log_info(f"Generated {len(thumbnails)} thumbnails in {thumb_folder}")
+        return Result.success(thumbnails)
+
+    def _generate_headless(self, psd_path: str, thumb_folder: Path) -> Dict[str, str]:
         """
+        Render a thumbnail per top-level layer from psd-tools data.
+
+        Mirrors the Photoshop script: groups are skipped, each layer is
+        rendered on its own, flattened onto white, cropped to its bounds
+        and scaled to the thumbnail width. Layers are composited one at a
+        time on the calling thread (a PSDImage is not thread-safe); the
+        flatten, resize and PNG encode run on the thread pool.
+
+        Raises:
+            Exception: If the PSD cannot be opened (e.g. unsupported version)
+        """
+        psd = psd_tools.PSDImage.open(psd_path)
+        layers = [layer for layer in psd if not layer.is_group()]
+        budget = get_memory_budget()
+        # Composited layers waiting for a thread, so decoding can't outrun encoding
+        window = threading.BoundedSemaphore(self.max_workers * 2)
+
+        def done(reserved: int):
+            def callback(_future):
+                budget.release(reserved)
+                window.release()
+            return callback
+
+        futures: List[Tuple[str, Optional[Future]]] = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='Thumbnail') as pool:
+            for layer in layers:
+                window.acquire()
+                reserved = budget.reserve(max(layer.width, 0) * max(layer.height, 0) * 4)
+                image = None
+                try:
+                    image = self._composite_layer(layer)
+                    future = pool.submit(self._write_thumbnail, image, layer.name, thumb_folder) if image else None
+                except Exception as e:
+                    self.log_warning(f"Failed to generate thumbnail for '{layer.name}': {e}")
+                    future = None
+                if future is None:
+                    budget.release(reserved)
+                    window.release()
+                else:
+                    future.add_done_callback(done(reserved))
+                futures.append((layer.name, future))
+                del image
+
+        thumbnails = {}
+        for name, future in futures:
+            if future is None:
+                continue
+            try:
+                thumbnails[name] = future.result()
+            except Exception as e:
+                self.log_warning(f"Failed to generate thumbnail for '{name}': {e}")
+        return thumbnails
+
+    def _composite_layer(self, layer):
+        """Render one layer on its own; None (with a warning) if it is empty."""
+        if layer.width <= 0 or layer.height <= 0:
+            self.log_warning(f"Failed to generate thumbnail for '{layer.name}': Layer has no dimensions")
+            return None
+
+        image = layer.composite()
+        if image is None:
+            self.log_warning(f"Failed to generate thumbnail for '{layer.name}': Layer has no pixels")
+        return image
+
+    def _write_thumbnail(self, image, layer_name: str, thumb_folder: Path) -> str:
+        """Flatten, scale and save a composited layer; returns its file name."""
+        # Flatten onto white like Photoshop's flatten()
+        image = image.convert('RGBA')
+        flattened = Image.new('RGB', image.size, (255, 255, 255))
+        flattened.paste(image, mask=image)
+        del image
+
+        width = self.thumbnail_size[0]
+        height = max(1, round(flattened.height * width / flattened.width))
+        thumbnail = flattened.resize((width, height), Image.Resampling.BICUBIC)
+
+        filename = f"{self._safe_layer_name(layer_name)}.png"
+        thumbnail.save(thumb_folder / filename, 'PNG')
+        self.log_debug(f"Thumbnail for '{layer_name}': {filename}")
+        return filename
+
+    def _safe_layer_name(self, layer_name: str) -> str:
+        """Same file-name mangling as the Photoshop script."""
+        return re.sub(r'[^a-zA-Z0-9_-]', '_', layer_name)
+
+    def _should_try_photoshop(self) -> bool:
+        """Whether the Photoshop fallback is enabled and installed."""
+        if os.getenv('DISABLE_PHOTOSHOP_FALLBACK', 'false').lower() == 'true':
+            return False
+        try:
+            from modules.phase1.photoshop_extractor import is_photoshop_available
+            return is_photoshop_available()
+        except Exception:
+            return False
+
+    def _generate_with_photoshop(self, psd_path: str, thumb_folder: Path) -> Result[Dict[str, str]]:
+        """Export layer thumbnails through Photoshop automation (macOS)."""
         # DIAGNOSTIC LOGGING
         self.log_info("=" * 70)
-        self.log_info("THUMBNAIL GENERATION STARTED")
+        self.log_info("THUMBNAIL GENERATION STARTED (PHOTOSHOP)")
         self.log_info("=" * 70)
         self.log_info(f"PSD path: {psd_path}")
         self.log_info(f"PSD exists: {os.path.exists(psd_path)}")
         self.log_info(f"PSD is absolute: {os.path.isabs(psd_path)}")
-        self.log_info(f"Output folder: {output_folder}")
-        self.log_info(f"Session ID: {session_id}")
+        self.log_info(f"Thumbnail folder: {thumb_folder}")
 
         try:
-            # Create output folder
-            thumb_folder = Path(output_folder) / "thumbnails" / session_id
-            thumb_folder.mkdir(parents=True, exist_ok=True)
-            self.log_info(f"Thumbnail folder: {thumb_folder}")
-            self.log_info(f"Thumbnail folder exists: {thumb_folder.exists()}")
-
             # Create temp results file
             results_file = tempfile.mktemp(suffix='.json')
             self.log_info(f"Results file path: {results_file}")
@@ -439,17 +591,10 @@ resultsFile.close();
             Result with output path
         """
         try:
-            from psd_tools import PSDImage
-            from PIL import Image
-
-            # Open PSD
-            psd = PSDImage.open(psd_path)
-
-            # Convert to PIL Image (flattened)
-            img = psd.compose()
+            from services.preview_pyramid import get_preview_pyramid
 
-            # Save as PNG
-            img.save(output_path, 'PNG')
+            # Flattened image from the shared preview cache (composited on a miss)
+            get_preview_pyramid().save_level(psd_path, 'full', output_path)
 
             self.log_info(f"Rendered PSD to PNG: {output_path}")
             return Result.success({'output_path': output_path})
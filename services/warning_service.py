@@ -2,12 +2,16 @@
 Warning Service
 
 Manages job warnings throughout the pipeline.
+
+New warnings are written behind through the shared AuditWriter; every
+read or update flushes it first, so queued warnings are never missed.
 """
 
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from database.models import JobWarning
 from database import db_session
+from services.audit_writer import get_audit_writer
 
 
 class WarningService:
@@ -17,6 +21,7 @@ class WarningService:
 
     def __init__(self, logger=None):
         self.logger = logger
+        self.audit_writer = get_audit_writer(logger)
 
     def log_info(self, message: str):
         """Log info message."""
@@ -44,7 +49,7 @@ class WarningService:
             details: Optional additional structured data
 
         Returns:
-            warning_id
+            warning_id, or None while the row is queued for a batched write
         """
         warning = JobWarning(
             job_id=job_id,
@@ -52,16 +57,21 @@ class WarningService:
             warning_type=warning_type,
             severity=severity,
             message=message,
-            details=details
+            details=details,
+            resolved=False,
+            created_at=datetime.utcnow()  # Event time, not flush time
         )
 
-        db_session.add(warning)
-        db_session.commit()
+        self.audit_writer.add(warning)
 
         self.log_info(f"Warning added to job {job_id}: {warning_type} ({severity}) - {message}")
 
         return warning.warning_id
 
+    def flush(self) -> int:
+        """Write queued warning (and log) rows now; returns rows written."""
+        return self.audit_writer.flush()
+
     def add_missing_font_warning(
         self,
         job_id: str,
@@ -150,6 +160,7 @@ class WarningService:
             resolved: If True, only resolved warnings. If False, only unresolved. If None, all.
             severity: Optional severity filter ('critical', 'warning', 'info')
         """
+        self.audit_writer.flush()
         query = db_session.query(JobWarning).filter_by(job_id=job_id)
 
         if resolved is not None:
@@ -162,6 +173,7 @@ class WarningService:
 
     def get_warning(self, warning_id: int) -> Optional[JobWarning]:
         """Get warning by ID."""
+        self.audit_writer.flush()
         return db_session.query(JobWarning).filter_by(warning_id=warning_id).first()
 
     def resolve_warning(
@@ -213,6 +225,7 @@ class WarningService:
         """Get count of warnings for job."""
         from sqlalchemy import func
 
+        self.audit_writer.flush()
         query = db_session.query(func.count(JobWarning.warning_id))\
             .filter_by(job_id=job_id, resolved=resolved)
 
@@ -269,6 +269,28 @@ def empty_aepx_data():
     }
 
 
+@pytest.fixture
+def tmp_db(tmp_path):
+    """Bind the shared scoped session to a throwaway database; yields its engine."""
+    from sqlalchemy import create_engine
+    from database import db_session, engine as production_engine
+    from database.models import Base
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={'check_same_thread': False}
+    )
+    Base.metadata.create_all(bind=engine)
+
+    db_session.remove()
+    db_session.configure(bind=engine)
+    yield engine
+
+    db_session.remove()
+    db_session.configure(bind=production_engine)
+    engine.dispose()
+
+
 @pytest.fixture(autouse=True)
 def reset_logging():
     """Reset logging between tests to avoid conflicts."""
@@ -119,6 +119,42 @@ def test_aepx_parser():
     return True
 
 
+def test_streaming_mode_matches_tree_mode():
+    """Streaming parse returns the same dict as the tree-based parse."""
+    path = 'sample_files/test-after-effects-project.aepx'
+
+    tree_result = parse_aepx(path, streaming=False)
+    streaming_result = parse_aepx(path, streaming=True)
+
+    assert streaming_result == tree_result
+    assert streaming_result['compositions']
+
+
+def test_streaming_mode_lookahead_window(tmp_path):
+    """A <string> only names a composition if a <Layr> sibling follows closely."""
+    far_fillers = '<Item/>' * 25
+    near_fillers = '<Item/>' * 3
+    content = f'''<?xml version="1.0" encoding="UTF-8"?>
+<AfterEffectsProject xmlns="http://www.adobe.com/products/aftereffects">
+    <string>Too Far</string>{far_fillers}
+    <string>Main Comp</string>{near_fillers}
+    <Layr><string>player1FullName</string><tdmn bdata="4144424520546578742050726f706572746965730000"/></Layr>
+    <Layr><string>Background</string><Layr><string>nested</string></Layr></Layr>
+</AfterEffectsProject>'''
+    path = tmp_path / 'window.aepx'
+    path.write_text(content)
+
+    tree_result = parse_aepx(str(path), streaming=False)
+    streaming_result = parse_aepx(str(path), streaming=True)
+
+    assert streaming_result == tree_result
+    assert [c['name'] for c in streaming_result['compositions']] == ['Main Comp']
+    layers = streaming_result['compositions'][0]['layers']
+    assert [(l['name'], l['type']) for l in layers] == [
+        ('player1FullName', 'text'), ('Background', 'image'), ('nested', 'image')
+    ]
+
+
 if __name__ == "__main__":
     try:
         test_aepx_parser()
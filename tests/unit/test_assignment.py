@@ -0,0 +1,125 @@
+"""
+Unit tests for optimal layer assignment.
+
+Checks the solver (scipy and NumPy fallback) against brute force, threshold
+handling, and that the matchers keep their output shape.
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from modules.phase3 import assignment
+from modules.phase3.content_matcher import match_content_to_slots
+
+
+def _brute_force_best(scores):
+    n, m = scores.shape
+    if n <= m:
+        return max(sum(scores[i, p[i]] for i in range(n))
+                   for p in itertools.permutations(range(m), n))
+    return max(sum(scores[p[j], j] for j in range(m))
+               for p in itertools.permutations(range(n), m))
+
+
+class TestAssignment:
+    """Test the assignment solver."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('use_scipy', [True, False])
+    def test_matches_brute_force(self, monkeypatch, use_scipy):
+        if use_scipy and not assignment._SCIPY_AVAILABLE:
+            pytest.skip('scipy not installed')
+        monkeypatch.setattr(assignment, '_SCIPY_AVAILABLE', use_scipy)
+        rng = np.random.default_rng(7)
+
+        for _ in range(100):
+            n, m = (int(x) for x in rng.integers(1, 6, 2))
+            scores = rng.random((n, m)).round(2)
+            rows, cols = assignment.linear_sum_assignment_max(scores)
+
+            assert len(set(rows)) == len(rows) == min(n, m)
+            assert len(set(cols)) == len(cols)
+            assert scores[rows, cols].sum() == pytest.approx(_brute_force_best(scores))
+
+    @pytest.mark.unit
+    def test_threshold_excludes_weak_pairs(self):
+        scores = np.array([
+            [0.9, 0.2],
+            [0.8, 0.25],
+        ])
+
+        pairs = assignment.solve_assignment(scores, 0.3)
+
+        assert pairs == [(0, 0, 0.9)]
+
+    @pytest.mark.unit
+    def test_beats_greedy_on_contended_layer(self):
+        # Greedy gives placeholder 0 the shared layer and leaves placeholder 1 empty
+        scores = np.array([
+            [0.8, 0.75],
+            [0.7, 0.0],
+        ])
+
+        pairs = assignment.solve_assignment(scores, 0.3)
+
+        assert [(r, c) for r, c, _ in pairs] == [(1, 0), (0, 1)]
+
+    @pytest.mark.unit
+    def test_empty_matrix(self):
+        assert assignment.solve_assignment(np.zeros((0, 3)), 0.3) == []
+
+
+class TestContentMatcherAssignment:
+    """Test rule-based image matching with both strategies."""
+
+    def _data(self):
+        psd = {'layers': [
+            {'name': 'player photo', 'type': 'smartobject', 'width': 1000, 'height': 1000},
+            {'name': 'logo', 'type': 'image', 'width': 100, 'height': 100},
+        ]}
+        aepx = {'placeholders': [
+            {'name': 'featured image', 'type': 'image'},
+            {'name': 'player photo', 'type': 'image'},
+        ]}
+        return psd, aepx
+
+    @pytest.mark.unit
+    def test_optimal_maximizes_total_score(self):
+        psd, aepx = self._data()
+
+        greedy = match_content_to_slots(psd, aepx, image_assignment='greedy')
+        optimal = match_content_to_slots(psd, aepx)
+
+        # Greedy spends the exact-name layer on the first placeholder it sees
+        assert [(m['psd_layer'], m['aepx_placeholder']) for m in greedy['mappings']] == [
+            ('player photo', 'featured image')
+        ]
+        assert [(m['psd_layer'], m['aepx_placeholder']) for m in optimal['mappings']] == [
+            ('player photo', 'player photo')
+        ]
+        assert optimal['mappings'][0]['confidence'] > greedy['mappings'][0]['confidence']
+        assert set(optimal) == {'mappings', 'unmapped_psd_layers', 'unfilled_placeholders'}
+        assert optimal['unfilled_placeholders'] == ['featured image']
+
+    @pytest.mark.unit
+    def test_duplicate_names_keep_first_position(self, monkeypatch):
+        from modules.phase3 import content_matcher
+
+        seen = []
+        score_matrix = content_matcher._image_score_matrix
+
+        def recording_matrix(layers, placeholders):
+            seen.extend(layers)
+            return score_matrix(layers, placeholders)
+
+        monkeypatch.setattr(content_matcher, '_image_score_matrix', recording_matrix)
+        layers = [
+            {'name': 'logo', 'type': 'image', 'width': 500, 'height': 500},
+            {'name': 'photo', 'type': 'image', 'width': 400, 'height': 400},
+            {'name': 'logo', 'type': 'image', 'width': 50, 'height': 50},
+        ]
+        content_matcher._match_image_layers(layers, [{'name': 'logo', 'type': 'image'}])
+
+        assert seen == layers[:2]
@@ -0,0 +1,209 @@
+"""
+Unit tests for AuditWriter.
+
+Tests that log and warning rows are written in batches, that the services
+read their own queued writes, and the size, interval and shutdown flushes.
+"""
+
+import time
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from database import db_session
+from database.models import Job, JobLog, JobWarning
+from services import audit_writer
+from services.audit_writer import AuditWriter
+from services.log_service import LogService
+from services.warning_service import WarningService
+
+
+@pytest.fixture
+def audit_db(tmp_db):
+    db_session.add(Job(job_id='job1', psd_path='/tmp/a.psd', aepx_path='/tmp/a.aepx', output_name='a'))
+    db_session.commit()
+    return tmp_db
+
+
+def _services(writer):
+    log_service = LogService()
+    warning_service = WarningService()
+    log_service.audit_writer = writer
+    warning_service.audit_writer = writer
+    return log_service, warning_service
+
+
+def _fail_writes(monkeypatch, message):
+    """Make every commit through the writer raise an OperationalError."""
+    class FailingSession:
+        def __init__(self, **kwargs):
+            pass
+
+        def add_all(self, rows):
+            pass
+
+        def commit(self):
+            raise OperationalError('INSERT', {}, Exception(message))
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(audit_writer, 'SessionLocal', FailingSession)
+
+
+def _count_commits(engine):
+    commits = []
+    event.listen(engine, 'commit', lambda conn: commits.append(1))
+    return commits
+
+
+class TestAuditWriter:
+    """Test write-behind audit rows."""
+
+    @pytest.mark.unit
+    def test_rows_written_in_one_transaction(self, audit_db):
+        writer = AuditWriter(flush_size=1000, flush_interval=60)
+        log_service, warning_service = _services(writer)
+        commits = _count_commits(audit_db)
+
+        for index in range(20):
+            assert log_service.log_action('job1', 1, 'step', 'system', message=f'step {index}') is None
+        warning_service.add_missing_font_warning('job1', 1, 'Helvetica Bold')
+        assert writer.pending_count() == 21
+        assert commits == []
+
+        assert writer.flush() == 21
+        assert len(commits) == 1
+        assert db_session.query(JobLog).count() == 20
+        assert db_session.query(JobWarning).count() == 1
+        writer.close()
+
+    @pytest.mark.unit
+    def test_reads_see_queued_writes(self, audit_db):
+        writer = AuditWriter(flush_size=1000, flush_interval=60)
+        log_service, warning_service = _services(writer)
+
+        log_service.log_stage_started('job1', 1)
+        log_service.log_stage_completed('job1', 1, 'system')
+        warning_service.add_missing_asset_warning('job1', 1, '/footage/missing.mov')
+
+        logs = log_service.get_job_logs('job1')
+        assert [log.action for log in logs] == ['stage_completed', 'stage_started']
+        assert log_service.get_log_count('job1') == 2
+        assert warning_service.has_unresolved_critical_warnings('job1')
+        assert writer.pending_count() == 0
+        writer.close()
+
+    @pytest.mark.unit
+    def test_flush_on_size(self, audit_db):
+        writer = AuditWriter(flush_size=5, flush_interval=60)
+        log_service, _ = _services(writer)
+
+        for _ in range(12):
+            log_service.log_action('job1', 1, 'step', 'system')
+
+        assert db_session.query(JobLog).count() == 10
+        assert writer.pending_count() == 2
+        writer.close()
+
+    @pytest.mark.unit
+    def test_flush_on_interval_and_close(self, audit_db):
+        writer = AuditWriter(flush_size=1000, flush_interval=0.05)
+        log_service, _ = _services(writer)
+
+        log_service.log_action('job1', 1, 'step', 'system')
+        deadline = time.time() + 5
+        while writer.pending_count() and time.time() < deadline:
+            time.sleep(0.02)
+        assert db_session.query(JobLog).count() == 1
+
+        # Rows queued at shutdown are written by close()
+        writer.flush_interval = 60
+        log_service.log_action('job1', 1, 'last', 'system')
+        writer.close()
+        assert db_session.query(JobLog).filter_by(action='last').count() == 1
+
+    @pytest.mark.unit
+    def test_disabled_commits_immediately(self, audit_db):
+        writer = AuditWriter(enabled=False)
+        log_service, warning_service = _services(writer)
+
+        assert isinstance(log_service.log_action('job1', 1, 'step', 'system'), int)
+        assert isinstance(warning_service.add_placeholder_not_matched_warning('job1', 1, 'Title'), int)
+        assert writer.pending_count() == 0
+
+    @pytest.mark.unit
+    def test_bulk_stage_start_is_one_commit(self, audit_db):
+        writer = AuditWriter(enabled=False)
+        log_service, _ = _services(writer)
+        for job_id in ('job2', 'job3'):
+            db_session.add(Job(job_id=job_id, psd_path='/tmp/a.psd', aepx_path='/tmp/a.aepx', output_name='a'))
+        db_session.commit()
+        commits = _count_commits(audit_db)
+
+        log_service.log_stages_started(['job1', 'job2', 'job3'], stage=1)
+
+        assert len(commits) == 1
+        assert db_session.query(JobLog).filter_by(action='stage_started').count() == 3
+
+    @pytest.mark.unit
+    def test_bad_row_dropped_alone(self, audit_db):
+        writer = AuditWriter(flush_size=1000, flush_interval=60)
+        log_service, _ = _services(writer)
+
+        log_service.log_action('job1', 1, 'before', 'system')
+        writer.add(JobLog(job_id='job1', stage=1, action=None))  # NOT NULL violation
+        log_service.log_action('job1', 1, 'after', 'system')
+
+        assert writer.flush() == 2
+        assert sorted(log.action for log in db_session.query(JobLog)) == ['after', 'before']
+        assert writer.get_stats()['dropped'] == 1
+        assert writer.pending_count() == 0
+        writer.close()
+
+    @pytest.mark.unit
+    def test_permanent_operational_error_not_requeued(self, audit_db, monkeypatch):
+        writer = AuditWriter(flush_size=1000, flush_interval=60)
+        log_service, _ = _services(writer)
+        log_service.log_action('job1', 1, 'step', 'system')
+        log_service.log_action('job1', 1, 'step', 'system')
+        _fail_writes(monkeypatch, 'no such table: job_logs')
+
+        assert writer.flush() == 0
+        assert writer.pending_count() == 0
+        assert writer.get_stats()['dropped'] == 2
+        writer.close()
+
+    @pytest.mark.unit
+    def test_busy_database_retried_then_dropped(self, audit_db, monkeypatch):
+        writer = AuditWriter(flush_size=1000, flush_interval=60, max_retries=3)
+        log_service, _ = _services(writer)
+        log_service.log_action('job1', 1, 'step', 'system')
+        _fail_writes(monkeypatch, 'database is locked')
+
+        for _ in range(3):
+            assert writer.flush() == 0
+            assert writer.pending_count() == 1
+        assert writer.flush() == 0
+        assert writer.pending_count() == 0
+        assert writer.get_stats()['dropped'] == 1
+
+    @pytest.mark.unit
+    def test_busy_database_retry_succeeds(self, audit_db, monkeypatch):
+        writer = AuditWriter(flush_size=1000, flush_interval=60)
+        log_service, _ = _services(writer)
+        log_service.log_action('job1', 1, 'step', 'system')
+
+        with monkeypatch.context() as patch:
+            _fail_writes(patch, 'database is locked')
+            assert writer.flush() == 0
+        assert writer.pending_count() == 1
+
+        assert writer.flush() == 1
+        assert db_session.query(JobLog).count() == 1
+        assert writer.get_stats()['dropped'] == 0
+        writer.close()
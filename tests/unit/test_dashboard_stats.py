@@ -0,0 +1,179 @@
+"""
+Unit tests for the materialized dashboard counters (job_stats).
+
+Tests that counters follow job inserts, status/stage changes and deletes
+made through JobService or directly on Job objects, and that they agree
+with a full rebuild from the jobs table.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from database import db_session
+from database.job_stats import read_job_stats, rebuild_job_stats
+from database.models import Job, JobStat
+from services.job_service import JobService, invalidate_dashboard_stats
+
+
+@pytest.fixture
+def stats_db(tmp_db, monkeypatch):
+    monkeypatch.setenv('DASHBOARD_STATS_TTL', '0')
+    invalidate_dashboard_stats()
+    yield tmp_db
+    invalidate_dashboard_stats()
+
+
+def _add_job(job_id, status='pending', stage=0, created_at=None):
+    job = Job(
+        job_id=job_id,
+        psd_path=f'/tmp/{job_id}.psd',
+        aepx_path=f'/tmp/{job_id}.aepx',
+        output_name=job_id,
+        status=status,
+        current_stage=stage,
+        created_at=created_at or datetime.utcnow()
+    )
+    db_session.add(job)
+    db_session.commit()
+    return job
+
+
+def _rebuilt(service):
+    """Dashboard stats recomputed from scratch."""
+    db_session.query(JobStat).delete()
+    db_session.commit()
+    invalidate_dashboard_stats()
+    return service.get_dashboard_stats()
+
+
+class TestDashboardStats:
+    """Test job_stats maintenance and reads."""
+
+    @pytest.mark.unit
+    def test_counters_follow_job_changes(self, stats_db):
+        service = JobService()
+        service.get_dashboard_stats()  # seed while empty
+
+        created = datetime(2025, 1, 1)
+        for index in range(4):
+            _add_job(f'job{index}', created_at=created)
+
+        service.update_job_status('job0', 'processing', 1)
+        service.update_job_status('job1', 'failed')
+
+        # Routes change jobs directly rather than through JobService
+        job = service.get_job('job2')
+        job.status = 'completed'
+        job.current_stage = 6
+        job.stage4_completed_at = created + timedelta(hours=2)
+        db_session.commit()
+
+        service.delete_job('job3')
+
+        stats = service.get_dashboard_stats()
+        assert stats['summary'] == {
+            'total': 3,
+            'completed': 1,
+            'failed': 1,
+            'in_progress': 1,
+            'avg_completion_time': '2h 0m'
+        }
+        assert stats['stage_counts'] == {0: 1, 1: 1, 6: 1}
+        assert stats['status_counts'] == {'processing': 1, 'failed': 1, 'completed': 1}
+        assert _rebuilt(service) == stats
+
+    @pytest.mark.unit
+    def test_leaving_completed_removes_duration(self, stats_db):
+        service = JobService()
+        created = datetime(2025, 1, 1)
+        _add_job('done', status='completed', stage=6, created_at=created)
+        job = service.get_job('done')
+        job.stage4_completed_at = created + timedelta(minutes=30)
+        db_session.commit()
+        _add_job('other', status='completed', stage=6, created_at=created)
+
+        assert service.get_summary_stats()['avg_completion_time'] == '15m'
+
+        job.status = 'on_hold'
+        db_session.commit()
+
+        assert service.get_summary_stats()['avg_completion_time'] == 'N/A'
+        assert _rebuilt(service) == service.get_dashboard_stats()
+
+    @pytest.mark.unit
+    def test_unseeded_counters_are_rebuilt(self, stats_db):
+        _add_job('a', status='failed', stage=1)
+        _add_job('b', stage=2)
+        db_session.query(JobStat).delete()
+        db_session.commit()
+
+        stats = read_job_stats(db_session)
+        assert stats[('total', 'all')][0] == 2
+        assert stats[('status', 'failed')][0] == 1
+        assert stats[('stage', '2')][0] == 1
+
+    @pytest.mark.unit
+    def test_failed_flush_not_counted(self, stats_db):
+        """Deltas of a rolled-back flush are not applied by the next one."""
+        service = JobService()
+        service.get_dashboard_stats()  # seed while empty
+        _add_job('a')
+
+        db_session.add(Job(job_id='b', psd_path='/tmp/b.psd', aepx_path='/tmp/b.aepx', output_name='b'))
+        db_session.add(Job(job_id='a', psd_path='/tmp/a.psd', aepx_path='/tmp/a.aepx', output_name='a'))
+        with pytest.raises(IntegrityError):
+            db_session.commit()
+        db_session.rollback()
+
+        _add_job('c')
+        assert service.get_summary_stats()['total'] == db_session.query(Job).count() == 2
+        assert _rebuilt(service) == service.get_dashboard_stats()
+
+    @pytest.mark.unit
+    def test_seeding_does_not_commit_pending_work(self, stats_db):
+        _add_job('a')
+        db_session.query(JobStat).delete()
+        db_session.commit()
+
+        db_session.add(Job(job_id='pending', psd_path='/tmp/p.psd', aepx_path='/tmp/p.aepx', output_name='p'))
+        assert read_job_stats(db_session)[('total', 'all')][0] == 1
+        db_session.rollback()
+
+        assert db_session.query(Job).filter_by(job_id='pending').count() == 0
+        assert read_job_stats(db_session)[('total', 'all')][0] == 1
+
+    @pytest.mark.unit
+    def test_dashboard_is_one_query(self, stats_db):
+        service = JobService()
+        _add_job('a')
+        rebuild_job_stats(db_session)
+
+        statements = []
+
+        @event.listens_for(stats_db, 'before_cursor_execute')
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        service.get_dashboard_stats()
+        event.remove(stats_db, 'before_cursor_execute', record)
+
+        assert len(statements) == 1
+        assert 'job_stats' in statements[0]
+
+    @pytest.mark.unit
+    def test_ttl_cache(self, stats_db, monkeypatch):
+        monkeypatch.setenv('DASHBOARD_STATS_TTL', '60')
+        service = JobService()
+        _add_job('a')
+        assert service.get_summary_stats()['total'] == 1
+
+        # Direct change: served from cache until the TTL passes
+        _add_job('b')
+        assert service.get_summary_stats()['total'] == 1
+
+        # JobService status updates invalidate the cache
+        service.update_job_status('a', 'processing', 1)
+        assert service.get_summary_stats()['total'] == 2
@@ -0,0 +1,121 @@
+"""
+Unit tests for EmbeddingCache.
+
+Tests memory/disk lookups, persistence across instances, LRU eviction
+and recovery from partial writes.
+"""
+
+import multiprocessing
+import sys
+
+import numpy as np
+import pytest
+
+from modules.phase3.embedding_cache import EmbeddingCache
+
+
+def _vec(*values):
+    return np.array(values, dtype=np.float32)
+
+
+def _put_worker(cache_dir, worker, count):
+    """Store count names one at a time, each in its own put."""
+    for i in range(count):
+        EmbeddingCache('model-a', cache_dir=cache_dir).put_many(
+            {f'w{worker}-{i}': _vec(worker, i)})
+
+
+class TestEmbeddingCache:
+    """Test EmbeddingCache behaviour."""
+
+    @pytest.mark.unit
+    def test_miss_then_hit(self, tmp_path):
+        cache = EmbeddingCache('model-a', cache_dir=str(tmp_path))
+
+        found, missing = cache.get_many(['cutout', 'Background', 'cutout'])
+        assert found == {}
+        assert missing == ['cutout', 'Background']
+
+        cache.put_many({'cutout': _vec(1, 2), 'Background': _vec(3, 4)})
+        found, missing = cache.get_many(['cutout', 'Background'])
+
+        assert missing == []
+        np.testing.assert_array_equal(found['Background'], _vec(3, 4))
+        assert cache.get_stats()['memory_hits'] == 2
+
+    @pytest.mark.unit
+    def test_persists_across_instances(self, tmp_path):
+        EmbeddingCache('model-a', cache_dir=str(tmp_path)).put_many({'cutout': _vec(1, 2)})
+        EmbeddingCache('model-a', cache_dir=str(tmp_path)).put_many({'logo': _vec(5, 6)})
+
+        cache = EmbeddingCache('model-a', cache_dir=str(tmp_path))
+        found, missing = cache.get_many(['cutout', 'logo'])
+
+        assert missing == []
+        np.testing.assert_array_equal(found['cutout'], _vec(1, 2))
+        np.testing.assert_array_equal(found['logo'], _vec(5, 6))
+        assert cache.get_stats()['disk_hits'] == 2
+
+    @pytest.mark.unit
+    def test_models_are_isolated(self, tmp_path):
+        EmbeddingCache('model-a', cache_dir=str(tmp_path)).put_many({'cutout': _vec(1, 2)})
+
+        _, missing = EmbeddingCache('model-b', cache_dir=str(tmp_path)).get_many(['cutout'])
+
+        assert missing == ['cutout']
+
+    @pytest.mark.unit
+    def test_memory_tier_is_lru_bounded(self, tmp_path):
+        cache = EmbeddingCache('model-a', cache_dir=str(tmp_path), max_memory_entries=2)
+        cache.put_many({'a': _vec(1), 'b': _vec(2), 'c': _vec(3)})
+
+        assert cache.get_stats()['memory_entries'] == 2
+        found, missing = cache.get_many(['a'])
+        # Evicted from memory but still served from disk
+        assert missing == []
+        assert cache.get_stats()['disk_hits'] == 1
+
+    @pytest.mark.unit
+    def test_ignores_rows_from_interrupted_write(self, tmp_path):
+        cache = EmbeddingCache('model-a', cache_dir=str(tmp_path))
+        cache.put_many({'a': _vec(1, 2)})
+        with open(cache.vectors_path, 'ab') as f:
+            f.write(_vec(9, 9).tobytes())  # row never added to the index
+
+        fresh = EmbeddingCache('model-a', cache_dir=str(tmp_path))
+        fresh.put_many({'b': _vec(3, 4)})
+        found, _ = EmbeddingCache('model-a', cache_dir=str(tmp_path)).get_many(['a', 'b'])
+
+        np.testing.assert_array_equal(found['a'], _vec(1, 2))
+        np.testing.assert_array_equal(found['b'], _vec(3, 4))
+
+    @pytest.mark.unit
+    def test_disabled_cache_stores_nothing(self, tmp_path):
+        cache = EmbeddingCache('model-a', cache_dir=str(tmp_path), enabled=False)
+        cache.put_many({'a': _vec(1)})
+
+        assert cache.get_many(['a']) == ({}, ['a'])
+        assert not cache.vectors_path.exists()
+
+    @pytest.mark.unit
+    @pytest.mark.skipif(sys.platform == 'win32', reason='flock is POSIX only')
+    def test_concurrent_processes_keep_every_row(self, tmp_path):
+        """Writers in separate processes neither lose rows nor mismatch names."""
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(target=_put_worker, args=(str(tmp_path), worker, 40))
+            for worker in range(4)
+        ]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join(30)
+            assert process.exitcode == 0
+
+        names = [f'w{worker}-{i}' for worker in range(4) for i in range(40)]
+        found, missing = EmbeddingCache('model-a', cache_dir=str(tmp_path)).get_many(names)
+
+        assert missing == []
+        for worker in range(4):
+            for i in range(40):
+                np.testing.assert_array_equal(found[f'w{worker}-{i}'], _vec(worker, i))
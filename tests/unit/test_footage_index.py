@@ -0,0 +1,127 @@
+"""
+Unit tests for FootageIndex.
+
+Tests lookup priority, incremental refresh, persistence and directory listings.
+"""
+
+import os
+import pytest
+
+from modules.phase2.footage_index import FootageIndex
+
+
+def _touch(path, data=b'x'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+@pytest.fixture
+def roots(temp_dir):
+    uploads = os.path.join(temp_dir, 'uploads')
+    footage = os.path.join(temp_dir, 'footage')
+    os.makedirs(uploads)
+    os.makedirs(footage)
+    return uploads, footage
+
+
+@pytest.fixture
+def index(roots, temp_dir):
+    return FootageIndex(search_dirs=list(roots),
+                        index_path=os.path.join(temp_dir, 'index.json'),
+                        refresh_seconds=0)
+
+
+class TestResolve:
+    """Test resolving file names to paths."""
+
+    @pytest.mark.unit
+    def test_finds_nested_file(self, index, roots):
+        path = _touch(os.path.join(roots[1], 'shots', 'day1', 'bg.png'))
+        assert index.resolve('bg.png') == os.path.abspath(path)
+        assert index.resolve('missing.png') is None
+
+    @pytest.mark.unit
+    def test_earlier_root_wins(self, index, roots):
+        _touch(os.path.join(roots[1], 'logo.png'))
+        first = _touch(os.path.join(roots[0], 'deep', 'logo.png'))
+        assert index.resolve('logo.png') == os.path.abspath(first)
+        assert len(index.find_all('logo.png')) == 2
+
+    @pytest.mark.unit
+    def test_picks_up_added_and_removed_files(self, index, roots):
+        assert index.resolve('new.png') is None
+
+        path = _touch(os.path.join(roots[0], 'sub', 'new.png'))
+        assert index.resolve('new.png') == os.path.abspath(path)
+
+        os.remove(path)
+        assert index.resolve('new.png') is None
+        assert index.get_stats()['files'] == 0
+
+    @pytest.mark.unit
+    def test_new_file_found_within_refresh_interval(self, roots, temp_dir):
+        """A miss rescans even if the last rescan was a moment ago."""
+        index = FootageIndex(search_dirs=list(roots), index_path=None, refresh_seconds=60)
+        assert index.resolve('x.png') is None
+
+        new = _touch(os.path.join(roots[0], 'sub', 'new.png'))
+        assert index.resolve('new.png') == new
+
+    @pytest.mark.unit
+    def test_unchanged_directories_not_relisted(self, index, roots, monkeypatch):
+        _touch(os.path.join(roots[0], 'a', 'one.png'))
+        index.resolve('one.png')
+
+        listed = []
+        real_scandir = os.scandir
+        monkeypatch.setattr(os, 'scandir', lambda d: listed.append(d) or real_scandir(d))
+
+        _touch(os.path.join(roots[1], 'two.png'))
+        assert index.resolve('two.png')
+        assert listed == [os.path.abspath(roots[1])]
+
+
+class TestPersistence:
+    """Test loading a saved index."""
+
+    @pytest.mark.unit
+    def test_warm_start_reuses_saved_listing(self, index, roots, temp_dir, monkeypatch):
+        path = _touch(os.path.join(roots[0], 'clip.mov'))
+        index.resolve('clip.mov')
+        assert os.path.exists(os.path.join(temp_dir, 'index.json'))
+
+        def fail(_):
+            raise AssertionError('directory listed again')
+
+        monkeypatch.setattr(os, 'scandir', fail)
+        warm = FootageIndex(search_dirs=list(roots),
+                            index_path=os.path.join(temp_dir, 'index.json'))
+        assert warm.resolve('clip.mov') == os.path.abspath(path)
+
+    @pytest.mark.unit
+    def test_corrupt_index_rebuilt(self, roots, temp_dir):
+        index_path = _touch(os.path.join(temp_dir, 'index.json'), b'{not json')
+        path = _touch(os.path.join(roots[1], 'bg.png'))
+        index = FootageIndex(search_dirs=list(roots), index_path=index_path)
+        assert index.resolve('bg.png') == os.path.abspath(path)
+
+
+class TestListFiles:
+    """Test cached directory listings."""
+
+    @pytest.mark.unit
+    def test_lists_by_suffix(self, index, temp_dir):
+        exports = os.path.join(temp_dir, 'exports', 'job1')
+        _touch(os.path.join(exports, 'b.png'))
+        _touch(os.path.join(exports, 'a.png'))
+        _touch(os.path.join(exports, 'notes.txt'))
+
+        assert index.list_files(exports, '.png') == [
+            os.path.join(os.path.abspath(exports), 'a.png'),
+            os.path.join(os.path.abspath(exports), 'b.png'),
+        ]
+        # Outside the roots, so not searchable by name
+        assert index.resolve('a.png') is None
+        assert index.list_files(os.path.join(temp_dir, 'nope')) == []
@@ -0,0 +1,133 @@
+"""
+Unit tests for IngestionPool.
+
+Tests bounded parallel execution, streaming results, timeouts and failures.
+"""
+
+import os
+import time
+import pytest
+
+from services.ingestion_pool import IngestionPool
+
+
+def _square(value):
+    return value * value
+
+
+def _sleep_then_return(seconds, value):
+    time.sleep(seconds)
+    return value
+
+
+def _raise_value_error(message):
+    raise ValueError(message)
+
+
+def _hard_exit():
+    os._exit(3)
+
+
+def _report_pid():
+    time.sleep(0.2)
+    return os.getpid()
+
+
+_calls = 0
+
+
+def _count_calls():
+    global _calls
+    _calls += 1
+    return _calls
+
+
+def _exit_if(crash):
+    if crash:
+        os._exit(3)
+    return 'alive'
+
+
+class TestIngestionPool:
+    """Test IngestionPool behaviour."""
+
+    @pytest.mark.unit
+    def test_runs_all_tasks(self):
+        """Every task yields exactly one successful result."""
+        pool = IngestionPool(max_workers=3, task_timeout=30)
+        tasks = [(f'job{i}', (i,)) for i in range(6)]
+
+        results = dict(pool.imap_unordered(_square, tasks))
+
+        assert sorted(results) == [f'job{i}' for i in range(6)]
+        assert all(outcome['success'] for outcome in results.values())
+        assert results['job4']['result'] == 16
+
+    @pytest.mark.unit
+    def test_results_stream_in_completion_order(self):
+        """A fast task is yielded before a slow one submitted earlier."""
+        pool = IngestionPool(max_workers=2, task_timeout=30)
+        tasks = [('slow', (1.0, 'slow')), ('fast', (0.0, 'fast'))]
+
+        order = [task_id for task_id, _ in pool.imap_unordered(_sleep_then_return, tasks)]
+
+        assert order == ['fast', 'slow']
+
+    @pytest.mark.unit
+    def test_timeout_terminates_only_that_task(self):
+        """A task past its deadline is reported as timed out; others succeed."""
+        pool = IngestionPool(max_workers=2, task_timeout=0.5)
+        tasks = [('hang', (30, 'never')), ('ok', (0.0, 'done'))]
+
+        started = time.time()
+        results = dict(pool.imap_unordered(_sleep_then_return, tasks))
+
+        assert time.time() - started < 10
+        assert results['hang']['timed_out'] is True
+        assert not results['hang']['success']
+        assert results['ok']['result'] == 'done'
+
+    @pytest.mark.unit
+    def test_exceptions_and_crashes_are_reported(self):
+        """Raised exceptions and dead workers become failed outcomes."""
+        pool = IngestionPool(max_workers=2, task_timeout=30)
+
+        raised = dict(pool.imap_unordered(_raise_value_error, [('bad', ('boom',))]))
+        crashed = dict(pool.imap_unordered(_hard_exit, [('dead', ())]))
+
+        assert 'ValueError: boom' in raised['bad']['error']
+        assert 'exit code 3' in crashed['dead']['error']
+
+    @pytest.mark.unit
+    def test_concurrency_is_bounded(self):
+        """No more than max_workers processes run at once."""
+        pool = IngestionPool(max_workers=2, task_timeout=30)
+        tasks = [(f'job{i}', ()) for i in range(4)]
+
+        started = time.time()
+        results = dict(pool.imap_unordered(_report_pid, tasks))
+
+        # 4 tasks of 0.2s on 2 workers need at least two rounds
+        assert time.time() - started >= 0.4
+        assert len({outcome['result'] for outcome in results.values()}) == 2
+
+    @pytest.mark.unit
+    def test_workers_are_reused(self):
+        """Module-level state set up by one task is seen by the next on that worker."""
+        pool = IngestionPool(max_workers=1, task_timeout=30)
+        tasks = [(f'job{i}', ()) for i in range(3)]
+
+        results = dict(pool.imap_unordered(_count_calls, tasks))
+
+        assert sorted(outcome['result'] for outcome in results.values()) == [1, 2, 3]
+
+    @pytest.mark.unit
+    def test_crashed_worker_is_replaced(self):
+        """Tasks after a worker crash run on a fresh worker."""
+        pool = IngestionPool(max_workers=1, task_timeout=30)
+        tasks = [('dead', (True,)), ('after', (False,))]
+
+        results = dict(pool.imap_unordered(_exit_if, tasks))
+
+        assert 'exit code 3' in results['dead']['error']
+        assert results['after']['result'] == 'alive'
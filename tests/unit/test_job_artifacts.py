@@ -0,0 +1,129 @@
+"""
+Unit tests for artifact-backed Job payloads.
+
+Tests that large payloads round-trip through job_artifacts, that job list
+queries leave them unloaded, and that rows written before the artifact
+store still read their inline columns.
+"""
+
+import pytest
+from sqlalchemy import event, text
+
+from database import db_session
+from database.models import Job, JobArtifact
+from services.job_service import JobService
+
+
+def _add_job(job_id, stage=1):
+    job = Job(
+        job_id=job_id,
+        psd_path=f'/tmp/{job_id}.psd',
+        aepx_path=f'/tmp/{job_id}.aepx',
+        output_name=job_id,
+        current_stage=stage
+    )
+    db_session.add(job)
+    db_session.commit()
+    return job
+
+
+def _stage1_payload():
+    return {
+        'psd': {'layers': [{'name': f'layer_{i}', 'bounds': [0, 0, 100, 100]} for i in range(200)]},
+        'aepx': {'placeholders': []},
+        'matches': {}
+    }
+
+
+class TestJobArtifacts:
+    """Test job payload storage."""
+
+    @pytest.mark.unit
+    def test_payloads_round_trip_compressed(self, tmp_db):
+        _add_job('job1')
+        job_service = JobService()
+        job_service.store_stage1_results('job1', **{
+            key: value for key, value in zip(('psd_result', 'aepx_result', 'match_result'), _stage1_payload().values())
+        })
+        job = job_service.get_job('job1')
+        job.stage5_extendscript = '// populate\n' * 200
+        db_session.commit()
+        db_session.remove()
+
+        job = job_service.get_job('job1')
+        assert job.stage1_results['psd'] == _stage1_payload()['psd']
+        assert job.stage5_extendscript == '// populate\n' * 200
+        assert job.stage2_approved_matches is None
+
+        artifacts = {a.name: a for a in db_session.query(JobArtifact).filter_by(job_id='job1')}
+        assert artifacts['stage1_results'].encoding == 'json+zlib'
+        assert artifacts['stage5_extendscript'].encoding == 'text+zlib'
+        assert len(artifacts['stage1_results'].data) < artifacts['stage1_results'].size_bytes
+
+        inline = db_session.execute(text("SELECT stage1_results FROM jobs WHERE job_id = 'job1'")).scalar()
+        assert inline is None
+
+    @pytest.mark.unit
+    def test_clearing_payload_deletes_artifact(self, tmp_db):
+        job = _add_job('job1')
+        job.stage3_validation_results = {'valid': True}
+        db_session.commit()
+
+        job.stage3_validation_results = None
+        db_session.commit()
+
+        assert job.stage3_validation_results is None
+        assert db_session.query(JobArtifact).count() == 0
+
+    @pytest.mark.unit
+    def test_stage_listing_skips_payloads(self, tmp_db):
+        for index in range(3):
+            job = _add_job(f'job{index}', stage=2)
+            job.stage1_results = _stage1_payload()
+        db_session.commit()
+        db_session.remove()
+
+        statements = []
+
+        @event.listens_for(tmp_db, 'before_cursor_execute')
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        jobs = JobService().get_jobs_for_stage(2)
+        assert [job.output_name for job in jobs] == ['job0', 'job1', 'job2']
+
+        event.remove(tmp_db, 'before_cursor_execute', record)
+        assert len(statements) == 1
+        assert 'job_artifacts' not in statements[0]
+        assert 'stage1_results' not in statements[0]
+
+    @pytest.mark.unit
+    def test_legacy_inline_rows_still_read(self, tmp_db):
+        _add_job('legacy')
+        db_session.execute(text(
+            "UPDATE jobs SET stage2_approved_matches = '{\"approved_matches\": [1, 2]}', "
+            "stage5_extendscript = 'alert(1);' WHERE job_id = 'legacy'"
+        ))
+        db_session.commit()
+        db_session.remove()
+
+        job = JobService().get_job('legacy')
+        assert job.stage2_approved_matches == {'approved_matches': [1, 2]}
+        assert job.stage5_extendscript == 'alert(1);'
+
+        # Rewriting moves the payload into the artifact store
+        job.stage2_approved_matches = {'approved_matches': [3]}
+        db_session.commit()
+        inline = db_session.execute(text("SELECT stage2_approved_matches FROM jobs WHERE job_id = 'legacy'")).scalar()
+        assert inline is None
+        assert job.stage2_approved_matches == {'approved_matches': [3]}
+
+    @pytest.mark.unit
+    def test_deleting_job_deletes_artifacts(self, tmp_db):
+        job = _add_job('job1')
+        job.stage1_results = _stage1_payload()
+        db_session.commit()
+
+        JobService().delete_job('job1')
+
+        assert db_session.query(JobArtifact).count() == 0
@@ -0,0 +1,139 @@
+"""
+Unit tests for keyset pagination of the job listing APIs.
+
+Tests page order and completeness, index use, cursor validation and the
+NDJSON streaming mode of /api/jobs and /api/jobs/stage/<stage>.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from database import db_session
+from database.models import Job
+from services.job_service import JobService
+
+
+@pytest.fixture
+def jobs_db(tmp_db):
+    """Seed the throwaway database with 25 jobs."""
+    base = datetime(2025, 1, 1)
+    priorities = ['low', 'high', 'medium', 'high', None]
+    for index in range(25):
+        db_session.add(Job(
+            job_id=f'job{index:02d}',
+            psd_path='/tmp/a.psd',
+            aepx_path='/tmp/a.aepx',
+            output_name=f'out{index}',
+            priority=priorities[index % 5],
+            current_stage=2 if index % 3 else 1,
+            archived=index % 4 == 0,
+            # Pairs of jobs share a timestamp so job_id breaks ties
+            created_at=base + timedelta(minutes=index // 2)
+        ))
+    db_session.commit()
+    return tmp_db
+
+
+def _walk(page, **filters):
+    ids, after = [], None
+    while True:
+        jobs, after = page(limit=4, after=after, **filters)
+        ids.extend(job.job_id for job in jobs)
+        if not after:
+            return ids
+
+
+@pytest.fixture
+def client(jobs_db, monkeypatch):
+    from routes import job_routes
+    monkeypatch.setattr(job_routes, 'get_services', lambda: (JobService(), None, None))
+    app = Flask(__name__)
+    app.register_blueprint(job_routes.job_bp)
+    return app.test_client()
+
+
+class TestJobPagination:
+    """Test keyset pagination."""
+
+    @pytest.mark.unit
+    def test_stage_pages_match_full_ordering(self, jobs_db):
+        service = JobService()
+        rank = {'high': 1, 'medium': 2, 'low': 3}
+        expected = sorted(
+            db_session.query(Job).filter(Job.current_stage == 2),
+            key=lambda job: (rank.get(job.priority, 2), job.created_at, job.job_id)
+        )
+
+        assert _walk(service.page_jobs_for_stage, stage=2) == [job.job_id for job in expected]
+        assert [job.job_id for job in service.get_jobs_for_stage(2, limit=3)] == \
+            [job.job_id for job in expected[:3]]
+
+    @pytest.mark.unit
+    def test_job_pages_newest_first(self, jobs_db):
+        service = JobService()
+        for archived in (False, True):
+            expected = sorted(
+                (job for job in db_session.query(Job) if bool(job.archived) == archived),
+                key=lambda job: (job.created_at, job.job_id),
+                reverse=True
+            )
+            assert _walk(service.page_jobs, archived=archived) == [job.job_id for job in expected]
+
+    @pytest.mark.unit
+    def test_stage_page_uses_keyset_index(self, jobs_db):
+        service = JobService()
+        _, cursor = service.page_jobs_for_stage(2, limit=2)
+
+        statements = []
+        from sqlalchemy import event
+
+        @event.listens_for(jobs_db, 'before_cursor_execute')
+        def record(conn, cursor_, statement, parameters, *args):
+            statements.append((statement, parameters))
+
+        service.page_jobs_for_stage(2, limit=2, after=cursor)
+        event.remove(jobs_db, 'before_cursor_execute', record)
+
+        statement, parameters = statements[0]
+        with jobs_db.connect() as conn:
+            plan = ' '.join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+        assert 'idx_job_stage_keyset' in plan
+        assert 'TEMP B-TREE' not in plan
+
+    @pytest.mark.unit
+    def test_invalid_cursor(self, jobs_db):
+        service = JobService()
+        _, cursor = service.page_jobs(limit=2)
+        with pytest.raises(ValueError):
+            service.page_jobs(after='not-a-cursor')
+        with pytest.raises(ValueError):
+            # A /api/jobs cursor is not valid for a stage listing
+            service.page_jobs_for_stage(2, after=cursor)
+
+
+class TestJobListingRoutes:
+    """Test the paginated and streaming routes."""
+
+    @pytest.mark.unit
+    def test_paged_json(self, client):
+        first = client.get('/api/jobs/stage/2?limit=5').get_json()
+        second = client.get(f"/api/jobs/stage/2?limit=5&cursor={first['next_cursor']}").get_json()
+
+        assert first['count'] == 5 and second['count'] == 5
+        assert not {j['job_id'] for j in first['jobs']} & {j['job_id'] for j in second['jobs']}
+        assert client.get('/api/jobs?cursor=bogus').status_code == 400
+
+    @pytest.mark.unit
+    def test_ndjson_stream(self, client):
+        response = client.get('/api/jobs?format=ndjson&archived=true')
+        assert response.mimetype == 'application/x-ndjson'
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert len(rows) == 7
+        assert all(row['archived'] for row in rows)
+
+        response = client.get('/api/jobs/stage/1', headers={'Accept': 'application/x-ndjson'})
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert len(rows) == 9
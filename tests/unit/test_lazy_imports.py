@@ -0,0 +1,73 @@
+"""
+Unit tests for lazy imports and lazily built container services.
+"""
+
+import sys
+
+import pytest
+
+from core.lazy_imports import LazyModule, is_available, lazy_import
+
+
+class TestLazyImports:
+    """Test deferred module loading."""
+
+    @pytest.mark.unit
+    def test_module_loads_on_first_attribute_access(self, monkeypatch):
+        monkeypatch.delitem(sys.modules, 'wave', raising=False)
+
+        wave = lazy_import('wave')
+
+        assert isinstance(wave, LazyModule)
+        assert 'wave' not in sys.modules
+        assert wave.WAVE_FORMAT_PCM == 1
+        assert 'wave' in sys.modules
+
+    @pytest.mark.unit
+    def test_already_loaded_module_returned_directly(self):
+        import json
+        assert lazy_import('json') is json
+
+    @pytest.mark.unit
+    def test_missing_module(self):
+        assert is_available('definitely_not_a_real_module') is False
+        with pytest.raises(ImportError):
+            lazy_import('definitely_not_a_real_module')
+
+
+    @pytest.mark.unit
+    def test_submodule_check_does_not_import_package(self, tmp_path, monkeypatch):
+        package = tmp_path / 'lazy_pkg'
+        package.mkdir()
+        (package / '__init__.py').write_text("raise RuntimeError('package imported')\n")
+        (package / 'image.py').write_text('VALUE = 1\n')
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        assert is_available('lazy_pkg.image') is True
+        assert is_available('lazy_pkg.missing') is False
+        assert 'lazy_pkg' not in sys.modules
+
+
+class TestLazyContainer:
+    """Test that container services are built on first access."""
+
+    @pytest.mark.unit
+    def test_services_built_on_demand_and_cached(self):
+        from config.container import container
+
+        container.__dict__.pop('validation_service', None)
+        assert 'validation_service' not in container.loaded_services()
+
+        service = container.validation_service
+
+        assert 'validation_service' in container.loaded_services()
+        assert container.validation_service is service
+
+    @pytest.mark.unit
+    def test_dependent_services_resolved(self):
+        from config.container import container
+
+        project_service = container.project_service
+
+        assert project_service.psd_service is container.psd_service
+        assert project_service.aepx_service is container.aepx_service
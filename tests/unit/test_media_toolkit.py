@@ -0,0 +1,157 @@
+"""
+Unit tests for MediaToolkit.
+
+Uses stand-in ffmpeg/ffprobe scripts that record each invocation, so probe
+memoization and single-run frame extraction can be checked without ffmpeg.
+"""
+
+import json
+import os
+import stat
+import sys
+import pytest
+
+from modules.phase5.media_toolkit import MediaToolkit
+
+
+FAKE_FFPROBE = '''#!{python}
+import json, sys
+with open({calls!r}, 'a') as f:
+    f.write(json.dumps(sys.argv[1:]) + '\\n')
+if open(sys.argv[-1]).read() == 'not video':
+    sys.exit(1)
+print(json.dumps({{
+    'format': {{'duration': '4.0'}},
+    'streams': [{{'codec_type': 'audio'}},
+                {{'codec_type': 'video', 'width': 960, 'height': 540, 'r_frame_rate': '30000/1001'}}]
+}}))
+'''
+
+FAKE_FFMPEG = '''#!{python}
+import json, sys
+args = sys.argv[1:]
+with open({calls!r}, 'a') as f:
+    f.write(json.dumps(args) + '\\n')
+# Every argument after an input/output option pair that looks like an image is an output
+for arg in args:
+    if arg.endswith(('.jpg', '.png')):
+        with open(arg, 'w') as out:
+            out.write('frame')
+'''
+
+
+def _script(path, template, calls):
+    with open(path, 'w') as f:
+        f.write(template.format(python=sys.executable, calls=calls))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+def _calls(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def toolkit(temp_dir):
+    ffprobe = _script(os.path.join(temp_dir, 'ffprobe'), FAKE_FFPROBE, os.path.join(temp_dir, 'probe_calls'))
+    ffmpeg = _script(os.path.join(temp_dir, 'ffmpeg'), FAKE_FFMPEG, os.path.join(temp_dir, 'ffmpeg_calls'))
+    return MediaToolkit(ffmpeg_path=ffmpeg, ffprobe_path=ffprobe, max_workers=4)
+
+
+@pytest.fixture
+def video(temp_dir):
+    path = os.path.join(temp_dir, 'preview.mp4')
+    with open(path, 'w') as f:
+        f.write('mp4 bytes')
+    return path
+
+
+class TestProbe:
+    """Test probing and memoization."""
+
+    @pytest.mark.unit
+    def test_video_info(self, toolkit, video):
+        info = toolkit.video_info(video)
+        assert info['duration'] == 4.0
+        assert info['resolution'] == '960x540'
+        assert info['fps'] == pytest.approx(29.97, abs=0.01)
+        assert toolkit.has_video_stream(video) is True
+
+    @pytest.mark.unit
+    def test_probe_memoized_until_file_changes(self, toolkit, video, temp_dir):
+        toolkit.video_info(video)
+        toolkit.has_video_stream(video)
+        assert len(_calls(os.path.join(temp_dir, 'probe_calls'))) == 1
+
+        with open(video, 'a') as f:
+            f.write(' re-rendered')
+        toolkit.video_info(video)
+        assert len(_calls(os.path.join(temp_dir, 'probe_calls'))) == 2
+
+    @pytest.mark.unit
+    def test_failed_probe_not_memoized(self, toolkit, temp_dir):
+        bad = os.path.join(temp_dir, 'bad.mp4')
+        with open(bad, 'w') as f:
+            f.write('not video')
+
+        assert toolkit.probe(bad) is None
+        assert toolkit.probe(bad) is None
+        assert len(_calls(os.path.join(temp_dir, 'probe_calls'))) == 2
+        assert toolkit.video_info(bad) == {'duration': None, 'resolution': None, 'fps': None}
+
+    @pytest.mark.unit
+    def test_probe_many(self, toolkit, temp_dir):
+        paths = []
+        for index in range(5):
+            path = os.path.join(temp_dir, f'clip{index}.mp4')
+            with open(path, 'w') as f:
+                f.write(f'clip {index}')
+            paths.append(path)
+
+        results = toolkit.probe_many(paths + paths[:2])
+        assert list(results) == paths
+        assert all(result['format']['duration'] == '4.0' for result in results.values())
+        assert len(_calls(os.path.join(temp_dir, 'probe_calls'))) == 5
+
+    @pytest.mark.unit
+    def test_missing_binaries(self, video, monkeypatch):
+        monkeypatch.setenv('PATH', '')
+        toolkit = MediaToolkit()
+        assert toolkit.probe(video) is None
+        assert toolkit.extract_frames(video, [0.5]) == [None]
+
+
+class TestFrames:
+    """Test frame extraction."""
+
+    @pytest.mark.unit
+    def test_several_frames_in_one_run(self, toolkit, video, temp_dir):
+        outputs = [os.path.join(temp_dir, name) for name in ('poster.jpg', 'mid.jpg', 'end.jpg')]
+        assert toolkit.extract_frames(video, [0.5, 2.0, 3.5], outputs) == outputs
+
+        calls = _calls(os.path.join(temp_dir, 'ffmpeg_calls'))
+        assert len(calls) == 1
+        args = calls[0]
+        assert args.count('-i') == 3
+        assert [args[i + 1] for i, arg in enumerate(args) if arg == '-ss'] == ['0.5', '2.0', '3.5']
+        assert [args[i + 1] for i, arg in enumerate(args) if arg == '-map'] == ['0:v:0', '1:v:0', '2:v:0']
+
+    @pytest.mark.unit
+    def test_default_output_names(self, toolkit, video, temp_dir):
+        assert toolkit.extract_frames(video, [1, 2]) == [
+            os.path.join(temp_dir, 'preview_0.jpg'),
+            os.path.join(temp_dir, 'preview_1.jpg'),
+        ]
+        with pytest.raises(ValueError):
+            toolkit.extract_frames(video, [1, 2], ['only_one.jpg'])
+
+    @pytest.mark.unit
+    def test_contact_sheet(self, toolkit, video, temp_dir):
+        sheet = os.path.join(temp_dir, 'sheet.jpg')
+        assert toolkit.contact_sheet(video, sheet, count=6, columns=3) == sheet
+
+        args = _calls(os.path.join(temp_dir, 'ffmpeg_calls'))[0]
+        assert args[args.index('-vf') + 1] == 'fps=6/4.0,scale=320:-2,tile=3x2'
@@ -0,0 +1,120 @@
+"""
+Unit tests for the ML content matcher.
+
+Uses a deterministic stand-in model to check batched encoding and
+vectorized scoring without sentence-transformers installed.
+"""
+
+import numpy as np
+import pytest
+
+from modules.phase3 import ml_content_matcher
+from modules.phase3.embedding_cache import EmbeddingCache
+
+
+class _CountingModel:
+    """Fake sentence transformer that records encode() calls."""
+
+    VECTORS = {
+        'Title': [1.0, 0.0, 0.0],
+        'player_name': [0.0, 1.0, 0.0],
+        'player_photo': [0.0, 0.0, 1.0],
+        'title_text': [0.9, 0.1, 0.0],
+        'name_text': [0.0, 1.0, 0.1],
+        'featured_image': [0.1, 0.0, 1.0],
+    }
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append(list(texts))
+        return np.array([self.VECTORS.get(t, [0.0, 0.0, 0.0]) for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def fake_model(monkeypatch, tmp_path):
+    model = _CountingModel()
+    monkeypatch.setattr(ml_content_matcher, '_ML_AVAILABLE', True)
+    monkeypatch.setattr(ml_content_matcher, '_MODEL_CACHE', model)
+    monkeypatch.setattr(ml_content_matcher, '_EMBEDDING_CACHE',
+                        EmbeddingCache('fake-model', cache_dir=str(tmp_path)))
+    return model
+
+
+def _job():
+    psd = {'layers': [
+        {'name': 'Title', 'type': 'text', 'y': 10},
+        {'name': 'player_name', 'type': 'text', 'y': 50},
+        {'name': 'player_photo', 'type': 'image', 'width': 800, 'height': 600},
+    ]}
+    aepx = {
+        'composition_name': 'Main',
+        'compositions': [{'name': 'Main', 'width': 1920, 'height': 1080}],
+        'placeholders': [
+            {'name': 'title_text', 'type': 'text'},
+            {'name': 'name_text', 'type': 'text'},
+            {'name': 'featured_image', 'type': 'image'},
+        ],
+    }
+    return psd, aepx
+
+
+class TestMLContentMatcher:
+    """Test batched embedding and vectorized scoring."""
+
+    @pytest.mark.unit
+    def test_single_encode_call_per_job(self, fake_model):
+        psd, aepx = _job()
+
+        result = ml_content_matcher.match_content_to_slots_ml(psd, aepx)
+
+        assert len(fake_model.calls) == 1
+        pairs = {(m['psd_layer'], m['aepx_placeholder']) for m in result['mappings']}
+        assert pairs == {
+            ('Title', 'title_text'),
+            ('player_name', 'name_text'),
+            ('player_photo', 'featured_image'),
+        }
+        assert result['unmapped_psd_layers'] == []
+        assert result['unfilled_placeholders'] == []
+
+    @pytest.mark.unit
+    def test_batch_shares_one_encode_call(self, fake_model):
+        jobs = [_job() for _ in range(5)]
+
+        results = ml_content_matcher.match_batch_ml(jobs)
+
+        assert len(fake_model.calls) == 1
+        # Duplicate names across jobs are encoded once
+        assert len(fake_model.calls[0]) == len(set(fake_model.calls[0]))
+        assert all(len(r['mappings']) == 3 for r in results)
+
+    @pytest.mark.unit
+    def test_zero_vectors_score_zero(self, fake_model):
+        psd = {'layers': [{'name': 'unknown', 'type': 'image', 'width': 10, 'height': 10}]}
+        aepx = {
+            'composition_name': 'Main',
+            'compositions': [{'name': 'Main', 'width': 1920, 'height': 1080}],
+            'placeholders': [{'name': 'also_unknown', 'type': 'image'}],
+        }
+
+        result = ml_content_matcher.match_content_to_slots_ml(psd, aepx)
+
+        assert result['mappings'] == []
+        assert result['unfilled_placeholders'] == ['also_unknown']
+
+    @pytest.mark.unit
+    def test_warm_match_needs_no_inference(self, fake_model, tmp_path, monkeypatch):
+        psd, aepx = _job()
+        cold = ml_content_matcher.match_content_to_slots_ml(psd, aepx)
+
+        # Fresh process: empty memory tier, same disk store, no model
+        monkeypatch.setattr(ml_content_matcher, '_EMBEDDING_CACHE',
+                            EmbeddingCache('fake-model', cache_dir=str(tmp_path)))
+        monkeypatch.setattr(ml_content_matcher, '_MODEL_CACHE', None)
+        monkeypatch.setattr(ml_content_matcher, '_get_model', lambda: None)
+        warm = ml_content_matcher.match_content_to_slots_ml(psd, aepx)
+
+        assert len(fake_model.calls) == 1
+        assert warm == cold
@@ -0,0 +1,130 @@
+"""
+Unit tests for ParseCache.
+
+Tests content-addressed lookups, LRU/disk tiers, and eviction.
+"""
+
+import os
+import pytest
+
+from services.parse_cache import ParseCache
+from services.aepx_service import AEPXService
+from core.logging_config import get_service_logger
+
+
+@pytest.fixture
+def parse_cache(temp_dir):
+    """Create a ParseCache rooted in a temporary directory."""
+    return ParseCache(cache_dir=os.path.join(temp_dir, 'cache'))
+
+
+def _write(temp_dir, name, content):
+    path = os.path.join(temp_dir, name)
+    with open(path, 'w') as f:
+        f.write(content)
+    return path
+
+
+class TestParseCacheLookups:
+    """Test cache hits, misses and content addressing."""
+
+    @pytest.mark.unit
+    def test_miss_then_memory_hit(self, parse_cache, temp_dir):
+        """Second lookup of the same file is served from memory."""
+        path = _write(temp_dir, 'a.aepx', '<xml/>')
+        calls = []
+
+        def parse():
+            calls.append(1)
+            return {'layers': [1, 2]}
+
+        first = parse_cache.get_or_parse('aepx', path, '1', parse)
+        second = parse_cache.get_or_parse('aepx', path, '1', parse)
+
+        assert first == second == {'layers': [1, 2]}
+        assert len(calls) == 1
+        stats = parse_cache.get_stats()
+        assert stats['misses'] == 1
+        assert stats['memory_hits'] == 1
+
+    @pytest.mark.unit
+    def test_same_content_different_path_hits(self, parse_cache, temp_dir):
+        """Entries are keyed by content, not path."""
+        a = _write(temp_dir, 'a.aepx', '<same/>')
+        b = _write(temp_dir, 'b.aepx', '<same/>')
+
+        parse_cache.put('aepx', a, '1', {'value': 42})
+
+        assert parse_cache.get('aepx', b, '1') == {'value': 42}
+
+    @pytest.mark.unit
+    def test_version_bump_invalidates(self, parse_cache, temp_dir):
+        """A different parser version never returns old entries."""
+        path = _write(temp_dir, 'a.aepx', '<xml/>')
+        parse_cache.put('aepx', path, '1', {'value': 1})
+
+        assert parse_cache.get('aepx', path, '2') is None
+
+    @pytest.mark.unit
+    def test_disk_tier_shared_between_instances(self, temp_dir):
+        """A new cache instance reads entries written by another one."""
+        cache_dir = os.path.join(temp_dir, 'cache')
+        path = _write(temp_dir, 'a.psd', 'psd-bytes')
+
+        ParseCache(cache_dir=cache_dir).put('psd', path, '1', {'layers': []})
+        other = ParseCache(cache_dir=cache_dir)
+
+        assert other.get('psd', path, '1') == {'layers': []}
+        assert other.get_stats()['disk_hits'] == 1
+
+    @pytest.mark.unit
+    def test_results_are_copies(self, parse_cache, temp_dir):
+        """Mutating a returned result does not corrupt the cache."""
+        path = _write(temp_dir, 'a.aepx', '<xml/>')
+        parse_cache.put('aepx', path, '1', {'layers': ['x']})
+
+        parse_cache.get('aepx', path, '1')['layers'].append('y')
+
+        assert parse_cache.get('aepx', path, '1') == {'layers': ['x']}
+
+
+class TestParseCacheEviction:
+    """Test size-based eviction."""
+
+    @pytest.mark.unit
+    def test_memory_lru_bounded(self, temp_dir):
+        """In-memory tier keeps at most max_memory_entries."""
+        cache = ParseCache(cache_dir=os.path.join(temp_dir, 'cache'), max_memory_entries=2)
+        for i in range(4):
+            path = _write(temp_dir, f'{i}.aepx', f'<x{i}/>')
+            cache.put('aepx', path, '1', {'i': i})
+
+        assert cache.get_stats()['memory_entries'] == 2
+
+    @pytest.mark.unit
+    def test_disk_budget_enforced(self, temp_dir):
+        """Oldest entries are removed once the disk budget is exceeded."""
+        cache = ParseCache(cache_dir=os.path.join(temp_dir, 'cache'), max_disk_bytes=2500)
+        for i in range(5):
+            path = _write(temp_dir, f'{i}.aepx', f'<x{i}/>')
+            cache.put('aepx', path, '1', {'blob': 'x' * 1000, 'i': i})
+
+        stats = cache.get_stats()
+        assert stats['disk_bytes'] <= 2500
+        assert stats['evictions'] >= 3
+
+
+class TestServiceIntegration:
+    """Test services route parsing through the cache."""
+
+    @pytest.mark.unit
+    def test_aepx_service_reuses_parse(self, parse_cache, valid_aepx_file, temp_dir):
+        """Repeated template parses become cache lookups."""
+        service = AEPXService(get_service_logger('test_aepx'), parse_cache=parse_cache)
+
+        first = service.parse_aepx(valid_aepx_file)
+        second = service.parse_aepx(valid_aepx_file)
+
+        assert first.is_success() and second.is_success()
+        assert first.get_data() == second.get_data()
+        assert parse_cache.get_stats()['memory_hits'] == 1
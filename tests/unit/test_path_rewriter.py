@@ -0,0 +1,105 @@
+"""
+Unit tests for PathRewriter.
+
+Tests single-pass replacement, chunk boundaries and fix_footage_paths.
+"""
+
+import os
+import re
+import pytest
+
+from modules.phase2.path_rewriter import PathRewriter, rewrite_paths
+from modules.phase2.aepx_path_fixer import fix_footage_paths
+
+
+def _sequential(text, mapping):
+    """Reference: the old one-re.sub-per-path rewrite."""
+    for old, new in mapping.items():
+        text = re.sub(re.escape(old), new.replace('\\', '\\\\'), text)
+    return text
+
+
+class TestRewrite:
+    """Test in-memory rewriting."""
+
+    @pytest.mark.unit
+    def test_replaces_all_paths_and_counts(self):
+        mapping = {'/Users/a/bg.png': 'footage/bg.png', '/Users/a/logo (1).png': 'footage/logo.png'}
+        text = '<f path="/Users/a/bg.png"/><f path="/Users/a/logo (1).png"/><f path="/Users/a/bg.png"/>'
+
+        new_text, counts = PathRewriter(mapping).rewrite(text)
+        assert new_text == _sequential(text, mapping)
+        assert counts == {'/Users/a/bg.png': 2, '/Users/a/logo (1).png': 1}
+
+    @pytest.mark.unit
+    def test_longest_path_wins(self):
+        mapping = {'/a/bg.png': 'short.png', '/a/bg.png.bak': 'long.png'}
+        assert PathRewriter(mapping).rewrite('x /a/bg.png.bak y /a/bg.png')[0] == 'x long.png y short.png'
+
+    @pytest.mark.unit
+    def test_replacement_is_literal(self):
+        new_text, _ = PathRewriter({'/a.png': 'C:\\temp\\1.png'}).rewrite('"/a.png"')
+        assert new_text == '"C:\\temp\\1.png"'
+
+    @pytest.mark.unit
+    def test_empty_mapping_is_noop(self):
+        assert PathRewriter({}).rewrite('abc') == ('abc', {})
+
+
+class TestRewriteFile:
+    """Test streaming file rewriting."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('chunk_size', [1, 7, 64, 1 << 20])
+    def test_matches_across_chunk_boundaries(self, temp_dir, chunk_size):
+        mapping = {'/Volumes/Shoot/clip_%d.mov' % i: 'footage/clip_%d.mov' % i for i in range(12)}
+        mapping['/Volumes/Shoot/clip_1.mov.xmp'] = 'footage/clip_1.xmp'
+        text = '\r\n'.join('<fileReference fullpath="/Volumes/Shoot/clip_%d.mov%s"/> é'
+                           % (i % 12, '.xmp' if i % 5 == 0 else '') for i in range(60))
+
+        path = os.path.join(temp_dir, 'project.aepx')
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+
+        counts = PathRewriter(mapping).rewrite_file(path, chunk_size=chunk_size)
+
+        with open(path, encoding='utf-8', newline='') as f:
+            assert f.read() == PathRewriter(mapping).rewrite(text)[0]
+        assert sum(counts.values()) == 60
+        assert not [n for n in os.listdir(temp_dir) if n.endswith('.tmp')]
+
+    @pytest.mark.unit
+    def test_writes_to_separate_output(self, temp_dir):
+        src = os.path.join(temp_dir, 'in.aepx')
+        dst = os.path.join(temp_dir, 'out.aepx')
+        with open(src, 'w', encoding='utf-8') as f:
+            f.write('/old/a.png')
+
+        assert rewrite_paths(src, {'/old/a.png': 'a.png'}, dst) == {'/old/a.png': 1}
+        with open(src) as f:
+            assert f.read() == '/old/a.png'
+        with open(dst) as f:
+            assert f.read() == 'a.png'
+
+
+class TestFixFootagePaths:
+    """Test fix_footage_paths uses the rewriter."""
+
+    @pytest.mark.unit
+    def test_rewrites_found_footage(self, temp_dir):
+        footage_dir = os.path.join(temp_dir, 'footage')
+        os.makedirs(footage_dir)
+        open(os.path.join(footage_dir, 'bg.png'), 'wb').close()
+
+        aepx = os.path.join(temp_dir, 'template.aepx')
+        with open(aepx, 'w', encoding='utf-8') as f:
+            f.write('<AfterEffectsProject><fileReference fullpath="/Users/x/bg.png"/>'
+                    '<fileReference fullpath="/Users/x/gone_forever.png"/></AfterEffectsProject>')
+
+        result = fix_footage_paths(aepx, footage_dir=footage_dir)
+
+        assert result['success']
+        assert result['fixed_paths'] == {'/Users/x/bg.png': 'footage/bg.png'}
+        assert result['missing_files'] == ['gone_forever.png']
+        with open(result['output_path'], encoding='utf-8') as f:
+            assert 'fullpath="footage/bg.png"' in f.read()
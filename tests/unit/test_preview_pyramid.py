@@ -0,0 +1,120 @@
+"""
+Unit tests for PreviewPyramid.
+
+Tests level sizes, tile round-trips, level selection and eviction.
+"""
+
+import os
+import pytest
+from PIL import Image
+
+from services.preview_pyramid import PreviewPyramid
+
+
+def _write_psd(path, size=(1100, 700)):
+    """PSD with a gradient-ish pixel layer spanning several tiles."""
+    from psd_tools import PSDImage
+
+    image = Image.new('RGB', size)
+    image.putdata([((x * 7) % 256, (y * 3) % 256, (x + y) % 256)
+                   for y in range(size[1]) for x in range(size[0])])
+    psd = PSDImage.new('RGB', size)
+    psd.create_pixel_layer(image, name='Art')
+    psd.save(path)
+    return path
+
+
+@pytest.fixture
+def pyramid(temp_dir):
+    return PreviewPyramid(cache_dir=os.path.join(temp_dir, 'previews'), tile_size=256)
+
+
+@pytest.fixture
+def psd_path(temp_dir):
+    return _write_psd(os.path.join(temp_dir, 'art.psd'))
+
+
+class TestPyramidLevels:
+    """Test building and reading pyramid levels."""
+
+    @pytest.mark.unit
+    def test_miss_builds_all_levels(self, pyramid, psd_path):
+        assert pyramid.get_image(psd_path, 'full') is None
+
+        thumb = pyramid.get_or_build(psd_path, 'thumb')
+        assert max(thumb.size) == 400
+
+        meta = pyramid.get_meta(psd_path)
+        assert meta['levels']['full']['size'] == [1100, 700]
+        assert meta['levels']['half']['size'] == [550, 350]
+        assert meta['levels']['quarter']['size'] == [275, 175]
+        assert meta['levels']['full']['rows'] == 3 and meta['levels']['full']['cols'] == 5
+
+        stats = pyramid.get_stats()
+        assert stats['builds'] == 1 and stats['entries'] == 1
+
+    @pytest.mark.unit
+    def test_full_level_round_trips_composite(self, pyramid, psd_path):
+        """Tiles reassemble to exactly the composited image."""
+        from psd_tools import PSDImage
+
+        composite = PSDImage.open(psd_path).composite()
+        assert pyramid.store(psd_path, composite)
+
+        full = pyramid.get_image(psd_path, 'full')
+        assert full.mode == composite.mode
+        assert full.tobytes() == composite.tobytes()
+
+    @pytest.mark.unit
+    def test_cache_hit_does_not_composite(self, pyramid, psd_path, monkeypatch):
+        pyramid.get_or_build(psd_path, 'half')
+
+        def fail(_):
+            raise AssertionError('composited again')
+
+        monkeypatch.setattr(pyramid, '_composite', fail)
+        assert pyramid.get_or_build(psd_path, 'quarter').size == (275, 175)
+        assert pyramid.get_stats()['hits'] >= 1
+
+    @pytest.mark.unit
+    def test_level_for_size(self, pyramid, psd_path):
+        """Smallest level covering the request; thumb (400x254) beats quarter (275x175)."""
+        assert pyramid.get_level_for_size(psd_path, 500, 300) == 'half'
+        assert pyramid.get_level_for_size(psd_path, 300, 200) == 'thumb'
+        assert pyramid.get_level_for_size(psd_path, 270, 170) == 'quarter'
+        assert pyramid.get_level_for_size(psd_path, 1000, 700) == 'full'
+        assert pyramid.get_level_for_size(psd_path, 1920, 1080) == 'full'
+
+    @pytest.mark.unit
+    def test_unknown_level_rejected(self, pyramid, psd_path):
+        with pytest.raises(ValueError):
+            pyramid.get_image(psd_path, 'eighth')
+
+    @pytest.mark.unit
+    def test_non_psd_falls_back_to_merged_image(self, pyramid, temp_dir):
+        path = os.path.join(temp_dir, 'flat.png')
+        Image.new('RGB', (300, 100), (10, 20, 30)).save(path)
+        assert pyramid.get_or_build(path, 'full').getpixel((5, 5)) == (10, 20, 30)
+
+    @pytest.mark.unit
+    def test_disabled_cache_still_returns_images(self, temp_dir, psd_path):
+        pyramid = PreviewPyramid(cache_dir=os.path.join(temp_dir, 'off'), enabled=False)
+        assert pyramid.get_or_build(psd_path, 'half').size == (550, 350)
+        assert not os.path.exists(os.path.join(temp_dir, 'off'))
+
+
+class TestPyramidEviction:
+    """Test disk budget enforcement."""
+
+    @pytest.mark.unit
+    def test_oldest_entries_evicted(self, temp_dir):
+        pyramid = PreviewPyramid(cache_dir=os.path.join(temp_dir, 'previews'), max_disk_bytes=1)
+        first = _write_psd(os.path.join(temp_dir, 'a.psd'), size=(64, 64))
+        second = _write_psd(os.path.join(temp_dir, 'b.psd'), size=(80, 64))
+
+        pyramid.get_or_build(first, 'thumb')
+        pyramid.get_or_build(second, 'thumb')
+
+        assert pyramid.get_meta(first) is None
+        assert pyramid.get_meta(second) is not None
+        assert pyramid.get_stats()['evictions'] == 1
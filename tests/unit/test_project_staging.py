@@ -0,0 +1,121 @@
+"""
+Unit tests for project staging.
+
+Tests hardlink/copy staging and the content-addressed PNG conversion cache.
+"""
+
+import os
+import pytest
+from PIL import Image
+
+from modules.phase5 import project_staging, preview_generator
+from modules.phase5.project_staging import ConversionCache, stage_file
+
+
+def _write(path, data=b'footage'):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+class TestStageFile:
+    """Test staging files into a temp directory."""
+
+    @pytest.mark.unit
+    def test_footage_is_hardlinked(self, temp_dir):
+        source = _write(os.path.join(temp_dir, 'clip.mov'))
+        dest = os.path.join(temp_dir, 'stage', 'clip.mov')
+
+        assert stage_file(source, dest, mode='link') == 'hardlink'
+        assert os.path.samefile(source, dest)
+
+    @pytest.mark.unit
+    def test_writable_files_never_share_inode(self, temp_dir):
+        source = _write(os.path.join(temp_dir, 'template.aepx'), b'<xml/>')
+        dest = os.path.join(temp_dir, 'stage', 'template.aepx')
+
+        assert stage_file(source, dest, writable=True, mode='link') in ('reflink', 'copy')
+        _write(dest, b'<changed/>')
+        with open(source, 'rb') as f:
+            assert f.read() == b'<xml/>'
+
+    @pytest.mark.unit
+    def test_falls_back_to_copy(self, temp_dir, monkeypatch):
+        source = _write(os.path.join(temp_dir, 'clip.mov'))
+        dest = os.path.join(temp_dir, 'clip_copy.mov')
+
+        def no_link(*args):
+            raise OSError('cross-device link')
+
+        monkeypatch.setattr(os, 'link', no_link)
+        monkeypatch.setattr(project_staging, '_reflink', lambda source, dest: False)
+
+        assert stage_file(source, dest) == 'copy'
+        assert not os.path.samefile(source, dest)
+
+    @pytest.mark.unit
+    def test_replaces_existing_dest(self, temp_dir):
+        source = _write(os.path.join(temp_dir, 'new.png'), b'new')
+        dest = _write(os.path.join(temp_dir, 'old.png'), b'old')
+
+        stage_file(source, dest, mode='copy')
+        with open(dest, 'rb') as f:
+            assert f.read() == b'new'
+
+    @pytest.mark.unit
+    def test_invalid_mode_rejected(self, monkeypatch):
+        monkeypatch.setenv('PREVIEW_STAGING_MODE', 'symlink')
+        with pytest.raises(ValueError):
+            project_staging.get_staging_mode()
+
+
+class TestPngConversionCache:
+    """Test AE-compatible PNG conversions are cached by content."""
+
+    @pytest.fixture
+    def png_cache(self, temp_dir, monkeypatch):
+        cache = ConversionCache(cache_dir=os.path.join(temp_dir, 'ae_png'))
+        monkeypatch.setattr(project_staging, '_png_cache', cache)
+        return cache
+
+    @pytest.mark.unit
+    def test_identical_content_converted_once(self, png_cache, temp_dir):
+        first = os.path.join(temp_dir, 'a.png')
+        second = os.path.join(temp_dir, 'b.png')
+        Image.new('RGB', (20, 10), (255, 0, 0)).save(first)
+        Image.new('RGB', (20, 10), (255, 0, 0)).save(second)
+
+        out_a = preview_generator.make_ae_compatible_png(first, os.path.join(temp_dir, 'job1'))
+        out_b = preview_generator.make_ae_compatible_png(second, os.path.join(temp_dir, 'job2'))
+
+        assert png_cache.stats == {'hits': 1, 'misses': 1, 'evictions': 0}
+        assert out_a.endswith('a_ae.png') and out_b.endswith('b_ae.png')
+        with Image.open(out_b) as converted:
+            assert converted.mode == 'RGBA'
+            assert converted.getpixel((0, 0)) == (255, 0, 0, 255)
+
+    @pytest.mark.unit
+    def test_changed_content_reconverted(self, png_cache, temp_dir):
+        path = os.path.join(temp_dir, 'a.png')
+        Image.new('RGB', (20, 10), (255, 0, 0)).save(path)
+        preview_generator.make_ae_compatible_png(path, temp_dir)
+
+        Image.new('RGB', (20, 10), (0, 0, 255)).save(path)
+        os.utime(path, ns=(1, 1))
+        output = preview_generator.make_ae_compatible_png(path, os.path.join(temp_dir, 'job'))
+
+        assert png_cache.stats['misses'] == 2
+        with Image.open(output) as converted:
+            assert converted.getpixel((0, 0)) == (0, 0, 255, 255)
+
+    @pytest.mark.unit
+    def test_disk_budget_evicts_oldest(self, temp_dir):
+        cache = ConversionCache(cache_dir=os.path.join(temp_dir, 'cache'), max_disk_bytes=1)
+        convert = lambda source, output: _write(output, b'converted')
+
+        first = cache.get_or_convert(_write(os.path.join(temp_dir, '1'), b'1'), convert)
+        second = cache.get_or_convert(_write(os.path.join(temp_dir, '2'), b'2'), convert)
+
+        assert not os.path.exists(first)
+        assert os.path.exists(second)
+        assert cache.stats['evictions'] == 1
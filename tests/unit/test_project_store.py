@@ -0,0 +1,132 @@
+"""
+Unit tests for ProjectStore.
+
+Tests the per-record SQLite store: reloading, the one-time import of a
+legacy projects.json, that saving a graphic writes only its rows, and the
+ID indexes.
+"""
+
+import json
+
+import pytest
+
+from models.project import ProjectStore
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / 'projects.json')
+
+
+def _reopen(store):
+    store.close()
+    return ProjectStore(store.storage_path)
+
+
+@pytest.mark.unit
+def test_round_trip(store_path):
+    store = ProjectStore(store_path)
+    project = store.create_project('Election Night', client='News', description='Lower thirds')
+    store.create_graphic(project.id, 'Lower third', psd_path='/tmp/a.psd')
+    second = store.create_graphic(project.id, 'Full screen')
+    second.mappings = {'title': 'Headline'}
+    second.add_audit_entry('updated', 'editor')
+    store.save()
+
+    reloaded = _reopen(store)
+    loaded = reloaded.get_project(project.id)
+
+    assert loaded.to_dict() == project.to_dict()
+    assert [g.name for g in loaded.graphics] == ['Lower third', 'Full screen']
+    assert reloaded.next_project_id == 2
+    assert reloaded.next_graphic_id == 3
+    reloaded.close()
+
+
+@pytest.mark.unit
+def test_imports_legacy_json_once(store_path):
+    legacy = {
+        'next_project_id': 5,
+        'next_graphic_id': 9,
+        'projects': [{
+            'id': 'proj_4',
+            'name': 'Imported',
+            'graphics': [{'id': 'graphic_8', 'name': 'Old graphic', 'status': 'complete'}]
+        }]
+    }
+    with open(store_path, 'w') as f:
+        json.dump(legacy, f)
+
+    store = ProjectStore(store_path)
+    assert store.db_path.endswith('projects.db')
+    assert store.get_graphic('graphic_8').status == 'complete'
+    assert store.create_project('New').id == 'proj_5'
+
+    # The database is now authoritative; later JSON edits are ignored
+    with open(store_path, 'w') as f:
+        json.dump({'projects': []}, f)
+    reloaded = _reopen(store)
+    assert [p.id for p in reloaded.list_projects()] == ['proj_4', 'proj_5']
+    reloaded.close()
+
+
+@pytest.mark.unit
+def test_save_graphic_writes_only_that_graphic(store_path):
+    store = ProjectStore(store_path)
+    project = store.create_project('Big')
+    graphics = [store.create_graphic(project.id, f'Graphic {i}') for i in range(50)]
+
+    target = graphics[25]
+    target.approved = True
+    target.add_audit_entry('approved', 'producer')
+    project.update_stats()
+
+    before = store._conn.total_changes
+    store.save_graphic(project, target)
+    # The project row (stats) and the one graphic
+    assert store._conn.total_changes - before == 2
+
+    # Nothing changed since: save() rewrites no records
+    before = store._conn.total_changes
+    store.save()
+    assert store._conn.total_changes - before == 0
+
+    reloaded = _reopen(store)
+    assert reloaded.get_graphic(target.id).approved is True
+    assert reloaded.get_project(project.id).approved_count == 1
+    reloaded.close()
+
+
+@pytest.mark.unit
+def test_removals_persist(store_path):
+    store = ProjectStore(store_path)
+    keep = store.create_project('Keep')
+    drop = store.create_project('Drop')
+    first = store.create_graphic(keep.id, 'First')
+    second = store.create_graphic(keep.id, 'Second')
+    store.create_graphic(drop.id, 'Gone')
+
+    keep.remove_graphic(first.id)
+    store.save_project(keep)
+    assert store.delete_project(drop.id) is True
+
+    reloaded = _reopen(store)
+    assert [p.id for p in reloaded.list_projects()] == [keep.id]
+    assert [g.id for g in reloaded.get_project(keep.id).graphics] == [second.id]
+    assert reloaded._conn.execute("SELECT COUNT(*) FROM graphics").fetchone()[0] == 1
+    reloaded.close()
+
+
+@pytest.mark.unit
+def test_graphic_lookup_follows_list_changes(store_path):
+    store = ProjectStore(store_path)
+    project = store.create_project('Lookup')
+    first = store.create_graphic(project.id, 'First')
+    second = store.create_graphic(project.id, 'Second')
+
+    assert project.get_graphic(second.id) is second
+    project.graphics.remove(first)
+    assert project.get_graphic(second.id) is second
+    assert project.get_graphic(first.id) is None
+    assert store.get_graphic('graphic_404') is None
+    store.close()
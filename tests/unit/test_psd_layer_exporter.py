@@ -0,0 +1,409 @@
+"""
+Unit tests for PSDLayerExporter.
+
+Tests serial and thread-pool layer export, nested groups and the memory
+budget on generated PSDs.
+"""
+
+import os
+import threading
+import pytest
+
+import services.psd_layer_exporter as psd_layer_exporter
+from services.psd_layer_exporter import MemoryBudget, PSDLayerExporter
+
+
+def _make_psd(path, num_layers, size=(64, 48)):
+    """Write a PSD with num_layers distinct pixel layers."""
+    from PIL import Image
+    from psd_tools import PSDImage
+
+    psd = PSDImage.new('RGBA', size)
+    for i in range(num_layers):
+        image = Image.new('RGBA', (20 + i, 10 + i), (i * 17 % 256, 80, 255 - i * 9 % 256, 200))
+        psd.create_pixel_layer(image, name=f"Layer {i}", top=i, left=i * 2)
+    psd.save(path)
+    return path
+
+
+def _make_nested_psd(path):
+    """PSD with duplicate layer names two groups deep."""
+    from PIL import Image
+    from psd_tools import PSDImage
+
+    psd = PSDImage.new('RGBA', (64, 48))
+    psd.create_pixel_layer(Image.new('RGBA', (10, 10), (255, 0, 0, 255)), name='Logo')
+    inner = psd.create_pixel_layer(Image.new('RGBA', (12, 8), (0, 255, 0, 255)), name='Logo', top=4)
+    photo = psd.create_pixel_layer(Image.new('RGBA', (30, 20), (0, 0, 255, 255)), name='Photo', left=5)
+    header = psd.create_group([inner, photo], name='Header')
+    psd.create_group([header], name='Page')
+    psd.save(path)
+    return path
+
+
+def _read_outputs(output_dir):
+    """Map relative path -> bytes for every image written by an export."""
+    files = {}
+    for root, _, names in os.walk(output_dir):
+        for name in names:
+            if name == 'export_manifest.json':
+                continue
+            full = os.path.join(root, name)
+            with open(full, 'rb') as f:
+                files[os.path.relpath(full, output_dir)] = f.read()
+    return files
+
+
+@pytest.fixture(autouse=True)
+def preview_cache(temp_dir, monkeypatch):
+    """Keep the shared preview pyramid out of the repository's data dir."""
+    import services.preview_pyramid as preview_pyramid
+
+    cache = preview_pyramid.PreviewPyramid(cache_dir=os.path.join(temp_dir, 'preview_cache'))
+    monkeypatch.setattr(preview_pyramid, '_shared_pyramid', cache)
+    return cache
+
+
+@pytest.fixture
+def sample_psd(temp_dir):
+    return _make_psd(os.path.join(temp_dir, 'layers.psd'), num_layers=10)
+
+
+class TestParallelExport:
+    """Test that the thread-pool export matches the serial export."""
+
+    @pytest.mark.unit
+    def test_parallel_output_is_byte_identical(self, sample_psd, temp_dir):
+        """Parallel export writes exactly the same files as serial export."""
+        exporter = PSDLayerExporter(max_workers=4)
+        serial_dir = os.path.join(temp_dir, 'serial')
+        parallel_dir = os.path.join(temp_dir, 'parallel')
+
+        serial = exporter.extract_all_layers(sample_psd, serial_dir, parallel=False)
+        parallel = exporter.extract_all_layers(sample_psd, parallel_dir, parallel=True)
+
+        serial_files = _read_outputs(serial_dir)
+        assert len(serial_files) == 10 * 2 + 1  # layers + thumbnails + flattened
+        assert serial_files == _read_outputs(parallel_dir)
+
+        assert list(serial['layers']) == list(parallel['layers'])
+        for name, info in serial['layers'].items():
+            other = parallel['layers'][name]
+            assert info['file_size_bytes'] == other['file_size_bytes']
+            assert os.path.basename(info['thumbnail_path']) == os.path.basename(other['thumbnail_path'])
+
+    @pytest.mark.unit
+    def test_threshold_selects_mode(self, sample_psd, temp_dir, monkeypatch):
+        """parallel=None uses the pool only at or above the layer threshold."""
+        import services.psd_layer_exporter as module
+
+        created = []
+        original = module._EncodePool
+
+        def tracking_pool(max_workers, memory_budget=None):
+            created.append(max_workers)
+            return original(max_workers, memory_budget)
+
+        monkeypatch.setattr(module, '_EncodePool', tracking_pool)
+
+        PSDLayerExporter(parallel_threshold=11, max_workers=2).extract_all_layers(
+            sample_psd, os.path.join(temp_dir, 'below'))
+        assert created == []
+
+        PSDLayerExporter(parallel_threshold=10, max_workers=2).extract_all_layers(
+            sample_psd, os.path.join(temp_dir, 'at'))
+        assert created == [2]
+
+    @pytest.mark.unit
+    def test_threshold_from_environment(self, monkeypatch):
+        """Threshold and worker count fall back to environment variables."""
+        monkeypatch.setenv('PSD_EXPORT_PARALLEL_THRESHOLD', '25')
+        monkeypatch.setenv('PSD_EXPORT_WORKERS', '3')
+        exporter = PSDLayerExporter()
+        assert exporter.parallel_threshold == 25
+        assert exporter.max_workers == 3
+
+    @pytest.mark.unit
+    def test_failed_encode_drops_layer(self, sample_psd, temp_dir, monkeypatch):
+        """A layer whose PNG write fails is left out of the results."""
+        exporter = PSDLayerExporter(max_workers=2)
+        original = exporter._write_layer_files
+
+        def flaky_write(image, output_path, thumbnails_dir, safe_name):
+            if safe_name == 'layer_3':
+                raise OSError('disk full')
+            return original(image, output_path, thumbnails_dir, safe_name)
+
+        monkeypatch.setattr(exporter, '_write_layer_files', flaky_write)
+        result = exporter.extract_all_layers(sample_psd, os.path.join(temp_dir, 'out'), parallel=True)
+
+        assert 'Layer 3' not in result['layers']
+        assert len(result['layers']) == 9
+        assert all(entry['name'] != 'Layer 3' for entry in result['metadata'])
+        assert all(entry['file_size_bytes'] for entry in result['metadata'])
+
+
+class TestNestedGroups:
+    """Test recursive export of layers inside groups."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('parallel', [False, True])
+    def test_exports_layers_inside_groups(self, temp_dir, parallel):
+        """Layers nested in groups are exported with unique file names."""
+        psd_path = _make_nested_psd(os.path.join(temp_dir, 'nested.psd'))
+        output_dir = os.path.join(temp_dir, 'out')
+
+        result = PSDLayerExporter(max_workers=2).extract_all_layers(
+            psd_path, output_dir, parallel=parallel)
+
+        paths = [entry['layer_path'] for entry in result['metadata']]
+        assert paths == ['Logo', 'Page/Header/Logo', 'Page/Header/Photo']
+        assert sorted(result['layers']) == paths
+        assert result['layers']['Logo']['size'] == (10, 10)
+
+        files = sorted(os.path.basename(entry['path']) for entry in result['metadata'])
+        assert files == ['logo.png', 'logo_2.png', 'photo.png']
+        for entry in result['metadata']:
+            assert os.path.getsize(entry['path']) == entry['file_size_bytes']
+            assert os.path.exists(entry['thumbnail_path'])
+
+
+    @pytest.mark.unit
+    def test_same_named_siblings_keep_separate_keys(self, temp_dir):
+        from PIL import Image
+        from psd_tools import PSDImage
+
+        psd = PSDImage.new('RGBA', (32, 32))
+        for shade in (10, 20, 30):
+            psd.create_pixel_layer(Image.new('RGBA', (8, 8), (shade, 0, 0, 255)), name='Layer 1')
+        psd_path = os.path.join(temp_dir, 'dupes.psd')
+        psd.save(psd_path)
+
+        result = PSDLayerExporter(max_workers=2).extract_all_layers(
+            psd_path, os.path.join(temp_dir, 'out'), parallel=False)
+        assert sorted(result['layers']) == ['Layer 1', 'Layer 1 (2)', 'Layer 1 (3)']
+
+
+class TestMemoryBudget:
+    """Test the decoded-pixel memory ceiling."""
+
+    @pytest.mark.unit
+    def test_unlimited_budget_never_blocks(self):
+        budget = MemoryBudget(None)
+        assert budget.reserve(10 ** 12) == 0
+        budget.release(0)
+        assert budget.in_use == 0
+
+    @pytest.mark.unit
+    def test_oversized_reservation_allowed_when_idle(self):
+        """A single item larger than the limit proceeds when nothing else is held."""
+        budget = MemoryBudget(100)
+        assert budget.reserve(500) == 500
+        budget.release(500)
+        assert budget.in_use == 0
+
+    @pytest.mark.unit
+    def test_reserve_blocks_until_release(self):
+        budget = MemoryBudget(100)
+        budget.reserve(80)
+        acquired = threading.Event()
+
+        def worker():
+            budget.reserve(50)
+            acquired.set()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        assert not acquired.wait(0.1)
+
+        budget.release(80)
+        assert acquired.wait(2)
+        thread.join()
+        assert budget.in_use == 50
+
+    @pytest.mark.unit
+    def test_export_respects_ceiling(self, sample_psd, temp_dir):
+        """Parallel export never holds more than the budget and matches serial output."""
+        composite_bytes = 64 * 48 * 4
+        held = []
+
+        class RecordingBudget(MemoryBudget):
+            def reserve(self, nbytes):
+                reserved = super().reserve(nbytes)
+                held.append((nbytes, self.in_use))
+                return reserved
+
+        # Largest layer is 29x19 RGBA; room for two of them at a time
+        limit = 29 * 19 * 4 * 2
+        budget = RecordingBudget(limit)
+        exporter = PSDLayerExporter(max_workers=4, memory_budget=budget)
+
+        exporter.extract_all_layers(sample_psd, os.path.join(temp_dir, 'serial'), parallel=False)
+        exporter.extract_all_layers(sample_psd, os.path.join(temp_dir, 'limited'), parallel=True)
+
+        assert budget.in_use == 0
+        # Layers stay under the ceiling; the oversized composite is only admitted alone
+        assert max(in_use for nbytes, in_use in held if nbytes < composite_bytes) <= limit
+        assert all(in_use == nbytes for nbytes, in_use in held if nbytes == composite_bytes)
+        assert _read_outputs(os.path.join(temp_dir, 'serial')) == \
+            _read_outputs(os.path.join(temp_dir, 'limited'))
+
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('parallel', [False, True])
+    def test_failed_composite_releases_budget(self, sample_psd, temp_dir, monkeypatch, parallel):
+        """A composite that raises does not leak its reservation."""
+        budget = MemoryBudget(64 * 48 * 4 * 2)
+        exporter = PSDLayerExporter(max_workers=2, memory_budget=budget)
+
+        def fail_composite(*args, **kwargs):
+            raise RuntimeError('corrupt image data')
+
+        monkeypatch.setattr(psd_layer_exporter.psd_tools.PSDImage, 'composite', fail_composite)
+        assert exporter.extract_all_layers(sample_psd, os.path.join(temp_dir, 'out'),
+                                           parallel=parallel) == {}
+        assert budget.in_use == 0
+
+    @pytest.mark.unit
+    def test_failed_decode_releases_budget(self, sample_psd, temp_dir, monkeypatch):
+        budget = MemoryBudget(64 * 48 * 4 * 2)
+        exporter = PSDLayerExporter(max_workers=2, memory_budget=budget)
+
+        def fail_topil(self, *args, **kwargs):
+            raise RuntimeError('corrupt channel')
+
+        from psd_tools.api.layers import PixelLayer
+        monkeypatch.setattr(PixelLayer, 'topil', fail_topil)
+        result = exporter.extract_all_layers(sample_psd, os.path.join(temp_dir, 'out'), parallel=True)
+        assert result['layers'] == {}
+        assert budget.in_use == 0
+
+
+class TestIncrementalExport:
+    """Test reuse of unchanged layers across re-exports."""
+
+    @staticmethod
+    def _counting_exporter(monkeypatch):
+        exporter = PSDLayerExporter(max_workers=2)
+        written = []
+        original = exporter._write_layer_files
+
+        def counting_write(image, output_path, thumbnails_dir, safe_name):
+            written.append(safe_name)
+            return original(image, output_path, thumbnails_dir, safe_name)
+
+        monkeypatch.setattr(exporter, '_write_layer_files', counting_write)
+        return exporter, written
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('parallel', [False, True])
+    def test_only_changed_layers_are_reencoded(self, temp_dir, monkeypatch, parallel):
+        """Re-export after editing one layer writes only that layer."""
+        from PIL import Image
+        from psd_tools import PSDImage
+
+        psd_path = _make_psd(os.path.join(temp_dir, 'v1.psd'), num_layers=8)
+        output_dir = os.path.join(temp_dir, 'job')
+        exporter, written = self._counting_exporter(monkeypatch)
+
+        exporter.extract_all_layers(psd_path, output_dir, parallel=parallel)
+        assert len(written) == 8
+
+        # Same document with Layer 5 repainted
+        psd = PSDImage.open(psd_path)
+        edited = PSDImage.new('RGBA', (psd.width, psd.height))
+        for layer in psd:
+            image = layer.topil()
+            if layer.name == 'Layer 5':
+                image = Image.new('RGBA', image.size, (1, 2, 3, 255))
+            edited.create_pixel_layer(image, name=layer.name, top=layer.top, left=layer.left)
+        v2_path = os.path.join(temp_dir, 'v2.psd')
+        edited.save(v2_path)
+
+        written.clear()
+        result = exporter.extract_all_layers(v2_path, output_dir, parallel=parallel)
+        assert written == ['layer_5']
+        assert len(result['layers']) == 8
+        assert all(os.path.exists(entry['thumbnail_path']) for entry in result['metadata'])
+
+        # Reused files are identical to a from-scratch export
+        fresh_dir = os.path.join(temp_dir, 'fresh')
+        exporter.extract_all_layers(v2_path, fresh_dir, parallel=parallel, incremental=False)
+        assert _read_outputs(output_dir) == _read_outputs(fresh_dir)
+
+    @pytest.mark.unit
+    def test_removed_layers_are_cleaned_up(self, temp_dir, monkeypatch):
+        """Files of layers missing from the new PSD are deleted."""
+        output_dir = os.path.join(temp_dir, 'job')
+        exporter, written = self._counting_exporter(monkeypatch)
+
+        exporter.extract_all_layers(_make_psd(os.path.join(temp_dir, 'a.psd'), 4), output_dir)
+        assert os.path.exists(os.path.join(output_dir, 'layer_3.png'))
+
+        written.clear()
+        exporter.extract_all_layers(_make_psd(os.path.join(temp_dir, 'b.psd'), 3), output_dir)
+        assert written == []
+        assert not os.path.exists(os.path.join(output_dir, 'layer_3.png'))
+        assert not os.path.exists(os.path.join(output_dir, 'thumbnails', 'thumb_layer_3.png'))
+
+    @pytest.mark.unit
+    def test_missing_files_are_regenerated(self, sample_psd, temp_dir, monkeypatch):
+        """A manifest entry whose PNG was deleted is not reused."""
+        output_dir = os.path.join(temp_dir, 'job')
+        exporter, written = self._counting_exporter(monkeypatch)
+        exporter.extract_all_layers(sample_psd, output_dir)
+
+        os.remove(os.path.join(output_dir, 'thumbnails', 'thumb_layer_2.png'))
+        written.clear()
+        exporter.extract_all_layers(sample_psd, output_dir)
+        assert written == ['layer_2']
+
+    @pytest.mark.unit
+    def test_pixel_hash_fallback_reuses_layers(self, sample_psd, temp_dir, monkeypatch):
+        """Without raw channel records, unchanged layers are matched by their pixels."""
+        output_dir = os.path.join(temp_dir, 'job')
+        exporter, written = self._counting_exporter(monkeypatch)
+        monkeypatch.setattr(exporter, '_layer_content_hash', lambda layer: None)
+
+        exporter.extract_all_layers(sample_psd, output_dir)
+        assert len(written) == 10
+
+        written.clear()
+        result = exporter.extract_all_layers(sample_psd, output_dir)
+        assert written == []
+        assert len(result['layers']) == 10
+
+    @pytest.mark.unit
+    def test_unhashed_layers_are_not_deleted(self, sample_psd, temp_dir, monkeypatch):
+        """Files written this run survive even when they get no manifest entry."""
+        output_dir = os.path.join(temp_dir, 'job')
+        exporter, written = self._counting_exporter(monkeypatch)
+        exporter.extract_all_layers(sample_psd, output_dir)
+
+        monkeypatch.setattr(exporter, '_layer_content_hash', lambda layer: None)
+        monkeypatch.setattr(exporter, '_pixel_content_hash', lambda layer, image: None)
+        written.clear()
+        exporter.extract_all_layers(sample_psd, output_dir)
+        assert len(written) == 10
+        assert os.path.exists(os.path.join(output_dir, 'layer_2.png'))
+        assert os.path.exists(os.path.join(output_dir, 'thumbnails', 'thumb_layer_2.png'))
+
+
+class TestFlattenedPreviewCache:
+    """Test that the flattened preview is shared through the preview pyramid."""
+
+    @pytest.mark.unit
+    def test_second_export_reuses_cached_composite(self, sample_psd, temp_dir, preview_cache, monkeypatch):
+        exporter = PSDLayerExporter(max_workers=2)
+        first = exporter.extract_all_layers(sample_psd, os.path.join(temp_dir, 'first'), parallel=True)
+        assert preview_cache.get_meta(sample_psd) is not None
+
+        def fail_composite(*args, **kwargs):
+            raise AssertionError('composited again')
+
+        monkeypatch.setattr(psd_layer_exporter.psd_tools.PSDImage, 'composite', fail_composite)
+        second = exporter.extract_all_layers(sample_psd, os.path.join(temp_dir, 'second'), parallel=False)
+
+        with open(first['flattened_preview'], 'rb') as a, open(second['flattened_preview'], 'rb') as b:
+            assert a.read() == b.read()
+
@@ -0,0 +1,124 @@
+"""
+Unit tests for RenderCache.
+
+Tests fingerprint inputs, storing/restoring renders and byte-based eviction.
+"""
+
+import os
+import pytest
+
+from services.render_cache import RenderCache
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+@pytest.fixture
+def cache(temp_dir):
+    return RenderCache(cache_dir=os.path.join(temp_dir, 'renders'))
+
+
+@pytest.fixture
+def project(temp_dir):
+    footage = _write(os.path.join(temp_dir, 'run1', 'bg.png'), b'png-1')
+    project = _write(os.path.join(temp_dir, 'run1', 'project.aepx'),
+                     f'<ref fullpath="{footage}"/>'.encode())
+    return project, footage
+
+
+class TestFingerprint:
+    """Test which inputs change the cache key."""
+
+    @pytest.mark.unit
+    def test_same_inputs_same_key(self, cache, project):
+        project_path, footage = project
+        options = {'resolution': 'half', 'duration': 5, 'fps': 15}
+        first = cache.fingerprint(project_path, 'Main', options, [footage])
+        assert first == cache.fingerprint(project_path, 'Main', dict(options, format='mp4'), [footage])
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('change', ['comp', 'options', 'footage', 'project', 'extra'])
+    def test_render_inputs_change_key(self, cache, project, change):
+        project_path, footage = project
+        options = {'resolution': 'half', 'duration': 5, 'fps': 15}
+        before = cache.fingerprint(project_path, 'Main', options, [footage], extra='script')
+
+        comp, extra = 'Main', 'script'
+        if change == 'comp':
+            comp = 'Other'
+        elif change == 'options':
+            options['fps'] = 30
+        elif change == 'footage':
+            _write(footage, b'png-2')
+        elif change == 'project':
+            _write(project_path, b'<changed/>')
+        else:
+            extra = 'other script'
+
+        assert cache.fingerprint(project_path, comp, options, [footage], extra=extra) != before
+
+    @pytest.mark.unit
+    def test_temp_directory_masked(self, cache, temp_dir):
+        keys = []
+        for run in ('run_a', 'run_b'):
+            run_dir = os.path.join(temp_dir, run)
+            footage = _write(os.path.join(run_dir, 'bg.png'), b'png')
+            project = _write(os.path.join(run_dir, 'p.aepx'), f'<ref fullpath="{footage}"/>'.encode())
+            keys.append(cache.fingerprint(project, 'Main', {}, [footage], relative_to=run_dir))
+
+        assert keys[0] == keys[1]
+
+
+class TestStoreAndRestore:
+    """Test caching rendered files."""
+
+    @pytest.mark.unit
+    def test_restore_copies_video_and_thumbnail(self, cache, temp_dir):
+        video = _write(os.path.join(temp_dir, 'out', 'preview.mp4'), b'video')
+        thumb = _write(os.path.join(temp_dir, 'out', 'preview.jpg'), b'jpeg')
+        assert cache.put('key1', video, thumb)
+
+        target = os.path.join(temp_dir, 'job2', 'preview.mp4')
+        restored = cache.restore('key1', target, os.path.join(temp_dir, 'job2', 'preview.jpg'))
+
+        assert restored['video_path'] == target
+        with open(target, 'rb') as f:
+            assert f.read() == b'video'
+        with open(restored['thumbnail_path'], 'rb') as f:
+            assert f.read() == b'jpeg'
+
+        # Overwriting the restored output in place must not touch the cache
+        _write(target, b'rendered again')
+        with open(cache.get('key1')['video_path'], 'rb') as f:
+            assert f.read() == b'video'
+
+    @pytest.mark.unit
+    def test_miss_and_disabled(self, temp_dir):
+        cache = RenderCache(cache_dir=os.path.join(temp_dir, 'renders'))
+        assert cache.restore('missing', os.path.join(temp_dir, 'x.mp4')) is None
+        assert cache.get_stats()['misses'] == 1
+
+        disabled = RenderCache(cache_dir=os.path.join(temp_dir, 'off'), enabled=False)
+        video = _write(os.path.join(temp_dir, 'v.mp4'), b'video')
+        assert not disabled.put('key', video)
+        assert disabled.get('key') is None
+
+    @pytest.mark.unit
+    def test_evicts_least_recently_used_by_bytes(self, temp_dir):
+        cache = RenderCache(cache_dir=os.path.join(temp_dir, 'renders'), max_disk_bytes=25)
+        for name in ('a', 'b'):
+            cache.put(name, _write(os.path.join(temp_dir, f'{name}.mp4'), b'x' * 10))
+        os.utime(os.path.join(temp_dir, 'renders', 'a', 'meta.json'), (1, 1))
+        cache.get('b')
+
+        cache.put('c', _write(os.path.join(temp_dir, 'c.mp4'), b'x' * 10))
+
+        assert cache.get('a') is None
+        assert cache.get('b') is not None and cache.get('c') is not None
+        stats = cache.get_stats()
+        assert stats['evictions'] == 1
+        assert stats['disk_bytes'] == 20
@@ -0,0 +1,188 @@
+"""
+Unit tests for RenderScheduler.
+
+Runs a fake aerender script that prints aerender-style PROGRESS output, so
+slots, priority, timeouts, cancellation and progress parsing can be tested
+without After Effects.
+"""
+
+import os
+import stat
+import sys
+import time
+import pytest
+
+from services.render_scheduler import RenderScheduler, RenderTask
+
+
+FAKE_AERENDER = '''#!{python}
+import sys, time
+args = sys.argv[1:]
+opts = dict(zip(args[::2], args[1::2]))
+frames = int(opts.get('-frames', 4))
+delay = float(opts.get('-delay', 0))
+code = int(opts.get('-exit', 0))
+print('PROGRESS:  Duration: 0:00:00:%02d' % frames)
+print('PROGRESS:  Frame Rate: 30.00 (comp)', flush=True)
+for i in range(frames):
+    print('PROGRESS:  0:00:00:%02d (%d): 0 Seconds' % (i, i + 1), flush=True)
+    time.sleep(delay)
+if code == 0:
+    with open(opts['-output'], 'w') as f:
+        f.write('video')
+print('PROGRESS:  Render Finished')
+sys.exit(code)
+'''
+
+
+@pytest.fixture
+def fake_aerender(temp_dir):
+    path = os.path.join(temp_dir, 'aerender')
+    with open(path, 'w') as f:
+        f.write(FAKE_AERENDER.format(python=sys.executable))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+@pytest.fixture
+def scheduler(fake_aerender):
+    scheduler = RenderScheduler(slots=1, default_timeout=30, aerender_path=fake_aerender)
+    yield scheduler
+    scheduler.shutdown(cancel_running=True)
+
+
+def _submit(scheduler, temp_dir, name, **kwargs):
+    args = []
+    for key in ('frames', 'delay', 'exit'):
+        if key in kwargs:
+            args += [f'-{key}', str(kwargs.pop(key))]
+    return scheduler.submit('project.aep', 'Main Comp', os.path.join(temp_dir, 'out', f'{name}.mp4'),
+                            args=args, **kwargs)
+
+
+class TestRenderOutcomes:
+    """Test how a single render finishes."""
+
+    @pytest.mark.unit
+    def test_successful_render_reports_progress(self, scheduler, temp_dir):
+        task = _submit(scheduler, temp_dir, 'ok', frames=6, job_id='job1')
+
+        assert task.wait(10)
+        assert task.succeeded
+        assert task.total_frames == 6 and task.frames_rendered == 6
+        assert task.progress == 1.0
+        assert os.path.exists(task.output_path)
+        assert 'Render Finished' in task.output
+        assert scheduler.get_tasks_for_job('job1') == [task]
+
+    @pytest.mark.unit
+    def test_nonzero_exit_fails(self, scheduler, temp_dir):
+        task = _submit(scheduler, temp_dir, 'bad', exit=3)
+
+        assert task.wait(10)
+        assert task.status == 'failed'
+        assert task.returncode == 3
+        assert scheduler.get_stats()['failed'] == 1
+
+    @pytest.mark.unit
+    def test_timeout_kills_render(self, scheduler, temp_dir):
+        task = _submit(scheduler, temp_dir, 'slow', frames=100, delay=0.1, timeout=0.5)
+
+        assert task.wait(10)
+        assert task.status == 'timed_out'
+        assert task.finished_at - task.started_at < 5
+
+    @pytest.mark.unit
+    def test_missing_executable(self, temp_dir):
+        scheduler = RenderScheduler(slots=1, aerender_path=os.path.join(temp_dir, 'nope'))
+        task = _submit(scheduler, temp_dir, 'x')
+        assert task.wait(10)
+        assert task.status == 'failed'
+        scheduler.shutdown()
+
+        with pytest.raises(ValueError):
+            RenderScheduler(slots=1).submit('p.aep', 'c', 'o.mp4')
+
+
+class TestScheduling:
+    """Test slots, priority and cancellation."""
+
+    @pytest.mark.unit
+    def test_high_priority_runs_first(self, scheduler, temp_dir):
+        blocker = _submit(scheduler, temp_dir, 'blocker', frames=5, delay=0.05)
+        low = _submit(scheduler, temp_dir, 'low', priority='low')
+        high = _submit(scheduler, temp_dir, 'high', priority='high')
+
+        for task in (blocker, low, high):
+            assert task.wait(10)
+        assert high.started_at <= low.started_at
+
+    @pytest.mark.unit
+    def test_slots_run_concurrently(self, fake_aerender, temp_dir):
+        scheduler = RenderScheduler(slots=2, aerender_path=fake_aerender)
+        first = _submit(scheduler, temp_dir, 'a', frames=5, delay=0.1)
+        second = _submit(scheduler, temp_dir, 'b', frames=5, delay=0.1)
+
+        assert first.wait(10) and second.wait(10)
+        assert second.started_at < first.finished_at
+        scheduler.shutdown()
+
+    @pytest.mark.unit
+    def test_cancel_queued_and_running(self, scheduler, temp_dir):
+        running = _submit(scheduler, temp_dir, 'running', frames=100, delay=0.1)
+        queued = _submit(scheduler, temp_dir, 'queued')
+
+        assert scheduler.cancel(queued.task_id)
+        assert queued.status == 'cancelled' and queued.started_at is None
+
+        deadline = time.time() + 5
+        while running.status != 'running' and time.time() < deadline:
+            time.sleep(0.01)
+        assert scheduler.cancel(running.task_id)
+        assert running.wait(10)
+        assert running.status == 'cancelled'
+        assert not scheduler.cancel(running.task_id)
+
+    @pytest.mark.unit
+    def test_cancel_job(self, scheduler, temp_dir):
+        running = _submit(scheduler, temp_dir, 'running', frames=100, delay=0.1, job_id='job1')
+        queued = _submit(scheduler, temp_dir, 'queued', job_id='job1')
+        other = _submit(scheduler, temp_dir, 'other', job_id='job2')
+
+        assert scheduler.cancel_job('job1') == 2
+        assert running.wait(10) and queued.wait(10)
+        assert running.status == queued.status == 'cancelled'
+        assert other.wait(10) and other.succeeded
+        assert scheduler.cancel_job('job1') == 0
+
+    @pytest.mark.unit
+    def test_wait_gives_up_on_queued_render(self, scheduler, temp_dir):
+        running = _submit(scheduler, temp_dir, 'running', frames=20, delay=0.05)
+        queued = _submit(scheduler, temp_dir, 'queued')
+
+        assert scheduler.wait(queued, queue_timeout=0.2) is queued
+        assert queued.status == 'timed_out' and queued.started_at is None
+        # The render already on the slot is unaffected
+        assert scheduler.wait(running, queue_timeout=0.2).succeeded
+
+    @pytest.mark.unit
+    def test_shutdown_rejects_new_renders(self, scheduler, temp_dir):
+        scheduler.shutdown()
+        with pytest.raises(RuntimeError):
+            _submit(scheduler, temp_dir, 'late')
+
+
+class TestProgressParsing:
+    """Test aerender output parsing."""
+
+    @pytest.mark.unit
+    def test_progress_from_timecode_and_frame_rate(self):
+        task = RenderTask(1, [], 'out.mp4', 'medium', None, None)
+        task._feed('PROGRESS:  Start Time: 0:00:00:00')
+        task._feed('PROGRESS:  Duration: 0:00:02:15')
+        task._feed('PROGRESS:  Frame Rate: 30.00 (comp)')
+        task._feed('PROGRESS:  0:00:00:29 (30): 0 Seconds')
+
+        assert task.total_frames == 75
+        assert task.frames_rendered == 30
+        assert task.progress == pytest.approx(0.4)
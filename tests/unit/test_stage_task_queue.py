@@ -0,0 +1,156 @@
+"""
+Unit tests for StageTaskQueue.
+
+Tests enqueue de-duplication, priority ordering, leases, retries and
+lease expiry against a temporary SQLite database.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import db_session
+from database.models import Job, StageTask
+from services.stage_task_queue import StageTaskQueue
+
+
+def _add_job(job_id, priority='medium', created_at=None):
+    job = Job(
+        job_id=job_id,
+        psd_path=f'/tmp/{job_id}.psd',
+        aepx_path=f'/tmp/{job_id}.aepx',
+        output_name=job_id,
+        priority=priority,
+        created_at=created_at or datetime.utcnow()
+    )
+    db_session.add(job)
+    db_session.commit()
+    return job
+
+
+class TestStageTaskQueue:
+    """Test StageTaskQueue behaviour."""
+
+    @pytest.mark.unit
+    def test_enqueue_deduplicates_active_tasks(self, tmp_db):
+        _add_job('job1')
+        queue = StageTaskQueue()
+
+        first = queue.enqueue('job1', 2)
+        second = queue.enqueue('job1', 2)
+
+        assert first.task_id == second.task_id
+        assert db_session.query(StageTask).count() == 1
+
+    @pytest.mark.unit
+    def test_lease_order_follows_priority_then_age(self, tmp_db):
+        base = datetime(2025, 1, 1)
+        _add_job('old_low', 'low', base)
+        _add_job('new_high', 'high', base + timedelta(hours=2))
+        _add_job('old_high', 'high', base + timedelta(hours=1))
+        queue = StageTaskQueue()
+        for job_id in ('old_low', 'new_high', 'old_high'):
+            queue.enqueue(job_id, 2)
+
+        order = [queue.lease('w1').job_id for _ in range(3)]
+
+        assert order == ['old_high', 'new_high', 'old_low']
+        assert queue.lease('w1') is None
+
+    @pytest.mark.unit
+    def test_leased_task_not_claimed_twice(self, tmp_db):
+        _add_job('job1')
+        queue = StageTaskQueue()
+        queue.enqueue('job1', 2)
+
+        task = queue.lease('w1')
+
+        assert task.status == 'leased'
+        assert task.attempts == 1
+        assert queue.lease('w2') is None
+        assert queue.complete(task, 'w1') is True
+        assert queue.get_task('job1', 2).status == 'completed'
+
+    @pytest.mark.unit
+    def test_fail_retries_with_backoff_then_fails(self, tmp_db):
+        _add_job('job1')
+        queue = StageTaskQueue(max_attempts=2, backoff_seconds=0)
+        queue.enqueue('job1', 3)
+
+        task = queue.lease('w1')
+        assert queue.fail(task, 'w1', 'boom') is True
+        assert task.status == 'queued'
+
+        task = queue.lease('w1')
+        assert task.attempts == 2
+        assert queue.fail(task, 'w1', 'boom again') is False
+        assert task.status == 'failed'
+        assert task.last_error == 'boom again'
+
+    @pytest.mark.unit
+    def test_expired_lease_is_reclaimed(self, tmp_db):
+        _add_job('job1')
+        queue = StageTaskQueue()
+        queue.enqueue('job1', 2)
+
+        task = queue.lease('crashed-worker')
+        task.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db_session.commit()
+
+        reclaimed = queue.lease('w2')
+
+        assert reclaimed.task_id == task.task_id
+        assert reclaimed.lease_owner == 'w2'
+        assert reclaimed.attempts == 2
+        # The crashed worker can no longer complete it
+        assert queue.complete(task, 'crashed-worker') is False
+
+    @pytest.mark.unit
+    def test_expired_final_lease_fails_job(self, tmp_db):
+        from services.stage_transition_manager import StageTransitionManager
+
+        job = _add_job('job1')
+        job.status = 'processing'
+        db_session.commit()
+        manager = StageTransitionManager(task_queue=StageTaskQueue(max_attempts=1))
+        manager._start_preprocessing('job1', 2, 'tester')
+
+        task = manager.task_queue.lease('crashed-worker')
+        task.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db_session.commit()
+
+        assert manager.process_next_task('w2') is False
+        assert manager.task_queue.get_task('job1', 2).status == 'failed'
+        assert db_session.get(Job, 'job1').status == 'failed'
+        warnings = manager.warning_service.get_job_warnings('job1')
+        assert [w.warning_type for w in warnings] == ['preprocessing_failed']
+
+    @pytest.mark.unit
+    def test_queue_stats(self, tmp_db):
+        _add_job('job1')
+        _add_job('job2')
+        queue = StageTaskQueue()
+        queue.enqueue('job1', 2)
+        queue.enqueue('job2', 5)
+        queue.lease('w1')
+
+        stats = queue.get_queue_stats()
+
+        assert stats['by_status'] == {'leased': 1, 'queued': 1}
+        assert stats['oldest_queued_at'] is not None
+
+    @pytest.mark.unit
+    def test_transition_manager_processes_queued_task(self, tmp_db):
+        from services.stage_transition_manager import StageTransitionManager
+
+        _add_job('job1')
+        manager = StageTransitionManager()
+        manager._start_preprocessing('job1', 4, 'tester')
+
+        assert manager.get_preprocessing_status('job1', 4)['status'] == 'queued'
+        assert manager.process_next_task('w1') is True
+        assert manager.process_next_task('w1') is False
+
+        status = manager.get_preprocessing_status('job1', 4)
+        assert status['status'] == 'completed'
+        assert db_session.get(Job, 'job1').status == 'awaiting_approval'
@@ -0,0 +1,128 @@
+"""
+Unit tests for ThumbnailService.
+
+Tests the headless thumbnail backend and the Photoshop fallback.
+"""
+
+import os
+import pytest
+from PIL import Image
+
+from services.base_service import Result
+from services.thumbnail_service import ThumbnailService
+from core.logging_config import get_service_logger
+
+
+@pytest.fixture
+def thumbnail_service():
+    return ThumbnailService(get_service_logger('test'), backend='headless', max_workers=2)
+
+
+@pytest.fixture
+def layered_psd(temp_dir):
+    """PSD with two pixel layers (one half transparent) and a group."""
+    from psd_tools import PSDImage
+
+    psd = PSDImage.new('RGBA', (120, 80))
+    psd.create_pixel_layer(Image.new('RGBA', (100, 50), (200, 0, 0, 255)), name='Hero Photo!')
+    psd.create_pixel_layer(Image.new('RGBA', (40, 40), (0, 0, 255, 0)), name='Ghost', top=10, left=10)
+    nested = psd.create_pixel_layer(Image.new('RGBA', (10, 10), (0, 255, 0, 255)), name='Nested')
+    psd.create_group([nested], name='Group')
+
+    path = os.path.join(temp_dir, 'layers.psd')
+    psd.save(path)
+    return path
+
+
+class TestHeadlessThumbnails:
+    """Test rendering thumbnails without Photoshop."""
+
+    @pytest.mark.unit
+    def test_generates_session_layout(self, thumbnail_service, layered_psd, temp_dir):
+        result = thumbnail_service.generate_layer_thumbnails(layered_psd, temp_dir, 'session1')
+
+        assert result.is_success()
+        thumbnails = result.get_data()
+        assert thumbnails == {'Hero Photo!': 'Hero_Photo_.png', 'Ghost': 'Ghost.png'}
+
+        folder = os.path.join(temp_dir, 'thumbnails', 'session1')
+        assert sorted(os.listdir(folder)) == ['Ghost.png', 'Hero_Photo_.png']
+
+        with Image.open(os.path.join(folder, 'Hero_Photo_.png')) as hero:
+            assert hero.size == (200, 100)
+            assert hero.getpixel((100, 50)) == (200, 0, 0)
+
+        # Transparent pixels are flattened onto white
+        with Image.open(os.path.join(folder, 'Ghost.png')) as ghost:
+            assert ghost.mode == 'RGB'
+            assert ghost.getpixel((5, 5)) == (255, 255, 255)
+
+        assert thumbnail_service.get_thumbnail_path('session1', 'Hero Photo!', temp_dir) == \
+            os.path.join(folder, 'Hero_Photo_.png')
+
+    @pytest.mark.unit
+    def test_unreadable_psd_falls_back_to_photoshop(self, thumbnail_service, temp_dir, monkeypatch):
+        bad_psd = os.path.join(temp_dir, 'bad.psd')
+        with open(bad_psd, 'wb') as f:
+            f.write(b'not a psd')
+
+        calls = []
+        monkeypatch.setattr(thumbnail_service, '_should_try_photoshop', lambda: True)
+        monkeypatch.setattr(
+            thumbnail_service, '_generate_with_photoshop',
+            lambda psd_path, folder: calls.append(folder) or Result.success({'Layer': 'Layer.png'})
+        )
+
+        result = thumbnail_service.generate_layer_thumbnails(bad_psd, temp_dir, 'session2')
+        assert result.get_data() == {'Layer': 'Layer.png'}
+        assert str(calls[0]).endswith(os.path.join('thumbnails', 'session2'))
+
+    @pytest.mark.unit
+    def test_unreadable_psd_without_photoshop_fails(self, thumbnail_service, temp_dir, monkeypatch):
+        bad_psd = os.path.join(temp_dir, 'bad.psd')
+        with open(bad_psd, 'wb') as f:
+            f.write(b'not a psd')
+
+        monkeypatch.setattr(thumbnail_service, '_should_try_photoshop', lambda: False)
+        result = thumbnail_service.generate_layer_thumbnails(bad_psd, temp_dir, 'session3')
+        assert result.is_failure()
+
+    @pytest.mark.unit
+    def test_layers_composited_on_calling_thread(self, thumbnail_service, layered_psd, temp_dir, monkeypatch):
+        """Only resize/encode runs on the pool; the shared PSDImage stays on one thread."""
+        import threading
+        from services.psd_layer_exporter import get_memory_budget
+
+        composite_threads, write_threads = set(), set()
+        composite, write = thumbnail_service._composite_layer, thumbnail_service._write_thumbnail
+
+        def recording_composite(layer):
+            composite_threads.add(threading.current_thread().name)
+            return composite(layer)
+
+        def recording_write(image, layer_name, thumb_folder):
+            write_threads.add(threading.current_thread().name)
+            return write(image, layer_name, thumb_folder)
+
+        monkeypatch.setattr(thumbnail_service, '_composite_layer', recording_composite)
+        monkeypatch.setattr(thumbnail_service, '_write_thumbnail', recording_write)
+
+        result = thumbnail_service.generate_layer_thumbnails(layered_psd, temp_dir, 'session4')
+        assert len(result.get_data()) == 2
+        assert composite_threads == {threading.current_thread().name}
+        assert all(name.startswith('Thumbnail') for name in write_threads)
+        assert get_memory_budget().in_use == 0
+
+
+class TestBackendSelection:
+    """Test backend configuration."""
+
+    @pytest.mark.unit
+    def test_backend_from_environment(self, monkeypatch):
+        monkeypatch.setenv('THUMBNAIL_BACKEND', 'photoshop')
+        assert ThumbnailService(None).backend == 'photoshop'
+
+    @pytest.mark.unit
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            ThumbnailService(None, backend='gimp')
@@ -14,8 +14,13 @@ from datetime import datetime, timedelta
 from flask import Flask, request, jsonify, render_template, send_file, g
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
-from PIL import Image, ImageDraw, ImageFont
-from psd_tools import PSDImage
+from core.lazy_imports import lazy_import
+
+# Heavy imaging libraries load on first use to keep startup fast
+Image = lazy_import('PIL.Image')
+ImageDraw = lazy_import('PIL.ImageDraw')
+ImageFont = lazy_import('PIL.ImageFont')
+psd_tools = lazy_import('psd_tools')
 
 # Legacy module imports (still used by some functions)
 from modules.phase1.psd_parser import parse_psd
@@ -1815,7 +1820,7 @@ def render_psd_preview():
         preview_prefix = f"{session_id}_{timestamp}"
 
         # Open PSD file
-        psd = PSDImage.open(psd_path)
+        psd = psd_tools.PSDImage.open(psd_path)
 
         # Render full PSD preview
         full_preview_filename = f"psd_full_{preview_prefix}.png"
@@ -3800,12 +3805,18 @@ def start_batch_processing(batch_id: str):
     Processes all jobs in the batch through automated ingestion.
     """
     try:
-        max_jobs = request.json.get('max_jobs', 100) if request.json else 100
+        options = request.json or {}
+        max_jobs = options.get('max_jobs', 100)
 
         container.main_logger.info(f"Starting Stage 1 processing for batch {batch_id}")
 
-        # Process batch
-        result = stage1_processor.process_batch(batch_id, max_jobs=max_jobs)
+        # Process batch (workers/job_timeout default to STAGE1_WORKERS/STAGE1_JOB_TIMEOUT)
+        result = stage1_processor.process_batch(
+            batch_id,
+            max_jobs=max_jobs,
+            workers=options.get('workers'),
+            job_timeout=options.get('job_timeout')
+        )
 
         # Update batch status
         if result['succeeded'] > 0:
@@ -3951,23 +3962,17 @@ def get_job_status(job_id: str):
 def get_dashboard_stats():
     """Get production dashboard statistics."""
     try:
-        # Get summary stats
-        summary = job_service.get_summary_stats()
-
-        # Get counts by stage
-        stage_counts = job_service.get_job_counts_by_stage()
-
-        # Get counts by status
-        status_counts = job_service.get_job_counts_by_status()
+        # Summary and counts by stage/status (materialized counters)
+        stats = job_service.get_dashboard_stats()
 
         # Get recent batches
         recent_batches = job_service.get_all_batches(limit=10)
 
         return jsonify({
             'success': True,
-            'summary': summary,
-            'stage_counts': stage_counts,
-            'status_counts': status_counts,
+            'summary': stats['summary'],
+            'stage_counts': stats['stage_counts'],
+            'status_counts': stats['status_counts'],
             'recent_batches': [{
                 'batch_id': b.batch_id,
                 'status': b.status,
@@ -3986,39 +3991,6 @@ def get_dashboard_stats():
         }), 500
 
 
-@app.route('/api/jobs/stage/<int:stage>', methods=['GET'])
-def get_jobs_by_stage(stage: int):
-    """Get all jobs in a specific stage."""
-    try:
-        batch_id = request.args.get('batch_id')
-        limit = int(request.args.get('limit', 100))
-
-        jobs = job_service.get_jobs_for_stage(stage, batch_id=batch_id, limit=limit)
-
-        return jsonify({
-            'success': True,
-            'stage': stage,
-            'count': len(jobs),
-            'jobs': [{
-                'job_id': job.job_id,
-                'batch_id': job.batch_id,
-                'status': job.status,
-                'priority': job.priority,
-                'client_name': job.client_name,
-                'project_name': job.project_name,
-                'output_name': job.output_name,
-                'created_at': job.created_at.isoformat() if job.created_at else None
-            } for job in jobs]
-        })
-
-    except Exception as e:
-        container.main_logger.error(f"Error getting jobs by stage: {e}", exc_info=True)
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-
 # ============================================================================
 # STAGE TRANSITION & APPROVAL ENDPOINTS
 # ============================================================================
@@ -4510,6 +4482,27 @@ def get_preprocessing_status(job_id: str, stage: int):
         }), 500
 
 
+@app.route('/api/stage-tasks/stats', methods=['GET'])
+def get_stage_task_stats():
+    """
+    Get stage pre-processing queue depth by status and stage.
+    """
+    try:
+        stats = transition_manager.task_queue.get_queue_stats()
+
+        return jsonify({
+            'success': True,
+            **stats
+        })
+
+    except Exception as e:
+        container.main_logger.error(f"Error getting stage task stats: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 # ============================================================================
 # MAIN
 # ============================================================================
@@ -4532,5 +4525,18 @@ if __name__ == '__main__':
     print("\n⚠️  Press Ctrl+C to stop the server")
     print("="*70 + "\n")
 
+    # With the debug reloader, the serving child process (not the file
+    # watcher) runs the background work below
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        # Execute queued stage pre-processing in this process
+        # (STAGE_WORKERS=0 to use `python -m services.stage_worker` instead)
+        from services.stage_worker import start_embedded_workers
+        start_embedded_workers(transition_manager, container.main_logger)
+
+        # Load the embedding model off the request path
+        if os.getenv('EMBEDDING_WARMUP', 'true').lower() == 'true':
+            from modules.phase3.ml_content_matcher import warm_up_model
+            warm_up_model(background=True)
+
     app.run(debug=True, host='0.0.0.0', port=5001)
 